@@ -0,0 +1,45 @@
+"""Benchmark suite of the measurement, analysis and data-file hot paths.
+
+Times each protocol's ``run()`` on the emulated system without delays,
+the J-V analysis, data-file writing, the PDF report, data-file
+scrambling and the live plot update, each at growing data sizes (see
+:mod:`.cases`). Results are written as JSON; a run compared with a
+stored baseline reports the cases that got slower. From the command
+line::
+
+    python -m iv_lab.bench --output bench.json
+    python -m iv_lab.bench --compare baseline.json --threshold 0.25
+
+The test suite runs every case once at its smallest size
+(``tests/test_bench.py``), so the benchmarks keep working as the code
+changes. Compare runs on the same machine only.
+
+:mod:`.soak` soak-tests multi-day MPP and constant-voltage runs at
+accelerated time (``python -m iv_lab.bench.soak``).
+"""
+
+from .cases import BENCHMARKS
+from .runner import (
+    BENCH_FORMAT,
+    DEFAULT_THRESHOLD,
+    Benchmark,
+    Comparison,
+    Timing,
+    compare,
+    read_results,
+    run_benchmarks,
+    write_results,
+)
+
+__all__ = [
+    "BENCHMARKS",
+    "BENCH_FORMAT",
+    "Benchmark",
+    "Comparison",
+    "DEFAULT_THRESHOLD",
+    "Timing",
+    "compare",
+    "read_results",
+    "run_benchmarks",
+    "write_results",
+]
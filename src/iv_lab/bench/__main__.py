@@ -0,0 +1,101 @@
+"""Command line of the benchmark suite.
+
+Usage::
+
+    python -m iv_lab.bench [-k PATTERN] [--repeat N] [--quick]
+                           [--output PATH] [--compare BASELINE]
+                           [--threshold FRACTION]
+
+Exits with 1 when ``--compare`` finds a case slower than the baseline by
+more than the threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from .cases import BENCHMARKS
+from .runner import (
+    DEFAULT_THRESHOLD,
+    Timing,
+    compare,
+    read_results,
+    run_benchmarks,
+    write_results,
+)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m iv_lab.bench",
+        description="Time the measurement, analysis and data-file hot paths.",
+    )
+    parser.add_argument(
+        "-k",
+        dest="pattern",
+        default=None,
+        help="run only the cases whose name contains PATTERN",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=None, help="timed calls per size (default: per case)"
+    )
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="run each case once at its smallest size (checks the suite, no timing)",
+    )
+    parser.add_argument(
+        "--output", default=None, metavar="PATH", help="write the results as JSON to PATH"
+    )
+    parser.add_argument(
+        "--compare",
+        default=None,
+        metavar="BASELINE",
+        help="compare with a result file written by an earlier --output",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="slowdown reported as a regression, as a fraction (default: %(default)s)",
+    )
+    return parser.parse_args(argv)
+
+
+def _print_timing(timing: Timing) -> None:
+    print(
+        f"{timing.name:<28} {timing.size:>8}  "
+        f"best {timing.best * 1e3:10.3f} ms  median {timing.median * 1e3:10.3f} ms",
+        flush=True,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    # read the baseline first: a wrong path should not cost a whole run
+    baseline = read_results(args.compare) if args.compare is not None else None
+
+    benchmarks = [b for b in BENCHMARKS if args.pattern is None or args.pattern in b.name]
+    timings = run_benchmarks(
+        benchmarks, quick=args.quick, repeat=args.repeat, progress=_print_timing
+    )
+    if args.output is not None:
+        write_results(args.output, timings)
+        print(f"Results written to {args.output}")
+
+    if baseline is None:
+        return 0
+    regressions = 0
+    print(f"\nCompared with {args.compare} (threshold +{args.threshold:.0%}):")
+    for c in compare(timings, baseline):
+        slower = c.is_regression(args.threshold)
+        regressions += slower
+        flag = "  REGRESSION" if slower else ""
+        print(f"{c.name:<28} {c.size:>8}  x{c.ratio:6.2f}{flag}")
+    print(f"{regressions} regression(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
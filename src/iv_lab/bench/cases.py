@@ -0,0 +1,308 @@
+"""The benchmarked hot paths.
+
+Protocols run on the emulated SMU and lamp with no integration delay on
+a :class:`~iv_lab.hardware.clock.VirtualClock`, so their times are the
+host-side cost of a run: the protocol loops, the driver layer and the
+live-data emission. The J-V protocol gets constant metrics, the J-V
+analysis is timed on its own. Synthetic data comes from the emulated
+diode.
+
+Sizes are points per scan or rows per file; the time-dependent
+protocols take one reading per 10 ms of simulated time, so their sizes
+are nominal.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Callable
+from pathlib import Path
+
+from iv_lab.analysis.jv_metrics import JVMetrics, compute_jv_metrics
+from iv_lab.config import LampSettings, SMUSettings
+from iv_lab.data import (
+    ConstantVoltageResults,
+    FileWriter,
+    IVResults,
+    MPPResults,
+    SystemContext,
+)
+from iv_lab.data.pdf_report import generate_jv_results_pdf
+from iv_lab.hardware import VirtualClock
+from iv_lab.hardware.lamp.drivers.emulated import EmulatedLamp
+from iv_lab.hardware.smu.drivers.emulated import EmulatedSMU
+from iv_lab.measurements.protocols import (
+    CalibrationProtocol,
+    ConstantCurrentProtocol,
+    ConstantVoltageProtocol,
+    IVCurveProtocol,
+    MeasurementProtocol,
+    MPPTrackingProtocol,
+)
+from iv_lab.services.auth import scramble_string
+
+from .runner import Benchmark
+
+#: Emulated reference diode current at 100 % sun, in A.
+FULL_SUN_CURRENT = 0.004
+#: Simulated reading interval of the time-dependent protocols, in s.
+READING_INTERVAL = 0.01
+
+PROTOCOL_SIZES = (100, 1_000, 10_000)
+DATA_SIZES = (100, 1_000, 10_000, 100_000)
+
+_Call = Callable[[], object]
+
+
+# --- emulated system ---
+
+
+def _emulated_system(
+    *, reference_diode: bool = False
+) -> tuple[EmulatedSMU, EmulatedLamp]:
+    clock = VirtualClock(start=1.7e9)
+    smu = EmulatedSMU(
+        SMUSettings(
+            brand="Keithley",
+            model="2602",
+            visa_address="GPIB0::24::INSTR",
+            visa_library="visa64.dll",
+            emulate=True,
+            useReferenceDiode=reference_diode,
+        )
+    )
+    smu.integration_delay = 0.0
+    smu.meas_period_min = 0.0
+    smu.full_sun_reference_current = FULL_SUN_CURRENT
+    smu.reference_diode_parallel = reference_diode
+    lamp = EmulatedLamp(LampSettings(brand="manual", model="manual", emulate=True))
+    smu.clock = lamp.clock = clock
+    smu.connect()
+    lamp.connect()
+    return smu, lamp
+
+
+def _without_waits(protocol: MeasurementProtocol) -> MeasurementProtocol:
+    protocol.light_intensity_measure_time = 0.0
+    protocol.light_intensity_poll_interval = 0.0
+    protocol.voc_check_wait = 0.0
+    protocol.voc_poll_interval = 0.0
+    return protocol
+
+
+def _constant_metrics(voltage, current, active_area, cell_name="cell") -> JVMetrics:
+    return JVMetrics(Voc=0.55, Jsc=-25.0, Vmpp=0.45, Jmpp=-22.0, Pmpp=9.9, FF=0.72)
+
+
+def _cell_params(**params) -> dict:
+    return {
+        "light_int": 100.0,
+        "Imax": 0.01,
+        "Vmax": 2.0,
+        "Dwell": 0.0,
+        "Nwire": "2 wire",
+        "active_area": 0.16,
+        "cell_name": "bench cell",
+        **params,
+    }
+
+
+def _time_series_params(size: int, **params) -> dict:
+    return _cell_params(interval=READING_INTERVAL, duration=size * READING_INTERVAL, **params)
+
+
+# --- protocols ---
+
+
+def _iv_curve(size: int, workdir: Path) -> _Call:
+    smu, lamp = _emulated_system()
+    protocol = _without_waits(IVCurveProtocol(smu, lamp, metrics_function=_constant_metrics))
+    params = _cell_params(
+        start_V=0.0,
+        stop_V=0.6,
+        dV=0.6 / (size - 1),
+        sweep_rate=1000.0,
+        Fwd_current_limit=0.001,
+    )
+    return lambda: protocol.run(params)
+
+
+def _constant_voltage(size: int, workdir: Path) -> _Call:
+    protocol = _without_waits(ConstantVoltageProtocol(*_emulated_system()))
+    params = _time_series_params(size, set_voltage=0.2)
+    return lambda: protocol.run(params)
+
+
+def _constant_current(size: int, workdir: Path) -> _Call:
+    protocol = _without_waits(ConstantCurrentProtocol(*_emulated_system()))
+    params = _time_series_params(size, set_current=-0.002)
+    return lambda: protocol.run(params)
+
+
+def _mpp_tracking(size: int, workdir: Path) -> _Call:
+    protocol = _without_waits(MPPTrackingProtocol(*_emulated_system()))
+    params = _time_series_params(size, start_voltage=0.45)
+    return lambda: protocol.run(params)
+
+
+def _calibration(size: int, workdir: Path) -> _Call:
+    protocol = _without_waits(CalibrationProtocol(*_emulated_system(reference_diode=True)))
+    params = _time_series_params(size, reference_current=FULL_SUN_CURRENT)
+    return lambda: protocol.run(params)
+
+
+# --- analysis, data files and reports ---
+
+
+def _jv_data(size: int) -> tuple[list[float], list[float]]:
+    smu, _ = _emulated_system()
+    step = 0.7 / (size - 1)
+    voltage, current = smu.sweep([-0.1 + k * step for k in range(size)])
+    return voltage.tolist(), current.tolist()
+
+
+def _iv_result(size: int) -> IVResults:
+    voltage, current = _jv_data(size)
+    return IVResults(
+        start_time="20260101_120000",
+        cell_name="bench cell",
+        active_area=0.16,
+        light_int=100.0,
+        light_int_meas=100.0,
+        Nwire="2 wire",
+        start_V=-0.1,
+        stop_V=0.6,
+        dV=0.7 / (size - 1),
+        sweep_rate=0.05,
+        Imax=0.01,
+        Dwell=0.0,
+        voltage=voltage,
+        current=current,
+        current_reference=[-FULL_SUN_CURRENT] * size,
+        Voc=0.55,
+        Jsc=-25.0,
+        Vmpp=0.45,
+        Jmpp=-22.0,
+        Pmpp=9.9,
+        PCE=9.9,
+        FF=0.72,
+    )
+
+
+def _time_series_result(result_class, size: int):
+    _, current = _jv_data(size)
+    return result_class(
+        start_time="20260101_120000",
+        cell_name="bench cell",
+        active_area=0.16,
+        light_int=100.0,
+        light_int_meas=100.0,
+        Nwire="2 wire",
+        interval=READING_INTERVAL,
+        duration=size * READING_INTERVAL,
+        time=[k * READING_INTERVAL for k in range(size)],
+        voltage=[0.45] * size,
+        current=current,
+        current_reference=[-FULL_SUN_CURRENT] * size,
+    )
+
+
+def _context(workdir: Path) -> SystemContext:
+    return SystemContext(
+        base_path=str(workdir),
+        sd_path="",
+        system_name="IVLab",
+        smu_brand="Keithley",
+        smu_model="2602",
+        lamp_display_name="Sinus70 (Wavelabs)",
+        use_reference_diode=True,
+        full_sun_reference_current=FULL_SUN_CURRENT,
+        calibration_datetime="Thu Jan  1 12:00:00 2026",
+    )
+
+
+def _jv_metrics(size: int, workdir: Path) -> _Call:
+    voltage, current = _jv_data(size)
+    return lambda: compute_jv_metrics(voltage, current, 0.16)
+
+
+def _save(make_result: Callable[[int], object]) -> Callable[[int, Path], _Call]:
+    def setup(size: int, workdir: Path) -> _Call:
+        writer = FileWriter(_context(workdir), generate_pdf=False)
+        result = make_result(size)
+        return lambda: writer.save(result, "bench")
+
+    return setup
+
+
+def _jv_report(size: int, workdir: Path) -> _Call:
+    result = _iv_result(size)
+    context = _context(workdir)
+    path = workdir / "report.pdf"
+    return lambda: generate_jv_results_pdf(result, "bench", context, "bench.csv", path)
+
+
+def _scramble(size: int, workdir: Path) -> _Call:
+    csv_path, _ = FileWriter(_context(workdir), generate_pdf=False).save(
+        _iv_result(size), "bench"
+    )
+    text = csv_path.read_text(encoding="utf-8")
+    return lambda: scramble_string(text)
+
+
+# --- GUI ---
+
+#: The QApplication and the plot panel of the GUI benchmarks, shared by
+#: all sizes.
+_qt: dict[str, object] = {}
+
+
+def _plot_panel():
+    if not _qt:
+        # offscreen unless a platform is chosen; before the first Qt import
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PySide6.QtWidgets import QApplication
+
+        from iv_lab.gui.panels.plot_panel import PlotPanel
+
+        _qt["app"] = QApplication.instance() or QApplication([])
+        _qt["panel"] = PlotPanel()
+    panel = _qt["panel"]
+    panel.clear_all()
+    return panel
+
+
+def _live_plot(keys: str) -> Callable[[int, Path], _Call]:
+    def setup(size: int, workdir: Path) -> _Call:
+        panel = _plot_panel()
+        values = [float(k) for k in range(size)]
+        data = dict.fromkeys(keys, values)
+        return lambda: panel.update_live_data(data)
+
+    return setup
+
+
+#: The benchmark suite, in run order.
+BENCHMARKS: tuple[Benchmark, ...] = (
+    Benchmark("protocol.iv_curve", _iv_curve, PROTOCOL_SIZES, repeat=3),
+    Benchmark("protocol.constant_voltage", _constant_voltage, PROTOCOL_SIZES, repeat=3),
+    Benchmark("protocol.constant_current", _constant_current, PROTOCOL_SIZES, repeat=3),
+    Benchmark("protocol.mpp_tracking", _mpp_tracking, PROTOCOL_SIZES, repeat=3),
+    Benchmark("protocol.calibration", _calibration, PROTOCOL_SIZES, repeat=3),
+    Benchmark("analysis.jv_metrics", _jv_metrics, DATA_SIZES),
+    Benchmark("data.save_jv", _save(_iv_result), DATA_SIZES),
+    Benchmark(
+        "data.save_cv",
+        _save(lambda size: _time_series_result(ConstantVoltageResults, size)),
+        DATA_SIZES,
+    ),
+    Benchmark(
+        "data.save_mpp",
+        _save(lambda size: _time_series_result(MPPResults, size)),
+        DATA_SIZES,
+    ),
+    Benchmark("data.jv_report_pdf", _jv_report, (100, 1_000, 10_000), repeat=3),
+    Benchmark("data.scramble_file", _scramble, DATA_SIZES, repeat=3),
+    Benchmark("gui.live_plot_jv", _live_plot("vj"), DATA_SIZES),
+    Benchmark("gui.live_plot_mpp", _live_plot("tvjw"), DATA_SIZES),
+)
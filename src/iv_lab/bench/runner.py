@@ -0,0 +1,179 @@
+"""Timing of benchmarks, result files and comparison with a baseline.
+
+This module is standard library only.
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+#: ``format`` value of a benchmark result file.
+BENCH_FORMAT = "iv_lab.bench"
+BENCH_VERSION = 1
+
+#: Default slowdown of the best time, relative to the baseline, that
+#: counts as a regression.
+DEFAULT_THRESHOLD = 0.25
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """One hot path, timed at several sizes."""
+
+    #: Dotted name, ``<area>.<case>``.
+    name: str
+    #: Prepares the data and objects for one size, given a scratch
+    #: directory for files, and returns the call to time; the preparation
+    #: itself is not timed.
+    setup: Callable[[int, Path], Callable[[], object]]
+    #: Data sizes (points, rows) to time, smallest first.
+    sizes: tuple[int, ...]
+    #: Timed calls per size; the best one is compared.
+    repeat: int = 5
+
+
+@dataclass
+class Timing:
+    """Times of one benchmark at one size, in s."""
+
+    name: str
+    size: int
+    times: list[float] = field(default_factory=list)
+
+    @property
+    def best(self) -> float:
+        return min(self.times)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.times)
+
+    @property
+    def key(self) -> tuple[str, int]:
+        return (self.name, self.size)
+
+
+def time_call(function: Callable[[], object], repeat: int) -> list[float]:
+    """Time ``repeat`` calls after one untimed warm-up call.
+
+    Garbage from the setup is collected first. The collector stays
+    enabled while timing (unlike ``timeit``): the cases allocate as in
+    real runs, and PySide objects freed with it disabled can crash the
+    interpreter at exit.
+    """
+    function()
+    gc.collect()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run_benchmarks(
+    benchmarks: Iterable[Benchmark],
+    *,
+    quick: bool = False,
+    repeat: int | None = None,
+    progress: Callable[[Timing], None] | None = None,
+) -> list[Timing]:
+    """Time every benchmark at each of its sizes.
+
+    ``quick`` times only the smallest size, once: a check that the suite
+    runs, not a measurement. ``repeat`` overrides the benchmarks' own.
+    Files are written to a temporary directory, removed at the end.
+    """
+    timings = []
+    with tempfile.TemporaryDirectory(prefix="iv_lab_bench_") as scratch:
+        for benchmark in benchmarks:
+            sizes = benchmark.sizes[:1] if quick else benchmark.sizes
+            count = 1 if quick else (repeat or benchmark.repeat)
+            for size in sizes:
+                workdir = Path(scratch) / f"{benchmark.name}_{size}"
+                workdir.mkdir()
+                call = benchmark.setup(size, workdir)
+                timing = Timing(benchmark.name, size, time_call(call, count))
+                timings.append(timing)
+                if progress is not None:
+                    progress(timing)
+    return timings
+
+
+# --- result files ---
+
+
+def write_results(path: str | Path, timings: Iterable[Timing]) -> None:
+    """Write timings to a JSON result file, with the machine they ran on."""
+    document = {
+        "format": BENCH_FORMAT,
+        "version": BENCH_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.node(),
+        "argv": sys.argv[1:],
+        "results": [
+            {
+                "name": t.name,
+                "size": t.size,
+                "best": t.best,
+                "median": t.median,
+                "times": t.times,
+            }
+            for t in timings
+        ],
+    }
+    Path(path).write_text(json.dumps(document, indent=1) + "\n", encoding="utf-8")
+
+
+def read_results(path: str | Path) -> list[Timing]:
+    """Load the timings of a result file written by :func:`write_results`."""
+    path = Path(path)
+    document = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(document, dict) or document.get("format") != BENCH_FORMAT:
+        raise ValueError(f"{path}: not a benchmark result file")
+    if document.get("version") != BENCH_VERSION:
+        raise ValueError(f"{path}: unsupported result version {document.get('version')}")
+    return [Timing(r["name"], r["size"], list(r["times"])) for r in document["results"]]
+
+
+# --- comparison ---
+
+
+@dataclass(frozen=True)
+class Comparison:
+    """Best time of one benchmark and size against the baseline."""
+
+    name: str
+    size: int
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        """Current over baseline time; above 1 is slower."""
+        return self.current / self.baseline if self.baseline > 0 else float("inf")
+
+    def is_regression(self, threshold: float = DEFAULT_THRESHOLD) -> bool:
+        return self.ratio > 1.0 + threshold
+
+
+def compare(current: Iterable[Timing], baseline: Iterable[Timing]) -> list[Comparison]:
+    """Pair the timings present in both runs, in the order of ``current``."""
+    reference = {t.key: t for t in baseline}
+    return [
+        Comparison(t.name, t.size, reference[t.key].best, t.best)
+        for t in current
+        if t.key in reference
+    ]
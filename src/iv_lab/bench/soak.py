@@ -0,0 +1,443 @@
+"""Accelerated soak test of long MPP and constant-voltage runs.
+
+Stability runs last days, and some faults only show after hours: memory
+that grows with the square of the sample count (a live-data copy kept
+per sample, a backlog of queued signals) or sample times drifting off
+the schedule. :func:`run_soak` runs a measurement the way the GUI does —
+through :class:`~iv_lab.core.IVLabSystem` with ``threaded=True``, the
+protocol on a worker thread, the live data queued to the main thread —
+on emulated hardware with a :class:`~iv_lab.hardware.clock.VirtualClock`,
+so days of instrument time take seconds to minutes. The SMU uses a
+timing profile (:mod:`iv_lab.hardware.timing`) so the protocol loops
+run at the real instrument's pace.
+
+Recorded along the run, at about ``checkpoints`` points:
+
+- the process RSS (``psutil`` when installed, ``/proc`` on Linux,
+  otherwise not reported) and the Python heap (``tracemalloc``),
+- the depth of the live-data queue: samples emitted on the worker
+  thread and not yet delivered to the main thread,
+
+and at the end the sample count and the sample times against the
+schedule (``k * interval``): the largest lateness, the largest
+deviation of a sample interval, and the drift of the last sample.
+
+The run fails when the heap grows faster than linearly with the sample
+count — the bytes per sample of the second half of the run more than
+``growth_ratio`` times those of the first half — or when a sample is
+late by more than ``max_lateness``. Usage::
+
+    python -m iv_lab.bench.soak --days 2 --interval 60 --json soak.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from PySide6.QtCore import QCoreApplication, QEventLoop, Qt
+
+from iv_lab.config import SystemSettings
+from iv_lab.hardware.clock import VirtualClock
+
+#: Measurements of the soak test (legacy scan-type labels) by short name.
+PROTOCOLS = {
+    "mpp": "Maximum Power Point",
+    "cv": "Constant Voltage, Measure J",
+}
+
+#: SMU timing profile of the emulated runs.
+DEFAULT_SMU_TIMING = "keithley-2602-gpib"
+
+
+@dataclass
+class Checkpoint:
+    """Process state after ``samples`` samples were delivered."""
+
+    samples: int
+    #: Simulated time since the start of the run, in s.
+    elapsed: float
+    #: Resident set size in bytes (None: not available).
+    rss: int | None
+    #: Traced Python heap in bytes (None: heap tracing off).
+    heap: int | None
+    #: Live-data samples emitted and not delivered yet.
+    pending: int
+
+
+@dataclass
+class SoakReport:
+    """Outcome of one soak run; :meth:`summary` for a compact text."""
+
+    label: str
+    interval: float
+    duration: float
+    expected_samples: int
+    samples: int = 0
+    #: Wall-clock duration of the run in s.
+    wall_time: float = 0.0
+    checkpoints: list[Checkpoint] = field(default_factory=list)
+    max_pending: int = 0
+    #: Largest delay of a sample behind its schedule slot, in s.
+    max_lateness: float = 0.0
+    #: Largest deviation of a sample interval from ``interval``, in s.
+    max_interval_jitter: float = 0.0
+    #: Lateness of the last sample, in s.
+    drift: float = 0.0
+    #: Heap bytes per sample in the first and second half of the run.
+    heap_per_sample: tuple[float, float] | None = None
+    failures: list[str] = field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return not self.failures
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "passed": self.passed}
+
+    def summary(self) -> str:
+        first, last = self.checkpoints[0], self.checkpoints[-1]
+        lines = [
+            f"{self.label}: {self.samples} samples (expected {self.expected_samples}), "
+            f"{self.duration / 86400:.2f} d simulated in {self.wall_time:.1f} s",
+        ]
+        if self.heap_per_sample is not None:
+            lines.append(
+                f"  heap {_mib(last.heap - first.heap):+.2f} MiB, "
+                f"{self.heap_per_sample[0]:.0f} B/sample then "
+                f"{self.heap_per_sample[1]:.0f} B/sample"
+            )
+        if first.rss is not None and last.rss is not None:
+            lines.append(f"  RSS {_mib(first.rss):.1f} -> {_mib(last.rss):.1f} MiB")
+        lines.append(f"  live-data queue: at most {self.max_pending} pending")
+        lines.append(
+            f"  timing: lateness max {self.max_lateness:.3f} s, interval jitter max "
+            f"{self.max_interval_jitter:.3f} s, drift {self.drift:+.3f} s"
+        )
+        lines.extend(f"  FAIL: {failure}" for failure in self.failures)
+        lines.append("  PASS" if self.passed else "  FAILED")
+        return "\n".join(lines)
+
+
+def _mib(size: float) -> float:
+    return size / 2**20
+
+
+def rss_bytes() -> int | None:
+    """Resident set size of this process, or None when unavailable."""
+    try:
+        import psutil
+    except ImportError:
+        pass
+    else:
+        return psutil.Process().memory_info().rss
+    try:
+        pages = Path("/proc/self/statm").read_text().split()[1]
+    except OSError:
+        return None
+    import resource
+
+    return int(pages) * resource.getpagesize()
+
+
+# --- verdicts ---
+
+
+def heap_growth(checkpoints: list[Checkpoint]) -> tuple[float, float] | None:
+    """Heap bytes per sample over the first and the second half of the run."""
+    traced = [c for c in checkpoints if c.heap is not None]
+    if len(traced) < 3 or traced[-1].samples < 2:
+        return None
+    start, end = traced[0], traced[-1]
+    middle = min(traced, key=lambda c: abs(2 * c.samples - start.samples - end.samples))
+    if not start.samples < middle.samples < end.samples:
+        return None
+    return (
+        (middle.heap - start.heap) / (middle.samples - start.samples),
+        (end.heap - middle.heap) / (end.samples - middle.samples),
+    )
+
+
+def schedule_deviation(times: list[float], interval: float) -> tuple[float, float, float]:
+    """``(max lateness, max interval jitter, drift)`` of sample times in s."""
+    if not times:
+        return (0.0, 0.0, 0.0)
+    lateness = [t - k * interval for k, t in enumerate(times)]
+    jitter = max(
+        (abs(b - a - interval) for a, b in zip(times, times[1:], strict=False)), default=0.0
+    )
+    return (max(lateness), jitter, lateness[-1])
+
+
+# --- the run ---
+
+
+def soak_settings(
+    base_path: str | Path, smu_timing: str | None = DEFAULT_SMU_TIMING
+) -> SystemSettings:
+    """Minimal emulated system: manual lamp, Keithley 2602 on one channel."""
+    return SystemSettings.model_validate(
+        {
+            "computer": {
+                "hardware": "soak test",
+                "os": sys.platform,
+                "basePath": str(base_path),
+                "sdPath": "",
+            },
+            "IVsys": {
+                "sysName": "IVLab",
+                "fullSunReferenceCurrent": 0.004,
+                "calibrationDateTime": "Thu Jan  1 12:00:00 2026",
+                "referenceDiodeImax": 0.005,
+            },
+            "lamp": {"brand": "manual", "model": "manual", "emulate": True},
+            "SMU": {
+                "brand": "Keithley",
+                "model": "2602",
+                "visa_address": "GPIB0::24::INSTR",
+                "visa_library": "visa64.dll",
+                "emulate": True,
+                "useReferenceDiode": False,
+                "emulationTiming": smu_timing,
+            },
+        }
+    )
+
+
+def soak_params(label: str, interval: float, duration: float) -> dict:
+    """Measurement parameters of a soak run (GUI parameter names)."""
+    params = {
+        "light_int": 100.0,
+        "interval": interval,
+        "duration": duration,
+        "Imax": 0.01,
+        "Vmax": 2.0,
+        "Dwell": 0.0,
+        "Nwire": "2 wire",
+        "active_area": 0.16,
+        "cell_name": "soak",
+    }
+    if label == PROTOCOLS["mpp"]:
+        params["start_voltage"] = 0.45
+    else:
+        params["set_voltage"] = 0.45
+    return params
+
+
+def run_soak(
+    label: str,
+    *,
+    days: float = 2.0,
+    interval: float = 60.0,
+    settings: SystemSettings | None = None,
+    checkpoints: int = 50,
+    trace_heap: bool = True,
+    max_lateness: float = 1.0,
+    growth_ratio: float = 2.0,
+    growth_slack: float = 256.0,
+) -> SoakReport:
+    """Run one measurement for ``days`` of simulated time and check it.
+
+    ``label`` is a scan-type label (see :data:`PROTOCOLS`). ``settings``
+    defaults to :func:`soak_settings`; all hardware is emulated in any
+    case. The heap fails the run when its second-half growth per sample
+    exceeds ``growth_ratio`` times the first half's plus
+    ``growth_slack`` bytes.
+    """
+    from iv_lab.core import IVLabSystem
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    duration = days * 86400.0
+    report = SoakReport(label, interval, duration, int(duration // interval))
+    every = max(1, report.expected_samples // checkpoints)
+
+    with contextlib.ExitStack() as stack:
+        scratch = stack.enter_context(tempfile.TemporaryDirectory(prefix="iv_lab_soak_"))
+        if settings is None:
+            settings = soak_settings(scratch)
+        else:
+            settings = settings.model_copy(deep=True)
+            settings.computer.basePath = scratch
+        settings.SMU.emulate = settings.lamp.emulate = True
+        if settings.arduino is not None:
+            settings.arduino.emulate = True
+
+        clock = VirtualClock(start=time.time())
+        system = IVLabSystem(
+            settings,
+            settings_file=Path(scratch) / "system_settings.toml",
+            users_file=Path(scratch) / "users.txt",
+            threaded=True,
+            clock=clock,
+        )
+        stack.callback(system.shutdown)
+        errors: list[str] = []
+        system.error_message.connect(errors.append)
+        if not system.hardware_init():
+            raise RuntimeError("soak test: " + "; ".join(errors))
+        # nobody to ask: protocol warnings proceed
+        system.warning_confirmation_needed.connect(system.confirm_warning_ok)
+
+        if trace_heap and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            stack.callback(tracemalloc.stop)
+        emitted = 0
+        start = clock.now
+
+        def checkpoint(samples: int, pending: int) -> None:
+            heap = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+            report.checkpoints.append(
+                Checkpoint(samples, clock.now - start, rss_bytes(), heap, pending)
+            )
+
+        def on_emitted(data: dict) -> None:  # worker thread
+            nonlocal emitted
+            emitted += 1
+
+        def on_started(label: str) -> None:
+            system.worker.data_ready.connect(on_emitted, Qt.ConnectionType.DirectConnection)
+            checkpoint(0, 0)
+
+        delivered = samples = 0
+
+        def on_delivered(data: dict) -> None:
+            nonlocal delivered, samples
+            delivered += 1
+            pending = emitted - delivered
+            report.max_pending = max(report.max_pending, pending)
+            # live data deltas carry the new samples only
+            samples += len(data["t"])
+            if samples % every == 0:
+                checkpoint(samples, pending)
+
+        loop = QEventLoop()
+        results = []
+        system.measurement_started.connect(on_started)
+        system.data_updated.connect(on_delivered)
+        system.measurement_finished.connect(results.append)
+        system.measurement_finished.connect(loop.quit)
+        system.error_message.connect(loop.quit)
+
+        started = time.perf_counter()
+        if not system.run_measurement(label, soak_params(label, interval, duration)):
+            raise RuntimeError("soak test: " + "; ".join(errors))
+        loop.exec()
+        report.wall_time = time.perf_counter() - started
+        while system.is_measurement_running():
+            app.processEvents()
+        if not results:
+            report.failures.append("measurement failed: " + "; ".join(errors))
+            return report
+        result = results[0]
+        report.samples = len(result.time)
+        if report.checkpoints[-1].samples != report.samples:
+            checkpoint(report.samples, emitted - delivered)
+
+    report.max_lateness, report.max_interval_jitter, report.drift = schedule_deviation(
+        list(result.time), interval
+    )
+    report.heap_per_sample = heap_growth(report.checkpoints)
+
+    if report.heap_per_sample is not None:
+        first, second = report.heap_per_sample
+        if second > growth_ratio * max(first, 0.0) + growth_slack:
+            report.failures.append(
+                f"heap grows faster than the sample count: {second:.0f} B/sample in "
+                f"the second half against {first:.0f} B/sample in the first"
+            )
+    if report.max_lateness > max_lateness:
+        report.failures.append(
+            f"sample timing drifts: a sample {report.max_lateness:.3f} s late "
+            f"(limit {max_lateness} s)"
+        )
+    return report
+
+
+# --- command line ---
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m iv_lab.bench.soak",
+        description="Soak-test long MPP and constant-voltage runs at accelerated time.",
+    )
+    parser.add_argument(
+        "--protocol",
+        nargs="+",
+        choices=sorted(PROTOCOLS),
+        default=["mpp", "cv"],
+        help="measurements to run (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--days", type=float, default=2.0, help="simulated duration (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=60.0,
+        help="measurement interval in s (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--settings",
+        default=None,
+        metavar="PATH",
+        help="system settings to soak (all hardware emulated; default: a 2602 system)",
+    )
+    parser.add_argument(
+        "--max-lateness",
+        type=float,
+        default=1.0,
+        help="largest tolerated sample delay in s (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--growth-ratio",
+        type=float,
+        default=2.0,
+        help="tolerated ratio of second- to first-half heap growth (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-heap", action="store_true", help="do not trace the Python heap (faster)"
+    )
+    parser.add_argument(
+        "--json", default=None, metavar="PATH", help="write the reports as JSON to PATH"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    settings = None
+    if args.settings is not None:
+        from iv_lab.config import load_settings
+
+        settings = load_settings(args.settings)
+
+    reports = []
+    for name in args.protocol:
+        report = run_soak(
+            PROTOCOLS[name],
+            days=args.days,
+            interval=args.interval,
+            settings=settings,
+            trace_heap=not args.no_heap,
+            max_lateness=args.max_lateness,
+            growth_ratio=args.growth_ratio,
+        )
+        print(report.summary(), flush=True)
+        reports.append(report)
+
+    if args.json is not None:
+        document = [report.to_dict() for report in reports]
+        Path(args.json).write_text(json.dumps(document, indent=1) + "\n", encoding="utf-8")
+    return 0 if all(report.passed for report in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
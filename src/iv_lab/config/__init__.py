@@ -6,10 +6,15 @@ from .discovery import (
 from .settings import (
     DEFAULT_SETTINGS_FILENAME,
     ArduinoSettings,
+    ArduinoTimingSettings,
     ComputerSettings,
+    EmulationTimingSettings,
     IVSystemSettings,
     LampSettings,
+    LampTimingSettings,
+    SMUEmulationSettings,
     SMUSettings,
+    SMUTimingSettings,
     SystemSettings,
     load_settings,
     save_settings,
@@ -19,10 +24,15 @@ __all__ = [
     "DEFAULT_SETTINGS_FILENAME",
     "SETTINGS_ENV_VAR",
     "ArduinoSettings",
+    "ArduinoTimingSettings",
     "ComputerSettings",
+    "EmulationTimingSettings",
     "IVSystemSettings",
     "LampSettings",
+    "LampTimingSettings",
+    "SMUEmulationSettings",
     "SMUSettings",
+    "SMUTimingSettings",
     "SystemSettings",
     "load_settings",
     "resolve_settings_file",
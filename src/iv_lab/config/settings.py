@@ -18,6 +18,7 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
+from typing import Any, Literal
 
 import tomllib
 from pydantic import BaseModel, ConfigDict, Field, model_validator
@@ -55,12 +56,65 @@ class IVSystemSettings(LegacyCompatibleModel):
     MPPVoltageStepInitial: float = 0.002
     MPPVoltageStepMax: float = 0.002
     MPPVoltageStepMin: float = 0.001
+    #: Run the MPP tracking loop on the SMU (2602 only; other SMUs track
+    #: on the host). Not a legacy preference.
+    MPPOnInstrument: bool = False
+    #: Write constant-voltage, constant-current and MPP runs to their
+    #: data file while they run, so a crash keeps the data measured so
+    #: far. Not a legacy preference.
+    streamData: bool = False
     #: Calibration (control) diodes selectable in the GUI calibration panel:
     #: name -> certified Iref in mA. Optional; the panel falls back to a
     #: built-in default when absent.
     calibrationDiodes: dict[str, float] | None = None
 
 
+class EmulationTimingSettings(LegacyCompatibleModel):
+    """An ``emulationTiming`` entry: timing profile of an emulated device.
+
+    Not a legacy key. Either a profile name or a table with a
+    ``profile`` and values overriding it, in s (see
+    ``iv_lab.hardware.timing``); absent values come from the profile.
+    """
+
+    #: Named profile; None starts from the emulation defaults.
+    profile: str | None = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def _profile_name(cls, data: Any) -> Any:
+        # a plain string names a profile without overrides
+        if isinstance(data, str):
+            return {"profile": data}
+        return data
+
+
+class SMUTimingSettings(EmulationTimingSettings):
+    """``SMU.emulationTiming``."""
+
+    commandLatency: float | None = Field(default=None, ge=0)
+    readingOverhead: float | None = Field(default=None, ge=0)
+    integrationTime: float | None = Field(default=None, ge=0)
+    sweepOverhead: float | None = Field(default=None, ge=0)
+    sweepPointTime: float | None = Field(default=None, ge=0)
+
+
+class LampTimingSettings(EmulationTimingSettings):
+    """``lamp.emulationTiming``."""
+
+    connectTime: float | None = Field(default=None, ge=0)
+    lightOnTime: float | None = Field(default=None, ge=0)
+    lightOffTime: float | None = Field(default=None, ge=0)
+    warmupTime: float | None = Field(default=None, ge=0)
+
+
+class ArduinoTimingSettings(EmulationTimingSettings):
+    """``arduino.emulationTiming``."""
+
+    commandLatency: float | None = Field(default=None, ge=0)
+    stageSettlingTime: float | None = Field(default=None, ge=0)
+
+
 class LampSettings(LegacyCompatibleModel):
     """The ``lamp`` section.
 
@@ -78,6 +132,8 @@ class LampSettings(LegacyCompatibleModel):
     lightLevelDict: dict[float, int | float | str] | None = None
     visa_address: str | None = None
     visa_library: str | None = None
+    #: Timing profile of the emulated lamp (``emulate = true`` only).
+    emulationTiming: LampTimingSettings | None = None
 
     @model_validator(mode="after")
     def _apply_legacy_rules(self) -> LampSettings:
@@ -96,6 +152,31 @@ class LampSettings(LegacyCompatibleModel):
         return self
 
 
+class SMUEmulationSettings(LegacyCompatibleModel):
+    """The optional ``SMU.emulation`` section (emulated cell model).
+
+    Not a legacy section. Without it the emulated SMU keeps the legacy
+    fixed-shape diode; with it, a single-diode cell whose photocurrent
+    follows the emulated lamp's light level.
+    """
+
+    #: ``'single diode'`` or ``'legacy'``.
+    model: Literal["single diode", "legacy"] = "single diode"
+    #: One-sun short-circuit photocurrent in A; absent uses
+    #: ``IVsys.fullSunReferenceCurrent``.
+    photocurrent: float | None = None
+    openCircuitVoltage: float = Field(default=0.55, gt=0)
+    ideality: float = Field(default=1.5, gt=0)
+    #: Series and shunt resistance in ohm.
+    seriesResistance: float = Field(default=5.0, ge=0)
+    shuntResistance: float = Field(default=1e4, gt=0)
+    #: Cell temperature in K.
+    temperature: float = Field(default=298.15, gt=0)
+    #: Junction capacitance in F; with ``seriesResistance`` it sets the
+    #: RC lag behind voltage steps (hysteresis). 0 disables it.
+    capacitance: float = Field(default=0.0, ge=0)
+
+
 class SMUSettings(LegacyCompatibleModel):
     """The ``SMU`` section."""
 
@@ -118,6 +199,10 @@ class SMUSettings(LegacyCompatibleModel):
     write_termination: str | None = None
     #: VISA read timeout in milliseconds (applies to all interface types).
     timeout_ms: float | None = None
+    #: Cell model of the emulated SMU (``emulate = true`` only).
+    emulation: SMUEmulationSettings | None = None
+    #: Timing profile of the emulated SMU (``emulate = true`` only).
+    emulationTiming: SMUTimingSettings | None = None
 
 
 class ArduinoSettings(LegacyCompatibleModel):
@@ -128,6 +213,8 @@ class ArduinoSettings(LegacyCompatibleModel):
     visa_address: str
     visa_library: str | None = None
     emulate: bool = False
+    #: Timing profile of the emulated controller (``emulate = true`` only).
+    emulationTiming: ArduinoTimingSettings | None = None
 
 
 class SystemSettings(LegacyCompatibleModel):
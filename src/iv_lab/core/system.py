@@ -14,7 +14,8 @@ the migrated orchestration layer of the legacy ``system`` class in
   (legacy ``data_IV``/``IV_Results`` etc.),
 - routes results to :class:`~iv_lab.data.FileWriter` (manual save with
   the legacy scan-type labels and error messages, and automatic save
-  when ``saveDataAutomatic`` is enabled),
+  when ``saveDataAutomatic`` is enabled; with ``streamData`` the
+  time-dependent runs are also written while they run),
 - coordinates authentication and the logbook (legacy
   ``user_login``/``user_logout``),
 - persists a confirmed calibration to the settings file (.json or .toml),
@@ -30,6 +31,8 @@ from __future__ import annotations
 
 import contextlib
 import datetime
+import re
+import time
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -40,8 +43,10 @@ from iv_lab.data import FileWriter, SystemContext
 from iv_lab.data.results import MeasurementResult
 from iv_lab.hardware.arduino import create_arduino
 from iv_lab.hardware.arduino.base import BaseArduino
+from iv_lab.hardware.clock import Clock, VirtualClock
 from iv_lab.hardware.errors import HardwareError
 from iv_lab.hardware.lamp import create_lamp
+from iv_lab.hardware.profiler import InstrumentProfiler
 from iv_lab.hardware.smu import create_smu
 from iv_lab.measurements.protocols import (
     CalibrationProtocol,
@@ -67,6 +72,14 @@ from iv_lab.services import (
     load_users,
 )
 from iv_lab.services.auth import USERS_FILENAME
+from iv_lab.tracing import (
+    Tracer,
+    active_tracer,
+    record_span,
+    start_tracing,
+    stop_tracing,
+    trace_span,
+)
 
 #: Default settings filename (mirrors config.DEFAULT_SETTINGS_FILENAME).
 SETTINGS_FILENAME = "config/system_settings.toml"
@@ -127,6 +140,11 @@ MEASUREMENTS = {
 }
 
 
+#: Scan types written to disk while they run with the ``streamData``
+#: preference.
+STREAMED_SCANS = ("CV", "CC", "MPP")
+
+
 class _HardwareInitWorker(QObject):
     """Runs ``IVLabSystem.hardware_init()`` on a worker thread.
 
@@ -182,6 +200,8 @@ class IVLabSystem(QObject):
         users_file: str | Path = USERS_FILENAME,
         logo_path: str | Path | None = None,
         threaded: bool = True,
+        clock: Clock | None = None,
+        trace_dir: str | Path | None = None,
         parent: QObject | None = None,
     ) -> None:
         super().__init__(parent)
@@ -230,6 +250,25 @@ class IVLabSystem(QObject):
                 )
             self.arduino = create_arduino(settings.arduino)
 
+        # injected time source (e.g. a VirtualClock for emulated runs);
+        # protocols follow the SMU's clock
+        if clock is not None:
+            for device in (self.smu, self.lamp, self.arduino):
+                if device is not None:
+                    device.clock = clock
+
+        # profiling and tracing report simulated time on a virtual clock
+        self._timer = (
+            (lambda: clock.now) if isinstance(clock, VirtualClock) else time.perf_counter
+        )
+        #: Per-command instrument profiler (see :meth:`start_profiling`).
+        self.profiler = InstrumentProfiler(self._timer)
+        #: Directory receiving a Chrome trace of every run (None: no tracing).
+        self.trace_dir = Path(trace_dir) if trace_dir is not None else None
+        #: Trace of the last traced run and the file it was written to.
+        self.last_trace: Tracer | None = None
+        self.last_trace_path: Path | None = None
+
         #: Last result per scan key ('JV', 'CV', 'CC', 'MPP'); legacy
         #: data_IV/IV_Results etc.
         self.results: dict[str, MeasurementResult] = {}
@@ -244,6 +283,7 @@ class IVLabSystem(QObject):
 
     # --- hardware (legacy hardware_init) ---
 
+    @trace_span("hardware init", category="run")
     def hardware_init(self) -> bool:
         """Connect all configured hardware; emits ``hardware_ready``."""
         self.status_message.emit("Initializing SMU...")
@@ -346,6 +386,30 @@ class IVLabSystem(QObject):
             with contextlib.suppress(Exception):
                 device.disconnect()
 
+    # --- instrument profiling ---
+
+    def start_profiling(self) -> None:
+        """Record call counts, latencies and bytes of every command sent to
+        the hardware in :attr:`profiler`, until :meth:`stop_profiling`.
+
+        Can be started before or after the hardware is connected.
+        """
+        for device in (self.smu, self.lamp, self.arduino):
+            if device is not None:
+                self.profiler.attach(device)
+
+    def stop_profiling(self) -> None:
+        """Stop recording; the statistics stay in :attr:`profiler`."""
+        self.profiler.detach()
+
+    def is_profiling(self) -> bool:
+        """Whether the hardware commands are being profiled."""
+        return bool(self.profiler.devices)
+
+    def profile_report(self) -> dict:
+        """The profiler statistics as a JSON-compatible report."""
+        return self.profiler.report()
+
     # --- authentication and logbook (legacy user_login / user_logout) ---
 
     def login(self, username: str, password: str) -> bool:
@@ -388,8 +452,9 @@ class IVLabSystem(QObject):
             kwargs["voltage_step_initial"] = self.settings.IVsys.MPPVoltageStepInitial
             kwargs["voltage_step_max"] = self.settings.IVsys.MPPVoltageStepMax
             kwargs["voltage_step_min"] = self.settings.IVsys.MPPVoltageStepMin
+            kwargs["on_instrument"] = self.settings.IVsys.MPPOnInstrument
 
-        return spec.protocol_cls(
+        protocol = spec.protocol_cls(
             self.smu,
             self.lamp,
             self.arduino,
@@ -398,6 +463,25 @@ class IVLabSystem(QObject):
             **kwargs,
         )
 
+        # streamData preference: time-dependent runs written as they run
+        if (
+            self.settings.IVsys.streamData
+            and spec.scan_key in STREAMED_SCANS
+            and self.user is not None
+        ):
+            writer = FileWriter(self._system_context())
+            username = self.user.username
+            protocol.stream_factory = lambda result: writer.open_stream(
+                result, username, timer=self._timer
+            )
+        return protocol
+
+    @property
+    def worker(self) -> MeasurementWorker | None:
+        """Worker of the running measurement (None when idle); set when
+        ``measurement_started`` is emitted, before its thread starts."""
+        return self._worker
+
     def is_measurement_running(self) -> bool:
         """Whether a measurement is currently in progress."""
         if self._running:
@@ -418,6 +502,17 @@ class IVLabSystem(QObject):
             self.error_message.emit("ERROR: A measurement is already running")
             return False
 
+        if self.trace_dir is not None:
+            start_tracing(
+                Tracer(label, timer=self._timer, metadata={"label": label, "params": params})
+            )
+        with record_span("run_measurement", label=label):
+            started = self._start_worker(label, spec, params)
+        if not self.threaded:
+            self._finish_trace()
+        return started
+
+    def _start_worker(self, label: str, spec: _MeasurementSpec, params: dict) -> bool:
         protocol = self._build_protocol(spec)
         worker = spec.worker_cls(protocol, params)
 
@@ -456,6 +551,9 @@ class IVLabSystem(QObject):
         thread.finished.connect(self._cleanup_worker)
         self._thread = thread
         thread.start()
+        tracer = active_tracer()
+        if tracer is not None:
+            tracer.instant("worker thread started")
         return True
 
     def abort_run(self) -> None:
@@ -483,7 +581,20 @@ class IVLabSystem(QObject):
         if self._thread is not None:
             self._thread.deleteLater()  # thread object lives in this thread
             self._thread = None
+        self._finish_trace()
+
+    def _finish_trace(self) -> None:
+        """End the trace of the run that just finished and write it."""
+        tracer = stop_tracing()
+        if tracer is None or self.trace_dir is None:
+            return
+        tracer.instant("run finished")
+        stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        name = re.sub(r"[^A-Za-z0-9]+", "_", tracer.name).strip("_")
+        self.last_trace = tracer
+        self.last_trace_path = tracer.write(self.trace_dir / f"{stamp}_{name}.trace.json")
 
+    @record_span("result handling")
     def _on_worker_finished(self, spec: _MeasurementSpec, result) -> None:
         if spec.scan_key is not None:
             self.results[spec.scan_key] = result
@@ -1,4 +1,5 @@
 from .file_writer import FileWriter, SystemContext
+from .live import LiveData
 from .results import (
     CalibrationResults,
     ConstantCurrentResults,
@@ -14,6 +15,7 @@ __all__ = [
     "ConstantVoltageResults",
     "FileWriter",
     "IVResults",
+    "LiveData",
     "MeasurementResult",
     "MPPResults",
     "SystemContext",
@@ -0,0 +1,182 @@
+"""Growable float64 columns for the data of a measurement run.
+
+The legacy protocols collected their samples in Python lists, one boxed
+float per value (about 32 bytes with the list slot), and kept derived
+columns (J, power) next to the measured ones. A :class:`ColumnStore`
+keeps each measured channel (e.g. ``t``, ``v``, ``i``, ``i_ref``) in a
+float64 array that doubles its capacity when full, so appending stays
+amortized O(1) at 8 bytes per value. Derived columns are not stored:
+they are functions of the stored ones, evaluated vectorized when read::
+
+    store = ColumnStore("v", "i", derived={"j": lambda c: c["i"] * 1000.0 / area})
+    store.append(v=0.5, i=-0.02)
+    store.column("j")  # array([-20.])
+
+The result dataclasses (:mod:`iv_lab.data.results`) take their arrays
+from a store as zero-copy views (``result.set_columns(store)``).
+
+Columns have their own lengths (a calibration run fills the test and
+the reference diode columns one after the other); the values given to
+one :meth:`ColumnStore.append` or :meth:`ColumnStore.extend` become
+visible together. Only one thread appends; readers on other threads see
+every column up to a consistent committed length. Arrays that grow are
+copied before they are swapped in, so views taken earlier stay valid.
+
+A store with ``max_rows`` keeps its memory bounded however long the run
+(e.g. a run streamed to its data file, which has every sample): when it
+is full, every second row is dropped so the kept rows stay evenly spread
+over the whole run, and the rows since then are kept in full until the
+next decimation. Its columns are appended together. Rows are then
+found by their sample number (counting the dropped ones) with
+:meth:`ColumnStore.position`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Mapping
+
+import numpy as np
+
+#: Rows allocated for each column of a new store.
+INITIAL_CAPACITY = 256
+
+#: Computes a derived column from (equal-length slices of) stored columns.
+Derivation = Callable[[Mapping[str, np.ndarray]], np.ndarray]
+
+
+class ColumnStore:
+    """Growable float64 columns with derived columns computed on read.
+
+    ``names`` are the stored columns; ``derived`` maps further column
+    names to functions of the stored columns, given as a mapping of
+    views. A derived column combines columns of the same length (or
+    reads a single one).
+    """
+
+    def __init__(
+        self,
+        *names: str,
+        derived: Mapping[str, Derivation] | None = None,
+        capacity: int = INITIAL_CAPACITY,
+        max_rows: int | None = None,
+    ) -> None:
+        if max_rows is not None and max_rows < 2:
+            raise ValueError("max_rows must be at least 2")
+        self.names = names
+        self.derived = dict(derived or {})
+        #: Rows kept before the store is decimated (None: all of them).
+        self.max_rows = max_rows
+        #: Samples per row of the decimated rows (1: none dropped yet).
+        self.stride = 1
+        #: Rows dropped by decimation.
+        self.dropped = 0
+        # leading rows on the ``stride`` grid; the later rows are kept in full
+        self._grid = 0
+        self._arrays = {name: np.empty(max(1, capacity)) for name in names}
+        # arrays and lengths, replaced as a whole on each commit, so
+        # readers never see a half-updated set of lengths
+        self._state = (self._arrays, dict.fromkeys(names, 0))
+
+    @property
+    def _lengths(self) -> dict[str, int]:
+        return self._state[1]
+
+    def __len__(self) -> int:
+        """Length of the longest stored column."""
+        return max(self._lengths.values(), default=0)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes allocated for the stored columns."""
+        return sum(array.nbytes for array in self._arrays.values())
+
+    def position(self, sample: int) -> int:
+        """Row of the first kept sample from sample number ``sample`` on.
+
+        Sample numbers count every value appended to a column, including
+        the rows dropped by decimation; without any, they are the rows.
+        """
+        first_full = self.dropped + self._grid
+        if sample >= first_full:
+            return self._grid + sample - first_full
+        return min(self._grid, -(-sample // self.stride))
+
+    def _decimate(self) -> None:
+        # keep every second row of the grid and the rows of the full part
+        # that fall on the doubled grid, in new arrays (views stay valid)
+        arrays, lengths = self._state
+        rows = len(self)
+        stride = 2 * self.stride
+        first_full = self.dropped + self._grid
+        full = np.arange(first_full, self.dropped + rows)
+        keep = np.concatenate(
+            [np.arange(0, self._grid, 2), self._grid + np.flatnonzero(full % stride == 0)]
+        )
+        kept = {}
+        for name in self.names:
+            array = np.empty(max(self.max_rows, len(keep)))
+            array[: len(keep)] = arrays[name][keep]
+            kept[name] = array
+        self.stride = stride
+        self.dropped += rows - len(keep)
+        self._grid = len(keep)
+        self._arrays = kept
+        self._state = (kept, dict.fromkeys(self.names, len(keep)))
+
+    def _make_room(self) -> None:
+        while self.max_rows is not None and len(self) >= self.max_rows:
+            self._decimate()
+
+    def _reserve(self, name: str, size: int) -> np.ndarray:
+        array = self._arrays[name]
+        if size > len(array):
+            grown = np.empty(max(size, 2 * len(array)))
+            grown[: self._lengths[name]] = array[: self._lengths[name]]
+            self._arrays[name] = array = grown
+        return array
+
+    def append(self, **values: float) -> None:
+        """Add one value to each of the given stored columns."""
+        self._make_room()
+        lengths = dict(self._lengths)
+        for name, value in values.items():
+            n = lengths[name]
+            self._reserve(name, n + 1)[n] = value
+            lengths[name] = n + 1
+        self._state = (self._arrays, lengths)
+
+    def extend(self, **chunks: Iterable[float]) -> None:
+        """Add a chunk of values to each of the given stored columns.
+
+        A bounded store may go over ``max_rows`` by the chunk until the
+        next append.
+        """
+        self._make_room()
+        lengths = dict(self._lengths)
+        for name, chunk in chunks.items():
+            chunk = np.asarray(chunk, dtype=float)
+            n = lengths[name]
+            self._reserve(name, n + len(chunk))[n : n + len(chunk)] = chunk
+            lengths[name] = n + len(chunk)
+        self._state = (self._arrays, lengths)
+
+    def _views(self, start: int = 0) -> dict[str, np.ndarray]:
+        arrays, lengths = self._state
+        return {name: arrays[name][start : lengths[name]] for name in self.names}
+
+    def column(self, name: str, start: int = 0) -> np.ndarray:
+        """The committed values of a column from row ``start`` on.
+
+        Zero-copy view for a stored column; a derived column is
+        computed for just that range.
+        """
+        if name in self.derived:
+            return self.derived[name](self._views(start))
+        arrays, lengths = self._state
+        return arrays[name][start : lengths[name]]
+
+    def snapshot(self) -> dict[str, np.ndarray]:
+        """All columns, stored and derived, at one committed state."""
+        data = self._views()
+        data.update({name: derive(data) for name, derive in self.derived.items()})
+        return data
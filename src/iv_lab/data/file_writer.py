@@ -15,11 +15,16 @@ Preserved legacy behavior:
 - row formats and rounding: voltages/currents rounded to 12 digits,
   times to 6, the MPP power column ``abs(i*v*1000/area)``, and the
   light intensity column ``-100 * i_ref / fullSunReferenceCurrent``,
+  printed as ``str(round(x, ndigits))`` (formatted column-wise, see
+  :mod:`iv_lab.data.number_format`),
 - saving a J-V scan also generates the PDF report,
 - the scrambled duplicate copy under ``sdPath`` (scrambled file name
   *and* scrambled content), written best-effort and skipped entirely
   when ``sdPath`` is empty.
 
+Long time-dependent runs (CV, CC, MPP) can also be written while they
+run, with a :class:`StreamingWriter` from :meth:`FileWriter.open_stream`.
+
 The writer receives a :class:`SystemContext` instead of reaching into
 settings/hardware objects; ``core/system.py`` assembles it (calibration
 values are runtime state on the SMU).
@@ -27,11 +32,19 @@ values are runtime state on the SMU).
 
 from __future__ import annotations
 
+import os
+import shutil
+import time
 from collections.abc import Callable, Sequence
 from dataclasses import dataclass
 from pathlib import Path
 
+import numpy as np
+
+from iv_lab.data.columns import ColumnStore
+from iv_lab.data.number_format import format_rounded, join_columns
 from iv_lab.data.results import (
+    Columns,
     ConstantCurrentResults,
     ConstantVoltageResults,
     IVResults,
@@ -39,6 +52,43 @@ from iv_lab.data.results import (
     MPPResults,
 )
 from iv_lab.services.auth import scramble_string
+from iv_lab.tracing import trace_span
+
+
+def _array(values: Sequence[float]) -> np.ndarray:
+    """A data column given as a list or numpy array, for arithmetic."""
+    return np.asarray(values, dtype=float)
+
+
+def _read_header(f) -> str:
+    """The ``nHeader`` line and header block at the start of a data file
+    opened as text."""
+    first = f.readline()
+    count = int(first.split(",")[1])
+    return first + "".join(f.readline() for _ in range(count - 1))
+
+
+def _write_with_header(source: Path, target: Path, header: str) -> None:
+    """Replace ``target`` atomically with ``header`` and the data rows of
+    the data file ``source`` (which may be ``target``), copied in chunks."""
+    tmp_path = target.with_name(target.name + ".tmp")
+    with open(source, encoding="utf-8") as body, open(tmp_path, "w", encoding="utf-8") as f:
+        _read_header(body)
+        f.write(header)
+        shutil.copyfileobj(body, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, target)
+
+
+#: Rows a :class:`StreamingWriter` buffers before writing them.
+STREAM_BUFFER_ROWS = 4096
+#: Seconds after which a :class:`StreamingWriter` writes buffered rows.
+STREAM_FLUSH_INTERVAL = 5.0
+#: Seconds between fsyncs of a streamed data file.
+STREAM_FSYNC_INTERVAL = 60.0
+#: Suffix of the data file of a run in progress.
+PARTIAL_SUFFIX = ".partial"
 
 
 @dataclass
@@ -171,96 +221,80 @@ class FileWriter:
 
         return lines
 
-    # --- legacy data rows ---
+    def _header_text(self, result: MeasurementResult) -> str:
+        """The ``nHeader`` line and the header block; the count includes
+        the ``nHeader`` line itself."""
+        header_lines = self._header_lines(result)
+        lines = ["nHeader," + str(len(header_lines) + 1), *header_lines]
+        return "".join(line + "\n" for line in lines)
 
-    def _light_intensity(self, i_ref: float) -> float:
-        return -100.0 * i_ref / self.context.full_sun_reference_current
+    # --- legacy data rows ---
 
     def _reference_column(self, result: MeasurementResult) -> Sequence[float]:
         i_ref = getattr(result, "current_reference", None)
         if i_ref is None:
-            return [0.0] * len(result.current)
+            return np.zeros(len(result.current))
         return i_ref
 
-    def _data_lines(self, result: MeasurementResult) -> list[str]:
+    def _data_text(self, result: MeasurementResult) -> str:
+        return self._rows(
+            result.scan_type,
+            result.active_area,
+            getattr(result, "time", []),
+            result.voltage,
+            result.current,
+            self._reference_column(result),
+        )
+
+    def _rows(
+        self,
+        scan_type: str,
+        active_area: float,
+        time: Sequence[float],
+        voltage: Sequence[float],
+        current: Sequence[float],
+        current_reference: Sequence[float],
+    ) -> str:
+        """Legacy data rows of the given columns, each ending with a
+        newline.
+
+        The rows are those of the legacy per-row loop (``zip`` of the
+        row's columns, so the shortest one decides), formatted
+        vectorized (see :mod:`iv_lab.data.number_format`).
+        """
         ctx = self.context
-        lines = []
+        if scan_type == "JV":
+            zipped = [voltage, current, current_reference]
+        elif scan_type == "CC":
+            zipped = [time, voltage, current]
+        else:
+            zipped = [time, voltage, current, current_reference]
+        n = min(map(len, zipped))
+        time, voltage, current, current_reference = (
+            column[:n] for column in (time, voltage, current, current_reference)
+        )
 
-        if result.scan_type == "JV":
-            for v, i, i_ref in zip(
-                result.voltage,
-                result.current,
-                self._reference_column(result),
-                strict=False,
-            ):
-                line = str(round(v, 12)) + "," + str(round(i, 12))
-                if ctx.use_reference_diode:
-                    line += "," + str(round(self._light_intensity(i_ref), 12))
-                lines.append(line)
-        elif result.scan_type == "CV":
-            for t, v, i_ref, i in zip(
-                result.time,
-                result.voltage,
-                self._reference_column(result),
-                result.current,
-                strict=False,
-            ):
-                line = (
-                    str(round(t, 6))
-                    + ","
-                    + str(round(v, 12))
-                    + ","
-                    + str(round(i, 12))
-                )
-                if ctx.use_reference_diode:
-                    line += "," + str(round(self._light_intensity(i_ref), 12))
-                lines.append(line)
-        elif result.scan_type == "CC":
-            for t, v, i in zip(
-                result.time, result.voltage, result.current, strict=False
-            ):
-                lines.append(
-                    str(round(t, 6))
-                    + ","
-                    + str(round(v, 12))
-                    + ","
-                    + str(round(i, 12))
-                )
-        elif result.scan_type == "MPP":
-            for t, v, i_ref, i in zip(
-                result.time,
-                result.voltage,
-                self._reference_column(result),
-                result.current,
-                strict=False,
-            ):
-                w = abs(i * v * 1000.0 / result.active_area)
-                line = (
-                    str(round(t, 6))
-                    + ","
-                    + str(round(v, 12))
-                    + ","
-                    + str(round(i, 12))
-                    + ","
-                    + str(round(w, 12))
+        columns = []
+        if scan_type != "JV":
+            columns.append(format_rounded(time, 6))
+        columns.append(format_rounded(voltage, 12))
+        columns.append(format_rounded(current, 12))
+        # inf and nan propagate silently, like in Python float arithmetic
+        with np.errstate(over="ignore", invalid="ignore"):
+            if scan_type == "MPP":
+                power = np.abs(_array(current) * _array(voltage) * 1000.0 / active_area)
+                columns.append(format_rounded(power, 12))
+            if ctx.use_reference_diode and scan_type != "CC":
+                light_intensity = (
+                    -100.0 * _array(current_reference) / ctx.full_sun_reference_current
                 )
-                if ctx.use_reference_diode:
-                    line += "," + str(round(self._light_intensity(i_ref), 12))
-                lines.append(line)
-
-        return lines
+                columns.append(format_rounded(light_intensity, 12))
+        return join_columns(*columns)
 
     # --- saving (legacy writeDataFile) ---
 
-    def save(
-        self,
-        result: IVResults | ConstantVoltageResults | ConstantCurrentResults | MPPResults,
-        username: str,
-    ) -> tuple[Path, Path | None]:
-        """Write the data file (and the J-V PDF report); returns
-        ``(csv_path, pdf_path_or_None)``."""
-        ctx = self.context
-
+    def data_file_path(self, result: MeasurementResult, username: str) -> Path:
+        """Legacy ``<basePath>/<user>/data/<cell>_<scanType>_<start>.csv``."""
         filename = (
             str(result.cell_name)
             + "_"
@@ -269,29 +303,37 @@ class FileWriter:
             + str(result.start_time)
             + ".csv"
         )
-        pdf_filename = (
-            str(result.cell_name)
-            + "_"
-            + result.scan_type
-            + "_"
-            + str(result.start_time)
-            + ".pdf"
-        )
-        data_file_path = Path(ctx.base_path) / username / "data" / filename
-        pdf_file_path = Path(ctx.base_path) / username / "data" / pdf_filename
+        return Path(self.context.base_path) / username / "data" / filename
 
-        # build the full content (header count includes the nHeader line)
-        header_lines = self._header_lines(result)
-        n_lines = len(header_lines) + 1
-        file_string = "nHeader," + str(n_lines) + "\n"
-        for line in header_lines:
-            file_string += line + "\n"
-        for line in self._data_lines(result):
-            file_string += line + "\n"
+    @trace_span("save", category="data")
+    def save(
+        self,
+        result: IVResults | ConstantVoltageResults | ConstantCurrentResults | MPPResults,
+        username: str,
+    ) -> tuple[Path, Path | None]:
+        """Write the data file (and the J-V PDF report); returns
+        ``(csv_path, pdf_path_or_None)``."""
+        ctx = self.context
+
+        data_file_path = self.data_file_path(result, username)
+        filename = data_file_path.name
+        pdf_file_path = data_file_path.with_suffix(".pdf")
 
         data_file_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(data_file_path, "w", encoding="utf-8") as f:
-            f.write(file_string)
+        if result.data_file is not None:
+            # streamed run: the rows come from its data file, which has all
+            # of them; when that is the file to write, it is already final
+            header = self._header_text(result)
+            with open(result.data_file, encoding="utf-8") as f:
+                final = Path(result.data_file) == data_file_path and _read_header(f) == header
+            if not final:
+                _write_with_header(Path(result.data_file), data_file_path, header)
+            file_string = None
+        else:
+            # build the full content once; it is also the scrambled copy's
+            file_string = self._header_text(result) + self._data_text(result)
+            with open(data_file_path, "w", encoding="utf-8") as f:
+                f.write(file_string)
 
         pdf_path: Path | None = None
         if result.scan_type == "JV" and self.generate_pdf:
@@ -313,9 +355,141 @@ class FileWriter:
                 )
                 sd_file_path = Path(ctx.sd_path) / scrambled_filename
                 sd_file_path.parent.mkdir(parents=True, exist_ok=True)
+                if file_string is None:
+                    file_string = data_file_path.read_text(encoding="utf-8")
                 with open(sd_file_path, "w", encoding="utf-8") as s:
                     s.write(scramble_string(file_string))
             except Exception:
                 pass
 
         return (data_file_path, pdf_path)
+
+    # --- streaming (long time-dependent runs) ---
+
+    def open_stream(
+        self,
+        result: ConstantVoltageResults | ConstantCurrentResults | MPPResults,
+        username: str,
+        *,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> StreamingWriter:
+        """Start writing the data file of a running measurement (see
+        :class:`StreamingWriter`)."""
+        return StreamingWriter(self, result, self.data_file_path(result, username), timer=timer)
+
+
+class StreamingWriter:
+    """Writes the data rows of a running measurement as they arrive.
+
+    The rows go to ``<data file>.partial``, below the header known when
+    the run starts, so a crash, power cut or instrument hang leaves a
+    valid legacy data file with everything measured up to the last
+    write. :meth:`write` is called with the run's
+    :class:`~iv_lab.data.columns.ColumnStore` after each sample or chunk;
+    the new rows are formatted and written once ``buffer_rows`` are
+    pending or ``flush_interval`` seconds have passed, and the file is
+    fsynced every ``fsync_interval`` seconds. New rows are copied into
+    the writer's own buffer at each :meth:`write`, so the store may drop
+    them afterwards (see ``max_rows`` of
+    :class:`~iv_lab.data.columns.ColumnStore`). :meth:`close` writes the
+    data file with the final header of ``result`` (e.g. the measured
+    light intensity) and the streamed rows, removes the partial file and
+    records the file as ``result.data_file``.
+
+    The constant columns of CV and CC runs (set voltage, set current)
+    and a missing reference column (zeros) come from ``result`` like in
+    :meth:`FileWriter.save`, so the file matches a save of the same run.
+    """
+
+    def __init__(
+        self,
+        writer: FileWriter,
+        result: ConstantVoltageResults | ConstantCurrentResults | MPPResults,
+        path: Path,
+        *,
+        timer: Callable[[], float] = time.monotonic,
+        buffer_rows: int = STREAM_BUFFER_ROWS,
+        flush_interval: float = STREAM_FLUSH_INTERVAL,
+        fsync_interval: float = STREAM_FSYNC_INTERVAL,
+    ) -> None:
+        self.writer = writer
+        self.result = result
+        self.path = path
+        self.partial_path = path.with_name(path.name + PARTIAL_SUFFIX)
+        self.timer = timer
+        self.buffer_rows = buffer_rows
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        #: Data rows written so far.
+        self.rows = 0
+        self.closed = False
+        # rows taken from the run's store and not written yet
+        self._pending: ColumnStore | None = None
+        self._seen = 0
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.partial_path, "w", encoding="utf-8")  # noqa: SIM115
+        self._file.write(writer._header_text(result))
+        self._file.flush()
+        self._last_flush = self._last_sync = timer()
+
+    def _constant(self, name: str) -> float:
+        # legacy fills the CV voltage and CC current with the setpoint, as
+        # given (an int one is written as an int)
+        value = getattr(self.result, {"v": "set_voltage", "i": "set_current"}.get(name, ""), None)
+        return 0.0 if value is None else value
+
+    def _flush(self, *, sync: bool = False) -> None:
+        pending = self._pending
+        if pending is not None and len(pending):
+            n = len(pending)
+            columns = [
+                pending.column(name) if name in pending.names else np.full(n, self._constant(name))
+                for name in ("v", "i", "i_ref")
+            ]
+            self._file.write(
+                self.writer._rows(
+                    self.result.scan_type, self.result.active_area, pending.column("t"), *columns
+                )
+            )
+            self.rows += n
+            self._pending = ColumnStore(*pending.names, capacity=self.buffer_rows)
+        self._file.flush()
+        now = self.timer()
+        self._last_flush = now
+        if sync or now - self._last_sync >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._last_sync = now
+
+    def write(self, store: Columns) -> None:
+        """Stream the rows added to ``store`` (columns ``t`` and any of
+        ``v``, ``i``, ``i_ref``) when a write is due."""
+        if self._pending is None:
+            names = [name for name in ("t", "v", "i", "i_ref") if name in store.names]
+            self._pending = ColumnStore(*names, capacity=self.buffer_rows)
+        start = store.position(self._seen)
+        new = {name: store.column(name, start) for name in self._pending.names}
+        n = len(new["t"])
+        if n:
+            self._pending.extend(**{name: column[:n] for name, column in new.items()})
+            self._seen = store.dropped + start + n
+        pending = len(self._pending)
+        if pending and (
+            pending >= self.buffer_rows
+            or self.timer() - self._last_flush >= self.flush_interval
+        ):
+            self._flush()
+
+    def close(self) -> Path:
+        """Write the remaining rows and the data file with the final
+        header; returns the path of the data file."""
+        if self.closed:
+            return self.path
+        self._flush(sync=True)
+        self._file.close()
+        self.closed = True
+
+        _write_with_header(self.partial_path, self.path, self.writer._header_text(self.result))
+        self.partial_path.unlink()
+        self.result.data_file = self.path
+        return self.path
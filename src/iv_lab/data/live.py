@@ -0,0 +1,68 @@
+"""Append-only live data shared between a measurement and the GUI.
+
+The legacy protocols sent the whole history of a run with every new
+point (``updatePlot*`` with full arrays), so a run of n points copied
+O(n²) values through the Qt signals. A :class:`LiveData` instead is the
+:class:`~iv_lab.data.columns.ColumnStore` of a data series (e.g. ``t``,
+``i`` and the derived ``j`` of a constant-voltage run); the protocol
+appends to it and emits :meth:`LiveData.delta` dicts that carry only
+the new values of the published columns:
+
+``{"seq": 12, "live": <LiveData>, "t": [1.1], "j": [-24.9]}``
+
+``seq`` numbers the deltas of the series (from 1) and ``live`` is the
+shared buffer, so a receiver can read the full columns from it with
+:meth:`LiveData.snapshot` and skip deltas it has already drawn. A new
+series (e.g. the MPP tracking after its automatic start scan) comes
+with a new ``LiveData``. Dicts without ``live`` are full arrays, as
+before.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+
+from .columns import INITIAL_CAPACITY, ColumnStore, Derivation
+
+
+class LiveData(ColumnStore):
+    """Column store of one live data series, emitted as deltas.
+
+    ``publish`` names the columns (stored or derived) that the deltas
+    carry, by default all of them.
+    """
+
+    def __init__(
+        self,
+        *names: str,
+        derived: Mapping[str, Derivation] | None = None,
+        publish: Iterable[str] | None = None,
+        capacity: int = INITIAL_CAPACITY,
+        max_rows: int | None = None,
+    ) -> None:
+        super().__init__(*names, derived=derived, capacity=capacity, max_rows=max_rows)
+        self.published = tuple(publish) if publish is not None else (*names, *self.derived)
+        # sample number of the next value to emit, per column
+        self._emitted = dict.fromkeys(self.published, 0)
+        #: Number of deltas emitted so far.
+        self.sequence = 0
+
+    def delta(self) -> dict:
+        """The values added since the last delta, as a live-data dict.
+
+        Called by the appending thread only.
+        """
+        self.sequence += 1
+        data: dict = {"seq": self.sequence, "live": self}
+        for name in self.published:
+            start = self.position(self._emitted[name])
+            new = self.column(name, start)
+            self._emitted[name] = self.dropped + start + len(new)
+            data[name] = new.tolist()
+        return data
+
+    def snapshot(self) -> dict:
+        """The published columns at one committed state (see
+        :meth:`ColumnStore.snapshot`)."""
+        data = super().snapshot()
+        return {name: data[name] for name in self.published}
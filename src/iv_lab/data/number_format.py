@@ -0,0 +1,158 @@
+"""Vectorized ``str(round(x, ndigits))`` for the legacy data files.
+
+The legacy data rows print every value as ``str(round(x, 12))`` (times
+with 6 digits), one Python call pair per value, which dominates saving
+a long run. :func:`format_rounded` produces the same characters for a
+whole float column with array operations, and :func:`join_columns`
+assembles the rows of several formatted columns in one pass.
+
+Exactness: ``round`` rounds the exact binary value of ``x`` to
+``ndigits`` decimals and returns the nearest float. With
+``s = |x| * 10**ndigits`` (one rounding error of at most half an ulp),
+``q = rint(s)`` is that decimal rounding whenever ``s`` is not within an
+ulp of a .5 tie, and ``q / 10**ndigits`` is then the same float as
+``round`` returns. Below ``10**15`` the decimal ``q * 10**-ndigits``
+has at most 15 significant digits, so it is also the shortest string
+that reads back as that float, i.e. its ``repr``: the digits of ``q``
+without trailing zeros, laid out positionally or, below ``1e-4``, in
+scientific notation. Values near a tie, at or above ``10**15`` units,
+inf and nan are formatted by Python itself, as are columns that are not
+all floats (``round`` keeps ints as ints).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+
+#: Decimal digits of a scaled value formatted vectorized (below 10**15).
+_SLOTS = 15
+
+_ZERO, _DOT, _MINUS, _E = (ord(c) for c in "0.-e")
+
+
+def _fallback(values: Sequence, ndigits: int) -> np.ndarray:
+    """Characters of ``str(round(v, ndigits))`` formatted by Python."""
+    strings = [str(round(v, ndigits)).encode("ascii") for v in values]
+    width = max(map(len, strings), default=1)
+    chars = np.array(strings, dtype=f"S{width}").view(np.uint8)
+    return chars.reshape(len(strings), width)
+
+
+def _float_column(values: Sequence[float] | np.ndarray) -> np.ndarray | None:
+    """``values`` as a float64 array, or None if they are not all
+    floats (numpy scalars and ints round and print differently)."""
+    if isinstance(values, np.ndarray):
+        return values.astype(float, copy=False) if values.dtype.kind == "f" else None
+    if all(type(v) is float for v in values):
+        return np.array(values, dtype=float)
+    return None
+
+
+#: ASCII digits of 0..9999, one uint32 (4 bytes) each.
+_GROUPS = np.array([b"%04d" % n for n in range(10_000)], dtype="S4").view(np.uint32)
+
+
+def _digits(values: np.ndarray) -> np.ndarray:
+    """ASCII digits of whole floats in ``[0, 10**15)``, as an array of
+    shape ``(n, 15)``, most significant first."""
+    groups = np.empty((len(values), 4), dtype=np.intp)
+    for k in range(3, 0, -1):
+        # exact: below 10**15 the quotient is never within an ulp of the
+        # next integer
+        upper = np.floor(values / 10_000.0)
+        groups[:, k] = values - upper * 10_000.0
+        values = upper
+    groups[:, 0] = values
+    return _GROUPS[groups].view(np.uint8)[:, 1:]
+
+
+def format_rounded(values: Sequence[float] | np.ndarray, ndigits: int) -> np.ndarray:
+    """``str(round(v, ndigits))`` of each value, as an ``(n, width)``
+    uint8 array of ASCII codes padded with zero bytes.
+
+    Vectorized for float columns and ``0 < ndigits < 15``; other
+    columns (and the odd value, see the module docstring) are formatted
+    by Python.
+    """
+    if isinstance(values, np.ndarray) and values.dtype.kind in "iu":
+        # e.g. an int setpoint filling a column: format each value once
+        unique, inverse = np.unique(values, return_inverse=True)
+        return _fallback(unique.tolist(), ndigits)[inverse.ravel()]
+    x = _float_column(values)
+    if x is None or not 0 < ndigits < _SLOTS:
+        return _fallback(values.tolist() if isinstance(values, np.ndarray) else values, ndigits)
+
+    with np.errstate(over="ignore", invalid="ignore"):
+        scaled = np.abs(x) * 10.0**ndigits
+        rounded = np.rint(scaled)
+        exact = (rounded < 10.0**_SLOTS) & (
+            np.abs(scaled - np.floor(scaled) - 0.5) > np.spacing(scaled)
+        )
+    q = np.where(exact, rounded, 0.0)
+    digits = _digits(q)
+
+    # first and last significant digit (none for zero), as int8 to keep
+    # the comparisons below cheap
+    nonzero = digits != _ZERO
+    some = q > 0
+    first = np.where(some, np.argmax(nonzero, axis=1), _SLOTS).astype(np.int8)
+    last = np.where(some, _SLOTS - 1 - np.argmax(nonzero[:, ::-1], axis=1), -1).astype(np.int8)
+
+    # positional: [-]<integer digits>.<fraction digits>, at least one of each
+    int_slots = _SLOTS - ndigits
+    chars = np.empty((len(x), _SLOTS + 2), dtype=np.uint8)
+    chars[:, 1 : 1 + int_slots] = digits[:, :int_slots]
+    chars[:, 2 + int_slots :] = digits[:, int_slots:]
+    # digit slot of each character (sign and dot are set after masking)
+    slot = np.array([0, *range(int_slots), 0, *range(int_slots, _SLOTS)], dtype=np.int8)
+    chars *= (slot >= np.minimum(first, int_slots - 1)[:, None]) & (
+        slot <= np.maximum(last, int_slots)[:, None]
+    )
+    chars[:, 0] = np.signbit(x) * np.uint8(_MINUS)
+    chars[:, 1 + int_slots] = _DOT
+
+    # scientific below 1e-4: [-]d[.ddd]e-XX
+    scientific = np.flatnonzero(some & (q < 10 ** max(ndigits - 4, 0)))
+    if len(scientific):
+        f = first[scientific]
+        l = last[scientific]  # noqa: E741
+        mantissa = f[:, None] + np.arange(ndigits - 4)
+        mantissa_digits = np.take_along_axis(
+            digits[scientific], np.minimum(mantissa, _SLOTS - 1), axis=1
+        )
+        exponent = ndigits - (_SLOTS - 1) + f
+        sci = np.zeros((len(scientific), _SLOTS + 2), dtype=np.uint8)
+        sci[:, 0] = chars[scientific, 0]
+        sci[:, 1] = mantissa_digits[:, 0]
+        sci[:, 2] = np.where(l > f, _DOT, 0)
+        sci[:, 3 : ndigits - 2] = np.where(mantissa[:, 1:] <= l[:, None], mantissa_digits[:, 1:], 0)
+        sci[:, ndigits - 2] = _E
+        sci[:, ndigits - 1] = _MINUS
+        sci[:, ndigits] = _ZERO + exponent // 10
+        sci[:, ndigits + 1] = _ZERO + exponent % 10
+        chars[scientific] = sci
+
+    inexact = np.flatnonzero(~exact)
+    if len(inexact):
+        python = _fallback(x[inexact].tolist(), ndigits)
+        if python.shape[1] > chars.shape[1]:
+            chars = np.pad(chars, ((0, 0), (0, python.shape[1] - chars.shape[1])))
+        chars[inexact] = 0
+        chars[inexact, : python.shape[1]] = python
+    return chars
+
+
+def join_columns(*columns: np.ndarray) -> str:
+    """Rows of formatted columns (see :func:`format_rounded`) joined
+    with ``,``, each row ending with a newline."""
+    if not columns or not len(columns[0]):
+        return ""
+    rows = len(columns[0])
+    parts = []
+    for column in columns:
+        parts.append(column)
+        parts.append(np.full((rows, 1), ord(","), dtype=np.uint8))
+    parts[-1] = np.full((rows, 1), ord("\n"), dtype=np.uint8)
+    return np.hstack(parts).tobytes().translate(None, b"\0").decode("ascii")
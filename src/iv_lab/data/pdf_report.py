@@ -26,6 +26,7 @@ from pathlib import Path
 from typing import TYPE_CHECKING
 
 from iv_lab.data.results import IVResults
+from iv_lab.tracing import trace_span
 
 if TYPE_CHECKING:
     from iv_lab.data.file_writer import SystemContext
@@ -50,6 +51,7 @@ def wrap_data_file_name(data_file_name: str) -> list[tuple[str, str, str]]:
     return rows
 
 
+@trace_span("PDF report", category="data")
 def generate_jv_results_pdf(
     result: IVResults,
     username: str,
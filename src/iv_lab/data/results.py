@@ -16,8 +16,13 @@ Naming convention:
   (reference diode current).
 
 Arrays are stored as passed in (list or numpy array); no copies are made.
-This module is dependency-light by design: standard library only, no GUI,
-hardware, file-writing, or analysis imports.
+The protocols hand over their column store
+(:class:`~iv_lab.data.columns.ColumnStore`) with
+:meth:`MeasurementResult.set_columns`, which takes zero-copy views of
+its ``t``, ``v``, ``i`` and ``i_ref`` columns.
+
+This module is dependency-light by design: standard library only, no
+GUI, hardware, file-writing, or analysis imports.
 
 The ``metadata`` dict carries any extra legacy metadata (e.g. system name,
 calibration date, user) that the file writer needs to preserve but that has
@@ -28,11 +33,27 @@ from __future__ import annotations
 
 from collections.abc import Sequence
 from dataclasses import dataclass, field
-from typing import Any
+from pathlib import Path
+from typing import Any, Protocol
 
 #: Legacy units: voltages in V, currents in A, time in s, active area in cm².
 Array = Sequence[float]
 
+#: Result field of each column of a protocol's column store.
+COLUMN_FIELDS = {"t": "time", "v": "voltage", "i": "current", "i_ref": "current_reference"}
+
+
+class Columns(Protocol):
+    """What :meth:`MeasurementResult.set_columns` (and the streaming file
+    writer) need of a column store."""
+
+    names: tuple[str, ...]
+    dropped: int
+
+    def column(self, name: str, start: int = 0) -> Array: ...
+
+    def position(self, sample: int) -> int: ...
+
 
 @dataclass
 class MeasurementResult:
@@ -56,6 +77,16 @@ class MeasurementResult:
     Nwire: int | None = None
     #: Extra legacy metadata preserved for the file writer.
     metadata: dict[str, Any] = field(default_factory=dict)
+    #: Data file a streamed run was written to while it ran. It has every
+    #: row; the data arrays may be a decimated history of the run.
+    data_file: Path | None = None
+
+    def set_columns(self, columns: Columns) -> None:
+        """Take the data arrays from a column store (see
+        :data:`COLUMN_FIELDS`), as views of its columns."""
+        for name, attr in COLUMN_FIELDS.items():
+            if name in columns.names and hasattr(self, attr):
+                setattr(self, attr, columns.column(name))
 
 
 @dataclass
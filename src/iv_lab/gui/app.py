@@ -28,7 +28,8 @@ def launch(settings: SystemSettings, **system_kwargs) -> tuple[QApplication, Mai
     """Create the application, core system, and main window, and show it.
 
     ``system_kwargs`` are forwarded to :class:`IVLabSystem`
-    (``settings_file``, ``users_file``, ``logo_path``, ``threaded``).
+    (``settings_file``, ``users_file``, ``logo_path``, ``threaded``,
+    ``trace_dir``).
     """
     app = create_application()
     system = IVLabSystem(settings, **system_kwargs)
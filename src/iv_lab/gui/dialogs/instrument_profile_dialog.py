@@ -0,0 +1,141 @@
+"""Diagnostics view of the instrument command profiler.
+
+Shows the per-command statistics of :attr:`IVLabSystem.profiler
+<iv_lab.core.IVLabSystem.profiler>` (see :mod:`iv_lab.hardware.profiler`)
+as a table refreshed once per second while the dialog is open, with a
+switch to start and stop profiling, a reset, and a save to the JSON
+report that ``python -m iv_lab.hardware.profiler`` prints.
+"""
+
+from __future__ import annotations
+
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import (
+    QCheckBox,
+    QDialog,
+    QFileDialog,
+    QHBoxLayout,
+    QHeaderView,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from iv_lab.core import IVLabSystem
+
+#: (header, report key, scale, format) of the table columns.
+COLUMNS = (
+    ("Device", "device", None, None),
+    ("Layer", "layer", None, None),
+    ("Phase", "phase", None, None),
+    ("Method", "method", None, None),
+    ("Calls", "count", 1, "{:d}"),
+    ("Total (s)", "total", 1, "{:.3f}"),
+    ("p50 (ms)", "p50", 1e3, "{:.3f}"),
+    ("p95 (ms)", "p95", 1e3, "{:.3f}"),
+    ("p99 (ms)", "p99", 1e3, "{:.3f}"),
+    ("Wire I/O", "io_calls", 1, "{:d}"),
+    ("Bytes out", "bytes_out", 1, "{:d}"),
+    ("Bytes in", "bytes_in", 1, "{:d}"),
+)
+
+#: Refresh period of the table while the dialog is shown, in ms.
+REFRESH_INTERVAL_MS = 1000
+
+
+class _NumericItem(QTableWidgetItem):
+    """Table cell that sorts by its value rather than its text."""
+
+    def __lt__(self, other: QTableWidgetItem) -> bool:
+        return self.data(Qt.ItemDataRole.UserRole) < other.data(Qt.ItemDataRole.UserRole)
+
+
+class InstrumentProfileDialog(QDialog):
+    """Live table of the instrument command statistics."""
+
+    def __init__(self, system: IVLabSystem, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.system = system
+        self.setWindowTitle("Instrument Profile")
+        self.resize(1000, 400)
+
+        self.check_enabled = QCheckBox("Profile instrument commands")
+        self.check_enabled.setChecked(system.is_profiling())
+        self.check_enabled.toggled.connect(self._set_enabled)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels([c[0] for c in COLUMNS])
+        self.table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.ResizeToContents
+        )
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSortingEnabled(True)
+
+        button_reset = QPushButton("Reset")
+        button_reset.clicked.connect(self._reset)
+        button_save = QPushButton("Save Report...")
+        button_save.clicked.connect(self._save_report)
+        button_close = QPushButton("Close")
+        button_close.clicked.connect(self.accept)
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.check_enabled)
+        buttons.addStretch(1)
+        buttons.addWidget(button_reset)
+        buttons.addWidget(button_save)
+        buttons.addWidget(button_close)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.table)
+        layout.addLayout(buttons)
+        self.setLayout(layout)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(REFRESH_INTERVAL_MS)
+        self.timer.timeout.connect(self.refresh)
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Reload the table from the profiler."""
+        rows = self.system.profiler.rows()
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(len(rows))
+        for i, row in enumerate(rows):
+            for j, (_, key, scale, fmt) in enumerate(COLUMNS):
+                value = row[key]
+                if fmt is None:
+                    item = QTableWidgetItem(value)
+                else:
+                    item = _NumericItem(fmt.format(value * scale))
+                    item.setData(Qt.ItemDataRole.UserRole, value)
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight)
+                self.table.setItem(i, j, item)
+        self.table.setSortingEnabled(True)
+
+    def showEvent(self, event) -> None:  # noqa: N802 - Qt naming
+        super().showEvent(event)
+        self.refresh()
+        self.timer.start()
+
+    def hideEvent(self, event) -> None:  # noqa: N802 - Qt naming
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def _set_enabled(self, enabled: bool) -> None:
+        if enabled:
+            self.system.start_profiling()
+        else:
+            self.system.stop_profiling()
+
+    def _reset(self) -> None:
+        self.system.profiler.reset()
+        self.refresh()
+
+    def _save_report(self) -> None:
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Save Instrument Profile", "instrument_profile.json", "JSON (*.json)"
+        )
+        if path:
+            self.system.profiler.write_report(path)
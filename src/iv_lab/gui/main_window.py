@@ -38,6 +38,7 @@ from PySide6.QtWidgets import (
 from iv_lab.core import IVLabSystem
 from iv_lab.data.results import IVResults
 
+from .dialogs.instrument_profile_dialog import InstrumentProfileDialog
 from .dialogs.logoff_dialog import LogOffDialog
 from .panels.light_panel import LightLevelPanel
 from .panels.measurement_panel import CORE_LABELS, MeasurementPanel
@@ -167,6 +168,12 @@ class MainWindow(QMainWindow):
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("Please Log In")
 
+        menu_diagnostics = self.menuBar().addMenu("Diagnostics")
+        menu_diagnostics.addAction("Instrument Profile...").triggered.connect(
+            self._show_instrument_profile
+        )
+        self.instrument_profile_dialog: InstrumentProfileDialog | None = None
+
         self._connect_panels()
         self._connect_system()
         self._configure_light_panel()
@@ -317,6 +324,12 @@ class MainWindow(QMainWindow):
 
     # --- hardware (legacy initializeHardware / setHardwareActive) ---
 
+    def _show_instrument_profile(self) -> None:
+        if self.instrument_profile_dialog is None:
+            self.instrument_profile_dialog = InstrumentProfileDialog(self.system, self)
+        self.instrument_profile_dialog.show()
+        self.instrument_profile_dialog.raise_()
+
     def _initialize_hardware(self) -> None:
         # disable the button so the connection cannot be re-triggered while it
         # runs; the work happens off the GUI thread so the window stays
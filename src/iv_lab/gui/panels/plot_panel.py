@@ -8,7 +8,10 @@ Live data arrives as the protocol data dicts re-emitted by the core
 system; :meth:`update_live_data` dispatches on the dict keys, so the
 panel showing the incoming data is raised automatically (this also
 reproduces the legacy behavior of showing the J-V plot during the MPP
-automatic start scan).
+automatic start scan). Deltas of a shared
+:class:`~iv_lab.data.live.LiveData` are drawn from the full buffer;
+when deltas queue up behind a slow redraw, the ones already covered by
+a previous draw are skipped.
 """
 
 from __future__ import annotations
@@ -23,6 +26,7 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from iv_lab.data.live import LiveData
 from iv_lab.data.results import IVResults
 
 #: Stack indices (legacy measurement menu order).
@@ -167,6 +171,10 @@ class PlotPanel(QWidget):
         layout.addWidget(self.stack)
         self.setLayout(layout)
 
+        # live buffer and delta sequence number of the last draw
+        self._live: LiveData | None = None
+        self._live_drawn = 0
+
     @staticmethod
     def _wrap(widget: QWidget) -> QWidget:
         panel = QWidget()
@@ -191,6 +199,14 @@ class PlotPanel(QWidget):
 
     def update_live_data(self, data: dict) -> None:
         """Route a protocol live-data dict to its plot by its keys."""
+        live = data.get("live")
+        if live is not None:
+            if live is self._live and data["seq"] <= self._live_drawn:
+                return  # already drawn from the buffer
+            # the sequence number first: the buffer may only get ahead of it
+            self._live, self._live_drawn = live, live.sequence
+            data = live.snapshot()
+
         if "i_meas_ma" in data:  # calibration
             self.stack.setCurrentIndex(PANEL_CALIBRATION)
             self.plot_calibration.set_data(
@@ -248,4 +264,5 @@ class PlotPanel(QWidget):
             setattr(self, attr, None)
         self.plot_mpp_iv.clear_curves()
         self.plot_calibration.clear_curves()
+        self._live, self._live_drawn = None, 0
         self.update_iv_results(None)
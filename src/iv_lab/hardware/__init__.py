@@ -1,4 +1,5 @@
 from .base import HardwareDevice
+from .clock import SYSTEM_CLOCK, Clock, VirtualClock
 from .errors import (
     HardwareCommandError,
     HardwareConnectionError,
@@ -8,7 +9,10 @@ from .errors import (
 )
 
 __all__ = [
+    "Clock",
     "HardwareDevice",
+    "SYSTEM_CLOCK",
+    "VirtualClock",
     "HardwareCommandError",
     "HardwareConnectionError",
     "HardwareError",
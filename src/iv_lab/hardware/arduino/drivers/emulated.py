@@ -2,12 +2,15 @@
 
 Tracks shutter state and the selected cell in memory without any serial
 dependency (docs/HARDWARE.md emulation requirements). The stage settling
-wait is zero by default so tests run instantly.
+wait is zero by default so tests run instantly; an
+``arduino.emulationTiming`` profile (:mod:`iv_lab.hardware.timing`)
+gives the real command latency and settling time.
 """
 
 from __future__ import annotations
 
 from iv_lab.config import ArduinoSettings
+from iv_lab.hardware.timing import ArduinoTiming
 
 from ..base import BaseArduino
 
@@ -17,8 +20,11 @@ class EmulatedArduino(BaseArduino):
 
     def __init__(self, settings: ArduinoSettings) -> None:
         super().__init__(settings, name=f"Emulated {settings.brand} {settings.model}")
-        #: No waiting in emulation (legacy slept even when emulating).
-        self.cell_stage_settling_time = 0.0
+        #: Time spent per command and settling (default: none).
+        self.timing = ArduinoTiming.from_settings(settings.emulationTiming)
+        #: No waiting in emulation unless a timing profile is set (legacy
+        #: slept even when emulating).
+        self.cell_stage_settling_time = self.timing.stage_settling_time
         #: Shutter state; closed on startup.
         self.shutter_is_open = False
         #: Selected cell, 'test' or 'reference'; the legacy stage default
@@ -31,14 +37,26 @@ class EmulatedArduino(BaseArduino):
     def _close(self) -> None:
         pass
 
+    def _command(self) -> None:
+        if self.timing.command_latency > 0:
+            self.clock.sleep(self.timing.command_latency)
+
+    def _move_stage(self, cell: str) -> None:
+        self._command()
+        self.selected_cell = cell
+        if self.cell_stage_settling_time > 0:
+            self.clock.sleep(self.cell_stage_settling_time)
+
     def open_shutter(self) -> None:
+        self._command()
         self.shutter_is_open = True
 
     def close_shutter(self) -> None:
+        self._command()
         self.shutter_is_open = False
 
     def select_test_cell(self) -> None:
-        self.selected_cell = "test"
+        self._move_stage("test")
 
     def select_reference_cell(self) -> None:
-        self.selected_cell = "reference"
+        self._move_stage("reference")
@@ -17,8 +17,6 @@ of the form ``"6,<pin>,<value>"`` (legacy ``arduino_digital_command``;
 
 from __future__ import annotations
 
-import time
-
 from iv_lab.config import ArduinoSettings
 from iv_lab.hardware.errors import HardwareConnectionError
 
@@ -79,8 +77,8 @@ class ArduinoShutterController(BaseArduino):
 
     def select_reference_cell(self) -> None:
         self._digital_command(4, 0)
-        time.sleep(self.cell_stage_settling_time)
+        self.clock.sleep(self.cell_stage_settling_time)
 
     def select_test_cell(self) -> None:
         self._digital_command(4, 1)
-        time.sleep(self.cell_stage_settling_time)
+        self.clock.sleep(self.cell_stage_settling_time)
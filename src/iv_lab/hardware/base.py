@@ -16,6 +16,8 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 
+from .clock import SYSTEM_CLOCK, Clock
+
 
 class HardwareDevice(ABC):
     """Abstract base class for a connectable hardware device.
@@ -40,6 +42,8 @@ class HardwareDevice(ABC):
     def __init__(self, name: str = "") -> None:
         #: Human-readable device name used in status and error messages.
         self.name = name or type(self).__name__
+        #: Time source for waits and timeouts (see :mod:`iv_lab.hardware.clock`).
+        self.clock: Clock = SYSTEM_CLOCK
         self._connected = False
 
     def connect(self) -> None:
@@ -69,6 +73,13 @@ class HardwareDevice(ABC):
         """Return whether the device is currently connected."""
         return self._connected
 
+    def io_transports(self) -> tuple:
+        """Objects the driver sends its raw commands through while
+        connected, from the instrument library down to the VISA resource
+        (the wire, last), whose I/O the :mod:`~iv_lab.hardware.profiler`
+        times; none by default."""
+        return ()
+
     @abstractmethod
     def _open(self) -> None:
         """Open the underlying connection.
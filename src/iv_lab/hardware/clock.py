@@ -0,0 +1,104 @@
+"""Injectable time source for device waits and measurement timing.
+
+Every :class:`~iv_lab.hardware.base.HardwareDevice` carries a ``clock``
+(default :data:`SYSTEM_CLOCK`) and the measurement protocols read and
+sleep through the SMU's clock instead of calling ``time.time`` /
+``time.sleep`` directly. Swapping in a :class:`VirtualClock` lets an
+emulated system run an hour-long stability or MPP protocol in seconds:
+sleeps advance simulated time instantly, with no real waiting.
+
+A virtual clock only makes sense with emulated devices — real instruments
+keep running in real time whatever the clock says.
+
+This module is standard library only.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+
+class Clock:
+    """Wall-clock time source (``time.time`` / ``time.sleep``)."""
+
+    #: Waits shorter than this are spun rather than slept, in s:
+    #: ``time.sleep`` can overshoot by about a millisecond.
+    spin_threshold = 0.002
+
+    def time(self) -> float:
+        """Return the current time in seconds."""
+        return time.time()
+
+    def perf_counter_ns(self) -> int:
+        """Return a monotonic time in integer nanoseconds.
+
+        Unlike :meth:`time` it never jumps with the system clock; only
+        differences between readings are meaningful.
+        """
+        return time.perf_counter_ns()
+
+    def sleep(self, seconds: float) -> None:
+        """Block for ``seconds``."""
+        time.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """Simulated time that advances instantly.
+
+    Time only moves when someone waits: ``sleep()`` and ``advance()`` move
+    the clock forward by the requested duration and return immediately,
+    so reading the clock never changes it. A loop that polls ``time()``
+    without sleeping will therefore not reach its deadline unless a
+    ``tick`` is given, which each ``time()`` read then adds.
+
+    The clock may be shared between threads (e.g. a protocol and the
+    emulated devices it drives); updates are made under a lock.
+    """
+
+    def __init__(self, start: float = 0.0, *, tick: float = 0.0) -> None:
+        if tick < 0:
+            raise ValueError("tick must be non-negative")
+        self.start = float(start)
+        #: Simulated time consumed by each ``time()`` read.
+        self.tick = float(tick)
+        # elapsed time in integer ns: at epoch-sized starts a float sum
+        # would drop sub-microsecond sleeps and a waiting loop never ends
+        self._elapsed = 0
+        self._tick = round(self.tick * 1e9)
+        self._lock = threading.Lock()
+
+    #: Virtual sleeps are exact: never spin.
+    spin_threshold = 0.0
+
+    @property
+    def now(self) -> float:
+        """Current simulated time in seconds."""
+        return self.start + self._elapsed / 1e9
+
+    def time(self) -> float:
+        self._read()
+        return self.now
+
+    def perf_counter_ns(self) -> int:
+        return self._read()
+
+    def sleep(self, seconds: float) -> None:
+        self.advance(seconds)
+
+    def advance(self, seconds: float) -> None:
+        """Move the clock forward by ``seconds``; negative values are ignored."""
+        if seconds > 0:
+            with self._lock:
+                self._elapsed += round(seconds * 1e9)
+
+    def _read(self) -> int:
+        if not self._tick:
+            return self._elapsed
+        with self._lock:
+            self._elapsed += self._tick
+            return self._elapsed
+
+
+#: Shared wall-clock instance used by default everywhere.
+SYSTEM_CLOCK = Clock()
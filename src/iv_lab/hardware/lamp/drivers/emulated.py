@@ -1,16 +1,23 @@
 """Emulated lamp driver.
 
 Provides the state behavior required by docs/HARDWARE.md (settable light
-level, on/off state) without any hardware action or waiting. The legacy
+level, on/off state) without any hardware action, and without waiting
+unless a ``lamp.emulationTiming`` profile gives the real lamp's connect,
+switching and warm-up times (:mod:`iv_lab.hardware.timing`). The legacy
 code emulated lamps inside each brand branch by skipping the hardware
 calls but keeping the ``light_is_on`` bookkeeping; this driver does the
 same for any configured brand.
+
+Given an emulated SMU, the lamp registers itself as the SMU's light
+source, so the single-diode cell model follows the light level.
 """
 
 from __future__ import annotations
 
 from iv_lab.config import LampSettings
 from iv_lab.hardware.smu.base import BaseSMU
+from iv_lab.hardware.smu.drivers.emulated import EmulatedSMU
+from iv_lab.hardware.timing import LampTiming
 
 from ..base import BaseLamp
 
@@ -20,9 +27,20 @@ class EmulatedLamp(BaseLamp):
 
     def __init__(self, settings: LampSettings, smu: BaseSMU | None = None) -> None:
         super().__init__(settings, smu=smu, name=f"Emulated {settings.display_name}")
+        if isinstance(smu, EmulatedSMU):
+            smu.light_source = self
+        #: Time spent connecting and switching (default: none).
+        self.timing = LampTiming.from_settings(settings.emulationTiming)
+        # clock time at which the warm-up is over
+        self._warm_at = 0.0
+
+    def _wait(self, duration: float) -> None:
+        if duration > 0:
+            self.clock.sleep(duration)
 
     def _open(self) -> None:
-        pass
+        self._wait(self.timing.connect_time)
+        self._warm_at = self.clock.time() + self.timing.warmup_time
 
     def _close(self) -> None:
         pass
@@ -32,10 +50,14 @@ class EmulatedLamp(BaseLamp):
         if self.light_level_dict is not None:
             # validate the level like the real drivers do
             self._light_level_value(light_int)
+        self._wait(self._warm_at - self.clock.time())
+        self._wait(self.timing.light_on_time)
         self.light_int = light_int
         # legacy sets light_is_on True after any successful light_on,
         # including at 0 % sun
         self.light_is_on = True
 
     def light_off(self) -> None:
+        if self.light_is_on:
+            self._wait(self.timing.light_off_time)
         self.light_is_on = False
@@ -14,8 +14,6 @@ time for the wheel to reach position (11 s after ``light_on``, 7 s after
 
 from __future__ import annotations
 
-import time
-
 from iv_lab.config import LampSettings
 from iv_lab.hardware.errors import HardwareConnectionError
 from iv_lab.hardware.smu.base import BaseSMU
@@ -39,9 +37,9 @@ class KeithleyFilterWheelLamp(BaseLamp):
 
     def _wait_for_wheel(self, duration: float) -> None:
         """Wait for the wheel to reach position (legacy 1 s sleep steps)."""
-        deadline = time.time() + duration
-        while time.time() < deadline:
-            time.sleep(min(1.0, max(0.0, deadline - time.time())))
+        deadline = self.clock.time() + duration
+        while self.clock.time() < deadline:
+            self.clock.sleep(min(1.0, max(0.0, deadline - self.clock.time())))
 
     def _open(self) -> None:
         if self.smu is None:
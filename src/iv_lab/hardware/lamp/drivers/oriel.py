@@ -57,6 +57,9 @@ class OrielLSS7120Lamp(BaseLamp):
     def _close(self) -> None:
         self.lss.close()
 
+    def io_transports(self) -> tuple:
+        return (self.lss,) if self.is_connected() else ()
+
     def light_on(self, light_int: float = 100.0) -> None:
         self.light_is_on = False
 
@@ -16,8 +16,6 @@ option for the TMCM-1160 only when homing, not when moving — preserved).
 
 from __future__ import annotations
 
-import time
-
 from iv_lab.config import LampSettings
 from iv_lab.hardware.errors import HardwareConnectionError, HardwareTimeoutError
 from iv_lab.hardware.smu.base import BaseSMU
@@ -78,11 +76,11 @@ class TrinamicFilterWheelLamp(BaseLamp):
 
     def _wait_for_position(self, motor, timeout: float, poll_interval: float) -> None:
         """Poll ``get_position_reached`` until done or ``timeout`` elapses."""
-        deadline = time.time() + timeout
-        while time.time() < deadline:
+        deadline = self.clock.time() + timeout
+        while self.clock.time() < deadline:
             if motor.get_position_reached():
                 break
-            time.sleep(poll_interval)
+            self.clock.sleep(poll_interval)
 
         if not motor.get_position_reached():
             motor.stop()
@@ -128,11 +126,11 @@ class TrinamicFilterWheelLamp(BaseLamp):
 
             # home the motor (reference search); poll until done
             interface.reference_search(0, 0)  # start (type, motor)
-            deadline = time.time() + self.trinamic_homing_timeout
-            while time.time() < deadline:
+            deadline = self.clock.time() + self.trinamic_homing_timeout
+            while self.clock.time() < deadline:
                 if interface.reference_search(2, 0) == 0:  # status poll
                     break
-                time.sleep(self.homing_poll_interval)
+                self.clock.sleep(self.homing_poll_interval)
 
             if interface.reference_search(2, 0) != 0:
                 interface.reference_search(1, 0)  # stop the search
@@ -79,6 +79,9 @@ class VeraSolLamp(BaseLamp):
             self._lamp.close()
             self._lamp = None
 
+    def io_transports(self) -> tuple:
+        return (self._lamp._instr,) if self._lamp is not None else ()
+
     # ------------------------------------------------------------------
     # Light control
     # ------------------------------------------------------------------
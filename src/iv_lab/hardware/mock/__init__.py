@@ -0,0 +1,37 @@
+"""Simulated instruments behind a pyvisa-like resource.
+
+For running the real drivers end to end without hardware — integration
+tests and benchmarks of command counts and wall time — on simulated
+instruments or on recorded sessions (:mod:`.replay`). Not imported by
+the rest of the package.
+"""
+
+from .keithley26xx import Keithley26xxMock, TSPError
+from .keithley2400 import GPIB_PROFILE, SERIAL_PROFILE, Keithley2400Mock, SCPIError
+from .replay import ReplayInstrument, ReplayMismatchError, ReplayResourceManager
+from .visa import (
+    LatencyProfile,
+    MockResourceManager,
+    MockVisaIOError,
+    MockVisaResource,
+    TranscriptEntry,
+    use_mock_visa,
+)
+
+__all__ = [
+    "GPIB_PROFILE",
+    "Keithley2400Mock",
+    "Keithley26xxMock",
+    "LatencyProfile",
+    "MockResourceManager",
+    "MockVisaIOError",
+    "MockVisaResource",
+    "ReplayInstrument",
+    "ReplayMismatchError",
+    "ReplayResourceManager",
+    "SCPIError",
+    "SERIAL_PROFILE",
+    "TSPError",
+    "TranscriptEntry",
+    "use_mock_visa",
+]
@@ -0,0 +1,619 @@
+"""Simulated Keithley 2400 / 2401 / 2450 speaking SCPI.
+
+:class:`Keithley2400Mock` models the state the 2400-family driver works
+with — source function and levels, compliance, sense function, ranges
+and NPLC, 2/4-wire sense, front/rear terminals, the TTL output, the
+``:FORM:ELEM`` reading format and the TRACE buffer with ``:SOUR:VOLT:MODE
+SWE`` (2400/2401) or ``:SOUR:SWE:VOLT:LIN`` (2450) sweeps — and answers
+queries like the instrument. pymeasure's ``Keithley2400`` /
+``Keithley2450`` open it through the patched pyvisa of
+:func:`~iv_lab.hardware.mock.visa.use_mock_visa`, so each property access
+of the driver becomes one simulated SCPI exchange.
+
+The front terminals carry the cell, the rear terminals the reference
+diode, both from the emulated SMU's diode models. A reading takes
+``nplc`` power line cycles on the instrument clock and sweeps fill the
+buffer as clock time passes. Every SCPI command is recorded with its
+time in :attr:`Keithley2400Mock.commands`; the resource's transcript has
+the messages and their bus time.
+
+Headers are matched in short form with optional nodes dropped
+(``:SOURce:VOLTage:LEVel:IMMediate`` is ``SOUR:VOLT``; a leading
+``VOLT``/``CURR``/``FUNC`` implies ``SENS``). Unknown headers queue
+``-113,"Undefined header"`` like the instrument; queries without an
+answer leave the read to time out.
+
+:data:`GPIB_PROFILE` and :data:`SERIAL_PROFILE` are bus timings
+calibrated to the legacy measured point periods (``meas_period_min``).
+"""
+
+from __future__ import annotations
+
+import re
+
+import numpy as np
+
+from iv_lab.hardware.clock import SYSTEM_CLOCK, Clock
+from iv_lab.hardware.smu.drivers._diode_model import LegacyDiodeModel, SingleDiodeModel
+
+from .visa import LatencyProfile
+
+#: The exchange of one legacy point-by-point step: set the level, read
+#: the current (one :FORM:ELEM element) at NPLC 1 and 50 Hz.
+_LEGACY_STEP = (":SOUR:VOLT:LEV 0.5\n", ":READ?\n", "-4.000000E-03\n")
+_LEGACY_INTEGRATION = 0.02
+
+
+def legacy_profile(period: float, baud_rate: int | None = None) -> LatencyProfile:
+    """Bus timing that reproduces a legacy measured point ``period``.
+
+    The part of the period not spent integrating or moving bytes (at
+    ``baud_rate`` on serial) is spread over the step's three transfers as
+    a fixed latency.
+    """
+    byte_time = 0.0 if baud_rate is None else LatencyProfile.serial(baud_rate).byte_time
+    transfer = byte_time * sum(len(part) for part in _LEGACY_STEP)
+    latency = (period - _LEGACY_INTEGRATION - transfer) / len(_LEGACY_STEP)
+    return LatencyProfile(latency=latency, byte_time=byte_time)
+
+
+#: Legacy ``meas_period_min`` of the 2400 over GPIB (1/8.5 s) and RS-232
+#: at 9600 baud (1/6 s).
+GPIB_PROFILE = legacy_profile(1 / 8.5)
+SERIAL_PROFILE = legacy_profile(1 / 6, baud_rate=9600)
+
+UNDEFINED_HEADER = -113
+DATA_TYPE_ERROR = -104
+ILLEGAL_PARAMETER = -224
+
+#: Reading element returned for the resistance when not measured.
+_NO_RESISTANCE = 9.91e37
+_ELEMENTS_2400 = ("VOLT", "CURR", "RES", "TIME", "STAT")
+_OPTIONAL_NODES = {"IMM", "AMPL", "DC", "NEXT"}
+_SENSE_ROOTS = {"VOLT", "CURR", "FUNC", "RES"}
+_ON = {"ON": True, "1": True, "OFF": False, "0": False}
+
+
+class SCPIError(Exception):
+    """A command error: queued on the error queue, the command is skipped."""
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+def _short_node(node: str) -> str:
+    """Short form of one header node (``SOURce2`` -> ``SOUR2``)."""
+    match = re.fullmatch(r"([A-Z]+)(\d*)", node.upper())
+    if match is None:
+        raise SCPIError(UNDEFINED_HEADER, "Undefined header")
+    name, suffix = match.groups()
+    if len(name) > 4:
+        name = name[:3] if name[3] in "AEIOU" else name[:4]
+    return name + ("" if suffix == "1" else suffix)
+
+
+def _split(text: str, separator: str) -> list[str]:
+    """Split on ``separator`` outside quotes."""
+    parts, current, quote = [], [], ""
+    for char in text:
+        if quote:
+            quote = "" if char == quote else quote
+        elif char in "'\"":
+            quote = char
+        elif char == separator:
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    parts.append("".join(current))
+    return parts
+
+
+class _Run:
+    """A triggered sweep or reading series filling the buffer over time."""
+
+    def __init__(self, start: float, period: float, levels: np.ndarray) -> None:
+        self.start = start
+        self.period = period
+        self.levels = levels
+        self.done = 0
+
+
+class Keithley2400Mock:
+    """Simulated 2400-family SMU for :class:`~.visa.MockVisaResource`.
+
+    ``load`` is the cell model (a :class:`SingleDiodeModel` by default),
+    ``photocurrent`` / ``reference_photocurrent`` the one-sun
+    photocurrents on the front / rear terminals and ``irradiance`` the
+    light level in suns.
+    """
+
+    def __init__(
+        self,
+        model: str = "2400",
+        *,
+        load: SingleDiodeModel | LegacyDiodeModel | None = None,
+        photocurrent: float = 0.004,
+        reference_photocurrent: float = 0.004,
+        line_frequency: float = 50.0,
+        clock: Clock = SYSTEM_CLOCK,
+    ) -> None:
+        self.model = model
+        self.load = load if load is not None else SingleDiodeModel()
+        self.photocurrent = photocurrent
+        self.reference_photocurrent = reference_photocurrent
+        self.irradiance = 1.0
+        self.line_frequency = line_frequency
+        self.clock = clock
+        #: Queued ``(code, message)`` errors.
+        self.errors: list[tuple[int, str]] = []
+        #: Every SCPI command executed, as ``(clock time, command)``.
+        self.commands: list[tuple[float, str]] = []
+        #: ``SYST:KEY`` front-panel key presses.
+        self.keys: list[int] = []
+        self._output: list[bytes] = []
+        self.reset()
+
+    @property
+    def is_2450(self) -> bool:
+        return self.model == "2450"
+
+    def reset(self) -> None:
+        """``*RST`` state."""
+        self.output = False
+        self.terminals = "FRON"
+        self.wires = 2
+        self.source_function = "VOLT"
+        self.source_level = {"VOLT": 0.0, "CURR": 0.0}
+        self.source_range = {"VOLT": 21.0, "CURR": 1.05e-4}
+        self.source_mode = "FIX"
+        self.sweep_start = 0.0
+        self.sweep_stop = 0.0
+        self.sweep_points = 2500 if not self.is_2450 else 1
+        self.source_delay = 0.0
+        self.trigger_delay = 0.0
+        self.trigger_count = 1
+        self.sense_function = "CURR"
+        self.protection = {"VOLT": 21.0, "CURR": 1.05e-4}
+        self.sense_range = {"VOLT": 21.0, "CURR": 1.05e-4}
+        self.sense_autorange = {"VOLT": True, "CURR": True}
+        self.nplc = {"VOLT": 1.0, "CURR": 1.0}
+        self.elements = list(_ELEMENTS_2400)
+        self.ttl_level = 15
+        self.beeper = True
+        self.trace_points = 100
+        self.trace_feed = "SENS"
+        self.trace_control = "NEV"
+        #: Buffered readings as ``(v, i, t)`` rows.
+        self.trace: list[tuple[float, float, float]] = []
+        self._run: _Run | None = None
+        self._time_zero = self.clock.time()
+
+    # --- SimulatedInstrument interface ---
+
+    def write(self, message: str) -> None:
+        self._advance()
+        path: list[str] = []
+        for unit in _split(message.strip(), ";"):
+            unit = unit.strip()
+            if not unit:
+                continue
+            self.commands.append((self.clock.time(), unit))
+            try:
+                path = self._execute(unit, path)
+            except SCPIError as err:
+                self.errors.append((err.code, str(err)))
+
+    def read(self) -> bytes | None:
+        return self._output.pop(0) if self._output else None
+
+    # --- parsing ---
+
+    def _execute(self, unit: str, path: list[str]) -> list[str]:
+        """Run one command; return the path for a following relative one."""
+        header, _, argument = unit.partition(" ")
+        header = header.lstrip(":") if header.startswith(":*") else header
+        query = header.endswith("?")
+        header = header.rstrip("?")
+        arguments = [a.strip() for a in _split(argument, ",")] if argument.strip() else []
+
+        if header.startswith("*"):
+            self._common(header.upper(), query)
+            return path
+
+        relative = not header.startswith(":") and bool(path)
+        nodes = [_short_node(node) for node in header.strip(":").split(":")]
+        if relative:
+            nodes = path + nodes
+        elif nodes[0] in _SENSE_ROOTS:
+            nodes = ["SENS", *nodes]
+        key = [
+            node
+            for k, node in enumerate(nodes)
+            if node not in _OPTIONAL_NODES
+            and not (node == "LEV" and k > 0 and nodes[k - 1] != "TTL")
+            and not (node == "STAT" and k > 0 and nodes[k - 1] == "OUTP")
+        ]
+        self._command(":".join(key), arguments, query)
+        return nodes[:-1]
+
+    def _answer(self, *values: float | str) -> None:
+        text = ",".join(v if isinstance(v, str) else f"{v:+.6E}" for v in values)
+        self._output.append((text + "\n").encode())
+
+    @staticmethod
+    def _number(arguments: list[str]) -> float:
+        if len(arguments) != 1:
+            raise SCPIError(DATA_TYPE_ERROR, "Data type error")
+        word = arguments[0].upper()
+        if word in ("MIN", "MINIMUM"):
+            return 0.0
+        if word in ("MAX", "MAXIMUM"):
+            return float("inf")
+        try:
+            return float(arguments[0])
+        except ValueError:
+            raise SCPIError(DATA_TYPE_ERROR, "Data type error") from None
+
+    @staticmethod
+    def _flag(arguments: list[str]) -> bool:
+        try:
+            return _ON[arguments[0].upper()]
+        except (IndexError, KeyError):
+            raise SCPIError(ILLEGAL_PARAMETER, "Illegal parameter value") from None
+
+    @staticmethod
+    def _word(arguments: list[str], choices: dict[str, str]) -> str:
+        try:
+            # 'CURR:DC' style function names
+            return choices[_short_node(arguments[0].strip("'\"").split(":")[0])]
+        except (IndexError, KeyError, SCPIError):
+            raise SCPIError(ILLEGAL_PARAMETER, "Illegal parameter value") from None
+
+    # --- command set ---
+
+    def _common(self, header: str, query: bool) -> None:
+        if header == "*RST":
+            self.reset()
+        elif header == "*CLS":
+            self.errors.clear()
+        elif header == "*IDN" and query:
+            self._answer(f"KEITHLEY INSTRUMENTS INC.,MODEL {self.model},4321234,C32 (sim)")
+        elif header == "*OPC" and query:
+            self._answer("1")
+        elif header not in ("*OPC", "*WAI"):
+            raise SCPIError(UNDEFINED_HEADER, "Undefined header")
+
+    def _command(self, key: str, arguments: list[str], query: bool) -> None:
+        quantity = "VOLT" if "VOLT" in key.split(":") else "CURR"
+        handler = getattr(self, "_" + key.replace(":", "_"), None)
+        if handler is None:
+            handler = self._generic(key, quantity)
+        if handler is None:
+            raise SCPIError(UNDEFINED_HEADER, "Undefined header")
+        handler(arguments, query)
+
+    def _generic(self, key: str, quantity: str):
+        """Handlers of the per-function ``SOUR:*`` and ``SENS:*`` settings."""
+        v_or_i = r"(VOLT|CURR)"
+        if re.fullmatch(f"SOUR:{v_or_i}", key):
+            return self._setting(self.source_level, quantity)
+        if re.fullmatch(f"SOUR:{v_or_i}:RANG", key):
+            return self._setting(self.source_range, quantity)
+        if re.fullmatch(f"SOUR:{v_or_i}:RANG:AUTO", key):
+            return self._ignored
+        if re.fullmatch(f"SENS:{v_or_i}:PROT", key):
+            return self._setting(self.protection, quantity)
+        if self.is_2450 and key in ("SOUR:VOLT:ILIM", "SOUR:CURR:VLIM"):
+            # the 2450's compliance is a source setting of the other quantity
+            other = "CURR" if key == "SOUR:VOLT:ILIM" else "VOLT"
+            return self._setting(self.protection, other)
+        if re.fullmatch(f"SENS:{v_or_i}:RANG", key):
+            return self._setting(self.sense_range, quantity, self._fixed_range)
+        if re.fullmatch(f"SENS:{v_or_i}:RANG:AUTO", key):
+            return self._setting(self.sense_autorange, quantity, flag=True)
+        if re.fullmatch(f"SENS:{v_or_i}:NPLC", key):
+            return self._setting(self.nplc, quantity, self._check_nplc)
+        if self.is_2450 and re.fullmatch(f"SENS:{v_or_i}:RSEN", key):
+            return self._SYST_RSEN
+        if key == "SOUR2:TTL:LEV" and not self.is_2450:
+            return self._ttl
+        measure = re.fullmatch(f"MEAS(?::{v_or_i})?", key)
+        if measure is not None:
+            return lambda arguments, query: self._measure(measure.group(1), query)
+        if key.startswith("DISP"):
+            return self._ignored
+        return None
+
+    def _setting(self, table: dict, name: str, on_set=None, *, flag: bool = False):
+        def handler(arguments: list[str], query: bool) -> None:
+            if query:
+                value = table[name]
+                self._answer(str(int(value)) if flag else value)
+                return
+            value = self._flag(arguments) if flag else self._number(arguments)
+            if on_set is not None:
+                on_set(name, value)
+            table[name] = value
+
+        return handler
+
+    def _ignored(self, arguments: list[str], query: bool) -> None:
+        pass
+
+    def _fixed_range(self, quantity: str, value: float) -> None:
+        self.sense_autorange[quantity] = False
+
+    def _check_nplc(self, quantity: str, value: float) -> None:
+        if not 0.01 <= value <= 10:
+            raise SCPIError(ILLEGAL_PARAMETER, "Parameter data out of range")
+
+    def _ttl(self, arguments: list[str], query: bool) -> None:
+        if query:
+            self._answer(str(self.ttl_level))
+            return
+        level = int(self._number(arguments))
+        if not 0 <= level <= 15:
+            raise SCPIError(ILLEGAL_PARAMETER, "Parameter data out of range")
+        self.ttl_level = level
+
+    def _OUTP(self, arguments: list[str], query: bool) -> None:
+        if query:
+            self._answer(str(int(self.output)))
+        else:
+            self.output = self._flag(arguments)
+
+    def _ROUT_TERM(self, arguments: list[str], query: bool) -> None:
+        if query:
+            self._answer(self.terminals)
+            return
+        terminals = self._word(arguments, {"FRON": "FRON", "REAR": "REAR"})
+        if terminals != self.terminals:
+            # switching terminals turns the output off
+            self.output = False
+            self.terminals = terminals
+
+    def _SYST_RSEN(self, arguments: list[str], query: bool) -> None:
+        if query:
+            self._answer(str(int(self.wires == 4)))
+        else:
+            self.wires = 4 if self._flag(arguments) else 2
+
+    def _SYST_BEEP_STAT(self, arguments: list[str], query: bool) -> None:
+        if query:
+            self._answer(str(int(self.beeper)))
+        else:
+            self.beeper = self._flag(arguments)
+
+    def _SYST_KEY(self, arguments: list[str], query: bool) -> None:
+        if self.is_2450:
+            raise SCPIError(UNDEFINED_HEADER, "Undefined header")
+        self.keys.append(int(self._number(arguments)))
+
+    def _SYST_ERR(self, arguments: list[str], query: bool) -> None:
+        code, message = self.errors.pop(0) if self.errors else (0, "No error")
+        self._answer(f'{code:+d},"{message}"')
+
+    def _STAT_QUE_CLE(self, arguments: list[str], query: bool) -> None:
+        self.errors.clear()
+
+    def _STAT_PRES(self, arguments: list[str], query: bool) -> None:
+        pass
+
+    def _SOUR_FUNC(self, arguments: list[str], query: bool) -> None:
+        if query:
+            self._answer(self.source_function)
+            return
+        function = self._word(arguments, {"VOLT": "VOLT", "CURR": "CURR"})
+        if self.output and function != self.source_function:
+            # the 2400 cannot change the source function with the output on
+            raise SCPIError(-221, "Settings conflict")
+        self.source_function = function
+
+    def _SOUR_VOLT_MODE(self, arguments: list[str], query: bool) -> None:
+        if query:
+            self._answer(self.source_mode)
+        else:
+            self.source_mode = self._word(
+                arguments, {"FIX": "FIX", "SWE": "SWE", "LIST": "LIST"}
+            )
+
+    def _SOUR_VOLT_STAR(self, arguments: list[str], query: bool) -> None:
+        self.sweep_start = self._number(arguments)
+
+    def _SOUR_VOLT_STOP(self, arguments: list[str], query: bool) -> None:
+        self.sweep_stop = self._number(arguments)
+
+    def _SOUR_SWE_POIN(self, arguments: list[str], query: bool) -> None:
+        if query:
+            self._answer(str(self.sweep_points))
+        else:
+            self.sweep_points = int(self._number(arguments))
+
+    def _SOUR_SWE_SPAC(self, arguments: list[str], query: bool) -> None:
+        self._word(arguments, {"LIN": "LIN"})
+
+    def _SOUR_SWE_VOLT_LIN(self, arguments: list[str], query: bool) -> None:
+        if not self.is_2450:
+            raise SCPIError(UNDEFINED_HEADER, "Undefined header")
+        if len(arguments) < 3:
+            raise SCPIError(-109, "Missing parameter")
+        self.sweep_start = float(arguments[0])
+        self.sweep_stop = float(arguments[1])
+        self.sweep_points = int(float(arguments[2]))
+        self.source_delay = float(arguments[3]) if len(arguments) > 3 else 0.0
+        self.source_function = "VOLT"
+        self.source_mode = "SWE"
+        self.trigger_count = self.sweep_points
+
+    def _SOUR_DEL(self, arguments: list[str], query: bool) -> None:
+        if query:
+            self._answer(self.source_delay)
+        else:
+            self.source_delay = self._number(arguments)
+
+    def _TRIG_DEL(self, arguments: list[str], query: bool) -> None:
+        if query:
+            self._answer(self.trigger_delay)
+        else:
+            self.trigger_delay = self._number(arguments)
+
+    def _TRIG_COUN(self, arguments: list[str], query: bool) -> None:
+        if query:
+            self._answer(str(self.trigger_count))
+        else:
+            self.trigger_count = int(self._number(arguments))
+
+    def _SENS_FUNC(self, arguments: list[str], query: bool) -> None:
+        if query:
+            self._answer(f'"{self.sense_function}:DC"')
+        else:
+            self.sense_function = self._word(arguments, {"VOLT": "VOLT", "CURR": "CURR"})
+
+    def _FORM_ELEM(self, arguments: list[str], query: bool) -> None:
+        if query:
+            self._answer(",".join(self.elements))
+            return
+        elements = [_short_node(a) for a in arguments]
+        if not elements or any(e not in _ELEMENTS_2400 for e in elements):
+            raise SCPIError(ILLEGAL_PARAMETER, "Illegal parameter value")
+        self.elements = elements
+
+    # --- readings ---
+
+    def _integration_time(self) -> float:
+        return self.nplc[self.sense_function] / self.line_frequency
+
+    def _terminal_photocurrent(self) -> float:
+        if self.terminals == "FRON":
+            return self.photocurrent
+        return self.reference_photocurrent
+
+    def _evaluate(self, levels: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Voltage and current at the terminals for source ``levels``."""
+        if not self.output:
+            zeros = np.zeros_like(levels)
+            return zeros, zeros
+        photocurrent = self._terminal_photocurrent()
+        if self.source_function == "VOLT":
+            i = self.load.current(levels, photocurrent, self.irradiance)
+            limit = self.protection["CURR"]
+            return levels, np.clip(i, -limit, limit)
+        v = self.load.voltage(levels, photocurrent, self.irradiance)
+        limit = self.protection["VOLT"]
+        return np.clip(v, -limit, limit), levels
+
+    def _format_readings(self, rows: list[tuple[float, float, float]]) -> str:
+        if self.is_2450:
+            column = 0 if self.sense_function == "VOLT" else 1
+            return ",".join(f"{row[column]:+.6E}" for row in rows)
+        values = []
+        for v, i, t in rows:
+            element_values = {
+                "VOLT": v, "CURR": i, "RES": _NO_RESISTANCE, "TIME": t, "STAT": 0.0,
+            }
+            values += [f"{element_values[e]:+.6E}" for e in self.elements]
+        return ",".join(values)
+
+    def _READ(self, arguments: list[str], query: bool) -> None:
+        if not query:
+            raise SCPIError(UNDEFINED_HEADER, "Undefined header")
+        count = self.trigger_count if self.source_mode == "FIX" else 1
+        rows = []
+        for _ in range(count):
+            self.clock.sleep(self.trigger_delay + self.source_delay + self._integration_time())
+            level = np.array([self.source_level[self.source_function]])
+            v, i = self._evaluate(level)
+            rows.append((float(v[0]), float(i[0]), self.clock.time() - self._time_zero))
+        self._output.append((self._format_readings(rows) + "\n").encode())
+
+    def _measure(self, function: str | None, query: bool) -> None:
+        """``:MEAS:<function>?``: select the sense function, then read."""
+        if function is not None:
+            self.sense_function = function
+        self._READ([], query)
+
+    # --- trigger model and buffer ---
+
+    def _INIT(self, arguments: list[str], query: bool) -> None:
+        if self.source_mode == "SWE":
+            levels = np.linspace(self.sweep_start, self.sweep_stop, self.sweep_points)
+            levels = levels[: self.trigger_count]
+        else:
+            levels = np.full(self.trigger_count, self.source_level[self.source_function])
+        period = self.trigger_delay + self.source_delay + self._integration_time()
+        self._run = _Run(self.clock.time(), period, levels)
+
+    def _ABOR(self, arguments: list[str], query: bool) -> None:
+        self._run = None
+
+    def _advance(self) -> None:
+        """Store the readings a running sweep has taken by now."""
+        run = self._run
+        if run is None:
+            return
+        elapsed = self.clock.time() - run.start
+        due = min(len(run.levels), int(elapsed / run.period) if run.period > 0 else len(run.levels))
+        if due > run.done:
+            levels = run.levels[run.done : due]
+            v, i = self._evaluate(levels)
+            t = run.start - self._time_zero + run.period * np.arange(run.done + 1, due + 1)
+            store = self.is_2450 or (self.trace_feed == "SENS" and self.trace_control == "NEXT")
+            if store:
+                rows = list(zip(v.tolist(), i.tolist(), t.tolist(), strict=True))
+                if not self.is_2450:
+                    rows = rows[: max(0, self.trace_points - len(self.trace))]
+                self.trace += rows
+            self.source_level[self.source_function] = float(levels[-1])
+            run.done = due
+        if run.done >= len(run.levels):
+            self._run = None
+            if not self.is_2450 and self.trace_control == "NEXT":
+                # a full buffer stops feeding
+                self.trace_control = "NEV"
+
+    def _TRAC_CLE(self, arguments: list[str], query: bool) -> None:
+        self.trace = []
+
+    def _TRAC_POIN(self, arguments: list[str], query: bool) -> None:
+        if query:
+            self._answer(str(self.trace_points))
+            return
+        points = int(self._number(arguments))
+        if not 1 <= points <= 2500:
+            raise SCPIError(ILLEGAL_PARAMETER, "Parameter data out of range")
+        self.trace_points = points
+
+    def _TRAC_POIN_ACT(self, arguments: list[str], query: bool) -> None:
+        self._answer(str(len(self.trace)))
+
+    def _TRAC_ACT(self, arguments: list[str], query: bool) -> None:
+        # 2450: ":TRAC:ACT? "defbuffer1""
+        self._answer(str(len(self.trace)))
+
+    def _TRAC_FEED(self, arguments: list[str], query: bool) -> None:
+        self.trace_feed = self._word(arguments, {"SENS": "SENS", "CALC": "CALC", "NONE": "NONE"})
+
+    def _TRAC_FEED_CONT(self, arguments: list[str], query: bool) -> None:
+        self.trace_control = self._word(arguments, {"NEXT": "NEXT", "NEV": "NEV"})
+
+    def _TRAC_DATA(self, arguments: list[str], query: bool) -> None:
+        if not query:
+            raise SCPIError(UNDEFINED_HEADER, "Undefined header")
+        if not self.is_2450:
+            self._output.append((self._format_readings(self.trace) + "\n").encode())
+            return
+        # 2450: first, last, buffer name, elements
+        first, last = int(float(arguments[0])), int(float(arguments[1]))
+        if not 1 <= first <= last <= len(self.trace):
+            raise SCPIError(-222, "Data out of range")
+        columns = {"SOUR": 0, "READ": 1, "REL": 2}
+        fields = [columns[_short_node(a)] for a in arguments[3:]] or [1]
+        rows = self.trace[first - 1 : last]
+        source_is_v = self.source_function == "VOLT"
+        values = []
+        for v, i, t in rows:
+            row = (v, i, t) if source_is_v else (i, v, t)
+            values += [f"{row[f]:+.6E}" for f in fields]
+        self._output.append((",".join(values) + "\n").encode())
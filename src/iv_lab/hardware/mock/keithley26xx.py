@@ -0,0 +1,982 @@
+"""Simulated Keithley 2600-series instrument speaking a TSP subset.
+
+:class:`Keithley26xxMock` interprets the Lua that the bundled
+``_keithley26xx_lib.SMU26xx`` and ``_keithley26xx_tsp`` send — attribute
+assignments (``smua.source.levelv = 0.5``), ``print(...)``,
+``errorqueue``, single-line ``if ... then ... end``, ``printbuffer`` in
+ASCII and REAL64, the ``SweepVLinMeasureI`` KISweep function, trigger-model
+sweeps and overlapped timed readings into ``nvbuffer1``, and
+``loadscript`` / ``endscript`` — and answers like the instrument, so the
+real driver runs end to end against it (see
+:func:`iv_lab.hardware.mock.visa.use_mock_visa`).
+
+Both channels drive a solar-cell load from the emulated SMU's diode
+models: channel A the cell, channel B the reference photodiode. Each
+reading takes ``nplc`` power line cycles on the instrument clock, and
+buffered operations fill ``nvbuffer1`` as clock time passes, so polling
+the buffer sees readings arrive as on the instrument. Likewise the
+running MPP tracker takes its samples on the instrument clock however
+late the host reads its records; a message sent while it runs waits
+until it ends, and a device clear (``clear()``) aborts it.
+
+The interpreter covers expressions and single-line statements only. The
+functions of loaded scripts are not interpreted: those of the IVLab
+scripts (``_keithley26xx_tsp``) have native implementations here, and
+calling any other script function is a runtime error.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+
+from iv_lab.hardware.clock import SYSTEM_CLOCK, Clock
+from iv_lab.hardware.smu.drivers._diode_model import LegacyDiodeModel, SingleDiodeModel
+
+#: Error queue entry when the queue is empty.
+_NO_ERROR = (0, "Queue Is Empty")
+#: Lua errors abort the rest of the message.
+SYNTAX_ERROR = -285
+RUNTIME_ERROR = -286
+#: Parameter errors are queued and execution continues.
+PARAMETER_ERROR = 1100
+
+
+class TSPError(Exception):
+    """A Lua error: queued and the rest of the message is skipped."""
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+# --- tokenizer and expression parser ---
+
+_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+      | (?P<string>"[^"]*"|'[^']*')
+      | (?P<name>[A-Za-z_]\w*)
+      | (?P<op>==|~=|<=|>=|[-+*/<>=(),.{}])
+    )""",
+    re.VERBOSE,
+)
+_KEYWORDS = {"and", "or", "not", "if", "then", "end", "local", "nil", "true", "false"}
+
+
+def _tokenize(line: str) -> list[tuple[str, str]]:
+    tokens: list[tuple[str, str]] = []
+    position = 0
+    line = line.rstrip()
+    while position < len(line):
+        match = _TOKEN.match(line, position)
+        if match is None or match.end() == position:
+            raise TSPError(SYNTAX_ERROR, f"Syntax error near {line[position:]!r}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "name" and value in _KEYWORDS:
+            kind = "keyword"
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser for one statement, producing closures."""
+
+    _BINARY = [
+        ("or",),
+        ("and",),
+        ("==", "~=", "<", ">", "<=", ">="),
+        ("+", "-"),
+        ("*", "/"),
+    ]
+
+    def __init__(self, tokens: list[tuple[str, str]]) -> None:
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> str | None:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position][1]
+        return None
+
+    def next(self) -> tuple[str, str]:
+        if self.position >= len(self.tokens):
+            raise TSPError(SYNTAX_ERROR, "unexpected end of statement")
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def expect(self, value: str) -> None:
+        kind, token = self.next()
+        if token != value:
+            raise TSPError(SYNTAX_ERROR, f"'{value}' expected near '{token}'")
+
+    def at_end(self) -> bool:
+        return self.position >= len(self.tokens)
+
+    # expressions evaluate to closures taking the interpreter
+
+    def expression(self, level: int = 0) -> Callable:
+        if level == len(self._BINARY):
+            return self.unary()
+        left = self.expression(level + 1)
+        while self.peek() in self._BINARY[level]:
+            op = self.next()[1]
+            right = self.expression(level + 1)
+            left = _binary(op, left, right)
+        return left
+
+    def unary(self) -> Callable:
+        if self.peek() == "not":
+            self.next()
+            operand = self.unary()
+            return lambda env: not _truthy(_single(operand(env)))
+        if self.peek() == "-":
+            self.next()
+            operand = self.unary()
+            return lambda env: -_single(operand(env))
+        return self.suffixed()
+
+    def primary(self) -> Callable:
+        kind, token = self.next()
+        if kind == "number":
+            value = float(token)
+            return lambda env: value
+        if kind == "string":
+            text = token[1:-1]
+            return lambda env: text
+        if token == "nil":
+            return lambda env: None
+        if token in ("true", "false"):
+            flag = token == "true"
+            return lambda env: flag
+        if token == "(":
+            inner = self.expression()
+            self.expect(")")
+            return lambda env: _single(inner(env))
+        if token == "{":
+            self.expect("}")
+            return lambda env: {}
+        if kind == "name":
+            return lambda env: env.lookup(token)
+        raise TSPError(SYNTAX_ERROR, f"unexpected symbol near '{token}'")
+
+    def suffixed(self) -> Callable:
+        expr = self.primary()
+        while self.peek() in (".", "("):
+            if self.next()[1] == ".":
+                kind, name = self.next()
+                if kind != "name":
+                    raise TSPError(SYNTAX_ERROR, f"name expected near '{name}'")
+                expr = _field(expr, name)
+            else:
+                args = self.arguments()
+                expr = _call(expr, args)
+        return expr
+
+    def arguments(self) -> list[Callable]:
+        args: list[Callable] = []
+        if self.peek() == ")":
+            self.next()
+            return args
+        args.append(self.expression())
+        while self.peek() == ",":
+            self.next()
+            args.append(self.expression())
+        self.expect(")")
+        return args
+
+    def target(self) -> tuple[Callable | None, str]:
+        """An assignment target: ``(object expression or None, name)``."""
+        kind, name = self.next()
+        if kind != "name":
+            raise TSPError(SYNTAX_ERROR, f"unexpected symbol near '{name}'")
+        owner: Callable | None = None
+        while self.peek() == ".":
+            self.next()
+            base = owner
+            owner = (
+                (lambda env, n=name: env.lookup(n))
+                if base is None
+                else _field(base, name)
+            )
+            kind, name = self.next()
+        return owner, name
+
+    # statements
+
+    def statement(self) -> Callable:
+        if self.peek() == "local":
+            self.next()
+        if self.peek() == "if":
+            self.next()
+            condition = self.expression()
+            self.expect("then")
+            body = []
+            while self.peek() != "end":
+                body.append(self.statement())
+            self.expect("end")
+
+            def run_if(env):
+                if _truthy(_single(condition(env))):
+                    for statement in body:
+                        statement(env)
+
+            return run_if
+
+        start = self.position
+        targets = [self.target()]
+        while self.peek() == ",":
+            self.next()
+            targets.append(self.target())
+        if self.peek() == "=":
+            self.next()
+            values = [self.expression()]
+            while self.peek() == ",":
+                self.next()
+                values.append(self.expression())
+            return _assignment(targets, values)
+
+        # not an assignment: a function call statement
+        self.position = start
+        call = self.suffixed()
+        return lambda env: call(env)
+
+
+def _single(value: Any) -> Any:
+    """First value of a multiple return (Lua adjusts to one value)."""
+    if isinstance(value, tuple):
+        return value[0] if value else None
+    return value
+
+
+def _truthy(value: Any) -> bool:
+    return value is not None and value is not False
+
+
+def _expand(values: list[Callable], env) -> list[Any]:
+    """Evaluate expressions, expanding the last one's multiple returns."""
+    results = [_single(value(env)) for value in values[:-1]]
+    if values:
+        last = values[-1](env)
+        results.extend(last if isinstance(last, tuple) else (last,))
+    return results
+
+
+def _binary(op: str, left: Callable, right: Callable) -> Callable:
+    if op == "and":
+        return lambda env: (
+            _single(right(env)) if _truthy(a := _single(left(env))) else a
+        )
+    if op == "or":
+        return lambda env: (
+            a if _truthy(a := _single(left(env))) else _single(right(env))
+        )
+    operations: dict[str, Callable[[Any, Any], Any]] = {
+        "==": lambda a, b: a == b,
+        "~=": lambda a, b: a != b,
+        "<": lambda a, b: a < b,
+        ">": lambda a, b: a > b,
+        "<=": lambda a, b: a <= b,
+        ">=": lambda a, b: a >= b,
+        "+": lambda a, b: a + b,
+        "-": lambda a, b: a - b,
+        "*": lambda a, b: a * b,
+        "/": lambda a, b: a / b,
+    }
+    operation = operations[op]
+
+    def evaluate(env):
+        a, b = _single(left(env)), _single(right(env))
+        try:
+            return operation(a, b)
+        except TypeError:
+            raise TSPError(
+                RUNTIME_ERROR, f"attempt to perform arithmetic or compare on {a!r} and {b!r}"
+            ) from None
+
+    return evaluate
+
+
+def _field(owner: Callable, name: str) -> Callable:
+    def evaluate(env):
+        obj = _single(owner(env))
+        if isinstance(obj, dict):
+            return obj.get(name)
+        if obj is None or name.startswith("_") or not hasattr(obj, name):
+            raise TSPError(RUNTIME_ERROR, f"attempt to index field '{name}'")
+        return getattr(obj, name)
+
+    return evaluate
+
+
+def _call(function: Callable, args: list[Callable]) -> Callable:
+    def evaluate(env):
+        target = _single(function(env))
+        if not callable(target):
+            raise TSPError(RUNTIME_ERROR, "attempt to call a non-function value")
+        return target(*_expand(args, env))
+
+    return evaluate
+
+
+def _assignment(targets: list[tuple[Callable | None, str]], values: list[Callable]) -> Callable:
+    def run(env):
+        results = _expand(values, env)
+        results += [None] * (len(targets) - len(results))
+        for (owner, name), value in zip(targets, results, strict=False):
+            if owner is None:
+                env.globals[name] = value
+                continue
+            obj = _single(owner(env))
+            if isinstance(obj, dict):
+                obj[name] = value
+            elif isinstance(obj, _Node) and obj.settable(name):
+                obj.set(name, value, env)
+            else:
+                raise TSPError(RUNTIME_ERROR, f"attempt to set field '{name}'")
+
+    return run
+
+
+# --- instrument object model ---
+
+
+class _Node:
+    """TSP object: readable attributes, some of them settable."""
+
+    #: Attribute names that commands may assign.
+    _settable: tuple[str, ...] = ()
+
+    def settable(self, name: str) -> bool:
+        return name in self._settable
+
+    def set(self, name: str, value: Any, env: Keithley26xxMock) -> None:
+        setattr(self, name, value)
+
+
+class _Namespace(_Node):
+    def __init__(self, settable: tuple[str, ...] = (), **attributes: Any) -> None:
+        self._settable = settable
+        for name, value in attributes.items():
+            setattr(self, name, value)
+
+
+class _BufferField:
+    """``nvbuffer1.readings`` and friends, as passed to ``printbuffer``."""
+
+    def __init__(self, buffer: _Buffer, name: str) -> None:
+        self.buffer = buffer
+        self.name = name
+
+    def values(self) -> list[float]:
+        self.buffer.channel.advance()
+        return getattr(self.buffer, "_" + self.name)
+
+
+class _Buffer(_Node):
+    """``smuX.nvbuffer1`` reading buffer."""
+
+    _settable = ("appendmode", "collectsourcevalues", "collecttimestamps")
+
+    def __init__(self, channel: _Channel) -> None:
+        self.channel = channel
+        self.appendmode = 0.0
+        self.collectsourcevalues = 0.0
+        self.collecttimestamps = 0.0
+        self.readings = _BufferField(self, "readings")
+        self.sourcevalues = _BufferField(self, "sourcevalues")
+        self.timestamps = _BufferField(self, "timestamps")
+        self._readings: list[float] = []
+        self._sourcevalues: list[float] = []
+        self._timestamps: list[float] = []
+        self._basetimestamp = 0.0
+
+    def clear(self) -> None:
+        self._readings, self._sourcevalues, self._timestamps = [], [], []
+
+    def append(self, readings, sources, timestamps, base: float) -> None:
+        """Store readings; ``base`` is the absolute time of timestamp 0."""
+        if not self.appendmode:
+            self.clear()
+        if not self._readings:
+            self._basetimestamp = base
+        self._readings.extend(readings)
+        self._sourcevalues.extend(sources)
+        self._timestamps.extend(timestamps)
+
+    @property
+    def n(self) -> float:
+        self.channel.advance()
+        return float(len(self._readings))
+
+    @property
+    def basetimestamp(self) -> float:
+        self.channel.advance()
+        return self._basetimestamp
+
+
+class _Run:
+    """A buffered operation filling ``nvbuffer1`` as clock time passes."""
+
+    def __init__(
+        self, start: float, period: float, points: int, quantity: str, levels=None
+    ) -> None:
+        self.start = start
+        self.period = period
+        self.points = points
+        self.quantity = quantity
+        #: Source levels per step for sweeps; None keeps the source level.
+        self.levels = None if levels is None else np.asarray(levels, dtype=float)
+        self.done = 0
+
+
+class _Channel(_Node):
+    """One SMU channel (``smua`` / ``smub``) and its diode load."""
+
+    OUTPUT_DCAMPS, OUTPUT_DCVOLTS = 0.0, 1.0
+    OUTPUT_OFF, OUTPUT_ON = 0.0, 1.0
+    AUTORANGE_OFF, AUTORANGE_ON = 0.0, 1.0
+    SENSE_LOCAL, SENSE_REMOTE = 0.0, 1.0
+    DISABLE, ENABLE = 0.0, 1.0
+    SOURCE_HOLD, SOURCE_IDLE = 0.0, 1.0
+    DELAY_OFF, DELAY_AUTO = 0.0, -1.0
+
+    _settable = ("sense",)
+
+    def __init__(self, instrument: Keithley26xxMock, name: str, photocurrent: float) -> None:
+        self.instrument = instrument
+        self.name = name
+        self.photocurrent = photocurrent
+        self.nvbuffer1 = _Buffer(self)
+        self._run: _Run | None = None
+        self.reset()
+
+    def reset(self) -> None:
+        self.sense = self.SENSE_LOCAL
+        self.source = _Namespace(
+            (
+                "func", "levelv", "leveli", "limitv", "limiti", "rangev", "rangei",
+                "autorangev", "autorangei", "output", "delay",
+            ),
+            func=self.OUTPUT_DCVOLTS, levelv=0.0, leveli=0.0, limitv=20.0,
+            limiti=0.1, rangev=20.0, rangei=0.1, autorangev=1.0, autorangei=1.0,
+            output=self.OUTPUT_OFF, delay=self.DELAY_OFF,
+        )
+        self.measure = _Measure(self)
+        self.trigger = _Trigger(self)
+        self._run = None
+
+    # --- the load ---
+
+    def _level(self) -> float:
+        src = self.source
+        return src.levelv if src.func == self.OUTPUT_DCVOLTS else src.leveli
+
+    def _evaluate(self, quantity: str, levels) -> tuple[np.ndarray, np.ndarray]:
+        """Current and voltage at the given source levels."""
+        src = self.source
+        levels = np.asarray(levels, dtype=float)
+        if src.output != self.OUTPUT_ON:
+            zeros = np.zeros_like(levels)
+            return zeros, zeros
+        load = self.instrument.load
+        irradiance = self.instrument.irradiance
+        if src.func == self.OUTPUT_DCVOLTS:
+            i = load.current(levels, self.photocurrent, irradiance)
+            return np.clip(i, -src.limiti, src.limiti), levels
+        v = load.voltage(levels, self.photocurrent, irradiance)
+        return levels, np.clip(v, -src.limitv, src.limitv)
+
+    def read(self, quantity: str) -> tuple[float, ...]:
+        """One reading of ``'i'``, ``'v'`` or ``'iv'`` (blocking)."""
+        self.advance()
+        self.instrument.integrate(self)
+        i, v = self._evaluate(quantity, [self._level()])
+        values = {"i": (float(i[0]),), "v": (float(v[0]),), "iv": (float(i[0]), float(v[0]))}
+        return values[quantity]
+
+    # --- buffered operations ---
+
+    def start_run(self, period: float, points: int, quantity: str, levels=None) -> None:
+        self.advance()
+        clock = self.instrument.clock
+        self._run = _Run(clock.time(), period, int(points), quantity, levels)
+
+    def advance(self) -> None:
+        """Store the readings a running operation has taken by now."""
+        run = self._run
+        if run is None:
+            return
+        elapsed = self.instrument.clock.time() - run.start
+        due = min(run.points, int(elapsed / run.period) if run.period > 0 else run.points)
+        if due > run.done:
+            k = np.arange(run.done, due)
+            if run.levels is not None:
+                levels = run.levels[k]
+                self.source.levelv = float(levels[-1])  # the source follows the sweep
+            else:
+                levels = np.full(len(k), self._level())
+            i, v = self._evaluate(run.quantity, levels)
+            readings = i if run.quantity == "i" else v
+            # the first reading completes one period after the start
+            self.nvbuffer1.append(
+                readings.tolist(),
+                levels.tolist(),
+                (k * run.period).tolist(),
+                run.start + run.period,
+            )
+            run.done = due
+        if run.done >= run.points:
+            self._run = None
+
+    def abort(self) -> None:
+        self.advance()
+        self._run = None
+
+
+class _Measure(_Node):
+    _settable = (
+        "nplc", "count", "interval", "autorangev", "autorangei", "rangev", "rangei",
+    )
+
+    def __init__(self, channel: _Channel) -> None:
+        self._channel = channel
+        self.nplc = 1.0
+        self.count = 1.0
+        self.interval = 0.0
+        self.autorangev = self.autorangei = 1.0
+        self.rangev, self.rangei = 20.0, 0.1
+
+    def set(self, name: str, value: Any, env: Keithley26xxMock) -> None:
+        if name == "nplc" and not 0.001 <= float(value) <= 25:
+            env.queue_error(PARAMETER_ERROR, "Parameter out of range: nplc")
+            return
+        setattr(self, name, value)
+
+    def i(self, buffer: _Buffer | None = None) -> tuple[float, ...]:
+        return self._channel.read("i")
+
+    def v(self, buffer: _Buffer | None = None) -> tuple[float, ...]:
+        return self._channel.read("v")
+
+    def iv(self, buffer: _Buffer | None = None) -> tuple[float, ...]:
+        return self._channel.read("iv")
+
+    def _overlapped(self, quantity: str) -> None:
+        channel = self._channel
+        period = max(float(self.interval), channel.instrument.integration_time(channel))
+        channel.start_run(period, int(self.count), quantity)
+
+    def overlappedi(self, buffer: _Buffer) -> None:
+        self._overlapped("i")
+
+    def overlappedv(self, buffer: _Buffer) -> None:
+        self._overlapped("v")
+
+
+class _Trigger(_Node):
+    _settable = ("count",)
+
+    def __init__(self, channel: _Channel) -> None:
+        self._channel = channel
+        self.count = 1.0
+        self._levels: list[float] | None = None
+        self._quantity = "i"
+        self.arm = _Namespace(("count",), count=1.0)
+        self.endpulse = _Namespace(("action",), action=channel.SOURCE_IDLE)
+        self.endsweep = _Namespace(("action",), action=channel.SOURCE_IDLE)
+        self.source = _Namespace(("action",), action=channel.DISABLE, linearv=self._linearv)
+        self.measure = _Namespace(
+            ("action",),
+            action=channel.DISABLE,
+            i=lambda buffer: self._measure_into("i"),
+            v=lambda buffer: self._measure_into("v"),
+        )
+
+    def _linearv(self, start: float, stop: float, points: float) -> None:
+        self._levels = np.linspace(start, stop, int(points)).tolist()
+
+    def _measure_into(self, quantity: str) -> None:
+        self._quantity = quantity
+
+    def initiate(self) -> None:
+        channel = self._channel
+        if self._levels is None:
+            raise TSPError(RUNTIME_ERROR, "trigger model has no source sweep")
+        channel.source.func = channel.OUTPUT_DCVOLTS
+        period = channel.source.delay + channel.instrument.integration_time(channel)
+        points = int(self.count) * int(self.arm.count)
+        levels = (self._levels * int(self.arm.count))[:points]
+        channel.start_run(period, points, self._quantity, levels)
+
+
+class _ErrorQueue(_Node):
+    def __init__(self, instrument: Keithley26xxMock) -> None:
+        self._instrument = instrument
+
+    @property
+    def count(self) -> float:
+        return float(len(self._instrument.errors))
+
+    def clear(self) -> None:
+        self._instrument.errors.clear()
+
+    def next(self) -> tuple[float, str, float, float]:
+        errors = self._instrument.errors
+        code, message = errors.pop(0) if errors else _NO_ERROR
+        return (float(code), message, 0.0, 0.0)
+
+
+# --- the instrument ---
+
+
+class Keithley26xxMock:
+    """Simulated 2600-series SMU for :class:`~.visa.MockVisaResource`.
+
+    ``load`` is the cell model of both channels (a
+    :class:`SingleDiodeModel` by default), ``photocurrent`` /
+    ``reference_photocurrent`` their one-sun photocurrents and
+    ``irradiance`` the light level in suns. A reading takes ``nplc`` /
+    ``line_frequency`` s on ``clock``.
+    """
+
+    def __init__(
+        self,
+        model: str = "2602B",
+        *,
+        load: SingleDiodeModel | LegacyDiodeModel | None = None,
+        photocurrent: float = 0.004,
+        reference_photocurrent: float = 0.004,
+        line_frequency: float = 50.0,
+        clock: Clock = SYSTEM_CLOCK,
+    ) -> None:
+        self.model = model
+        self.load = load if load is not None else SingleDiodeModel()
+        self.irradiance = 1.0
+        self.line_frequency = line_frequency
+        self.clock = clock
+        #: Queued ``(code, message)`` errors.
+        self.errors: list[tuple[int, str]] = []
+        #: Statements executed, and messages run.
+        self.statement_count = 0
+        self.message_count = 0
+        #: Loaded scripts by name (source text).
+        self.scripts: dict[str, str] = {}
+
+        self.smua = _Channel(self, "a", photocurrent)
+        self.smub = _Channel(self, "b", reference_photocurrent)
+        self.globals: dict[str, Any] = {}
+        self._builtins: dict[str, Any] = {
+            "smua": self.smua,
+            "smub": self.smub,
+            "errorqueue": _ErrorQueue(self),
+            "localnode": _Namespace(model=model, linefreq=line_frequency),
+            "display": _Namespace(
+                smua=_Namespace(measure=_Namespace(("func",), func=1.0)),
+                smub=_Namespace(measure=_Namespace(("func",), func=1.0)),
+                MEASURE_DCAMPS=0.0, MEASURE_DCVOLTS=1.0,
+                MEASURE_OHMS=2.0, MEASURE_WATTS=3.0,
+            ),
+            "format": _Namespace(
+                ("data", "byteorder", "asciiprecision"),
+                data=1.0, byteorder=0.0, asciiprecision=6.0,
+                ASCII=1.0, REAL32=4.0, REAL64=5.0, SREAL=4.0, DREAL=5.0,
+                NORMAL=1.0, SWAPPED=0.0, BIGENDIAN=1.0, LITTLEENDIAN=0.0,
+            ),
+            "timer": _Namespace(reset=self._timer_reset, measure=_Namespace(t=self._timer_t)),
+            "print": self._print,
+            "printbuffer": self._printbuffer,
+            "SweepVLinMeasureI": self._sweep_v_lin_measure_i,
+            "delay": self.clock.sleep,
+        }
+        self._output: list[bytes] = []
+        self._script_name: str | None = None
+        self._script_lines: list[str] = []
+        self._timer_start = self.clock.time()
+        self._mpp: dict[str, Any] = {}
+        self._script_running = False
+
+    # --- SimulatedInstrument interface ---
+
+    def write(self, message: str) -> None:
+        """Run one message: a Lua chunk or lines of a script being loaded."""
+        # the instrument runs one command at a time
+        self._advance_script(to_end=True)
+        self.message_count += 1
+        statements: list[Callable] = []
+        try:
+            for line in message.split("\n"):
+                statement = self._parse_line(line)
+                if statement is not None:
+                    statements.append(statement)
+        except TSPError as err:
+            # a chunk that does not compile does not run at all
+            self.queue_error(err.code, str(err))
+            return
+        try:
+            for statement in statements:
+                self.statement_count += 1
+                statement(self)
+        except TSPError as err:
+            self.queue_error(err.code, str(err))
+
+    def read(self) -> bytes | None:
+        self._advance_script(until_output=True)
+        return self._output.pop(0) if self._output else None
+
+    def clear(self) -> None:
+        """Device clear: abort a running script and drop pending output."""
+        self._advance_script()
+        self._script_running = False
+        self._output.clear()
+
+    # --- interpreter plumbing ---
+
+    def lookup(self, name: str) -> Any:
+        if name in self.globals:
+            return self.globals[name]
+        return self._builtins.get(name)
+
+    def queue_error(self, code: int, message: str) -> None:
+        self.errors.append((code, message))
+
+    def _parse_line(self, line: str) -> Callable | None:
+        stripped = line.strip()
+        if self._script_name is not None:
+            if stripped == "endscript":
+                self._define_script(self._script_name, "\n".join(self._script_lines))
+                self._script_name = None
+            else:
+                self._script_lines.append(line)
+            return None
+        if not stripped or stripped.startswith("--"):
+            return None
+        if stripped.startswith("loadscript "):
+            self._script_name = stripped.split()[1]
+            self._script_lines = []
+            return None
+        parser = _Parser(_tokenize(stripped))
+        statement = parser.statement()
+        if not parser.at_end():
+            raise TSPError(SYNTAX_ERROR, f"unexpected symbol near '{parser.peek()}'")
+        return statement
+
+    def _define_script(self, name: str, source: str) -> None:
+        self.scripts[name] = source
+
+        def run_script() -> None:
+            for function in re.findall(r"^function\s+(\w+)\s*\(", source, re.MULTILINE):
+                native = getattr(self, "_native_" + function, None)
+                self.globals[function] = native or self._missing_function(function)
+
+        self.globals[name] = run_script
+
+    @staticmethod
+    def _missing_function(name: str) -> Callable:
+        def missing(*args: Any) -> None:
+            raise TSPError(RUNTIME_ERROR, f"script function '{name}' is not simulated")
+
+        return missing
+
+    # --- timing ---
+
+    def integration_time(self, channel: _Channel) -> float:
+        return float(channel.measure.nplc) / self.line_frequency
+
+    def integrate(self, channel: _Channel) -> None:
+        self.clock.sleep(self.integration_time(channel))
+
+    def _timer_reset(self) -> None:
+        self._timer_start = self.clock.time()
+
+    def _timer_t(self) -> float:
+        return self.clock.time() - self._timer_start
+
+    # --- output ---
+
+    def _format_number(self, value: float) -> str:
+        precision = int(self._builtins["format"].asciiprecision)
+        return f"{value:.{precision - 1}e}"
+
+    def _format(self, value: Any) -> str:
+        if value is None:
+            return "nil"
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, (int, float)):
+            return self._format_number(float(value))
+        if isinstance(value, str):
+            return value
+        return f"table: {id(value):#x}"
+
+    def _print(self, *values: Any) -> None:
+        self._output.append(("\t".join(self._format(v) for v in values) + "\n").encode())
+
+    def _printbuffer(self, first: float, last: float, *fields: Any) -> None:
+        columns = []
+        for field in fields:
+            if isinstance(field, _BufferField):
+                columns.append(field.values())
+            elif isinstance(field, dict):
+                columns.append([field.get(float(k)) for k in range(1, int(last) + 1)])
+            else:
+                raise TSPError(RUNTIME_ERROR, "bad argument to printbuffer")
+        first_index, last_index = int(first), int(last)
+        if first_index < 1 or any(last_index > len(column) for column in columns):
+            raise TSPError(RUNTIME_ERROR, "index out of range in printbuffer")
+        values = [
+            float(column[k - 1])
+            for k in range(first_index, last_index + 1)
+            for column in columns
+        ]
+        fmt = self._builtins["format"]
+        if fmt.data == fmt.ASCII:
+            text = ", ".join(self._format_number(v) for v in values)
+            self._output.append((text + "\n").encode())
+            return
+        dtype = "<" if fmt.byteorder == fmt.LITTLEENDIAN else ">"
+        dtype += "f8" if fmt.data == fmt.REAL64 else "f4"
+        data = np.asarray(values, dtype=dtype).tobytes()
+        # an indefinite-length block, like the instrument sends
+        self._output.append(b"#0" + data + b"\n")
+
+    # --- KISweep ---
+
+    def _sweep_v_lin_measure_i(
+        self, channel: _Channel, start: float, stop: float, settle: float, points: float
+    ) -> None:
+        levels = np.linspace(start, stop, int(points))
+        channel.source.func = channel.OUTPUT_DCVOLTS
+        channel.source.output = channel.OUTPUT_ON
+        # blocking: the sweep completes before the next command runs
+        self.clock.sleep(len(levels) * (settle + self.integration_time(channel)))
+        i, _ = channel._evaluate("i", levels)
+        channel.nvbuffer1.append(
+            i.tolist(), levels.tolist(), [0.0] * len(levels), self.clock.time()
+        )
+        channel.source.levelv = float(levels[-1])
+
+    # --- native IVLab script functions (_keithley26xx_tsp) ---
+
+    def _native_ivl_setv_meas_i(self, channel: _Channel, v: float, settle: float) -> None:
+        channel.source.levelv = v
+        if settle > 0:
+            self.clock.sleep(settle)
+        self._print(*channel.read("i"))
+
+    def _native_ivl_setv_both_i(self, v: float, settle: float) -> None:
+        self.smua.source.levelv = v
+        if settle > 0:
+            self.clock.sleep(settle)
+        self._print(*self.smua.read("i"), *self.smub.read("i"))
+
+    def _native_ivl_meas_i(self, channel: _Channel) -> None:
+        self._print(*channel.read("i"))
+
+    def _native_ivl_meas_iv(self, channel: _Channel) -> None:
+        self._print(*channel.read("iv"))
+
+    def _native_ivl_both_i(self) -> None:
+        self._print(*self.smua.read("i"), *self.smub.read("i"))
+
+    def _native_ivl_both_iv(self) -> None:
+        self._print(*self.smua.read("iv"), *self.smub.read("iv"))
+
+    def _native_ivl_mpp_start(
+        self, v, step, step_max, step_min, v_limit, period, decimation, duration, reference
+    ) -> None:
+        m = {
+            "v_set": v, "step": step, "step_max": step_max, "step_min": step_min,
+            "v_limit": abs(v_limit), "period": period, "decimation": decimation,
+            "duration": duration, "reference": reference == 1, "direction": 1,
+            "history": [0] * 8, "nsteps": 0, "last_p": 0.0, "next_t": 0.0,
+            "busy_t": 0.0, "acc": [0, 0.0, 0.0, 0.0, 0.0],
+        }
+        self._mpp = m
+        self.smua.source.levelv = v
+        self._timer_reset()
+
+    def _native_ivl_mpp_record(self, m: dict) -> None:
+        n, *sums = m["acc"]
+        self._print(*(total / n for total in sums))
+        m["acc"] = [0, 0.0, 0.0, 0.0, 0.0]
+
+    def _mpp_sample_time(self, m: dict) -> float:
+        # timer value at which the next sample's readings are complete
+        duration = self.integration_time(self.smua)
+        if m["reference"]:
+            duration += self.integration_time(self.smub)
+        return max(m["next_t"], m["busy_t"]) + duration
+
+    def _native_ivl_mpp_sample(self, m: dict) -> None:
+        # taken at its time on the instrument, whenever the host looks
+        t = max(m["next_t"], m["busy_t"])
+        m["busy_t"] = self._mpp_sample_time(m)
+        i, v = (float(x[0]) for x in self.smua._evaluate("iv", [self.smua._level()]))
+        iref = 0.0
+        if m["reference"]:
+            iref = float(self.smub._evaluate("i", [self.smub._level()])[0][0])
+        m["next_t"] += m["period"]
+
+        # the power went down: we're going the wrong way
+        w = -i * v
+        if w < m["last_p"]:
+            m["direction"] = -m["direction"]
+        m["nsteps"] += 1
+        m["history"][(m["nsteps"] - 1) % 8] = m["direction"]
+        if m["nsteps"] >= 8:
+            trend = sum(m["history"])
+            if abs(trend) >= 3:
+                m["step"] = min(m["step"] * 2, m["step_max"])
+                m["nsteps"] = 0
+            elif trend == 0 and m["step"] > m["step_min"]:
+                m["step"] = max(m["step"] / 2, m["step_min"])
+                m["nsteps"] = 0
+        m["v_set"] = min(max(m["v_set"] + m["step"] * m["direction"], -m["v_limit"]), m["v_limit"])
+        self.smua.source.levelv = m["v_set"]
+        m["last_p"] = w
+
+        acc = m["acc"]
+        acc[0] += 1
+        acc[1] += t
+        acc[2] += v
+        acc[3] += i
+        acc[4] += iref
+        if acc[0] >= m["decimation"]:
+            self._native_ivl_mpp_record(m)
+
+    def _native_ivl_mpp_track(self) -> None:
+        # runs on instrument time as the clock passes (see _advance_script)
+        self._script_running = True
+
+    # --- running script ---
+
+    def _advance_script(self, *, until_output: bool = False, to_end: bool = False) -> None:
+        """Run the MPP tracker up to now on the instrument clock.
+
+        With ``until_output``, wait for the next printed line if none is
+        pending (a blocking read); with ``to_end``, until the tracker ends
+        (a command queued behind the running script).
+        """
+        m = self._mpp
+        while self._script_running:
+            if m["next_t"] >= m["duration"]:
+                if m["acc"][0] > 0:
+                    self._native_ivl_mpp_record(m)
+                self._print("end")
+                self._script_running = False
+                return
+            wait = self._mpp_sample_time(m) - self._timer_t()
+            if wait > 0:
+                if not (to_end or (until_output and not self._output)):
+                    return
+                self.clock.sleep(wait)
+            self._native_ivl_mpp_sample(m)
+
+
@@ -0,0 +1,170 @@
+"""Replay of a recorded VISA session (see :mod:`iv_lab.hardware.visa_trace`).
+
+:class:`ReplayResourceManager` opens, for each address, the next recorded
+session of that address as a :class:`ReplayInstrument` behind a
+:class:`~iv_lab.hardware.mock.visa.MockVisaResource`. The instrument
+checks every message against the trace, answers reads with the recorded
+answers, and spends the recorded duration of each call — divided by
+``speed`` — on the clock. With a
+:class:`~iv_lab.hardware.clock.VirtualClock` a replay is instant and
+fully deterministic; the resource log then holds the driver's calls in
+replayed instrument time, for profiling driver hot paths against real
+traces.
+
+A recorded failed read replays as a timeout. In strict mode (the
+default) a message that differs from the trace raises
+:class:`ReplayMismatchError`; otherwise the replay skips ahead to the
+next recording of the same message, and a message never recorded costs
+no time and gets no answer.
+"""
+
+from __future__ import annotations
+
+import math
+from pathlib import Path
+
+from iv_lab.hardware.clock import SYSTEM_CLOCK, Clock
+from iv_lab.hardware.visa_trace import TraceEntry, VisaTrace, read_trace
+
+from .visa import MockResourceManager, MockVisaIOError
+
+
+class ReplayMismatchError(Exception):
+    """The driver sent something other than the recorded session."""
+
+
+class ReplayInstrument:
+    """Simulated instrument answering from one recorded session."""
+
+    def __init__(
+        self,
+        entries: list[TraceEntry],
+        *,
+        address: str = "",
+        speed: float = 1.0,
+        clock: Clock = SYSTEM_CLOCK,
+        strict: bool = True,
+    ) -> None:
+        if not speed > 0:
+            raise ValueError("speed must be positive")
+        self.entries = entries
+        self.address = address
+        self.speed = speed
+        self.clock = clock
+        self.strict = strict
+        #: Index of the next entry to replay.
+        self.position = 0
+
+    @property
+    def remaining(self) -> int:
+        """Number of recorded calls not replayed yet."""
+        return len(self.entries) - self.position
+
+    def _take(self) -> TraceEntry:
+        entry = self.entries[self.position]
+        self.position += 1
+        if not math.isinf(self.speed):
+            self.clock.sleep(entry.duration / self.speed)
+        return entry
+
+    def _peek(self) -> TraceEntry | None:
+        return self.entries[self.position] if self.position < len(self.entries) else None
+
+    def _mismatch(self, expected: TraceEntry | None, got: str) -> ReplayMismatchError:
+        recorded = "the end of the session" if expected is None else f"{expected.op} {expected.data!r}"
+        return ReplayMismatchError(
+            f"{self.address}: call {self.position} is {got}, recorded {recorded}"
+        )
+
+    @staticmethod
+    def _message(entry: TraceEntry) -> str | None:
+        if entry.op == "w":
+            return entry.data
+        if entry.op == "w!":
+            return entry.data[0]
+        return None
+
+    def write(self, message: str) -> None:
+        entry = self._peek()
+        if entry is None or self._message(entry) != message:
+            if self.strict:
+                raise self._mismatch(entry, f"write {message!r}")
+            for index in range(self.position, len(self.entries)):
+                if self._message(self.entries[index]) == message:
+                    self.position = index
+                    break
+            else:
+                return
+        entry = self._take()
+        if entry.op == "w!":
+            raise MockVisaIOError(entry.data[1])
+
+    def read(self) -> bytes | None:
+        entry = self._peek()
+        if entry is None or entry.op not in ("r", "rb", "r!"):
+            if self.strict:
+                raise self._mismatch(entry, "a read")
+            return None
+        if entry.op == "r!":
+            # the resource runs into its timeout
+            self.position += 1
+            return None
+        return self._take().data.encode("latin-1")
+
+    def clear(self) -> None:
+        entry = self._peek()
+        if entry is not None and entry.op in ("clear", "clear!"):
+            self._take()
+        elif self.strict:
+            raise self._mismatch(entry, "a device clear")
+
+
+class ReplayResourceManager(MockResourceManager):
+    """``pyvisa.ResourceManager`` replaying a recorded trace.
+
+    Use with :func:`~iv_lab.hardware.mock.visa.use_mock_visa` like any
+    :class:`MockResourceManager`.
+    """
+
+    def __init__(
+        self,
+        trace: VisaTrace | str | Path,
+        *,
+        speed: float = 1.0,
+        clock: Clock = SYSTEM_CLOCK,
+        strict: bool = True,
+    ) -> None:
+        if not isinstance(trace, VisaTrace):
+            trace = read_trace(trace)
+        self.trace = trace
+        self.speed = speed
+        self.strict = strict
+        #: Recorded sessions not opened yet, in order.
+        self.unopened: dict[int, str] = trace.addresses()
+        #: Instruments of the opened sessions, in order.
+        self.instruments_opened: list[ReplayInstrument] = []
+        super().__init__(self._open_session, clock=clock)
+
+    def _open_session(self, address: str) -> ReplayInstrument:
+        session = next((s for s, a in self.unopened.items() if a == address), None)
+        if session is None:
+            raise MockVisaIOError(f"VI_ERROR_RSRC_NFOUND: no recorded session for {address}")
+        del self.unopened[session]
+        instrument = ReplayInstrument(
+            self.trace.session(session),
+            address=address,
+            speed=self.speed,
+            clock=self.clock,
+            strict=self.strict,
+        )
+        self.instruments_opened.append(instrument)
+        return instrument
+
+    def list_resources(self, query: str = "?*::INSTR") -> tuple[str, ...]:
+        return tuple(dict.fromkeys(self.trace.addresses().values()))
+
+    @property
+    def remaining(self) -> int:
+        """Recorded calls not replayed yet, over all sessions."""
+        opened = sum(instrument.remaining for instrument in self.instruments_opened)
+        return opened + sum(len(self.trace.session(s)) for s in self.unopened)
@@ -0,0 +1,363 @@
+"""In-process stand-in for a pyvisa message-based resource.
+
+A :class:`MockVisaResource` offers the part of the pyvisa resource API the
+instrument libraries use (``write``, ``read``, ``query``, ``read_raw``,
+``read_binary_values``, ``clear``, ``close``, ``timeout``) on top of a
+simulated instrument. The instrument only has to implement
+
+- ``write(message: str) -> None`` — run one message,
+- ``read() -> bytes | None`` — the next pending answer, or None,
+
+so the wire traffic, rather than the library calls, is what gets
+simulated: every message and answer is counted and logged with its
+time, and costs bus time on the resource clock — a fixed latency plus a
+per-byte transfer time (:class:`LatencyProfile`).
+
+The instrument runs a message inside ``write``, advancing the clock by
+the time it is busy. A read waits for that busy time, so an answer that
+takes longer than the resource ``timeout`` fails with ``VI_ERROR_TMO``
+as it would on a real bus.
+
+:func:`use_mock_visa` makes ``pyvisa.ResourceManager()`` return a
+:class:`MockResourceManager` while it is active, so the real drivers and
+the bundled libraries connect to simulated instruments unchanged. When
+``pyvisa`` is not installed, a minimal stand-in module is provided for
+the duration of the block.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import sys
+import types
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import Any, NamedTuple, Protocol
+
+import numpy as np
+
+from iv_lab.hardware.clock import SYSTEM_CLOCK, Clock
+
+
+class MockVisaIOError(OSError):
+    """VISA I/O error of a mock resource (``pyvisa.VisaIOError`` stand-in)."""
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    """Bus timing of a :class:`MockVisaResource`."""
+
+    #: Fixed cost in s of each message and each answer (turnaround,
+    #: interface and driver overhead).
+    latency: float = 0.0
+    #: Transfer time in s per byte.
+    byte_time: float = 0.0
+
+    @classmethod
+    def serial(cls, baud_rate: int, latency: float = 0.0) -> LatencyProfile:
+        """RS-232 at ``baud_rate``: 10 bits per byte (8N1)."""
+        return cls(latency=latency, byte_time=10.0 / baud_rate)
+
+
+class TranscriptEntry(NamedTuple):
+    """One message or answer on a :class:`MockVisaResource`."""
+
+    kind: str  # "write" or "read"
+    text: str
+    #: Clock time in s when the transfer started, and how long it took
+    #: (for a write, including the instrument executing the message).
+    start: float
+    duration: float
+
+
+class ResourceInfo(NamedTuple):
+    """``pyvisa.highlevel.ResourceInfo`` of a mock resource address."""
+
+    interface_type: Any
+    interface_board_number: int
+    resource_class: str | None
+    resource_name: str
+    alias: str | None
+
+
+class SimulatedInstrument(Protocol):
+    """What a :class:`MockVisaResource` needs from an instrument."""
+
+    def write(self, message: str) -> None: ...
+
+    def read(self) -> bytes | None: ...
+
+
+class MockVisaResource:
+    """pyvisa-like message-based resource talking to a simulated instrument."""
+
+    def __init__(
+        self,
+        instrument: SimulatedInstrument,
+        *,
+        latency: float | LatencyProfile = 0.0,
+        clock: Clock = SYSTEM_CLOCK,
+        read_termination: str = "\n",
+    ) -> None:
+        self.instrument = instrument
+        if not isinstance(latency, LatencyProfile):
+            latency = LatencyProfile(latency=latency)
+        #: Bus time of each message and answer.
+        self.profile = latency
+        self.clock = clock
+        self.read_termination = read_termination
+        #: VISA timeout in ms (set by the libraries).
+        self.timeout: float = 2000
+        #: Wait in s between the message and the read of a query.
+        self.query_delay: float = 0.0
+        #: Messages written, answers read, and their sizes in bytes.
+        self.write_count = 0
+        self.read_count = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+        #: Every message and answer, in order.
+        self.log: list[TranscriptEntry] = []
+        self.closed = False
+        # time the instrument spent on the last message, in s, and an
+        # answer that came after its read timed out
+        self._busy = 0.0
+        self._late: bytes | None = None
+
+    def reset_counters(self) -> None:
+        """Zero the traffic counters and clear the log."""
+        self.write_count = self.read_count = 0
+        self.bytes_written = self.bytes_read = 0
+        self.log.clear()
+
+    def _transfer(self, size: int) -> None:
+        if self.closed:
+            raise MockVisaIOError("VI_ERROR_CONN_LOST: the resource is closed")
+        bus_time = self.profile.latency + self.profile.byte_time * size
+        if bus_time > 0:
+            self.clock.sleep(bus_time)
+
+    def _record(self, kind: str, text: str, start: float) -> None:
+        self.log.append(TranscriptEntry(kind, text, start, self.clock.time() - start))
+
+    # --- pyvisa resource API ---
+
+    def write(self, message: str) -> int:
+        size = len(message) + 1  # with the termination
+        start = self.clock.time()
+        self._transfer(size)
+        self.write_count += 1
+        self.bytes_written += size
+        busy_start = self.clock.time()
+        self.instrument.write(message)
+        self._busy = self.clock.time() - busy_start
+        self._record("write", message, start)
+        return size
+
+    def _read_answer(self) -> tuple[bytes, float]:
+        start = self.clock.time()
+        if self.closed:
+            raise MockVisaIOError("VI_ERROR_CONN_LOST: the resource is closed")
+        answer, self._late = self._late, None
+        if answer is None:
+            answer = self.instrument.read()
+        # the read waited for the instrument since the last message
+        waited = self._busy + self.clock.time() - start
+        self._busy = 0.0
+        if answer is None or waited > self.timeout / 1000:
+            # nothing to send (in time): the read runs into the VISA timeout
+            self.clock.sleep(max(0.0, self.timeout / 1000 - waited))
+            if answer is not None:
+                # the late answer stays queued for the next read
+                self._late = answer
+            raise MockVisaIOError("VI_ERROR_TMO: Timeout expired before operation completed")
+        self._transfer(len(answer))
+        self.read_count += 1
+        self.bytes_read += len(answer)
+        return answer, start
+
+    def read_raw(self) -> bytes:
+        answer, start = self._read_answer()
+        self._record("read", f"<{len(answer)} bytes>", start)
+        return answer
+
+    def read_bytes(self, count: int, **kwargs: Any) -> bytes:
+        return self.read_raw()[:count]
+
+    def read(self) -> str:
+        answer, start = self._read_answer()
+        text = answer.decode("latin-1")
+        if self.read_termination and text.endswith(self.read_termination):
+            text = text[: -len(self.read_termination)]
+        self._record("read", text, start)
+        return text
+
+    def query(self, message: str, delay: float | None = None) -> str:
+        self.write(message)
+        delay = self.query_delay if delay is None else delay
+        if delay > 0:
+            self.clock.sleep(delay)
+        return self.read()
+
+    def read_binary_values(
+        self,
+        datatype: str = "f",
+        is_big_endian: bool = False,
+        container: Callable[[Any], Any] = list,
+        header_fmt: str = "ieee",
+        expect_termination: bool = True,
+        data_points: int = 0,
+        **kwargs: Any,
+    ) -> Any:
+        raw, start = self._read_answer()
+        if header_fmt == "ieee":
+            if not raw.startswith(b"#"):
+                raise MockVisaIOError(f"no IEEE block header in {raw[:10]!r}")
+            digits = int(raw[1:2])
+            length = int(raw[2 : 2 + digits]) if digits else None
+            raw = raw[2 + digits :]
+            if length is not None:
+                raw = raw[:length]
+        dtype = np.dtype(datatype).newbyteorder(">" if is_big_endian else "<")
+        size = data_points * dtype.itemsize if data_points else len(raw) // dtype.itemsize * dtype.itemsize
+        values = np.frombuffer(raw[:size], dtype=dtype)
+        self._record("read", f"<{len(values)} binary values>", start)
+        return container(values.astype(dtype.newbyteorder("=")))
+
+    def clear(self) -> None:
+        """Device clear: drop pending answers.
+
+        An instrument with a ``clear()`` method handles it itself.
+        """
+        self._late = None
+        clear = getattr(self.instrument, "clear", None)
+        if clear is not None:
+            clear()
+            return
+        while self.instrument.read() is not None:
+            pass
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class MockResourceManager:
+    """``pyvisa.ResourceManager`` opening :class:`MockVisaResource` objects.
+
+    ``instruments`` maps VISA addresses to simulated instruments; a
+    callable is called with the address instead, e.g. to simulate any
+    address with a fresh instrument.
+    """
+
+    def __init__(
+        self,
+        instruments: dict[str, SimulatedInstrument] | Callable[[str], SimulatedInstrument],
+        *,
+        latency: float | LatencyProfile = 0.0,
+        clock: Clock = SYSTEM_CLOCK,
+    ) -> None:
+        self.instruments = instruments
+        self.latency = latency
+        self.clock = clock
+        #: Resources opened so far, in order.
+        self.resources: list[MockVisaResource] = []
+
+    def open_resource(self, resource_name: str, **kwargs: Any) -> MockVisaResource:
+        if callable(self.instruments):
+            instrument = self.instruments(resource_name)
+        else:
+            try:
+                instrument = self.instruments[resource_name]
+            except KeyError:
+                raise MockVisaIOError(
+                    f"VI_ERROR_RSRC_NFOUND: no simulated instrument at {resource_name}"
+                ) from None
+        resource = MockVisaResource(instrument, latency=self.latency, clock=self.clock)
+        for name, value in kwargs.items():
+            setattr(resource, name, value)
+        self.resources.append(resource)
+        return resource
+
+    def resource_info(self, resource_name: str, extended: bool = True) -> ResourceInfo:
+        """Parse ``resource_name`` like pyvisa (e.g. pymeasure's adapter asks).
+
+        ``interface_type`` is a ``pyvisa.constants.InterfaceType`` member
+        when pyvisa is installed, else its lower-case name (``"gpib"``).
+        """
+        prefix = resource_name.partition("::")[0]
+        last = resource_name.rpartition("::")[2]
+        interface = prefix.rstrip("0123456789")
+        board = prefix[len(interface) :]
+        name = interface.lower()
+        try:
+            from pyvisa.constants import InterfaceType
+        except ImportError:
+            interface_type: Any = name
+        else:
+            interface_type = getattr(InterfaceType, name, InterfaceType.unknown)
+        resource_class = last if last.isalpha() else None
+        return ResourceInfo(interface_type, int(board or 0), resource_class, resource_name, None)
+
+    def list_resources(self, query: str = "?*::INSTR") -> tuple[str, ...]:
+        if callable(self.instruments):
+            return ()
+        return tuple(self.instruments)
+
+    def close(self) -> None:
+        for resource in self.resources:
+            resource.close()
+
+
+#: Packages that :func:`use_mock_visa` unloads again when they were first
+#: imported inside its block.
+_HARDWARE_PACKAGES = ("pyvisa", "pymeasure")
+
+
+def _unload_hardware_modules(loaded: set[str]) -> None:
+    """Unload modules imported since ``loaded`` that are or use hardware packages."""
+    hardware = {
+        id(module)
+        for name, module in sys.modules.items()
+        if name.split(".")[0] in _HARDWARE_PACKAGES
+    }
+    for name in set(sys.modules) - loaded:
+        module = sys.modules[name]
+        if module is None:
+            continue
+        if id(module) in hardware or any(id(value) in hardware for value in vars(module).values()):
+            del sys.modules[name]
+
+
+@contextlib.contextmanager
+def use_mock_visa(resource_manager: MockResourceManager) -> Iterator[MockResourceManager]:
+    """Make ``pyvisa.ResourceManager(...)`` return ``resource_manager``.
+
+    Drivers open their resources in ``connect()``, so only the connection
+    has to happen inside the block; the resources keep working after it.
+    Without ``pyvisa`` installed, a stand-in module (``ResourceManager``
+    and ``VisaIOError`` only) is importable for the duration of the block.
+    Either way, ``pyvisa`` and ``pymeasure`` modules first imported inside
+    the block, and the modules that imported them (e.g. the bundled
+    instrument libraries), are unloaded afterwards, so that a later import
+    sees the environment from before the block again.
+    """
+    loaded = set(sys.modules)
+    try:
+        import pyvisa
+    except ImportError:
+        pyvisa = types.ModuleType("pyvisa")
+        pyvisa.VisaIOError = MockVisaIOError
+        sys.modules["pyvisa"] = pyvisa
+
+    class ResourceManager:
+        # a class, since callers may isinstance() check against it
+        def __new__(cls, *args: Any, **kwargs: Any) -> MockResourceManager:
+            return resource_manager
+
+    original = getattr(pyvisa, "ResourceManager", None)
+    pyvisa.ResourceManager = ResourceManager
+    try:
+        yield resource_manager
+    finally:
+        if original is not None:
+            pyvisa.ResourceManager = original
+        _unload_hardware_modules(loaded)
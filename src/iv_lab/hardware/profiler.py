@@ -0,0 +1,552 @@
+"""Per-command latency profiler for the instrument drivers.
+
+Opt-in instrumentation of the hardware layer. :meth:`InstrumentProfiler.attach`
+times every call a device receives through its interface (the public
+``BaseSMU`` / ``BaseLamp`` / ``BaseArduino`` methods, the ``"api"``
+layer) and every raw I/O call underneath it (the ``"io"`` layer: the
+bundled 26xx library's ``write_lua`` / ``query_lua``, and the
+``write`` / ``read`` / ``query`` of the VISA resource, which carry the
+SCPI of the 2400 family and the error-queue checks of the 26xx). For
+each device, layer, method and protocol phase it records the call
+count, a latency histogram (p50/p95/p99) and the bytes sent and
+received. An API row also counts the calls and bytes on the wire (the
+lowest transport, the VISA resource) made inside its calls, so one can
+see e.g. how many VISA round trips a ``set_voltage`` costs. Calls a
+transport makes on itself (a VISA ``query`` is a ``write`` and a
+``read``) are counted once, as the outer call.
+
+Methods are wrapped by giving the instance a subclass of its own class
+with timed methods: a device that is not profiled runs the driver code
+unchanged, with no check on the call path, and :meth:`detach` restores
+the original class. Which raw objects a driver talks through is declared
+by :meth:`~iv_lab.hardware.base.HardwareDevice.io_transports`; they are
+attached after each ``connect()``.
+
+Protocol phases are named with :func:`profile_phase` (the measurement
+workers and the shared protocol helpers do this); phases nest and are
+kept per thread, so calls from a worker thread land in the phase of
+that thread.
+
+Reports are JSON documents (:meth:`InstrumentProfiler.write_report`);
+``python -m iv_lab.hardware.profiler report.json`` prints one as a table.
+
+This module is standard library only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime
+import functools
+import inspect
+import json
+import math
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+
+#: ``format`` field of a profile report.
+PROFILE_FORMAT = "iv_lab.profile"
+#: Report format version.
+PROFILE_VERSION = 1
+
+#: Layer of the device interface methods.
+API_LAYER = "api"
+#: Layer of the raw I/O calls.
+IO_LAYER = "io"
+
+#: Interface methods that are not instrument commands.
+API_EXCLUDED = frozenset(
+    {
+        "batch",
+        "io_transports",
+        "is_connected",
+        "invalidate_state_cache",
+        "state_cache_hit_rate",
+    }
+)
+
+#: Raw I/O methods wrapped on a transport object when it has them.
+IO_METHODS = (
+    "write_lua",
+    "query_lua",
+    "write",
+    "write_raw",
+    "read",
+    "read_raw",
+    "read_bytes",
+    "query",
+    "read_binary_values",
+    "query_binary_values",
+)
+
+#: Phase label of calls made outside any :func:`profile_phase`.
+NO_PHASE = "-"
+
+_phase: ContextVar[tuple[str, ...]] = ContextVar("iv_lab_profile_phase", default=())
+
+
+@contextlib.contextmanager
+def profile_phase(name: str) -> Iterator[None]:
+    """Name the protocol phase of the calls made inside the block.
+
+    Also usable as a method decorator. Phases nest (``"IVCurve / Voc"``);
+    outside of any phase the label is :data:`NO_PHASE`.
+    """
+    token = _phase.set(_phase.get() + (name,))
+    try:
+        yield
+    finally:
+        _phase.reset(token)
+
+
+def current_phase() -> str:
+    """Label of the current protocol phase in this thread."""
+    return " / ".join(_phase.get()) or NO_PHASE
+
+
+def payload_size(value) -> int:
+    """Bytes carried by an I/O argument or answer (0 if not data)."""
+    if isinstance(value, (str, bytes, bytearray, memoryview)):
+        return len(value)
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if isinstance(value, (list, tuple)):
+        return 8 * len(value)
+    return 0
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with constant memory.
+
+    Buckets are ``BUCKETS_PER_DECADE`` per factor of ten from
+    ``MIN_LATENCY`` up, so a percentile is known to about 12 % whatever the
+    number of calls.
+    """
+
+    BUCKETS_PER_DECADE = 20
+    MIN_LATENCY = 1e-7
+
+    def __init__(self) -> None:
+        self.buckets: dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        if seconds > self.MIN_LATENCY:
+            index = int(math.log10(seconds / self.MIN_LATENCY) * self.BUCKETS_PER_DECADE)
+        else:
+            index = 0
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        """Latency below which ``q`` percent of the calls fall."""
+        if not self.count:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                middle = self.MIN_LATENCY * 10 ** ((index + 0.5) / self.BUCKETS_PER_DECADE)
+                return min(max(middle, self.min), self.max)
+        return self.max
+
+
+@dataclass
+class CallStats:
+    """Statistics of one method of one device in one protocol phase."""
+
+    device: str
+    layer: str
+    method: str
+    phase: str
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram, repr=False)
+    errors: int = 0
+    bytes_out: int = 0
+    bytes_in: int = 0
+    #: Wire-level I/O calls made inside the calls (API layer only).
+    io_calls: int = 0
+
+    @property
+    def count(self) -> int:
+        return self.histogram.count
+
+    @property
+    def total(self) -> float:
+        return self.histogram.total
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> dict:
+        histogram = self.histogram
+        return {
+            "device": self.device,
+            "layer": self.layer,
+            "method": self.method,
+            "phase": self.phase,
+            "count": self.count,
+            "errors": self.errors,
+            "total": self.total,
+            "mean": self.mean,
+            "min": histogram.min if self.count else 0.0,
+            "p50": histogram.percentile(50),
+            "p95": histogram.percentile(95),
+            "p99": histogram.percentile(99),
+            "max": histogram.max,
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "io_calls": self.io_calls,
+        }
+
+
+class _OpenCall:
+    """An API call in progress; collects the I/O made inside it."""
+
+    __slots__ = ("io_calls", "bytes_out", "bytes_in")
+
+    def __init__(self) -> None:
+        self.io_calls = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+
+
+class InstrumentProfiler:
+    """Records per-command statistics of the attached devices.
+
+    ``timer`` returns the current time in seconds (``time.perf_counter``
+    by default; :class:`~iv_lab.core.IVLabSystem` reads its virtual clock
+    without advancing it when it runs on one). The statistics are kept
+    until :meth:`reset`, also across :meth:`detach`.
+    """
+
+    def __init__(self, timer: Callable[[], float] = time.perf_counter) -> None:
+        self.timer = timer
+        self._stats: dict[tuple[str, str, str, str], CallStats] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        #: Instrumented objects -> their original class.
+        self._originals: dict[int, tuple[object, type]] = {}
+        self._devices: list = []
+
+    # --- instrumentation ---
+
+    @property
+    def devices(self) -> list:
+        """The attached devices."""
+        return list(self._devices)
+
+    def attach(self, device) -> None:
+        """Profile ``device``: its interface methods now, its I/O
+        transports now (if connected) and after every ``connect()``."""
+        if any(d is device for d in self._devices):
+            return
+        names = [
+            name for name in interface_methods(device) if name not in API_EXCLUDED
+        ]
+        self._instrument(device, device.name, names)
+        self._devices.append(device)
+        if device.is_connected():
+            self._attach_transports(device)
+
+    def detach(self, device=None) -> None:
+        """Stop profiling ``device`` (all devices when None)."""
+        devices = self._devices if device is None else [device]
+        for dev in list(devices):
+            self._restore(
+                lambda obj, dev=dev: obj is dev
+                or getattr(obj, "_profiled_device", None) is dev
+            )
+            self._devices = [d for d in self._devices if d is not dev]
+
+    def _restore(self, predicate: Callable[[object], bool]) -> None:
+        for key, (obj, original) in list(self._originals.items()):
+            if predicate(obj):
+                obj.__class__ = original
+                del self._originals[key]
+
+    def _attach_transports(self, device) -> None:
+        transports = list(device.io_transports())
+        # transports of an earlier connection
+        self._restore(
+            lambda obj: getattr(obj, "_profiled_device", None) is device
+            and not any(obj is t for t in transports)
+        )
+        for index, transport in enumerate(transports):
+            if id(transport) in self._originals:
+                continue
+            names = [name for name in IO_METHODS if callable(getattr(transport, name, None))]
+            if names:
+                wire = index == len(transports) - 1
+                self._instrument(transport, device.name, names, owner=device, wire=wire)
+
+    def _instrument(
+        self, obj, device_name: str, names: list[str], *, owner=None, wire: bool = False
+    ) -> None:
+        cls = type(obj)
+        namespace = {
+            "__slots__": (),
+            "__module__": cls.__module__,
+            "__qualname__": cls.__qualname__,
+        }
+        for name in names:
+            method = inspect.getattr_static(cls, name, None)
+            if not inspect.isfunction(method):
+                continue
+            if owner is None:
+                namespace[name] = self._timed_api(method, device_name, name)
+            else:
+                label = f"{cls.__name__}.{name}"
+                namespace[name] = self._timed_io(method, device_name, label, wire)
+        if owner is not None:
+            namespace["_profiled_device"] = owner
+        elif "connect" in namespace:
+            namespace["connect"] = self._connect_then_attach(namespace["connect"])
+        profiled = type(cls)(cls.__name__, (cls,), namespace)
+        try:
+            obj.__class__ = profiled
+        except TypeError:
+            return  # e.g. a builtin type: not profiled
+        self._originals[id(obj)] = (obj, cls)
+
+    def _connect_then_attach(self, connect):
+        profiler = self
+
+        @functools.wraps(connect)
+        def connect_and_attach(device, *args, **kwargs):
+            connect(device, *args, **kwargs)
+            profiler._attach_transports(device)
+
+        return connect_and_attach
+
+    def _timed_api(self, method, device_name: str, name: str):
+        profiler = self
+        timer = self.timer
+
+        @functools.wraps(method)
+        def timed(obj, *args, **kwargs):
+            calls = profiler._thread_state().calls
+            call = _OpenCall()
+            calls.append(call)
+            start = timer()
+            try:
+                result = method(obj, *args, **kwargs)
+            except BaseException:
+                profiler._record_api(device_name, name, timer() - start, call, True)
+                raise
+            finally:
+                calls.pop()
+            profiler._record_api(device_name, name, timer() - start, call, False)
+            return result
+
+        return timed
+
+    def _timed_io(self, method, device_name: str, label: str, wire: bool):
+        profiler = self
+        timer = self.timer
+
+        @functools.wraps(method)
+        def timed(obj, *args, **kwargs):
+            busy = profiler._thread_state().busy
+            key = id(obj)
+            if key in busy:
+                # the transport's own nested calls (a query's write and read)
+                return method(obj, *args, **kwargs)
+            busy.add(key)
+            start = timer()
+            try:
+                result = method(obj, *args, **kwargs)
+            except BaseException:
+                profiler._record_io(
+                    device_name, label, wire, timer() - start, args, None, True
+                )
+                raise
+            finally:
+                busy.discard(key)
+            profiler._record_io(
+                device_name, label, wire, timer() - start, args, result, False
+            )
+            return result
+
+        return timed
+
+    # --- recording ---
+
+    def _thread_state(self):
+        """Open API calls and busy transports of the calling thread."""
+        state = self._local
+        if not hasattr(state, "calls"):
+            state.calls = []
+            state.busy = set()
+        return state
+
+    def _entry(self, device: str, layer: str, method: str) -> CallStats:
+        phase = current_phase()
+        key = (device, layer, method, phase)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = CallStats(device, layer, method, phase)
+        return stats
+
+    def _record_api(
+        self, device: str, method: str, seconds: float, call: _OpenCall, error: bool
+    ) -> None:
+        with self._lock:
+            stats = self._entry(device, API_LAYER, method)
+            stats.histogram.add(seconds)
+            stats.errors += error
+            stats.io_calls += call.io_calls
+            stats.bytes_out += call.bytes_out
+            stats.bytes_in += call.bytes_in
+
+    def _record_io(
+        self,
+        device: str,
+        method: str,
+        wire: bool,
+        seconds: float,
+        args: tuple,
+        result,
+        error: bool,
+    ) -> None:
+        sent = payload_size(args[0]) if args else 0
+        received = payload_size(result)
+        if wire:
+            for call in self._thread_state().calls:
+                call.io_calls += 1
+                call.bytes_out += sent
+                call.bytes_in += received
+        with self._lock:
+            stats = self._entry(device, IO_LAYER, method)
+            stats.histogram.add(seconds)
+            stats.errors += error
+            stats.bytes_out += sent
+            stats.bytes_in += received
+
+    # --- results ---
+
+    def reset(self) -> None:
+        """Drop the statistics recorded so far."""
+        with self._lock:
+            self._stats.clear()
+
+    def stats(self) -> list[CallStats]:
+        """Statistics per device, layer, phase and method."""
+        with self._lock:
+            return sorted(
+                self._stats.values(),
+                key=lambda s: (s.device, s.layer, s.phase, s.method),
+            )
+
+    def rows(self) -> list[dict]:
+        """:meth:`stats` as plain dictionaries (the report rows)."""
+        with self._lock:
+            stats = list(self._stats.values())
+            rows = [s.to_dict() for s in stats]
+        return sorted(rows, key=lambda r: (r["device"], r["layer"], r["phase"], r["method"]))
+
+    def report(self) -> dict:
+        """JSON-compatible report of the statistics."""
+        return {
+            "format": PROFILE_FORMAT,
+            "version": PROFILE_VERSION,
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "stats": self.rows(),
+        }
+
+    def write_report(self, path: str | Path) -> None:
+        """Write :meth:`report` to ``path`` as JSON."""
+        Path(path).write_text(json.dumps(self.report(), indent=1), encoding="utf-8")
+
+
+def interface_methods(device) -> list[str]:
+    """Public methods of the device family interface of ``device``."""
+    from .arduino.base import BaseArduino
+    from .lamp.base import BaseLamp
+    from .smu.base import BaseSMU
+
+    for interface in (BaseSMU, BaseLamp, BaseArduino):
+        if isinstance(device, interface):
+            break
+    else:
+        interface = type(device)
+    return [
+        name
+        for name in dir(interface)
+        if not name.startswith("_")
+        and inspect.isfunction(inspect.getattr_static(interface, name))
+    ]
+
+
+def read_report(path: str | Path) -> list[dict]:
+    """The rows of a report written by :meth:`InstrumentProfiler.write_report`."""
+    document = json.loads(Path(path).read_text(encoding="utf-8"))
+    if document.get("format") != PROFILE_FORMAT:
+        raise ValueError(f"{path} is not an instrument profile report")
+    return document["stats"]
+
+
+def format_table(rows: Iterable[dict], *, sort: str = "total") -> str:
+    """Text table of report rows, slowest (by ``sort``) first."""
+    rows = sorted(rows, key=lambda r: r[sort], reverse=True)
+    header = (
+        f"{'device':<24} {'layer':<5} {'phase':<28} {'method':<34} {'count':>8} "
+        f"{'total s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+        f"{'io':>7} {'bytes out':>10} {'bytes in':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in rows:
+        lines.append(
+            f"{r['device'][:24]:<24} {r['layer']:<5} {r['phase'][:28]:<28} "
+            f"{r['method'][:34]:<34} {r['count']:>8} {r['total']:>10.4f} "
+            f"{1e3 * r['p50']:>9.3f} {1e3 * r['p95']:>9.3f} {1e3 * r['p99']:>9.3f} "
+            f"{r['io_calls']:>7} {r['bytes_out']:>10} {r['bytes_in']:>10}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m iv_lab.hardware.profiler",
+        description="Print an instrument profile report as a table.",
+    )
+    parser.add_argument("report", help="report written with --profile-instruments")
+    parser.add_argument(
+        "--sort",
+        choices=("total", "count", "p50", "p95", "p99", "bytes_out", "bytes_in"),
+        default="total",
+        help="column to sort by, largest first (default: %(default)s)",
+    )
+    parser.add_argument("--layer", choices=(API_LAYER, IO_LAYER), help="show one layer only")
+    parser.add_argument("--device", help="show one device only")
+    args = parser.parse_args(argv)
+
+    try:
+        rows = read_report(args.report)
+    except (OSError, ValueError) as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        return 1
+    if args.layer is not None:
+        rows = [r for r in rows if r["layer"] == args.layer]
+    if args.device is not None:
+        rows = [r for r in rows if r["device"] == args.device]
+    print(format_table(rows, sort=args.sort))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,12 +13,21 @@ part of this interface — they become measurement protocols in
 This module is standard library only. Concrete drivers defer their
 hardware library imports (``pymeasure``, local ``Keithley26XX``) into
 ``_open()`` / hardware-use methods.
+
+Drivers can opt in to a write-through state cache for the configuration
+methods by decorating them with :func:`cached_setting` (and their
+``turn_off`` with :func:`clears_state_cache`): a call repeating the
+last value sent for a channel is then skipped.
 """
 
 from __future__ import annotations
 
+import contextlib
+import functools
 from abc import abstractmethod
+from collections.abc import Callable, Iterator
 from enum import Enum
+from typing import Any, TypeVar
 
 from iv_lab.hardware.base import HardwareDevice
 from iv_lab.hardware.errors import HardwareCommandError
@@ -37,6 +46,58 @@ class SMUChannel(Enum):
     REFERENCE = "CHAN_B"
 
 
+_Method = TypeVar("_Method", bound=Callable[..., Any])
+
+#: Composite setup methods: any other cached setting sent for a channel
+#: may change what they configured.
+_SETUP_METHODS = ("setup_voltage_output", "setup_current_output")
+
+
+def cached_setting(method: _Method) -> _Method:
+    """Skip ``method(channel, value)`` when it repeats the last value sent.
+
+    For the per-channel configuration methods of a driver. The value is
+    recorded once the call returns; a call that raises clears the whole
+    cache, since the instrument state is then unknown. Calls are
+    counted in :attr:`BaseSMU.state_cache_hits` / ``state_cache_misses``.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self: BaseSMU, channel: SMUChannel, *args: Any) -> Any:
+        if not self.state_cache_enabled:
+            return method(self, channel, *args)
+        key = (name, channel)
+        if self._state_cache.get(key) == args:
+            self.state_cache_hits += 1
+            self._select_channel(channel)
+            return None
+        self.state_cache_misses += 1
+        for setup in _SETUP_METHODS:
+            self._state_cache.pop((setup, channel), None)
+        self._state_cache.pop(key, None)
+        try:
+            result = method(self, channel, *args)
+        except Exception:
+            self.invalidate_state_cache()
+            raise
+        self._state_cache[key] = args
+        return result
+
+    return wrapper  # type: ignore[return-value]
+
+
+def clears_state_cache(method: _Method) -> _Method:
+    """Clear the state cache whenever ``method`` is called (e.g. ``turn_off``)."""
+
+    @functools.wraps(method)
+    def wrapper(self: BaseSMU, *args: Any, **kwargs: Any) -> Any:
+        self.invalidate_state_cache()
+        return method(self, *args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
 class BaseSMU(HardwareDevice):
     """Abstract source meter unit.
 
@@ -74,6 +135,65 @@ class BaseSMU(HardwareDevice):
         #: Minimum achievable measurement period in s (legacy
         #: ``meas_period_min``; overwritten per SMU model on connect).
         self.meas_period_min: float = 1 / 16
+        #: Minimum point period in s of the on-instrument staircase sweep
+        #: (:meth:`sweep_voltage`); ``None`` when the SMU has no hardware
+        #: sweep. Set per SMU model on connect.
+        self.sweep_period_min: float | None = None
+        #: Minimum sample period in s of the on-instrument MPP tracker
+        #: (:meth:`track_mpp`); ``None`` when the SMU cannot run it. Set
+        #: per SMU model on connect.
+        self.mpp_period_min: float | None = None
+        #: Minimum sample period in s of buffered timed readings
+        #: (:meth:`acquire_time_series`); ``None`` when the SMU cannot
+        #: buffer them. Set per SMU model on connect.
+        self.acquisition_period_min: float | None = None
+        #: Longest ``settle`` time in s that
+        #: :meth:`set_voltage_measure_current` and
+        #: :meth:`set_voltage_measure_both_currents` wait on the
+        #: instrument, in the same exchange as the set and the read, so a
+        #: J-V point costs one exchange; 0 when they wait on the host.
+        #: Longer waits stay on the host. Set per driver.
+        self.settle_on_instrument: float = 0.0
+
+        #: Skip repeated configuration calls in drivers that opt in to the
+        #: state cache (see :func:`cached_setting`).
+        self.state_cache_enabled: bool = True
+        #: Configuration calls skipped / sent through the state cache.
+        self.state_cache_hits: int = 0
+        self.state_cache_misses: int = 0
+        # (method name, channel) -> arguments last sent
+        self._state_cache: dict[tuple[str, SMUChannel], tuple] = {}
+
+    def connect(self) -> None:
+        # a (re)connected instrument starts from its reset state
+        self.invalidate_state_cache()
+        super().connect()
+
+    # --- state cache ---
+
+    def invalidate_state_cache(self, *methods: str) -> None:
+        """Forget the cached settings of ``methods`` (all when none given).
+
+        For drivers whose instrument state changes outside the cached
+        methods, and for callers that reset the instrument.
+        """
+        if not methods:
+            self._state_cache.clear()
+            return
+        for key in [key for key in self._state_cache if key[0] in methods]:
+            del self._state_cache[key]
+
+    def _select_channel(self, channel: SMUChannel) -> None:
+        """Make ``channel`` current when a cached call skips its write.
+
+        For drivers whose channels share one instrument (the 2400 family
+        switches terminals); nothing to do by default.
+        """
+
+    def state_cache_hit_rate(self) -> float:
+        """Fraction of cached configuration calls that were skipped."""
+        calls = self.state_cache_hits + self.state_cache_misses
+        return self.state_cache_hits / calls if calls else 0.0
 
     # --- compliance and measurement configuration ---
 
@@ -169,6 +289,56 @@ class BaseSMU(HardwareDevice):
 
     # --- composed/optional behavior ---
 
+    def batch(self) -> contextlib.AbstractContextManager[None]:
+        """Group the configuration commands issued inside the block.
+
+        Drivers that can send several configuration commands in one
+        exchange (the 2602) do so for the commands issued inside the
+        ``with`` block; command errors then surface when the batch is
+        sent, at the latest when the block ends. Measurements inside the
+        block still see the configuration issued before them. Nesting is
+        allowed. The default does not group anything.
+        """
+        return contextlib.nullcontext()
+
+    def check_errors(self) -> None:
+        """Raise :class:`HardwareCommandError` for errors queued on the SMU.
+
+        Drivers that skip the per-command error check on single-point
+        reads (the 2602) report the errors of those reads here; protocols
+        call it once per J-V sweep. Otherwise such errors surface with the
+        next checked command. The default has nothing to check.
+        """
+
+    def set_voltage_measure_current(
+        self, channel: SMUChannel, voltage: float, settle: float = 0.0
+    ) -> float:
+        """Set the source voltage and read the current ``settle`` s later.
+
+        Same as :meth:`set_voltage`, a ``settle`` s wait on :attr:`clock`
+        and :meth:`measure_current`; drivers that can do this in one
+        instrument exchange override it for settle times up to
+        :attr:`settle_on_instrument`.
+        """
+        self.set_voltage(channel, voltage)
+        if settle > 0:
+            self.clock.sleep(settle)
+        return self.measure_current(channel)
+
+    def set_voltage_measure_both_currents(
+        self, voltage: float, settle: float = 0.0
+    ) -> tuple[float, float]:
+        """Set the cell voltage and read both currents ``settle`` s later.
+
+        Same as :meth:`set_voltage` on the cell channel, a ``settle`` s
+        wait and :meth:`measure_both_currents`; drivers that can do this
+        in one instrument exchange override it.
+        """
+        self.set_voltage(SMUChannel.CELL, voltage)
+        if settle > 0:
+            self.clock.sleep(settle)
+        return self.measure_both_currents()
+
     def measure_both_iv_points(self) -> tuple[float, float, float, float]:
         """Measure ``(i_cell, v_cell, i_ref, v_ref)`` in one cycle.
 
@@ -182,6 +352,85 @@ class BaseSMU(HardwareDevice):
             "not supported by this SMU"
         )
 
+    def sweep_voltage(
+        self,
+        channel: SMUChannel,
+        start: float,
+        stop: float,
+        points: int,
+        interval: float,
+    ) -> Iterator[tuple[list[float], list[float]]]:
+        """Run a voltage staircase sweep on the instrument.
+
+        Steps the source linearly from ``start`` to ``stop`` in ``points``
+        steps, one step every ``interval`` seconds, measuring the current
+        at the end of each step (the timing of the legacy point-by-point
+        scan). Yields ``(voltages, currents)`` chunks as the readings are
+        collected from the instrument buffer; closing the iterator early
+        aborts the sweep. The output is left on at the last level.
+
+        Only available when :attr:`sweep_period_min` is set; the default
+        raises, like the other optional capabilities.
+        """
+        raise HardwareCommandError(
+            f"{self.name}: hardware voltage sweeps are not supported by this SMU"
+        )
+
+    def track_mpp(
+        self,
+        v_start: float,
+        v_limit: float,
+        voltage_steps: tuple[float, float, float],
+        interval: float,
+        duration: float,
+        *,
+        reference: bool = False,
+    ) -> Iterator[tuple[list[float], list[float], list[float], list[float]]]:
+        """Run perturb-and-observe MPP tracking on the instrument.
+
+        Same algorithm as the host loop of the MPP tracking protocol,
+        starting at ``v_start`` with the ``(initial, max, min)`` voltage
+        steps and the voltage kept within ``±v_limit``. The instrument
+        samples at its own rate (down to :attr:`mpp_period_min`) and
+        averages the samples into one record per ``interval``; yields
+        ``(t, v, i, i_ref)`` record chunks until ``duration`` s have
+        passed. ``i_ref`` is the reference diode read in the same sample
+        when ``reference`` is True, zeros otherwise. Closing the iterator
+        stops the tracking; the output is left on at the last voltage.
+
+        Only available when :attr:`mpp_period_min` is set; the default
+        raises, like the other optional capabilities.
+        """
+        raise HardwareCommandError(
+            f"{self.name}: on-instrument MPP tracking is not supported by this SMU"
+        )
+
+    def acquire_time_series(
+        self,
+        channel: SMUChannel,
+        quantity: str,
+        interval: float,
+        points: int,
+        *,
+        reference: bool = False,
+    ) -> Iterator[tuple[list[float], list[float], list[float]]]:
+        """Take ``points`` timed readings into the instrument buffer.
+
+        Measures ``quantity`` (``"i"`` or ``"v"``) of ``channel`` every
+        ``interval`` seconds with the source left as configured. Yields
+        ``(t, values, i_ref)`` chunks as the readings are collected; ``t``
+        are instrument timestamps in s from the first reading, ``i_ref``
+        the reference diode current read alongside when ``reference`` is
+        True, zeros otherwise. Closing the iterator early stops the
+        acquisition.
+
+        Only available when :attr:`acquisition_period_min` is set; the
+        default raises, like the other optional capabilities.
+        """
+        raise HardwareCommandError(
+            f"{self.name}: buffered timed acquisition is not supported by this SMU"
+        )
+
     def setup_reference_diode(self) -> None:
         """Prepare channel B to read the reference photodiode.
 
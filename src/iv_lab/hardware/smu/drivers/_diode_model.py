@@ -0,0 +1,166 @@
+"""Vectorized solar-cell models for the emulated SMU.
+
+Two models share one interface — ``current(v, photocurrent, irradiance)``
+and ``voltage(i, photocurrent, irradiance)`` evaluate whole NumPy arrays
+in one call, in the SMU's sign convention (negative current under
+illumination at short circuit):
+
+- :class:`LegacyDiodeModel` is the exponential of the legacy emulation
+  (``IVLab/IVlab.py``): fixed Voc and tau, no light dependence.
+- :class:`SingleDiodeModel` is the single-diode equation with series and
+  shunt resistance, ideality factor and a photocurrent proportional to
+  the irradiance, solved explicitly through the Lambert W function. An
+  optional junction capacitance adds the RC charging current that lags
+  each voltage step, which gives scan-direction hysteresis.
+
+``photocurrent`` is the one-sun short-circuit photocurrent in A and
+``irradiance`` the light level in suns. Readings are not clipped here;
+compliance is the SMU's job.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from iv_lab.config import SMUEmulationSettings
+
+#: Legacy emulation constants (IVLab/IVlab.py).
+EMULATED_VOC = 0.55
+EMULATED_TAU = 10.0
+
+#: Boltzmann constant over elementary charge in V/K.
+_K_OVER_Q = 8.617333262e-5
+
+
+def lambertw_exp(x: ArrayLike) -> np.ndarray:
+    """Principal branch of ``W(exp(x))`` without evaluating ``exp(x)``.
+
+    Solves ``w + log(w) = x`` by Newton's method, which converges
+    monotonically from any positive start on this concave function (after
+    at most one step from above the root). Working in ``x`` keeps it
+    stable far beyond the float range of ``exp``, which the diode
+    equations reach at forward bias.
+    """
+    x = np.asarray(x, dtype=float)
+    w = np.where(x > 1.0, x - np.log(np.maximum(x, 1.0)), np.exp(np.minimum(x, 1.0)))
+    # W(z) = z to double precision for tiny z (and exp may underflow to 0)
+    solve = x > -40.0
+    for _ in range(50):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = np.where(solve, (w + np.log(w) - x) * w / (w + 1.0), 0.0)
+        w = w - step
+        if np.all(np.abs(step) <= 1e-15 * w):
+            break
+    return w
+
+
+class LegacyDiodeModel:
+    """Legacy emulation: ``i(v) = Isc + K * exp(tau * v - 1)``."""
+
+    capacitance = 0.0
+    photocurrent: float | None = None
+
+    def current(
+        self, voltage: ArrayLike, photocurrent: float, irradiance: float = 1.0
+    ) -> np.ndarray:
+        isc = -photocurrent
+        k = -isc / math.exp(EMULATED_TAU * EMULATED_VOC - 1)
+        return isc + k * np.exp(EMULATED_TAU * np.asarray(voltage, dtype=float) - 1)
+
+    def voltage(
+        self, current: ArrayLike, photocurrent: float, irradiance: float = 1.0
+    ) -> np.ndarray:
+        isc = -photocurrent
+        k = -isc / math.exp(EMULATED_TAU * EMULATED_VOC - 1)
+        arg = (np.asarray(current, dtype=float) - isc) / k
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # sourcing below Isc: legacy produced nan, -inf clips to -Vlimit
+            return np.where(arg > 0.0, (np.log(arg) + 1) / EMULATED_TAU, -np.inf)
+
+    def lag_current(self, step: ArrayLike, elapsed: ArrayLike) -> np.ndarray | float:
+        return 0.0
+
+
+@dataclass(frozen=True)
+class SingleDiodeModel:
+    """Single-diode cell with Rs, Rsh, ideality and junction capacitance.
+
+    The saturation current follows from the one-sun open-circuit voltage,
+    so the parameters are the ones read off a measured J-V curve.
+    """
+
+    open_circuit_voltage: float = 0.55
+    ideality: float = 1.5
+    series_resistance: float = 5.0
+    shunt_resistance: float = 1e4
+    temperature: float = 298.15
+    capacitance: float = 0.0
+    #: One-sun photocurrent in A; None uses the SMU's full-sun reference.
+    photocurrent: float | None = None
+
+    @classmethod
+    def from_settings(cls, settings: SMUEmulationSettings) -> SingleDiodeModel:
+        return cls(
+            open_circuit_voltage=settings.openCircuitVoltage,
+            ideality=settings.ideality,
+            series_resistance=settings.seriesResistance,
+            shunt_resistance=settings.shuntResistance,
+            temperature=settings.temperature,
+            capacitance=settings.capacitance,
+            photocurrent=settings.photocurrent,
+        )
+
+    @property
+    def _thermal_voltage(self) -> float:
+        """Modified thermal voltage ``n k T / q`` in V."""
+        return self.ideality * _K_OVER_Q * self.temperature
+
+    def _saturation_current(self, photocurrent: float) -> float:
+        a = self._thermal_voltage
+        voc = self.open_circuit_voltage
+        i0 = (photocurrent - voc / self.shunt_resistance) / math.expm1(voc / a)
+        # a shunt too small for the Voc leaves no diode current to fit
+        return max(i0, 1e-30)
+
+    def current(
+        self, voltage: ArrayLike, photocurrent: float, irradiance: float = 1.0
+    ) -> np.ndarray:
+        v = np.asarray(voltage, dtype=float)
+        a = self._thermal_voltage
+        rs, rsh = self.series_resistance, self.shunt_resistance
+        i0 = self._saturation_current(photocurrent)
+        iph = photocurrent * irradiance
+        if rs == 0.0:
+            generated = iph - i0 * np.expm1(v / a) - v / rsh
+        else:
+            x = math.log(rs * i0 * rsh / (a * (rs + rsh))) + rsh * (
+                rs * (iph + i0) + v
+            ) / (a * (rs + rsh))
+            generated = (rsh * (iph + i0) - v) / (rs + rsh) - a / rs * lambertw_exp(x)
+        return -generated
+
+    def voltage(
+        self, current: ArrayLike, photocurrent: float, irradiance: float = 1.0
+    ) -> np.ndarray:
+        generated = -np.asarray(current, dtype=float)
+        a = self._thermal_voltage
+        rs, rsh = self.series_resistance, self.shunt_resistance
+        i0 = self._saturation_current(photocurrent)
+        iph = photocurrent * irradiance
+        y = math.log(i0 * rsh / a) + rsh * (iph + i0 - generated) / a
+        return (iph + i0 - generated) * rsh - generated * rs - a * lambertw_exp(y)
+
+    def lag_current(self, step: ArrayLike, elapsed: ArrayLike) -> np.ndarray | float:
+        """RC charging current ``elapsed`` s after a voltage ``step``."""
+        tau = self.series_resistance * self.capacitance
+        if tau <= 0.0:
+            return 0.0
+        return (
+            np.asarray(step, dtype=float)
+            / self.series_resistance
+            * np.exp(-np.asarray(elapsed, dtype=float) / tau)
+        )
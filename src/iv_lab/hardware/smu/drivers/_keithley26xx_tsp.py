@@ -0,0 +1,487 @@
+"""TSP helpers for the Keithley 2600 series beyond the bundled library.
+
+The bundled ``_keithley26xx_lib`` is a verbatim copy of the legacy
+``Keithley26XX.py`` and is not modified. Instrument features it lacks are
+built here on its public ``write_lua`` / ``query_lua`` methods, taking the
+connected ``SMU26xx`` object and a channel letter (``"a"`` / ``"b"``).
+Binary buffer reads go through the instrument's pyvisa resource
+directly, since the library only parses ASCII answers.
+
+This module does not import ``pyvisa``; it only talks to an already
+connected instrument object.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from iv_lab.hardware.errors import HardwareCommandError
+
+
+def _parse_values(answer: str) -> list[float]:
+    return [float(value) for value in answer.split(",")]
+
+
+# --- command batching ---
+
+
+class CommandBatch:
+    """Send the ``write_lua`` commands of an ``SMU26xx`` as one Lua chunk.
+
+    The bundled library checks the error queue after every command, one
+    extra VISA round trip each. Inside the ``with`` block, the commands
+    are collected instead (the instance's ``write_lua`` / ``query_lua``
+    are shadowed, which the library's own calls go through) and sent as a
+    single chunk when the block ends or before the next query, so reads
+    always see the configuration issued before them.
+
+    The chunk records the index of the first command after which the
+    error queue is not empty, so an error still names the command that
+    caused it; it is raised as :class:`HardwareCommandError` when the
+    chunk is sent rather than when the command is issued. Errors left in
+    the queue before the chunk are cleared first; a chunk that does not
+    compile, or that a runtime error aborts, names no command. If the
+    block itself raises, that exception is the one raised and a batch
+    error is added to it as a note.
+
+    Helpers that use the VISA resource directly send a pending batch
+    first (see :func:`flush_batch`).
+    """
+
+    def __init__(self, smu) -> None:
+        self.smu = smu
+        self._commands: list[str] = []
+        self._write_lua = smu.write_lua
+        self._query_lua = smu.query_lua
+
+    def __enter__(self) -> CommandBatch:
+        self.smu.write_lua = self._collect
+        self.smu.query_lua = self._query
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        # restore the library methods, then send what was collected (also
+        # on error, as the unbatched library would have sent it already)
+        del self.smu.write_lua
+        del self.smu.query_lua
+        if exc is None:
+            self.flush()
+            return
+        try:
+            self.flush()
+        except Exception as flush_error:
+            # the body's exception stays the one raised (add_note is
+            # Python 3.11+; __notes__ is what it sets)
+            note = f"The command batch failed as well: {flush_error}"
+            if hasattr(exc, "add_note"):
+                exc.add_note(note)
+            else:
+                exc.__notes__ = [*getattr(exc, "__notes__", ()), note]
+
+    def _collect(self, cmd, check_for_errors=True) -> None:
+        self._commands.append(str(cmd))
+
+    def _query(self, cmd, check_for_errors=True) -> str:
+        self.flush()
+        return self._query_lua(cmd, check_for_errors)
+
+    def flush(self) -> None:
+        """Send the collected commands and check the error queue once."""
+        if not self._commands:
+            return
+        commands, self._commands = self._commands, []
+
+        lines = ["ivl_batch_error = 0", "errorqueue.clear()"]
+        for index, cmd in enumerate(commands, start=1):
+            lines.append(cmd)
+            lines.append(
+                f"if ivl_batch_error == 0 and errorqueue.count > 0 then "
+                f"ivl_batch_error = {index} end"
+            )
+        self._write_lua("\n".join(lines), check_for_errors=False)
+
+        answer = self._query_lua(
+            "errorcode, message = errorqueue.next()\n"
+            # reset, so a chunk that did not run reads as aborted
+            "print(ivl_batch_error or 0, errorcode, message)\n"
+            "ivl_batch_error = nil",
+            check_for_errors=False,
+        )
+        index, code, message = answer.split("\t", 2)
+        if float(code) != 0:
+            # drop follow-up errors of the same batch
+            self._write_lua("errorqueue.clear()", check_for_errors=False)
+            index = int(float(index))
+            if 0 < index <= len(commands):
+                where = f"batched command {index} of {len(commands)}: {commands[index - 1]!r}"
+            else:
+                where = f"batch of {len(commands)} commands aborted"
+            raise HardwareCommandError(
+                f'The SMU said: "{message}" / Keithley-Error-Code: {code} ({where})'
+            )
+
+
+def flush_batch(smu) -> None:
+    """Send the commands collected by a :class:`CommandBatch` active on
+    ``smu``, so I/O on its VISA resource comes after them."""
+    batch = getattr(vars(smu).get("write_lua"), "__self__", None)
+    if isinstance(batch, CommandBatch):
+        batch.flush()
+
+
+# --- non-blocking staircase sweep ---
+
+
+def start_voltage_sweep(
+    smu, channel: str, start: float, stop: float, settling_time: float, points: int
+) -> None:
+    """Start a voltage staircase sweep into ``nvbuffer1`` and return at once.
+
+    Same staircase as the blocking KISweep ``SweepVLinMeasureI`` used by
+    the bundled library, programmed directly into the trigger model so
+    the command interface stays available while the sweep runs. The
+    source delay is the settling time between a step and its reading;
+    the last level is held after the sweep.
+    """
+    ch = f"smu{channel}"
+    smu.write_lua(
+        f"{ch}.nvbuffer1.clear()\n"
+        f"{ch}.nvbuffer1.appendmode = 1\n"
+        f"{ch}.nvbuffer1.collectsourcevalues = 1\n"
+        f"{ch}.nvbuffer1.collecttimestamps = 1\n"
+        f"{ch}.measure.count = 1"
+    )
+    smu.write_lua(
+        f"{ch}.source.delay = {settling_time}\n"
+        f"{ch}.trigger.source.linearv({start}, {stop}, {points})\n"
+        f"{ch}.trigger.source.action = {ch}.ENABLE\n"
+        f"{ch}.trigger.measure.i({ch}.nvbuffer1)\n"
+        f"{ch}.trigger.measure.action = {ch}.ENABLE\n"
+        f"{ch}.trigger.endpulse.action = {ch}.SOURCE_HOLD\n"
+        f"{ch}.trigger.endsweep.action = {ch}.SOURCE_HOLD\n"
+        f"{ch}.trigger.count = {points}\n"
+        f"{ch}.trigger.arm.count = 1"
+    )
+    # unlike the KISweep functions, initiate() returns immediately
+    smu.write_lua(f"{ch}.source.output = {ch}.OUTPUT_ON\n{ch}.trigger.initiate()")
+
+
+def get_buffer_count(smu, channel: str) -> int:
+    """Number of readings stored in ``nvbuffer1``."""
+    answer = smu.query_lua(f"print(smu{channel}.nvbuffer1.n)", check_for_errors=False)
+    return int(float(answer))
+
+
+def _visa_resource(smu):
+    """The pyvisa resource of an ``SMU26xx`` (private in the library)."""
+    return smu._SMU26xx__instrument
+
+
+def read_buffer(
+    smu,
+    channel: str,
+    first_index: int,
+    last_index: int,
+    fields: tuple[str, ...] = ("readings", "sourcevalues", "timestamps"),
+) -> tuple[np.ndarray, ...]:
+    """Read ``fields`` of ``nvbuffer1`` in one binary ``printbuffer`` call.
+
+    Indices are 1-based and inclusive. The data is sent as little-endian
+    REAL64 instead of ASCII, so neither end formats or parses numbers;
+    ``printbuffer`` interleaves the fields per reading and each returned
+    array is a strided view into the one decoded block. The timestamps
+    need ``collecttimestamps`` enabled on the buffer.
+    """
+    count = last_index - first_index + 1
+    sources = ", ".join(f"smu{channel}.nvbuffer1.{field}" for field in fields)
+    resource = _visa_resource(smu)
+    smu.write_lua("format.data = format.REAL64\nformat.byteorder = format.LITTLEENDIAN")
+    # in a batch, the format is only sent with the pending commands
+    flush_batch(smu)
+    try:
+        resource.write(f"printbuffer({first_index}, {last_index}, {sources})")
+        # TSP sends an indefinite-length "#0" block: the size comes from
+        # the number of values expected
+        values = resource.read_binary_values(
+            datatype="d",
+            is_big_endian=False,
+            container=np.array,
+            header_fmt="ieee",
+            data_points=count * len(fields),
+        )
+    finally:
+        # back to the ASCII format the library parses
+        smu.write_lua("format.data = format.ASCII")
+    values = np.asarray(values, dtype=np.float64).reshape(count, len(fields))
+    return tuple(values[:, k] for k in range(len(fields)))
+
+
+def abort_sweep(smu, channel: str) -> None:
+    """Stop a running sweep and restore the default source delay."""
+    ch = f"smu{channel}"
+    smu.write_lua(f"{ch}.abort()\n{ch}.source.delay = {ch}.DELAY_OFF")
+
+
+# --- timed acquisition ---
+
+
+def start_acquisition(
+    smu, readings: list[tuple[str, str]], interval: float, points: int
+) -> None:
+    """Start ``points`` timed readings into ``nvbuffer1`` and return at once.
+
+    ``readings`` lists ``(channel, quantity)`` pairs, the quantity being
+    ``"i"`` or ``"v"``; all channels are started in the same chunk. The
+    instrument spaces the readings ``interval`` s apart
+    (``measure.interval``) and timestamps each of them; the source is
+    left as it is.
+    """
+    setup: list[str] = []
+    start: list[str] = []
+    for channel, quantity in readings:
+        ch = f"smu{channel}"
+        setup += [
+            f"{ch}.nvbuffer1.clear()",
+            f"{ch}.nvbuffer1.appendmode = 1",
+            f"{ch}.nvbuffer1.collectsourcevalues = 0",
+            f"{ch}.nvbuffer1.collecttimestamps = 1",
+            f"{ch}.measure.count = {points}",
+            f"{ch}.measure.interval = {interval}",
+        ]
+        # overlapped measurements run in the background
+        start.append(f"{ch}.measure.overlapped{quantity}({ch}.nvbuffer1)")
+    smu.write_lua("\n".join(setup))
+    smu.write_lua("\n".join(start))
+
+
+def get_base_timestamp(smu, channel: str) -> float:
+    """Absolute time in s of the first reading in ``nvbuffer1``."""
+    answer = smu.query_lua(
+        f"print(smu{channel}.nvbuffer1.basetimestamp)", check_for_errors=False
+    )
+    return float(answer)
+
+
+def abort_acquisition(smu, channels: list[str]) -> None:
+    """Stop timed readings and restore single readings per measurement."""
+    smu.write_lua(
+        "\n".join(f"smu{c}.abort()\nsmu{c}.measure.count = 1" for c in channels)
+    )
+
+
+# --- scripts ---
+
+
+def load_script(smu, name: str, source: str) -> None:
+    """Load a TSP script into the instrument and run it once.
+
+    Running the script defines the functions it contains as globals on
+    the instrument; later commands call them by name.
+    """
+    smu.write_lua(f"loadscript {name}\n{source}\nendscript")
+    smu.write_lua(f"{name}()")
+
+
+def call(smu, function: str, *args) -> list[float]:
+    """Call a loaded TSP function and parse the values it prints.
+
+    The error queue is not checked: a function that fails prints nothing
+    and the query times out, and queued errors are left to
+    :func:`check_errors` (or the next checked command).
+    """
+    arguments = ", ".join(str(arg) for arg in args)
+    answer = smu.query_lua(f"{function}({arguments})", check_for_errors=False)
+    return [float(value) for value in answer.replace("'", "").split("\t")]
+
+
+def check_errors(smu) -> None:
+    """Raise the first error in the error queue, dropping the rest."""
+    answer = smu.query_lua(
+        "errorcode, message = errorqueue.next()\nprint(errorcode, message)",
+        check_for_errors=False,
+    )
+    code, message = answer.split("\t", 1)
+    if float(code) != 0:
+        smu.write_lua("errorqueue.clear()", check_for_errors=False)
+        raise HardwareCommandError(
+            f'The SMU said: "{message.strip()}" / Keithley-Error-Code: {code}'
+        )
+
+
+# --- single-point function library ---
+
+#: Name of the function library loaded on connect.
+FUNCTION_LIBRARY_NAME = "IVLabFunctions"
+
+#: Hot-path single-point operations as preloaded functions: one short
+#: call per point instead of a full Lua statement to parse, and the level
+#: set, the settling delay (``settle`` s, 0 for none) and the reading in
+#: the same exchange. ``ch`` is the channel object (``smua`` / ``smub``);
+#: the ``both`` functions read channel A (cell) and B (reference diode)
+#: in the same cycle, like the library's ``CHANNEL_ALL`` reads.
+FUNCTION_LIBRARY = """\
+function ivl_setv_meas_i(ch, v, settle)
+  ch.source.levelv = v
+  if settle > 0 then delay(settle) end
+  print(ch.measure.i())
+end
+
+function ivl_setv_both_i(v, settle)
+  smua.source.levelv = v
+  if settle > 0 then delay(settle) end
+  print(smua.measure.i(), smub.measure.i())
+end
+
+function ivl_meas_i(ch)
+  print(ch.measure.i())
+end
+
+function ivl_meas_iv(ch)
+  print(ch.measure.iv())
+end
+
+function ivl_both_i()
+  print(smua.measure.i(), smub.measure.i())
+end
+
+function ivl_both_iv()
+  local ia, va = smua.measure.iv()
+  local ib, vb = smub.measure.iv()
+  print(ia, va, ib, vb)
+end
+"""
+
+
+# --- on-instrument MPP tracker ---
+
+#: Name of the loaded MPP tracker script.
+MPP_TRACKER_SCRIPT_NAME = "IVLabMPP"
+
+#: Perturb-and-observe MPP tracker, the legacy adaptive-step algorithm of
+#: ``MPPTrackingProtocol`` running on channel A (cell), optionally reading
+#: the reference diode on channel B in the same sample. Samples are taken
+#: every ``period`` s on the instrument timer; each ``decimation`` samples
+#: are averaged into one (t, v, i, i_ref) record. ``ivl_mpp_track`` runs
+#: the loop for the whole duration and prints each record as it is made,
+#: then ``end``: the instrument tracks without gaps while the host reads
+#: the records from the output queue, and a slow host only delays the
+#: reads. Lua 5.0 (TSP): no ``#`` operator, hence the explicit counters.
+MPP_TRACKER_SCRIPT = """\
+ivl_mpp_state = {}
+
+function ivl_mpp_start(v, step, step_max, step_min, v_limit, period, decimation, duration, reference)
+  local m = {}
+  m.v_set, m.step, m.step_max, m.step_min = v, step, step_max, step_min
+  m.v_limit, m.period, m.decimation, m.duration = math.abs(v_limit), period, decimation, duration
+  m.reference = (reference == 1)
+  m.direction, m.history, m.nsteps, m.last_p = 1, {}, 0, 0
+  m.next_t = 0
+  m.acc_n, m.acc_t, m.acc_v, m.acc_i, m.acc_iref = 0, 0, 0, 0, 0
+  ivl_mpp_state = m
+  smua.source.levelv = v
+  timer.reset()
+end
+
+function ivl_mpp_record(m)
+  local n = m.acc_n
+  print(m.acc_t / n, m.acc_v / n, m.acc_i / n, m.acc_iref / n)
+  m.acc_n, m.acc_t, m.acc_v, m.acc_i, m.acc_iref = 0, 0, 0, 0, 0
+end
+function ivl_mpp_sample(m)
+  while timer.measure.t() < m.next_t do end
+  local t = timer.measure.t()
+  local i, v = smua.measure.iv()
+  local iref = 0
+  if m.reference then iref = smub.measure.i() end
+  m.next_t = m.next_t + m.period
+
+  -- the power went down: we're going the wrong way
+  local w = -i * v
+  if w < m.last_p then m.direction = -m.direction end
+  m.nsteps = m.nsteps + 1
+  m.history[m.nsteps - 8 * math.floor((m.nsteps - 1) / 8)] = m.direction
+  if m.nsteps >= 8 then
+    local trend = 0
+    for k = 1, 8 do trend = trend + m.history[k] end
+    if math.abs(trend) >= 3 then
+      m.step = math.min(m.step * 2, m.step_max)
+      m.nsteps = 0
+    elseif trend == 0 and m.step > m.step_min then
+      m.step = math.max(m.step / 2, m.step_min)
+      m.nsteps = 0
+    end
+  end
+  m.v_set = m.v_set + m.step * m.direction
+  if m.v_set > m.v_limit then m.v_set = m.v_limit end
+  if m.v_set < -m.v_limit then m.v_set = -m.v_limit end
+  smua.source.levelv = m.v_set
+  m.last_p = w
+
+  m.acc_n = m.acc_n + 1
+  m.acc_t, m.acc_v = m.acc_t + t, m.acc_v + v
+  m.acc_i, m.acc_iref = m.acc_i + i, m.acc_iref + iref
+  if m.acc_n >= m.decimation then ivl_mpp_record(m) end
+end
+
+function ivl_mpp_track()
+  local m = ivl_mpp_state
+  while m.next_t < m.duration do ivl_mpp_sample(m) end
+  if m.acc_n > 0 then ivl_mpp_record(m) end
+  print("end")
+end
+"""
+
+
+def start_mpp_tracker(
+    smu,
+    v_start: float,
+    voltage_steps: tuple[float, float, float],
+    v_limit: float,
+    period: float,
+    decimation: int,
+    duration: float,
+    reference: bool,
+) -> None:
+    """Reset the tracker state and the instrument timer (time zero)."""
+    step, step_max, step_min = voltage_steps
+    smu.write_lua(
+        f"ivl_mpp_start({v_start}, {step}, {step_max}, {step_min}, {v_limit}, "
+        f"{period}, {decimation}, {duration}, {int(reference)})"
+    )
+
+
+def run_mpp_tracker(smu) -> None:
+    """Start tracking; returns at once, the records follow as lines.
+
+    The instrument runs the tracker to the end of its duration and
+    executes no other command until then (see :func:`stop_mpp_tracker`).
+    """
+    smu.write_lua("ivl_mpp_track()", check_for_errors=False)
+
+
+def read_mpp_record(smu, timeout: float) -> tuple[float, float, float, float] | None:
+    """Wait up to ``timeout`` s for the next ``(t, v, i, i_ref)`` record.
+
+    Returns None once the tracker has ended.
+    """
+    flush_batch(smu)
+    resource = _visa_resource(smu)
+    previous = resource.timeout
+    resource.timeout = max(previous, timeout * 1000)
+    try:
+        line = resource.read().strip()
+    finally:
+        resource.timeout = previous
+    if line == "end":
+        return None
+    t, v, i, i_ref = (float(value) for value in line.split("\t"))
+    return (t, v, i, i_ref)
+
+
+def stop_mpp_tracker(smu) -> None:
+    """Abort a running tracker and drop its unread records.
+
+    A device clear stops the running script on the 2600 series; the
+    output stays on at the last voltage.
+    """
+    _visa_resource(smu).clear()
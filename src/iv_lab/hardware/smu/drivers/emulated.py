@@ -1,8 +1,8 @@
 """Emulated SMU driver.
 
-Replicates the legacy emulation model built into the legacy ``SMU`` class
-(``measure_voltage`` / ``measure_current`` in ``IVLab/IVlab.py``): both
-channels behave as an illuminated diode with
+By default replicates the legacy emulation model built into the legacy
+``SMU`` class (``measure_voltage`` / ``measure_current`` in
+``IVLab/IVlab.py``): both channels behave as an illuminated diode with
 
 - ``Isc = -full_sun_reference_current``,
 - ``Voc = 0.55 V``, ``tau = 10``,
@@ -12,28 +12,56 @@ channels behave as an illuminated diode with
 
 Extensions over the legacy model (see docs/HARDWARE.md emulation
 requirements): optional gaussian current noise (off by default, seeded —
-deterministic for tests) and a configurable :attr:`integration_delay`
-that tests can set to 0.
-
-Standard library only; no hardware library is imported.
+deterministic for tests), a configurable :attr:`integration_delay`
+that tests can set to 0, and a hardware staircase sweep
+(:meth:`EmulatedSMU.sweep_voltage`) and buffered timed readings
+(:meth:`EmulatedSMU.acquire_time_series`) that are disabled until
+``sweep_period_min`` / ``acquisition_period_min`` are set, as real
+instruments do on connect. All waits go through the device ``clock``,
+so with a :class:`~iv_lab.hardware.clock.VirtualClock` emulated
+protocols run faster than real time.
+
+An ``SMU.emulation`` settings section replaces the legacy diode with a
+single-diode cell (series/shunt resistance, ideality, optional junction
+capacitance) whose photocurrent follows the emulated lamp's light level;
+see ``_diode_model.py``. The models evaluate NumPy arrays, and
+:meth:`EmulatedSMU.sweep` computes a whole staircase in one call for
+benchmarks on large data sets.
+
+An ``SMU.emulationTiming`` profile (:mod:`iv_lab.hardware.timing`) adds
+the real instrument's command latency, reading overhead and hardware
+sweep overhead, and sets the minimum periods its driver reports, so that
+emulated runs take as long as real ones.
+
+No hardware library is imported.
 """
 
 from __future__ import annotations
 
-import math
 import random
-import time
+from collections.abc import Iterator
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import numpy as np
+from numpy.typing import ArrayLike
 
 from iv_lab.config import SMUSettings
+from iv_lab.hardware.timing import SMUTiming
+
+from ..base import BaseSMU, SMUChannel, cached_setting, clears_state_cache
+from ._diode_model import EMULATED_TAU as EMULATED_TAU
+from ._diode_model import EMULATED_VOC as EMULATED_VOC
+from ._diode_model import LegacyDiodeModel, SingleDiodeModel
 
-from ..base import BaseSMU, SMUChannel
+if TYPE_CHECKING:
+    from iv_lab.hardware.lamp.base import BaseLamp
 
-#: Legacy emulation constants (IVLab/IVlab.py).
-EMULATED_VOC = 0.55
-EMULATED_TAU = 10.0
 #: Legacy simulated Keithley integration time in s.
 LEGACY_INTEGRATION_DELAY = 0.02
+#: Readings per chunk yielded by the emulated hardware sweep and timed
+#: acquisition.
+SWEEP_CHUNK_SIZE = 100
 
 
 @dataclass
@@ -47,6 +75,9 @@ class _ChannelState:
     i_limit: float = 0.005
     nwire: int = 2
     output: bool = False
+    # last voltage step and its clock time (capacitive lag only)
+    v_step: float = 0.0
+    t_step: float = 0.0
 
 
 class EmulatedSMU(BaseSMU):
@@ -66,12 +97,27 @@ class EmulatedSMU(BaseSMU):
             self.meas_speed = settings.measSpeed
             self.use_reference_diode = settings.useReferenceDiode
 
+        #: Time spent per command, reading and sweep (the default is the
+        #: legacy emulation: integration time only).
+        self.timing = SMUTiming.from_settings(
+            settings.emulationTiming if settings is not None else None
+        )
         #: Simulated integration time per reading in s; 0 disables waiting.
-        self.integration_delay: float = LEGACY_INTEGRATION_DELAY
+        self.integration_delay: float = self.timing.integration_time
         #: Gaussian current noise sigma in A; 0 (default) is fully
         #: deterministic, matching the legacy emulation.
         self.current_noise: float = 0.0
         self._noise_rng = random.Random(0)
+        self._noise_array_rng = np.random.default_rng(0)
+
+        #: Cell model behind every reading.
+        self.diode_model: LegacyDiodeModel | SingleDiodeModel = LegacyDiodeModel()
+        emulation = settings.emulation if settings is not None else None
+        if emulation is not None and emulation.model == "single diode":
+            self.diode_model = SingleDiodeModel.from_settings(emulation)
+        #: Lamp whose light level scales the photocurrent of the
+        #: single-diode model (set by the emulated lamp); None is one sun.
+        self.light_source: BaseLamp | None = None
 
         self._channels = {
             SMUChannel.CELL: _ChannelState(),
@@ -81,11 +127,16 @@ class EmulatedSMU(BaseSMU):
     def seed_noise(self, seed: int) -> None:
         """Re-seed the noise generator for reproducible noisy runs."""
         self._noise_rng = random.Random(seed)
+        self._noise_array_rng = np.random.default_rng(seed)
 
     # --- connection ---
 
     def _open(self) -> None:
-        pass
+        # the minimum periods the emulated instrument's driver reports
+        for name in ("meas_period_min", "sweep_period_min", "acquisition_period_min"):
+            period = getattr(self.timing, name)
+            if period is not None:
+                setattr(self, name, period)
 
     def _close(self) -> None:
         # leave the emulated instrument safe, as a real driver would
@@ -93,68 +144,143 @@ class EmulatedSMU(BaseSMU):
 
     # --- diode model ---
 
-    def _isc(self) -> float:
-        return -1.0 * self.full_sun_reference_current
+    def _photocurrent(self, channel: SMUChannel) -> float:
+        if channel == SMUChannel.CELL and self.diode_model.photocurrent is not None:
+            return self.diode_model.photocurrent
+        return self.full_sun_reference_current
+
+    def _irradiance(self) -> float:
+        lamp = self.light_source
+        if lamp is None:
+            return 1.0
+        return lamp.light_int / 100.0 if lamp.light_is_on else 0.0
 
-    def _k(self) -> float:
-        return -self._isc() / math.exp(EMULATED_TAU * EMULATED_VOC - 1)
+    def _currents(
+        self, channel: SMUChannel, voltages: ArrayLike, lag: ArrayLike = 0.0
+    ) -> np.ndarray:
+        state = self._channels[channel]
+        i = self.diode_model.current(
+            voltages, self._photocurrent(channel), self._irradiance()
+        )
+        return np.clip(i + lag, -state.i_limit, state.i_limit)
 
     def _diode_current(self, channel: SMUChannel) -> float:
         state = self._channels[channel]
-        i = self._isc() + self._k() * math.exp(EMULATED_TAU * state.v_set - 1)
-        return min(max(i, -state.i_limit), state.i_limit)
+        lag = 0.0
+        if self.diode_model.capacitance > 0:
+            lag = self.diode_model.lag_current(
+                state.v_step, self.clock.time() - state.t_step
+            )
+        return float(self._currents(channel, state.v_set, lag))
 
     def _diode_voltage(self, channel: SMUChannel) -> float:
         state = self._channels[channel]
-        arg = (state.i_set - self._isc()) / self._k()
-        if arg <= 0.0:
-            # sourcing below Isc; legacy produced nan here, clamp instead
-            return -state.v_limit
-        v = (math.log(arg) + 1) / EMULATED_TAU
-        return min(max(v, -state.v_limit), state.v_limit)
+        v = self.diode_model.voltage(
+            state.i_set, self._photocurrent(channel), self._irradiance()
+        )
+        # sourcing below Isc gives -inf (legacy nan): clamped to -Vlimit
+        return float(np.clip(v, -state.v_limit, state.v_limit))
+
+    def _command(self) -> None:
+        if self.timing.command_latency > 0:
+            self.clock.sleep(self.timing.command_latency)
 
     def _integrate(self) -> None:
-        if self.integration_delay > 0:
-            time.sleep(self.integration_delay)
+        duration = self.timing.reading_overhead + self.integration_delay
+        if duration > 0:
+            self.clock.sleep(duration)
+
+    def _sweep_overhead(self, points: int) -> None:
+        duration = self.timing.sweep_overhead + self.timing.sweep_point_time * points
+        if duration > 0:
+            self.clock.sleep(duration)
 
     def _noisy(self, current: float) -> float:
         if self.current_noise > 0:
             current += self._noise_rng.gauss(0.0, self.current_noise)
         return current
 
+    def _noisy_array(self, currents: np.ndarray) -> np.ndarray:
+        if self.current_noise > 0:
+            currents = currents + self._noise_array_rng.normal(
+                0.0, self.current_noise, currents.shape
+            )
+        return currents
+
     # --- compliance and measurement configuration ---
 
+    @cached_setting
     def set_voltage_limit(self, channel: SMUChannel, voltage: float) -> None:
+        self._command()
         self._channels[channel].v_limit = abs(voltage)
 
+    @cached_setting
     def set_current_limit(self, channel: SMUChannel, current: float) -> None:
+        self._command()
         self._channels[channel].i_limit = abs(current)
 
+    @cached_setting
     def set_sense_mode(self, channel: SMUChannel, nwire: int) -> None:
+        self._command()
         self._channels[channel].nwire = int(nwire)
 
+    @cached_setting
     def setup_voltage_output(self, channel: SMUChannel, current_limit: float) -> None:
         self.set_current_limit(channel, current_limit)
+        self._command()
         self._channels[channel].source_mode = "voltage"
 
+    @cached_setting
     def setup_current_output(self, channel: SMUChannel, voltage_limit: float) -> None:
         self.set_voltage_limit(channel, voltage_limit)
+        self._command()
         self._channels[channel].source_mode = "current"
 
     # --- sourcing ---
 
+    def _source_voltage(self, channel: SMUChannel, voltage: float) -> None:
+        state = self._channels[channel]
+        if self.diode_model.capacitance > 0:
+            state.v_step = voltage - state.v_set
+            state.t_step = self.clock.time()
+        state.v_set = voltage
+
     def set_voltage(self, channel: SMUChannel, voltage: float) -> None:
-        self._channels[channel].v_set = voltage
+        self._command()
+        self._source_voltage(channel, voltage)
 
     def set_current(self, channel: SMUChannel, current: float) -> None:
+        self._command()
         self._channels[channel].i_set = current
 
     def enable_output(self, channel: SMUChannel) -> None:
+        self._command()
         self._channels[channel].output = True
 
     def disable_output(self, channel: SMUChannel) -> None:
+        self._command()
         self._channels[channel].output = False
 
+    def set_voltage_measure_current(
+        self, channel: SMUChannel, voltage: float, settle: float = 0.0
+    ) -> float:
+        if not self.timing.fused_set_measure:
+            return super().set_voltage_measure_current(channel, voltage, settle)
+        self._source_voltage(channel, voltage)
+        if settle > 0:
+            self.clock.sleep(settle)
+        return self.measure_current(channel)
+
+    def set_voltage_measure_both_currents(
+        self, voltage: float, settle: float = 0.0
+    ) -> tuple[float, float]:
+        if not self.timing.fused_set_measure:
+            return super().set_voltage_measure_both_currents(voltage, settle)
+        self._source_voltage(SMUChannel.CELL, voltage)
+        if settle > 0:
+            self.clock.sleep(settle)
+        return self.measure_both_currents()
+
     # --- measuring ---
 
     def measure_voltage(self, channel: SMUChannel) -> float:
@@ -202,8 +328,102 @@ class EmulatedSMU(BaseSMU):
             values.extend((i, v))
         return (values[0], values[1], values[2], values[3])
 
+    # --- bulk evaluation ---
+
+    def sweep(
+        self,
+        voltages: ArrayLike,
+        channel: SMUChannel = SMUChannel.CELL,
+        *,
+        interval: float = 0.0,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Step ``channel`` through ``voltages`` in one call.
+
+        Returns the voltage and current arrays. Each step takes
+        ``interval`` s on the device clock and is read at its end, which
+        is also when the capacitive lag of the step is evaluated; the
+        channel is left at the last voltage. Not part of the ``BaseSMU``
+        interface: this is the fast path for emulated benchmarks.
+        """
+        state = self._channels[channel]
+        v = np.asarray(voltages, dtype=float)
+        lag: ArrayLike = 0.0
+        if self.diode_model.capacitance > 0 and v.size:
+            steps = np.diff(v, prepend=state.v_set)
+            lag = self.diode_model.lag_current(steps, interval)
+            state.v_step = float(steps[-1])
+            state.t_step = self.clock.time() + interval * (v.size - 1)
+        i = self._noisy_array(self._currents(channel, v, lag))
+        if v.size:
+            state.v_set = float(v[-1])
+        if interval > 0:
+            self.clock.sleep(interval * v.size)
+        return v, i
+
+    # --- hardware sweep ---
+
+    def sweep_voltage(
+        self,
+        channel: SMUChannel,
+        start: float,
+        stop: float,
+        points: int,
+        interval: float,
+    ) -> Iterator[tuple[list[float], list[float]]]:
+        if self.sweep_period_min is None:
+            # not enabled: behave like an SMU without the capability
+            super().sweep_voltage(channel, start, stop, points, interval)
+        self._channels[channel].output = True
+        self._sweep_overhead(points)
+        step = (stop - start) / (points - 1) if points > 1 else 0.0
+        for first in range(0, points, SWEEP_CHUNK_SIZE):
+            k = np.arange(first, min(first + SWEEP_CHUNK_SIZE, points))
+            # the instrument needs one interval per step
+            voltages, currents = self.sweep(start + step * k, channel, interval=interval)
+            yield (voltages.tolist(), currents.tolist())
+
+    # --- buffered timed acquisition ---
+
+    def acquire_time_series(
+        self,
+        channel: SMUChannel,
+        quantity: str,
+        interval: float,
+        points: int,
+        *,
+        reference: bool = False,
+    ) -> Iterator[tuple[list[float], list[float], list[float]]]:
+        if self.acquisition_period_min is None:
+            # not enabled: behave like an SMU without the capability
+            super().acquire_time_series(
+                channel, quantity, interval, points, reference=reference
+            )
+        state = self._channels[channel]
+        measured = "voltage" if quantity == "v" else "current"
+        self._sweep_overhead(points)
+        for first in range(0, points, SWEEP_CHUNK_SIZE):
+            n = min(SWEEP_CHUNK_SIZE, points - first)
+            t = np.arange(first, first + n) * interval
+            if measured == state.source_mode:
+                level = state.v_set if measured == "voltage" else state.i_set
+                values = np.full(n, level)
+            elif measured == "voltage":
+                values = np.full(n, self._diode_voltage(channel))
+            else:
+                values = self._noisy_array(np.full(n, self._diode_current(channel)))
+            if reference:
+                i_ref = self._noisy_array(
+                    np.full(n, self._diode_current(SMUChannel.REFERENCE))
+                )
+            else:
+                i_ref = np.zeros(n)
+            # the instrument needs one interval per reading
+            self.clock.sleep(interval * n)
+            yield (t.tolist(), values.tolist(), i_ref.tolist())
+
     # --- safety ---
 
+    @clears_state_cache
     def turn_off(self) -> None:
         for state in self._channels.values():
             state.output = False
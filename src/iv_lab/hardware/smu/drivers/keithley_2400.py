@@ -10,7 +10,9 @@ switching between the front and rear terminals: every operation that
 targets a different channel than the currently active one first runs
 ``toggle_output_2400`` — output off, switch terminals, replay all cached
 per-channel settings, output back on if it was on. That behavior is
-preserved here in :meth:`_activate_channel`.
+preserved here in :meth:`_activate_channel`, except that only the
+settings that differ from what the instrument currently holds are sent
+(:attr:`Keithley2400FamilySMU.elided_writes` counts the skipped writes).
 
 Preserved legacy quirks:
 
@@ -27,17 +29,29 @@ Preserved legacy quirks:
   sent to the 2450.
 - Switching source mode while the output is on briefly disables the
   output (the instrument cannot change mode with output on).
+
+Single readings use a bare ``:READ?`` with ``:FORM:ELEM`` reduced to the
+one element needed (the 2450 returns only the reading anyway), and the
+sense function, NPLC and range last sent are cached so the source-mode
+setup does not re-send them.
+
+Beyond the legacy code, :meth:`Keithley2400FamilySMU.sweep_voltage` runs
+J-V staircases on the instrument (``:SOUR:VOLT:MODE SWE`` into the TRACE
+buffer on the 2400/2401, ``:SOUR:SWE:VOLT:LIN`` on the 2450) and reads
+all points back with one query, which avoids the per-point interface
+latency that limits ``meas_period_min``.
 """
 
 from __future__ import annotations
 
 import contextlib
+from collections.abc import Iterator
 from dataclasses import dataclass
 
 from iv_lab.config import SMUSettings
 from iv_lab.hardware.errors import HardwareCommandError
 
-from ..base import BaseSMU, SMUChannel
+from ..base import BaseSMU, SMUChannel, cached_setting, clears_state_cache
 from ..registry import register_smu_driver
 
 # Default RS-232 parameters for a serial Keithley 2400.  These must match the
@@ -53,6 +67,17 @@ _SERIAL_DEFAULTS = {
 #: Default VISA read timeout (ms).  Serial reads are slower than GPIB; a too
 #: short timeout turns a slow-but-valid read into a spurious VI_ERROR_TMO.
 _DEFAULT_TIMEOUT_MS = 5000.0
+#: Integration time per reading in s: selecting the source mode sets
+#: NPLC 1 (legacy), 20 ms at the 50 Hz line frequency.
+_INTEGRATION_TIME = 0.02
+#: Minimum point period of the hardware sweep: the integration time plus
+#: the per-point source, trigger and buffer overhead.
+SWEEP_PERIOD_MIN = 1 / 25
+#: Readings per hardware sweep (TRACE buffer size and maximum trigger
+#: count of the 2400). Longer scans run as consecutive sweeps.
+SWEEP_POINTS_MAX = 2500
+#: Interval in s between buffer polls while a hardware sweep runs.
+SWEEP_POLL_INTERVAL = 0.1
 
 
 @dataclass
@@ -103,6 +128,21 @@ class Keithley2400FamilySMU(BaseSMU):
             SMUChannel.REFERENCE: _ChannelState(),
         }
         self._current_channel = SMUChannel.CELL
+        #: Interval between buffer polls during a hardware sweep, in s.
+        self.sweep_poll_interval: float = SWEEP_POLL_INTERVAL
+        # sense settings known to be on the instrument (None: unknown),
+        # see _invalidate_sense_cache()
+        self._sense_function: str | None = None
+        self._sense_nplc: dict[str, float | None] = {}
+        self._sense_range: dict[str, float | str | None] = {}
+        self._form_elements: str | None = None
+        self._invalidate_sense_cache()
+        # source settings the instrument holds, by _ChannelState field
+        # name; missing keys are unknown
+        self._registers: dict[str, object] = {}
+        #: SCPI writes skipped by terminal switches because the instrument
+        #: already held the setting (reset on connect).
+        self.elided_writes: int = 0
 
     # --- connection (legacy connect/disconnect, 2400-family branch) ---
 
@@ -145,21 +185,26 @@ class Keithley2400FamilySMU(BaseSMU):
             self.smu = Keithley2400(self.visa_address, **kwargs)
 
         self.smu.reset()
+        self._invalidate_sense_cache()
+        self._registers = {"output": False}
+        self.elided_writes = 0
         self.smu.front_terminals_enabled = True
         self._current_channel = SMUChannel.CELL
 
-        self.smu.wires = 4 if self.sense_mode_a == "4 wire" else 2
+        wires = 4 if self.sense_mode_a == "4 wire" else 2
+        self.smu.wires = wires
+        self._registers["wires"] = wires
 
         # measurement integration time in power line cycles
         if self.meas_speed == "fast":
-            self.smu.voltage_nplc = 0.01
-            self.smu.current_nplc = 0.01
+            nplc = 0.01
         elif self.meas_speed == "medium":
-            self.smu.voltage_nplc = 0.1
-            self.smu.current_nplc = 0.1
+            nplc = 0.1
         else:  # 'normal'
-            self.smu.voltage_nplc = 1
-            self.smu.current_nplc = 1
+            nplc = 1
+        self.smu.voltage_nplc = nplc
+        self.smu.current_nplc = nplc
+        self._sense_nplc = {"voltage": nplc, "current": nplc}
 
         # measurement speed is limited by the interface on the 2400;
         # legacy measured values for serial vs. GPIB
@@ -167,11 +212,14 @@ class Keithley2400FamilySMU(BaseSMU):
             self.meas_period_min = 1 / 6
         else:
             self.meas_period_min = 1 / 8.5
+        # the hardware sweep only talks to the instrument once per sweep
+        self.sweep_period_min = SWEEP_PERIOD_MIN
 
         self.smu.source_current_range = 0.01
         self.smu.compliance_current = 0.01
         self.smu.source_voltage_range = 2.0
         self.smu.compliance_voltage = 2.0
+        self._registers.update(i_limit=0.01, v_limit=2.0)
         self.smu.trigger_delay = 0.0
         self.smu.source_delay = 0.0
 
@@ -186,6 +234,54 @@ class Keithley2400FamilySMU(BaseSMU):
         with contextlib.suppress(Exception):
             self.smu.adapter.close()
 
+    def io_transports(self) -> tuple:
+        # the VISA resource under pymeasure's adapter (the SCPI messages)
+        connection = getattr(getattr(self.smu, "adapter", None), "connection", None)
+        return (connection,) if self.is_connected() and connection is not None else ()
+
+    # --- cached sense settings ---
+
+    def _invalidate_sense_cache(self) -> None:
+        """Forget the cached sense settings (after a reset or connect)."""
+        self._sense_function = None
+        self._sense_nplc = {"voltage": None, "current": None}
+        self._sense_range = {"voltage": None, "current": None}
+        self._form_elements = None
+
+    def _select_sense_function(self, function: str) -> None:
+        """Select the ``'CURR'`` / ``'VOLT'`` sense function if not active."""
+        if self._sense_function != function:
+            self.smu.write(f":SENS:FUNC '{function}'")
+            self._sense_function = function
+
+    def _set_sense_nplc(self, quantity: str, nplc: float) -> None:
+        """Set the ``'voltage'`` / ``'current'`` integration time in NPLC."""
+        if self._sense_nplc[quantity] != nplc:
+            setattr(self.smu, f"{quantity}_nplc", nplc)
+            self._sense_nplc[quantity] = nplc
+
+    def _set_sense_range(self, quantity: str, sense_range: float | str) -> None:
+        """Set a fixed ``quantity`` measurement range, or ``"auto"``."""
+        if self._sense_range[quantity] == sense_range:
+            return
+        if sense_range == "auto":
+            setattr(self.smu, f"{quantity}_range_auto_enabled", True)
+        else:
+            setattr(self.smu, f"{quantity}_range", sense_range)
+        self._sense_range[quantity] = sense_range
+
+    def _read(self, element: str) -> float:
+        """One ``'VOLT'`` / ``'CURR'`` reading with a bare ``:READ?``.
+
+        On the 2400/2401 only ``element`` is returned (``:FORM:ELEM``);
+        the 2450 returns just the sense function's reading (legacy
+        pymeasure behavior).
+        """
+        if self.model != "2450" and self._form_elements != element:
+            self.smu.write(f":FORM:ELEM {element}")
+            self._form_elements = element
+        return float(self.smu.ask(":READ?"))
+
     # --- channel switching (legacy toggle_output_2400) ---
 
     def _activate_channel(self, channel: SMUChannel) -> None:
@@ -195,11 +291,16 @@ class Keithley2400FamilySMU(BaseSMU):
         self._current_channel = channel
         self._toggle_output_2400(channel)
 
+    def _select_channel(self, channel: SMUChannel) -> None:
+        # settings skipped by the state cache still select the terminals
+        self._activate_channel(channel)
+
     def _toggle_output_2400(self, channel: SMUChannel) -> None:
         state = self._channels[channel]
 
         # first disable the sourcemeter output
         self.smu.disable_source()
+        self._registers["output"] = False
 
         # front terminals are the cell, rear terminals the reference diode
         if channel == SMUChannel.CELL:
@@ -208,79 +309,132 @@ class Keithley2400FamilySMU(BaseSMU):
         else:
             self.smu.front_terminals_enabled = False
             sense_mode = self.sense_mode_b
-        self.smu.wires = 4 if sense_mode == "4 wire" else 2
-
-        # replay the cached channel settings (legacy order)
-        self.set_voltage_limit(channel, state.v_limit)
-        self.set_current_limit(channel, state.i_limit)
-
-        if state.curr_autorange:
+        wires = 4 if sense_mode == "4 wire" else 2
+        if self._differs("wires", wires, writes=1):
+            self.smu.wires = wires
+            self._registers["wires"] = wires
+        # the wire mode now follows the channel's sense mode setting
+        self.invalidate_state_cache("set_sense_mode")
+
+        # replay the cached channel settings (legacy order), skipping what
+        # the instrument already holds
+        # (the limits bypass the state cache, which holds this channel's
+        # values while the instrument may hold the other channel's)
+        if self._differs("v_limit", state.v_limit, writes=2):
+            self._write_voltage_limit(channel, state.v_limit)
+        if self._differs("i_limit", state.i_limit, writes=2):
+            self._write_current_limit(channel, state.i_limit)
+
+        current_range = "auto" if state.curr_autorange else state.i_range
+        if self._sense_range["current"] == current_range:
+            self.elided_writes += 1
+        elif state.curr_autorange:
             self.enable_current_autorange(channel)
         else:
             self.set_current_range(channel, state.i_range)
 
-        if state.volt_autorange:
+        voltage_range = "auto" if state.volt_autorange else state.v_range
+        if self._sense_range["voltage"] == voltage_range:
+            self.elided_writes += 1
+        elif state.volt_autorange:
             self.enable_voltage_autorange(channel)
         else:
             self.set_voltage_range(channel, state.v_range)
 
-        self.set_current(channel, state.i_set)
-        self.set_voltage(channel, state.v_set)
-
-        if state.source_mode == "current":
-            self.set_mode_current_source(channel)
-            self.display_voltage(channel)
-        else:
-            self.set_mode_voltage_source(channel)
-            self.display_current(channel)
+        if self._differs("i_set", state.i_set, writes=1):
+            self.set_current(channel, state.i_set)
+        if self._differs("v_set", state.v_set, writes=1):
+            self.set_voltage(channel, state.v_set)
+
+        # the mode setup also selects the matching display
+        if self._differs("source_mode", state.source_mode, writes=1):
+            if state.source_mode == "current":
+                self.set_mode_current_source(channel)
+            else:
+                self.set_mode_voltage_source(channel)
+        display_writes = 0 if self.model == "2450" else 1
+        if self._differs("display_mode", state.display_mode, writes=display_writes):
+            if state.display_mode == "voltage":
+                self.display_voltage(channel)
+            else:
+                self.display_current(channel)
 
         # re-enable the output if it was on before
         if state.output:
             self.enable_output(channel)
 
+    def _differs(self, register: str, value: object, *, writes: int) -> bool:
+        """Whether the instrument's ``register`` is not known to be ``value``.
+
+        Counts the ``writes`` saved when it already is.
+        """
+        if register in self._registers and self._registers[register] == value:
+            self.elided_writes += writes
+            return False
+        return True
+
     # --- compliance, ranges, autorange ---
 
+    @cached_setting
     def set_current_limit(self, channel: SMUChannel, current: float) -> None:
         self._activate_channel(channel)
+        self._write_current_limit(channel, current)
+
+    def _write_current_limit(self, channel: SMUChannel, current: float) -> None:
         self.smu.source_current_range = current
         self.smu.compliance_current = current
+        # the compliance can move the current measurement range
+        self._sense_range["current"] = None
+        self._registers["i_limit"] = current
         self._channels[channel].i_limit = current
 
+    @cached_setting
     def set_voltage_limit(self, channel: SMUChannel, voltage: float) -> None:
         self._activate_channel(channel)
+        self._write_voltage_limit(channel, voltage)
+
+    def _write_voltage_limit(self, channel: SMUChannel, voltage: float) -> None:
         self.smu.source_voltage_range = voltage
         self.smu.compliance_voltage = voltage
+        self._sense_range["voltage"] = None
+        self._registers["v_limit"] = voltage
         self._channels[channel].v_limit = voltage
 
     def enable_current_autorange(self, channel: SMUChannel) -> None:
         self._activate_channel(channel)
         self.smu.write(":CURR:RANG:AUTO ON")
+        self._sense_range["current"] = "auto"
         self._channels[channel].curr_autorange = True
 
     def enable_voltage_autorange(self, channel: SMUChannel) -> None:
         self._activate_channel(channel)
         self.smu.write(":VOLT:RANG:AUTO ON")
+        self._sense_range["voltage"] = "auto"
         self._channels[channel].volt_autorange = True
 
     def disable_current_autorange(self, channel: SMUChannel) -> None:
         self._activate_channel(channel)
         self.smu.write(":CURR:RANG:AUTO OFF")
+        self._sense_range["current"] = None  # fixed at whatever range was active
         self._channels[channel].curr_autorange = False
 
     def disable_voltage_autorange(self, channel: SMUChannel) -> None:
         self._activate_channel(channel)
         self.smu.write(":VOLT:RANG:AUTO OFF")
+        self._sense_range["voltage"] = None
         self._channels[channel].volt_autorange = False
 
     def set_current_range(self, channel: SMUChannel, current_range: float) -> None:
         # setting a fixed measurement range disables autorange
         self._activate_channel(channel)
         self.smu.current_range = current_range
+        self._sense_range["current"] = current_range
         self._channels[channel].i_range = current_range
 
     def set_voltage_range(self, channel: SMUChannel, voltage_range: float) -> None:
         self._activate_channel(channel)
         self.smu.voltage_range = voltage_range
+        self._sense_range["voltage"] = voltage_range
         self._channels[channel].v_range = voltage_range
 
     # --- source mode (legacy set_mode_*_source) ---
@@ -302,14 +456,13 @@ class Keithley2400FamilySMU(BaseSMU):
         # autoranged measurement clamps the source compliance to whatever
         # range it auto-selects (the 100 uA default at low signal). Honor the
         # channel's actual autorange state instead: fixed range when off.
-        self.smu.write(":SENS:FUNC 'VOLT'")
-        self.smu.voltage_nplc = 1
-        if state.volt_autorange:
-            self.smu.voltage_range_auto_enabled = True
-        else:
-            self.smu.voltage_range = state.v_range
+        # Only what differs from the cached sense settings is sent.
+        self._select_sense_function("VOLT")
+        self._set_sense_nplc("voltage", 1)
+        self._set_sense_range("voltage", "auto" if state.volt_autorange else state.v_range)
         if state.output:
             self.smu.enable_source()
+        self._registers["source_mode"] = "current"
         state.source_mode = "current"
 
         self.display_voltage(channel)
@@ -326,14 +479,12 @@ class Keithley2400FamilySMU(BaseSMU):
         # autorange here (the legacy behavior) drops the current range back to
         # its 100 uA default, which clamps the source current compliance to
         # ~105 uA -- so when autorange is off, apply the fixed range instead.
-        self.smu.write(":SENS:FUNC 'CURR'")
-        self.smu.current_nplc = 1
-        if state.curr_autorange:
-            self.smu.current_range_auto_enabled = True
-        else:
-            self.smu.current_range = state.i_range
+        self._select_sense_function("CURR")
+        self._set_sense_nplc("current", 1)
+        self._set_sense_range("current", "auto" if state.curr_autorange else state.i_range)
         if state.output:
             self.smu.enable_source()
+        self._registers["source_mode"] = "voltage"
         state.source_mode = "voltage"
 
         self.display_current(channel)
@@ -344,16 +495,19 @@ class Keithley2400FamilySMU(BaseSMU):
         self._activate_channel(channel)
         if self.model != "2450":
             self.smu.write("SYST:KEY 15")  # set voltage display
+        self._registers["display_mode"] = "voltage"
         self._channels[channel].display_mode = "voltage"
 
     def display_current(self, channel: SMUChannel) -> None:
         self._activate_channel(channel)
         if self.model != "2450":
             self.smu.write("SYST:KEY 22")  # set current display
+        self._registers["display_mode"] = "current"
         self._channels[channel].display_mode = "current"
 
     # --- setup helpers (legacy setup_voltage_output/setup_current_output) ---
 
+    @cached_setting
     def setup_voltage_output(self, channel: SMUChannel, current_limit: float) -> None:
         self.set_current_limit(channel, current_limit)
         if self.autorange:
@@ -363,6 +517,7 @@ class Keithley2400FamilySMU(BaseSMU):
             self.set_current_range(channel, current_limit)
         self.set_mode_voltage_source(channel)
 
+    @cached_setting
     def setup_current_output(self, channel: SMUChannel, voltage_limit: float) -> None:
         self.set_voltage_limit(channel, voltage_limit)
         if self.autorange:
@@ -377,25 +532,30 @@ class Keithley2400FamilySMU(BaseSMU):
     def set_voltage(self, channel: SMUChannel, voltage: float) -> None:
         self._activate_channel(channel)
         self.smu.source_voltage = voltage
+        self._registers["v_set"] = voltage
         self._channels[channel].v_set = voltage
 
     def set_current(self, channel: SMUChannel, current: float) -> None:
         self._activate_channel(channel)
         self.smu.source_current = current
+        self._registers["i_set"] = current
         self._channels[channel].i_set = current
 
     def enable_output(self, channel: SMUChannel) -> None:
         self._activate_channel(channel)
         self.smu.enable_source()
+        self._registers["output"] = True
         self._channels[channel].output = True
 
     def disable_output(self, channel: SMUChannel) -> None:
         self._activate_channel(channel)
         self.smu.disable_source()
+        self._registers["output"] = False
         self._channels[channel].output = False
 
     # --- sensing ---
 
+    @cached_setting
     def set_sense_mode(self, channel: SMUChannel, nwire: int) -> None:
         self._activate_channel(channel)
         if int(nwire) not in (2, 4):
@@ -403,14 +563,15 @@ class Keithley2400FamilySMU(BaseSMU):
                 f"sense mode {nwire} is not supported. Valid values are 2 and 4"
             )
         self.smu.wires = int(nwire)
+        self._registers["wires"] = int(nwire)
 
     # --- measuring (legacy: no channel switch, reads the active terminals) ---
 
     def measure_voltage(self, channel: SMUChannel) -> float:
-        return self.smu.voltage
+        return self._read("VOLT")
 
     def measure_current(self, channel: SMUChannel) -> float:
-        return self.smu.current
+        return self._read("CURR")
 
     def measure_both_currents(self) -> tuple[float, float]:
         raise HardwareCommandError(
@@ -421,12 +582,91 @@ class Keithley2400FamilySMU(BaseSMU):
     def measure_iv_point(self, channel: SMUChannel) -> tuple[float, float]:
         # legacy: "2400 doesn't like to read voltage in voltage mode",
         # so the set voltage is returned instead of a measured one
-        return (self.smu.current, self._channels[channel].v_set)
+        return (self._read("CURR"), self._channels[channel].v_set)
+
+    # --- hardware sweep ---
+
+    def sweep_voltage(
+        self,
+        channel: SMUChannel,
+        start: float,
+        stop: float,
+        points: int,
+        interval: float,
+    ) -> Iterator[tuple[list[float], list[float]]]:
+        self._activate_channel(channel)
+        state = self._channels[channel]
+        # settle for the rest of each step so the reading ends the step,
+        # like the point-by-point scan
+        settling_time = max(0.0, interval - _INTEGRATION_TIME)
+        step = (stop - start) / (points - 1) if points > 1 else 0.0
+        try:
+            for first in range(0, points, SWEEP_POINTS_MAX):
+                count = min(SWEEP_POINTS_MAX, points - first)
+                level_start = start + step * first
+                level_stop = start + step * (first + count - 1)
+                if self.model == "2450":
+                    values = self._sweep_2450(
+                        level_start, level_stop, count, settling_time
+                    )
+                else:
+                    values = self._sweep_2400(
+                        level_start, level_stop, count, settling_time
+                    )
+                state.v_set = level_stop
+                yield (values[0::2], values[1::2])
+        finally:
+            self.smu.write(":ABOR")
+            if self.model != "2450":
+                self.smu.write(
+                    ":SOUR:VOLT:MODE FIX;:TRIG:COUN 1;:SOUR:DEL 0;:TRAC:FEED:CONT NEV"
+                )
+            # hold the last level reached
+            self.smu.source_voltage = state.v_set
+            self._registers["v_set"] = state.v_set
+
+    def _sweep_2400(
+        self, start: float, stop: float, points: int, settling_time: float
+    ) -> list[float]:
+        """One ``SWE`` mode sweep into the TRACE buffer; ``[v, i, v, i, ...]``."""
+        self.smu.write(
+            f":SOUR:VOLT:STAR {start};:SOUR:VOLT:STOP {stop};"
+            f":SOUR:SWE:POIN {points};:SOUR:SWE:SPAC LIN;:SOUR:VOLT:MODE SWE"
+        )
+        self.smu.write(
+            f":SOUR:DEL {settling_time};:TRIG:COUN {points};:FORM:ELEM VOLT,CURR"
+        )
+        self._form_elements = "VOLT,CURR"
+        self.smu.write(
+            f":TRAC:CLE;:TRAC:POIN {points};:TRAC:FEED SENS;:TRAC:FEED:CONT NEXT"
+        )
+        self.smu.write(":INIT")
+        self._wait_for_readings(":TRAC:POIN:ACT?", points)
+        return self.smu.values(":TRAC:DATA?")
+
+    def _sweep_2450(
+        self, start: float, stop: float, points: int, settling_time: float
+    ) -> list[float]:
+        """One linear sweep into ``defbuffer1``; ``[v, i, v, i, ...]``."""
+        self.smu.write(':TRAC:CLE "defbuffer1"')
+        self.smu.write(f":SOUR:SWE:VOLT:LIN {start}, {stop}, {points}, {settling_time}")
+        self.smu.write(":INIT")
+        self._wait_for_readings(':TRAC:ACT? "defbuffer1"', points)
+        return self.smu.values(f':TRAC:DATA? 1, {points}, "defbuffer1", SOUR, READ')
+
+    def _wait_for_readings(self, count_query: str, points: int) -> None:
+        """Poll the buffer count until the sweep has stored ``points``."""
+        while True:
+            self.clock.sleep(self.sweep_poll_interval)
+            if int(float(self.smu.ask(count_query))) >= points:
+                return
 
     # --- safety ---
 
+    @clears_state_cache
     def turn_off(self) -> None:
         self.smu.disable_source()
+        self._registers["output"] = False
         # the legacy code did not update its cached output state here; we
         # mark the outputs off so a later terminal switch cannot silently
         # re-enable the source (physical state is identical)
@@ -16,15 +16,64 @@ Both channels can be read in the same measurement cycle through the
 parent ``SMU26xx`` object (legacy ``CHAN_BOTH``), which is what enables
 parallel reference-diode measurement during scans
 (``reference_diode_parallel``).
+
+J-V scans faster than the point-by-point loop allows run as a hardware
+staircase sweep (:meth:`Keithley26xxSMU.sweep_voltage`): the sweep is
+programmed into the instrument's trigger model and the readings are
+collected from ``nvbuffer1`` in chunks while it runs. MPP tracking can
+run on the instrument as well (:meth:`Keithley26xxSMU.track_mpp`): a TSP
+script runs the perturb-and-observe loop at the instrument's native rate
+and the host only collects the records. The TSP for both is in
+``_keithley26xx_tsp``; the bundled library is kept verbatim.
+
+On connect, a small TSP function library is loaded so the hot-path
+single-point operations (set the voltage and read the current, read both
+channels) are one short function call and one query each.
+
+Configuration sequences (connect, output setup, reference diode setup,
+and the protocols' :meth:`~BaseSMU.batch` blocks) are sent as one Lua
+chunk with a single error-queue check instead of one check per command.
 """
 
 from __future__ import annotations
 
+import contextlib
+from collections.abc import Iterator
+
 from iv_lab.config import SMUSettings
 from iv_lab.hardware.errors import HardwareCommandError
 
-from ..base import BaseSMU, SMUChannel
+from ..base import BaseSMU, SMUChannel, cached_setting, clears_state_cache
 from ..registry import register_smu_driver
+from . import _keithley26xx_tsp as tsp
+
+#: Integration time per reading in s for each measurement speed (NPLC
+#: 0.01 / 0.1 / 1 at the 50 Hz line frequency).
+INTEGRATION_TIMES = {"fast": 0.0002, "medium": 0.002, "normal": 0.02}
+#: Minimum point period of the hardware sweep for each measurement speed:
+#: the integration time plus the per-point trigger and buffer overhead.
+SWEEP_PERIOD_MIN = {"fast": 1 / 1000, "medium": 1 / 250, "normal": 1 / 40}
+#: Interval in s between buffer polls while a hardware sweep or a timed
+#: acquisition runs.
+SWEEP_POLL_INTERVAL = 0.1
+#: Minimum sample period of buffered timed readings for each measurement
+#: speed: the integration time plus the per-reading buffer overhead.
+ACQUISITION_PERIOD_MIN = {"fast": 1 / 2000, "medium": 1 / 400, "normal": 1 / 45}
+#: Readings per timed acquisition run: ``nvbuffer1`` holds a bit more
+#: than 60000 timestamped readings. Longer series run back to back.
+ACQUISITION_POINTS_MAX = 60000
+#: Minimum sample period of the on-instrument MPP tracker for each
+#: measurement speed: cell I-V and reference diode readings plus the
+#: source update.
+MPP_PERIOD_MIN = {"fast": 1 / 500, "medium": 1 / 150, "normal": 1 / 20}
+#: Extra time in s a record read of the on-instrument MPP tracker waits
+#: beyond the record interval before it times out.
+MPP_RECORD_TIMEOUT_MARGIN = 1.0
+#: Longest settling delay in s run on the instrument by the fused
+#: set-and-read functions: the query blocks for it, and with the reading
+#: it must stay well inside the library's 1 s VISA timeout. Abort is also
+#: only seen between queries.
+SETTLE_ON_INSTRUMENT_MAX = 0.25
 
 
 @register_smu_driver("Keithley", "2600", "2602")
@@ -50,7 +99,20 @@ class Keithley26xxSMU(BaseSMU):
         self.sense_mode_b: str = settings.referenceDiodeSenseMode
 
         self.smu = None  # SMU26xx instance, created in _open()
+        # the preloaded set-and-read functions delay on the instrument
+        self.settle_on_instrument = SETTLE_ON_INSTRUMENT_MAX
         self._channel_objects: dict[SMUChannel, object] = {}
+        #: TSP channel letters (``smua`` / ``smub``) for the TSP helpers.
+        self._channel_names: dict[SMUChannel, str] = {}
+        #: Integration time per reading in s (set on connect).
+        self.integration_time: float = INTEGRATION_TIMES["normal"]
+        #: Interval between buffer reads during a hardware sweep or a
+        #: timed acquisition, in s.
+        self.sweep_poll_interval: float = SWEEP_POLL_INTERVAL
+        # the MPP tracker script is loaded on first use after connecting
+        self._mpp_script_loaded = False
+        # active command batch (see batch())
+        self._batch: tsp.CommandBatch | None = None
 
     def _chan(self, channel: SMUChannel):
         """Return the Keithley26XX channel object (legacy ``k`` / ``kb``)."""
@@ -67,7 +129,25 @@ class Keithley26xxSMU(BaseSMU):
             SMUChannel.CELL: self.smu.get_channel(SMU26xx.CHANNEL_A),
             SMUChannel.REFERENCE: self.smu.get_channel(SMU26xx.CHANNEL_B),
         }
+        self._channel_names = {
+            SMUChannel.CELL: SMU26xx.CHANNEL_A,
+            SMUChannel.REFERENCE: SMU26xx.CHANNEL_B,
+        }
+
+        tsp.load_script(self.smu, tsp.FUNCTION_LIBRARY_NAME, tsp.FUNCTION_LIBRARY)
+
+        with self.batch():
+            self._configure()
 
+        speed = self.meas_speed if self.meas_speed in INTEGRATION_TIMES else "normal"
+        self.integration_time = INTEGRATION_TIMES[speed]
+        self.sweep_period_min = SWEEP_PERIOD_MIN[speed]
+        self.mpp_period_min = MPP_PERIOD_MIN[speed]
+        self.acquisition_period_min = ACQUISITION_PERIOD_MIN[speed]
+        self._mpp_script_loaded = False
+
+    def _configure(self) -> None:
+        """Initial channel configuration (legacy connect, 2602 branch)."""
         # initial voltage and current range settings, used if autoranging is off
         for channel in (SMUChannel.CELL, SMUChannel.REFERENCE):
             self._chan(channel).set_voltage_range(2)
@@ -101,11 +181,37 @@ class Keithley26xxSMU(BaseSMU):
     def _close(self) -> None:
         self.smu.disconnect()
 
+    def io_transports(self) -> tuple:
+        # the library's TSP calls and the VISA messages under them
+        return (self.smu, tsp._visa_resource(self.smu)) if self.is_connected() else ()
+
+    # --- command batching ---
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        if self._batch is not None:
+            # nested: the outer batch sends everything
+            yield
+            return
+        self._batch = tsp.CommandBatch(self.smu)
+        try:
+            with self._batch:
+                yield
+        except Exception:
+            # batched command errors surface here, after the cached
+            # settings were recorded
+            self.invalidate_state_cache()
+            raise
+        finally:
+            self._batch = None
+
     # --- compliance, ranges, autorange ---
 
+    @cached_setting
     def set_current_limit(self, channel: SMUChannel, current: float) -> None:
         self._chan(channel).set_current_limit(current)
 
+    @cached_setting
     def set_voltage_limit(self, channel: SMUChannel, voltage: float) -> None:
         self._chan(channel).set_voltage_limit(voltage)
 
@@ -147,23 +253,31 @@ class Keithley26xxSMU(BaseSMU):
 
     # --- setup helpers (legacy setup_voltage_output/setup_current_output) ---
 
+    @cached_setting
     def setup_voltage_output(self, channel: SMUChannel, current_limit: float) -> None:
-        self.set_current_limit(channel, current_limit)
-        if self.autorange:
-            self.enable_current_autorange(channel)
-        else:
-            self.disable_current_autorange(channel)
-            self.set_current_range(channel, current_limit)
-        self.set_mode_voltage_source(channel)
+        with self.batch():
+            self.set_current_limit(channel, current_limit)
+            if self.autorange:
+                self.enable_current_autorange(channel)
+            else:
+                self.disable_current_autorange(channel)
+                self.set_current_range(channel, current_limit)
+            self.set_mode_voltage_source(channel)
 
+    @cached_setting
     def setup_current_output(self, channel: SMUChannel, voltage_limit: float) -> None:
-        self.set_voltage_limit(channel, voltage_limit)
-        if self.autorange:
-            self.enable_voltage_autorange(channel)
-        else:
-            self.disable_voltage_autorange(channel)
-            self.set_voltage_range(channel, voltage_limit)
-        self.set_mode_current_source(channel)
+        with self.batch():
+            self.set_voltage_limit(channel, voltage_limit)
+            if self.autorange:
+                self.enable_voltage_autorange(channel)
+            else:
+                self.disable_voltage_autorange(channel)
+                self.set_voltage_range(channel, voltage_limit)
+            self.set_mode_current_source(channel)
+
+    def setup_reference_diode(self) -> None:
+        with self.batch():
+            super().setup_reference_diode()
 
     # --- sourcing ---
 
@@ -188,6 +302,7 @@ class Keithley26xxSMU(BaseSMU):
         else:
             self._chan(channel).set_sense_2wire()
 
+    @cached_setting
     def set_sense_mode(self, channel: SMUChannel, nwire: int) -> None:
         if int(nwire) == 4:
             self._chan(channel).set_sense_4wire()
@@ -204,28 +319,183 @@ class Keithley26xxSMU(BaseSMU):
         return self._chan(channel).measure_voltage()
 
     def measure_current(self, channel: SMUChannel) -> float:
-        return self._chan(channel).measure_current()
+        (i,) = tsp.call(self.smu, "ivl_meas_i", f"smu{self._channel_names[channel]}")
+        return i
 
     def measure_both_currents(self) -> tuple[float, float]:
         # legacy measure_current("CHAN_BOTH"): both channels in the same
-        # measurement cycle through the parent SMU26xx object, returning
-        # [i_channel_a, i_channel_b]
-        i_cell, i_ref = self.smu.measure_current()
+        # measurement cycle, [i_channel_a, i_channel_b] (preloaded function
+        # instead of the library's multi-statement CHANNEL_ALL read)
+        i_cell, i_ref = tsp.call(self.smu, "ivl_both_i")
+        return (i_cell, i_ref)
+
+    def set_voltage_measure_current(
+        self, channel: SMUChannel, voltage: float, settle: float = 0.0
+    ) -> float:
+        if settle > self.settle_on_instrument:
+            # too long to block in one query: wait on the host
+            return super().set_voltage_measure_current(channel, voltage, settle)
+        (i,) = tsp.call(
+            self.smu,
+            "ivl_setv_meas_i",
+            f"smu{self._channel_names[channel]}",
+            voltage,
+            max(0.0, settle),
+        )
+        return i
+
+    def set_voltage_measure_both_currents(
+        self, voltage: float, settle: float = 0.0
+    ) -> tuple[float, float]:
+        if settle > self.settle_on_instrument:
+            return super().set_voltage_measure_both_currents(voltage, settle)
+        i_cell, i_ref = tsp.call(self.smu, "ivl_setv_both_i", voltage, max(0.0, settle))
         return (i_cell, i_ref)
 
     def measure_iv_point(self, channel: SMUChannel) -> tuple[float, float]:
         # legacy measure_current_and_voltage: channel returns [i, v]
-        i, v = self._chan(channel).measure_current_and_voltage()
+        i, v = tsp.call(self.smu, "ivl_meas_iv", f"smu{self._channel_names[channel]}")
         return (i, v)
 
     def measure_both_iv_points(self) -> tuple[float, float, float, float]:
-        # legacy measure_current_and_voltage("CHAN_BOTH") through the
-        # parent SMU26xx object: [i_a, v_a, i_b, v_b] in one cycle
-        i_cell, v_cell, i_ref, v_ref = self.smu.measure_current_and_voltage()
+        # legacy measure_current_and_voltage("CHAN_BOTH"):
+        # [i_a, v_a, i_b, v_b] in one cycle
+        i_cell, v_cell, i_ref, v_ref = tsp.call(self.smu, "ivl_both_iv")
         return (i_cell, v_cell, i_ref, v_ref)
 
+    def check_errors(self) -> None:
+        tsp.check_errors(self.smu)
+
+    # --- hardware sweep ---
+
+    def sweep_voltage(
+        self,
+        channel: SMUChannel,
+        start: float,
+        stop: float,
+        points: int,
+        interval: float,
+    ) -> Iterator[tuple[list[float], list[float]]]:
+        name = self._channel_names[channel]
+        # settle for the rest of each step so the reading ends the step,
+        # like the point-by-point scan
+        settling_time = max(0.0, interval - self.integration_time)
+        tsp.start_voltage_sweep(self.smu, name, start, stop, settling_time, points)
+        collected = 0
+        try:
+            while collected < points:
+                self.clock.sleep(self.sweep_poll_interval)
+                available = tsp.get_buffer_count(self.smu, name)
+                if available > collected:
+                    i, v = tsp.read_buffer(
+                        self.smu, name, collected + 1, available,
+                        fields=("readings", "sourcevalues"),
+                    )
+                    collected = available
+                    yield (v.tolist(), i.tolist())
+        finally:
+            # also restores the source delay changed for the sweep
+            tsp.abort_sweep(self.smu, name)
+
+    # --- buffered timed acquisition ---
+
+    def acquire_time_series(
+        self,
+        channel: SMUChannel,
+        quantity: str,
+        interval: float,
+        points: int,
+        *,
+        reference: bool = False,
+    ) -> Iterator[tuple[list[float], list[float], list[float]]]:
+        name = self._channel_names[channel]
+        readings = [(name, quantity)]
+        if reference:
+            readings.append((self._channel_names[SMUChannel.REFERENCE], "i"))
+        channels = [c for c, _ in readings]
+        t_first: float | None = None
+        remaining = points
+        try:
+            while remaining > 0:
+                run_points = min(remaining, ACQUISITION_POINTS_MAX)
+                tsp.start_acquisition(self.smu, readings, interval, run_points)
+                t_offset: float | None = None
+                collected = 0
+                while collected < run_points:
+                    self.clock.sleep(self.sweep_poll_interval)
+                    available = min(tsp.get_buffer_count(self.smu, c) for c in channels)
+                    if available <= collected:
+                        continue
+                    if t_offset is None:
+                        # timestamps restart with each run
+                        t_base = tsp.get_base_timestamp(self.smu, name)
+                        if t_first is None:
+                            t_first = t_base
+                        t_offset = t_base - t_first
+                    values, t = tsp.read_buffer(
+                        self.smu, name, collected + 1, available,
+                        fields=("readings", "timestamps"),
+                    )
+                    if reference:
+                        (i_ref,) = tsp.read_buffer(
+                            self.smu, channels[1], collected + 1, available,
+                            fields=("readings",),
+                        )
+                        i_ref = i_ref.tolist()
+                    else:
+                        i_ref = [0.0] * len(values)
+                    collected = available
+                    yield ((t + t_offset).tolist(), values.tolist(), i_ref)
+                remaining -= run_points
+        finally:
+            tsp.abort_acquisition(self.smu, channels)
+
+    # --- on-instrument MPP tracking ---
+
+    def track_mpp(
+        self,
+        v_start: float,
+        v_limit: float,
+        voltage_steps: tuple[float, float, float],
+        interval: float,
+        duration: float,
+        *,
+        reference: bool = False,
+    ) -> Iterator[tuple[list[float], list[float], list[float], list[float]]]:
+        # the script tracks on channel A and reads the diode on channel B
+        if not self._mpp_script_loaded:
+            tsp.load_script(self.smu, tsp.MPP_TRACKER_SCRIPT_NAME, tsp.MPP_TRACKER_SCRIPT)
+            self._mpp_script_loaded = True
+
+        # sample as fast as the instrument allows, one record per interval
+        decimation = max(1, int(interval / self.mpp_period_min))
+        tsp.start_mpp_tracker(
+            self.smu,
+            v_start,
+            voltage_steps,
+            v_limit,
+            interval / decimation,
+            decimation,
+            duration,
+            reference,
+        )
+        # the instrument tracks on its own; the host only reads the records
+        tsp.run_mpp_tracker(self.smu)
+        timeout = interval + MPP_RECORD_TIMEOUT_MARGIN
+        running = True
+        try:
+            while (record := tsp.read_mpp_record(self.smu, timeout)) is not None:
+                t, v, i, i_ref = record
+                yield ([t], [v], [i], [i_ref])
+            running = False
+        finally:
+            if running:
+                # closed early or failed: stop the script
+                tsp.stop_mpp_tracker(self.smu)
+
     # --- safety ---
 
+    @clears_state_cache
     def turn_off(self) -> None:
         # legacy turn_off for the 2602: disable both channel outputs
         self._chan(SMUChannel.CELL).disable_output()
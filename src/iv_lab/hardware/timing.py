@@ -0,0 +1,213 @@
+"""Timing profiles for the emulated devices.
+
+By default the emulated SMU spends the legacy 20 ms integration time per
+reading and nothing else, the emulated lamp switches instantly, and the
+emulated Arduino stage does not settle. A timing profile makes an
+emulated device spend, on its ``clock``, the time the real device takes:
+per-command latency, reading time, hardware sweep overhead, lamp moves
+and warm-up, stage settling. An emulated run with the profiles of the
+real system then predicts the duration of a real run, so scheduling
+changes can be evaluated on a :class:`~iv_lab.hardware.clock.VirtualClock`
+before they are deployed.
+
+Profiles are selected per device with an ``emulationTiming`` entry in
+the ``SMU``, ``lamp`` and ``arduino`` settings sections: a profile name,
+or a table with a ``profile`` and values overriding it::
+
+    [SMU]
+    emulationTiming = "keithley-2400-serial"
+
+    [lamp.emulationTiming]
+    profile = "trinamic-filter-wheel"
+    lightOnTime = 2.6
+
+Calibration: the SMU profiles reproduce the legacy measured minimum
+point periods (``meas_period_min``: 2602 at NPLC 1 1/16 s, 2400 over
+GPIB 1/8.5 s, over RS-232 at 9600 baud 1/6 s) and split them into
+command, transfer and integration time; the Keithley filter wheel and
+Arduino stage use the legacy fixed waits. The Trinamic, Wavelabs and
+VeraSol times are estimates — override them with times measured on the
+system.
+
+This module is standard library only.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, fields, replace
+from typing import TYPE_CHECKING, TypeVar
+
+if TYPE_CHECKING:
+    from iv_lab.config import (
+        ArduinoTimingSettings,
+        LampTimingSettings,
+        SMUTimingSettings,
+    )
+
+_Timing = TypeVar("_Timing", "SMUTiming", "LampTiming", "ArduinoTiming")
+
+
+@dataclass(frozen=True)
+class SMUTiming:
+    """Where an SMU spends its time; all times in s."""
+
+    #: Each configuration or source command (a set voltage, an output
+    #: switch, a compliance change).
+    command_latency: float = 0.0
+    #: Each reading besides the integration: query round trip, transfer
+    #: of the answer, autozero.
+    reading_overhead: float = 0.0
+    #: Integration time of each reading.
+    integration_time: float = 0.02
+    #: Setting the source and reading happen in one exchange (the 2602's
+    #: preloaded set-and-measure functions): no separate command latency.
+    fused_set_measure: bool = False
+    #: Each hardware sweep or buffered acquisition: setup commands,
+    #: polling and readout, plus the transfer of each point read back.
+    sweep_overhead: float = 0.0
+    sweep_point_time: float = 0.0
+    #: Minimum periods the real driver reports on connect (see
+    #: :class:`~iv_lab.hardware.smu.base.BaseSMU`); None keeps the
+    #: emulated SMU's own.
+    meas_period_min: float | None = None
+    sweep_period_min: float | None = None
+    acquisition_period_min: float | None = None
+
+    @property
+    def point_time(self) -> float:
+        """Time of a set-and-read step of a point-by-point scan."""
+        reading = self.reading_overhead + self.integration_time
+        return reading if self.fused_set_measure else reading + self.command_latency
+
+    @classmethod
+    def from_settings(cls, settings: SMUTimingSettings | None) -> SMUTiming:
+        """The settings' profile with their overrides (None: the default)."""
+        return _resolve(cls(), SMU_TIMING_PROFILES, settings)
+
+
+@dataclass(frozen=True)
+class LampTiming:
+    """Where a lamp spends its time; all times in s."""
+
+    #: Connecting (homing, moving to the dark position).
+    connect_time: float = 0.0
+    #: Turning the light on (moving the filter wheel, starting a recipe),
+    #: and off.
+    light_on_time: float = 0.0
+    light_off_time: float = 0.0
+    #: Time after connecting before the light reaches its operating
+    #: point; turning the light on earlier waits for the rest.
+    warmup_time: float = 0.0
+
+    @classmethod
+    def from_settings(cls, settings: LampTimingSettings | None) -> LampTiming:
+        """The settings' profile with their overrides (None: the default)."""
+        return _resolve(cls(), LAMP_TIMING_PROFILES, settings)
+
+
+@dataclass(frozen=True)
+class ArduinoTiming:
+    """Where the shutter / cell-stage controller spends its time, in s."""
+
+    #: Each digital command over the serial line.
+    command_latency: float = 0.0
+    #: Wait for the cell stage after moving it.
+    stage_settling_time: float = 0.0
+
+    @classmethod
+    def from_settings(cls, settings: ArduinoTimingSettings | None) -> ArduinoTiming:
+        """The settings' profile with their overrides (None: the default)."""
+        return _resolve(cls(), ARDUINO_TIMING_PROFILES, settings)
+
+
+# 2400 point: set (":SOUR:VOLT:LEV ..."), then ":READ?" and its answer;
+# the legacy period less the integration is bus time, spread over the
+# three transfers (as the simulated 2400 in iv_lab.hardware.mock does)
+_NPLC1 = 0.02
+_GPIB_2400_TRANSFER = (1 / 8.5 - _NPLC1) / 3
+_SERIAL_BYTE = 10 / 9600  # 8N1 at 9600 baud
+_SERIAL_2400_TRANSFER = (1 / 6 - _NPLC1 - 40 * _SERIAL_BYTE) / 3
+
+#: Named SMU profiles, at NPLC 1 (``measSpeed = "normal"``, 50 Hz).
+SMU_TIMING_PROFILES: dict[str, SMUTiming] = {
+    "keithley-2602-gpib": SMUTiming(
+        command_latency=0.0025,
+        reading_overhead=1 / 16 - _NPLC1,
+        integration_time=_NPLC1,
+        fused_set_measure=True,
+        sweep_overhead=0.05,
+        sweep_point_time=0.0005,
+        meas_period_min=1 / 16,
+        sweep_period_min=1 / 40,
+        acquisition_period_min=1 / 45,
+    ),
+    "keithley-2400-gpib": SMUTiming(
+        command_latency=_GPIB_2400_TRANSFER,
+        reading_overhead=2 * _GPIB_2400_TRANSFER,
+        integration_time=_NPLC1,
+        sweep_overhead=8 * _GPIB_2400_TRANSFER,
+        sweep_point_time=0.0005,
+        meas_period_min=1 / 8.5,
+        sweep_period_min=1 / 25,
+    ),
+    "keithley-2400-serial": SMUTiming(
+        command_latency=_SERIAL_2400_TRANSFER + 19 * _SERIAL_BYTE,
+        reading_overhead=2 * _SERIAL_2400_TRANSFER + 21 * _SERIAL_BYTE,
+        integration_time=_NPLC1,
+        sweep_overhead=8 * _SERIAL_2400_TRANSFER + 250 * _SERIAL_BYTE,
+        # "VOLT,CURR" pair of the TRACE readout
+        sweep_point_time=28 * _SERIAL_BYTE,
+        meas_period_min=1 / 6,
+        sweep_period_min=1 / 25,
+    ),
+}
+
+#: Named lamp profiles.
+LAMP_TIMING_PROFILES: dict[str, LampTiming] = {
+    # legacy fixed waits; connecting parks the wheel dark
+    "keithley-filter-wheel": LampTiming(
+        connect_time=7.0, light_on_time=11.0, light_off_time=7.0
+    ),
+    # reference search and park on connect, then one move per switch
+    "trinamic-filter-wheel": LampTiming(
+        connect_time=9.0, light_on_time=2.5, light_off_time=2.5
+    ),
+    # socket handshake, ActivateRecipe and StartRecipe up to full output
+    "wavelabs-sinus70": LampTiming(light_on_time=2.0, light_off_time=0.5),
+    # LED head at operating temperature about 15 min after power-up
+    "verasol-lss7120": LampTiming(
+        connect_time=1.0, light_on_time=0.3, light_off_time=0.1, warmup_time=900.0
+    ),
+}
+
+#: Named Arduino profiles.
+ARDUINO_TIMING_PROFILES: dict[str, ArduinoTiming] = {
+    # "6,<pin>,<value>" at 9600 baud; legacy 5 s stage settling
+    "arduino-shutter-stage": ArduinoTiming(command_latency=0.01, stage_settling_time=5.0),
+}
+
+
+def _snake_case(name: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+def _resolve(default: _Timing, profiles: dict[str, _Timing], settings) -> _Timing:
+    if settings is None:
+        return default
+    timing = default
+    if settings.profile is not None:
+        try:
+            timing = profiles[settings.profile]
+        except KeyError:
+            raise ValueError(
+                f"unknown emulation timing profile {settings.profile!r}; "
+                f"expected one of {', '.join(sorted(profiles))}"
+            ) from None
+    names = {f.name for f in fields(timing)}
+    overrides = {
+        _snake_case(key): value
+        for key, value in settings.model_dump(exclude={"profile"}).items()
+        if value is not None and _snake_case(key) in names
+    }
+    return replace(timing, **overrides)
@@ -0,0 +1,278 @@
+"""Recording of VISA traffic to a compact trace file.
+
+For reproducing slow or odd instrument behavior away from the lab:
+:func:`record_visa` makes ``pyvisa.ResourceManager()`` hand out resources
+that log every message and answer, with its time and duration, to a
+trace file. All real drivers open their instruments through
+``pyvisa.ResourceManager`` in ``connect()`` — directly (Oriel, Arduino),
+through the bundled libraries (``SMU26xx``, ``VeraSol``) or through
+pymeasure's VISA adapter (Keithley 2400 family) — so one patch covers
+them all.
+
+The recorded session is replayed by
+:class:`iv_lab.hardware.mock.ReplayResourceManager`, deterministically
+and at real or accelerated speed.
+
+Trace format: JSON Lines, optionally gzip-compressed (``.gz`` suffix).
+The first line is a header object; every following line is one entry
+``[t, duration, session, op, data]``:
+
+- ``t``: start time in s since the recording started, ``duration``: s,
+- ``session``: number of the opened resource, in order of opening,
+- ``op`` / ``data``: ``"open"`` / address, ``"w"`` / message,
+  ``"r"`` / answer text, ``"rb"`` / raw answer bytes (latin-1 text),
+  ``"clear"`` and ``"close"`` / null; a call that raised is logged as
+  ``"w!"`` / ``[message, error]`` or ``"r!"`` (``"clear!"``,
+  ``"close!"``) / error.
+
+Only the message-level calls (``write``, ``read``, ``read_raw``,
+``read_bytes``, ``query``, ``clear``, ``close``) are recorded; attribute
+access and other methods pass through to the real resource.
+
+This module is standard library only; ``pyvisa`` is imported when the
+recording starts.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import gzip
+import json
+import threading
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, NamedTuple, TypeVar
+
+from .clock import SYSTEM_CLOCK, Clock
+
+#: ``format`` value in the header line of a trace file.
+TRACE_FORMAT = "iv_lab.visa_trace"
+TRACE_VERSION = 1
+
+_T = TypeVar("_T")
+
+
+class TraceEntry(NamedTuple):
+    """One recorded call (see the module docstring for the fields)."""
+
+    t: float
+    duration: float
+    session: int
+    op: str
+    data: Any
+
+
+@dataclass
+class VisaTrace:
+    """A recorded trace file."""
+
+    header: dict[str, Any]
+    entries: list[TraceEntry] = field(default_factory=list)
+
+    def addresses(self) -> dict[int, str]:
+        """VISA address of each session, in order of opening."""
+        return {e.session: e.data for e in self.entries if e.op == "open"}
+
+    def session(self, session: int) -> list[TraceEntry]:
+        """The calls of one session, without its open and close entries."""
+        return [
+            e for e in self.entries
+            if e.session == session and e.op not in ("open", "close")
+        ]
+
+
+def _open_text(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def read_trace(path: str | Path) -> VisaTrace:
+    """Load a trace file written by :class:`VisaRecorder`."""
+    path = Path(path)
+    with _open_text(path, "r") as stream:
+        lines = [line for line in stream if line.strip()]
+    if not lines:
+        raise ValueError(f"{path}: empty trace file")
+    header = json.loads(lines[0])
+    if not isinstance(header, dict) or header.get("format") != TRACE_FORMAT:
+        raise ValueError(f"{path}: not a VISA trace file")
+    if header.get("version") != TRACE_VERSION:
+        raise ValueError(f"{path}: unsupported trace version {header.get('version')}")
+    return VisaTrace(header, [TraceEntry(*json.loads(line)) for line in lines[1:]])
+
+
+class VisaRecorder:
+    """Writes trace entries to a file; shared by all recorded resources.
+
+    Plain files are flushed after every entry, so a trace survives a
+    crash up to the last call; gzip files are flushed on close only.
+    """
+
+    def __init__(self, path: str | Path, *, clock: Clock = SYSTEM_CLOCK) -> None:
+        self.path = Path(path)
+        self.clock = clock
+        self._stream = _open_text(self.path, "w")
+        self._flush = self.path.suffix != ".gz"
+        self._lock = threading.Lock()
+        self._sessions = 0
+        self.start = clock.time()
+        header = {
+            "format": TRACE_FORMAT,
+            "version": TRACE_VERSION,
+            "created": datetime.now().isoformat(timespec="seconds"),
+        }
+        self._stream.write(json.dumps(header) + "\n")
+        #: Entries written so far.
+        self.entry_count = 0
+
+    def new_session(self, address: str) -> int:
+        """Log the opening of a resource; return its session number."""
+        with self._lock:
+            session = self._sessions
+            self._sessions += 1
+        self.record(session, "open", address, self.clock.time())
+        return session
+
+    def record(self, session: int, op: str, data: Any, start: float) -> None:
+        """Log one call that started at clock time ``start``."""
+        end = self.clock.time()
+        line = json.dumps(
+            [round(start - self.start, 6), round(end - start, 6), session, op, data],
+            separators=(",", ":"),
+        )
+        with self._lock:
+            if self._stream.closed:
+                return
+            self._stream.write(line + "\n")
+            if self._flush:
+                self._stream.flush()
+            self.entry_count += 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._stream.close()
+
+
+class RecordingResource:
+    """Proxy for a pyvisa resource that logs its traffic to a recorder."""
+
+    def __init__(self, resource: Any, recorder: VisaRecorder, session: int) -> None:
+        # attribute writes go to the resource (timeouts, terminations, ...)
+        object.__setattr__(self, "_resource", resource)
+        object.__setattr__(self, "_recorder", recorder)
+        object.__setattr__(self, "_session", session)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resource, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._resource, name, value)
+
+    def _call(
+        self,
+        op: str,
+        function: Callable[[], _T],
+        data: Any = None,
+        answer: Callable[[_T], Any] | None = None,
+    ) -> _T:
+        recorder = self._recorder
+        start = recorder.clock.time()
+        try:
+            result = function()
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            if op == "w":
+                recorder.record(self._session, "w!", [data, error], start)
+            else:
+                recorder.record(self._session, "r!" if op[0] == "r" else op + "!", error, start)
+            raise
+        recorder.record(self._session, op, answer(result) if answer else data, start)
+        return result
+
+    # --- recorded pyvisa resource API ---
+
+    def write(self, message: str, *args: Any, **kwargs: Any) -> int:
+        return self._call("w", lambda: self._resource.write(message, *args, **kwargs), message)
+
+    def read(self, *args: Any, **kwargs: Any) -> str:
+        return self._call("r", lambda: self._resource.read(*args, **kwargs), answer=str)
+
+    def read_raw(self, *args: Any, **kwargs: Any) -> bytes:
+        return self._call(
+            "rb", lambda: self._resource.read_raw(*args, **kwargs), answer=_latin1
+        )
+
+    def read_bytes(self, *args: Any, **kwargs: Any) -> bytes:
+        return self._call(
+            "rb", lambda: self._resource.read_bytes(*args, **kwargs), answer=_latin1
+        )
+
+    def query(self, message: str, delay: float | None = None) -> str:
+        # as pyvisa's MessageBasedResource.query, so that both halves are logged
+        self.write(message)
+        delay = getattr(self._resource, "query_delay", 0.0) if delay is None else delay
+        if delay > 0:
+            self._recorder.clock.sleep(delay)
+        return self.read()
+
+    def clear(self) -> None:
+        self._call("clear", self._resource.clear)
+
+    def close(self) -> None:
+        self._call("close", self._resource.close)
+
+
+def _latin1(raw: bytes) -> str:
+    return bytes(raw).decode("latin-1")
+
+
+class RecordingResourceManager:
+    """Proxy for a pyvisa resource manager whose resources are recorded."""
+
+    def __init__(self, resource_manager: Any, recorder: VisaRecorder) -> None:
+        self._resource_manager = resource_manager
+        self.recorder = recorder
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resource_manager, name)
+
+    def open_resource(self, resource_name: str, *args: Any, **kwargs: Any) -> RecordingResource:
+        resource = self._resource_manager.open_resource(resource_name, *args, **kwargs)
+        return RecordingResource(resource, self.recorder, self.recorder.new_session(resource_name))
+
+
+@contextlib.contextmanager
+def record_visa(path: str | Path, *, clock: Clock = SYSTEM_CLOCK) -> Iterator[VisaRecorder]:
+    """Record the traffic of every VISA resource opened inside the block.
+
+    Patches ``pyvisa.ResourceManager`` for the duration of the block; the
+    trace file is closed at its end, so the block should span the whole
+    session. Without ``pyvisa`` nothing can be opened, and the trace
+    stays empty. Nests inside
+    :func:`iv_lab.hardware.mock.use_mock_visa` to record simulated
+    instruments.
+    """
+    recorder = VisaRecorder(path, clock=clock)
+    try:
+        try:
+            import pyvisa
+        except ImportError:
+            yield recorder
+            return
+        original = pyvisa.ResourceManager
+
+        class ResourceManager:
+            # a class, since callers may isinstance() check against it
+            def __new__(cls, *args: Any, **kwargs: Any) -> RecordingResourceManager:
+                return RecordingResourceManager(original(*args, **kwargs), recorder)
+
+        pyvisa.ResourceManager = ResourceManager
+        try:
+            yield recorder
+        finally:
+            pyvisa.ResourceManager = original
+    finally:
+        recorder.close()
@@ -7,16 +7,28 @@ loop. No hardware, measurement, or file-writing logic lives here.
 Usage::
 
     python -m iv_lab.main [--settings PATH] [--users PATH]
-                          [--logo PATH] [--emulate]
+                          [--logo PATH] [--emulate] [--record-visa PATH]
+                          [--profile-instruments PATH] [--trace-dir PATH]
 
 ``--emulate`` forces emulation of all configured hardware regardless of
 the ``emulate`` flags in the settings file, so the application runs on
 machines without instruments or hardware libraries.
+
+``--record-visa`` records all instrument traffic of the session to a
+trace file (see :mod:`iv_lab.hardware.visa_trace`).
+
+``--profile-instruments`` profiles every command sent to the hardware
+during the session and writes the statistics to a JSON report at exit
+(print it with ``python -m iv_lab.hardware.profiler PATH``).
+
+``--trace-dir`` writes a Chrome trace of the phases of every measurement
+run to the directory (see :mod:`iv_lab.tracing`).
 """
 
 from __future__ import annotations
 
 import argparse
+import contextlib
 import sys
 from pathlib import Path
 
@@ -78,6 +90,33 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         action="store_true",
         help="force emulation of all hardware, regardless of the settings file",
     )
+    parser.add_argument(
+        "--record-visa",
+        default=None,
+        metavar="PATH",
+        help=(
+            "record all VISA instrument traffic with timing to a trace file "
+            "(gzip-compressed if PATH ends in .gz), for replay without hardware"
+        ),
+    )
+    parser.add_argument(
+        "--profile-instruments",
+        default=None,
+        metavar="PATH",
+        help=(
+            "profile the calls, latencies and bytes of every instrument command "
+            "and write the report to PATH at exit"
+        ),
+    )
+    parser.add_argument(
+        "--trace-dir",
+        default=None,
+        metavar="PATH",
+        help=(
+            "write a Chrome trace (chrome://tracing, ui.perfetto.dev) of the phases "
+            "of every measurement run to the directory PATH"
+        ),
+    )
     parser.add_argument(
         "--init",
         action="store_true",
@@ -128,17 +167,28 @@ def main(argv: list[str] | None = None, *, exec_app: bool = True) -> int:
 
     from iv_lab.gui.app import launch
 
-    app, window = launch(
-        settings,
-        settings_file=settings_path,
-        users_file=users_file,
-        logo_path=args.logo,
-    )
+    with contextlib.ExitStack() as stack:
+        if args.record_visa is not None:
+            from iv_lab.hardware.visa_trace import record_visa
 
-    if not exec_app:
-        window.close()
-        return 0
-    return app.exec()
+            stack.enter_context(record_visa(args.record_visa))
+
+        app, window = launch(
+            settings,
+            settings_file=settings_path,
+            users_file=users_file,
+            logo_path=args.logo,
+            trace_dir=args.trace_dir,
+        )
+
+        if args.profile_instruments is not None:
+            window.system.start_profiling()
+            stack.callback(window.system.profiler.write_report, args.profile_instruments)
+
+        if not exec_app:
+            window.close()
+            return 0
+        return app.exec()
 
 
 if __name__ == "__main__":
@@ -13,7 +13,9 @@ docs/MIGRATION.md) connect to signals:
 - ``status_callback(message)`` — legacy ``show_status``,
 - ``warning_callback(message)`` — legacy non-fatal ``error_window`` uses,
 - ``data_callback(data_dict)`` — live data for plotting (legacy
-  ``updatePlot*``), called with a protocol-specific dict of arrays,
+  ``updatePlot*``), called with protocol-specific deltas of the run's
+  shared :class:`~iv_lab.data.live.LiveData` buffer (only the new
+  values, plus a sequence number),
 - ``cancel_callback() -> bool`` — legacy ``abortRunFlag``; protocols
   poll it at the same points the legacy code did and return partial
   data when cancelled.
@@ -25,18 +27,41 @@ GUI assembles; each ``run()`` works on its own copy.
 Hardware safety: every ``run()`` uses ``try/finally`` to turn the SMU
 off and the lamp off (including the IV_Old shutter), even on error or
 cancellation — the legacy code did not guarantee this on exceptions.
+
+Timing: the timed loops (J-V points, constant voltage/current, MPP
+tracking, calibration) and the dwell waits go through a
+:class:`SampleScheduler`. The legacy loops polled ``time.time()`` and
+sent a dummy reading to the instrument on every pass; the scheduler
+sleeps until shortly before each deadline on a monotonic clock and
+spins the rest, with keep-alive readings at a configurable rate.
+
+Streaming: with a :attr:`MeasurementProtocol.stream_factory`, the
+constant-voltage, constant-current and MPP loops also write their rows
+to the data file while they run (see
+:class:`~iv_lab.data.file_writer.StreamingWriter`); ``run()`` finishes
+the file with the final header in its ``finally`` block. The file then
+has every row, so a streamed run keeps only an evenly decimated history
+of at most :data:`STREAMED_HISTORY_ROWS` rows in memory for the plot and
+the result, however long it runs.
 """
 
 from __future__ import annotations
 
-import time
+import enum
+import math
 from abc import ABC, abstractmethod
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
+from dataclasses import asdict, dataclass
 from typing import Any
 
+from iv_lab.data.columns import Derivation
+from iv_lab.data.file_writer import StreamingWriter
+from iv_lab.data.results import MeasurementResult
 from iv_lab.hardware.arduino.base import BaseArduino
+from iv_lab.hardware.clock import Clock
 from iv_lab.hardware.lamp.base import BaseLamp
 from iv_lab.hardware.smu.base import BaseSMU, SMUChannel
+from iv_lab.tracing import trace_span
 
 
 class VocPolarityError(Exception):
@@ -52,6 +77,34 @@ def _nwire_value(nwire: int | str) -> int:
     return 4 if "4" in str(nwire) else 2
 
 
+def time_series_period_min(smu: BaseSMU) -> float:
+    """Shortest sample interval in s of a constant-voltage/current series.
+
+    The polling loop is limited by ``meas_period_min``; SMUs that buffer
+    timed readings (``acquisition_period_min``) go faster.
+    """
+    if smu.acquisition_period_min is None:
+        return smu.meas_period_min
+    return min(smu.meas_period_min, smu.acquisition_period_min)
+
+
+def _buffered_time_series(smu: BaseSMU, interval: float) -> bool:
+    """Whether a time series at ``interval`` runs as buffered readings.
+
+    Only intervals the polling loop cannot keep up with are buffered, so
+    slower series keep the legacy loop and its host-side timing.
+    """
+    return interval < smu.meas_period_min and time_series_period_min(smu) < (
+        smu.meas_period_min
+    )
+
+
+def _time_series_points(duration: float, interval: float) -> int:
+    """Readings a polling loop takes in ``duration`` s at ``interval``."""
+    # rounded first so that e.g. 1 s / 0.1 s gives 10, not 11
+    return max(1, math.ceil(round(duration / interval, 9)))
+
+
 def linspace(start: float, stop: float, num: int) -> list[float]:
     """Evenly spaced values including both endpoints (like np.linspace)."""
     if num <= 1:
@@ -60,6 +113,257 @@ def linspace(start: float, stop: float, num: int) -> list[float]:
     return [start + step * k for k in range(num)]
 
 
+def _current_density(active_area: float) -> Derivation:
+    """Derived column J in mA/cm² from the current ``i`` in A."""
+    return lambda c: c["i"] * 1000.0 / active_area
+
+
+def _power_density(active_area: float) -> Derivation:
+    """Derived column of the delivered power in mW/cm² from ``i`` and
+    ``v`` (cell voltage is positive, current is negative)."""
+    return lambda c: c["i"] * c["v"] * -1000.0 / active_area
+
+
+class MissedDeadline(str, enum.Enum):
+    """What a :class:`SampleScheduler` does after a late sample."""
+
+    #: Drop the slots that already passed; the next sample stays on the
+    #: grid (legacy constant-voltage loop).
+    SKIP = "skip"
+    #: Keep every slot: late samples follow back to back until the loop
+    #: is on time again (legacy J-V, constant-current, MPP, calibration).
+    CATCH_UP = "catch_up"
+    #: Restart the grid at the late sample: intervals stay whole, the
+    #: schedule drifts.
+    STRETCH = "stretch"
+
+
+#: Default seconds between keep-alive readings while waiting for a sample:
+#: back to back, like the legacy loops.
+KEEP_ALIVE_INTERVAL = 0.0
+
+#: Longest single sleep of a wait in s, so cancellation stays responsive.
+WAIT_POLL_INTERVAL = 0.05
+
+#: Samples later than this after their deadline count as late, in s.
+LATE_TOLERANCE = 1e-3
+
+#: Rows a streamed run keeps in memory for its plot and result (its data
+#: file has all of them).
+STREAMED_HISTORY_ROWS = 100_000
+
+
+@dataclass
+class ScheduleStats:
+    """Sample times of one run against their schedule.
+
+    Lateness is the actual minus the scheduled time of a sample.
+    """
+
+    samples: int = 0
+    late: int = 0
+    skipped: int = 0
+    keep_alive_reads: int = 0
+    total_lateness: float = 0.0
+    total_squared_lateness: float = 0.0
+    max_lateness: float = 0.0
+
+    def add(self, lateness: float) -> None:
+        self.samples += 1
+        if lateness > LATE_TOLERANCE:
+            self.late += 1
+        self.total_lateness += lateness
+        self.total_squared_lateness += lateness * lateness
+        self.max_lateness = max(self.max_lateness, lateness)
+
+    @property
+    def mean_lateness(self) -> float:
+        return self.total_lateness / self.samples if self.samples else 0.0
+
+    @property
+    def jitter(self) -> float:
+        """Standard deviation of the lateness in s."""
+        if not self.samples:
+            return 0.0
+        mean = self.mean_lateness
+        return math.sqrt(max(0.0, self.total_squared_lateness / self.samples - mean * mean))
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "mean_lateness": self.mean_lateness, "jitter": self.jitter}
+
+
+class SampleScheduler:
+    """Deadlines of a timed measurement loop on ``clock``.
+
+    Times are kept in integer nanoseconds of
+    :meth:`Clock.perf_counter_ns <iv_lab.hardware.clock.Clock.perf_counter_ns>`,
+    so the grid neither drifts with rounding nor jumps with the system
+    clock. A wait sleeps until ``clock.spin_threshold`` before the
+    deadline and spins the rest.
+
+    While waiting, ``keep_alive`` (given to :meth:`start` or
+    :meth:`hold`) is called every ``keep_alive_interval`` s to keep the
+    instrument display alive: 0 (the default) calls it continuously like
+    the legacy loops, None never. A keep-alive reading that would not end
+    before the deadline is left out; one that takes no time (an emulated
+    instrument on a virtual clock) is followed by a normal wait.
+
+    ``policy`` overrides the missed-deadline policy each loop passes to
+    :meth:`start`. :attr:`stats` collects all loops of the scheduler;
+    a protocol makes one scheduler per run (see
+    :meth:`MeasurementProtocol.scheduler`).
+    """
+
+    def __init__(
+        self,
+        clock: Clock,
+        *,
+        policy: MissedDeadline | None = None,
+        keep_alive_interval: float | None = KEEP_ALIVE_INTERVAL,
+    ) -> None:
+        self.clock = clock
+        self.policy = policy
+        self.keep_alive_interval = keep_alive_interval
+        self.stats = ScheduleStats()
+        self._policy = MissedDeadline.CATCH_UP
+        self._interval = 0
+        self._duration: int | None = None
+        self._origin = 0
+        self._deadline = 0
+        self._keep_alive: Callable[[], Any] | None = None
+        self._cancelled: Callable[[], bool] | None = None
+        self._next_keep_alive = 0
+        self._keep_alive_time = 0
+
+    def start(
+        self,
+        interval: float,
+        *,
+        duration: float | None = None,
+        policy: MissedDeadline = MissedDeadline.CATCH_UP,
+        keep_alive: Callable[[], Any] | None = None,
+        cancelled: Callable[[], bool] | None = None,
+    ) -> None:
+        """Start a grid of samples every ``interval`` s, the first now.
+
+        With a ``duration``, :meth:`wait` ends the loop once it has
+        passed. ``policy`` is the loop's own missed-deadline policy.
+        """
+        self._policy = self.policy if self.policy is not None else MissedDeadline(policy)
+        self._interval = round(interval * 1e9)
+        self._duration = None if duration is None else round(duration * 1e9)
+        self._keep_alive = keep_alive
+        self._cancelled = cancelled
+        self._origin = self._deadline = self.clock.perf_counter_ns()
+        self._schedule_keep_alive(self._origin)
+
+    def time_left(self) -> float:
+        """Seconds until the next sample is due, 0 when it is."""
+        return max(0, self._deadline - self.clock.perf_counter_ns()) / 1e9
+
+    def wait(self) -> float | None:
+        """Wait for the next sample and move on to the one after it.
+
+        Returns the sample time in s since :meth:`start`, or None when
+        the duration is over or the wait was cancelled.
+        """
+        if self._over():
+            return None
+        if not self._wait_until(self._deadline):
+            return None
+        return self._next(self.clock.perf_counter_ns())
+
+    def advance(self) -> float | None:
+        """Move on to the next sample without waiting for it.
+
+        Returns the time in s until the sample is due (0 when it is
+        late), for loops that leave the wait to the instrument, e.g. as a
+        settling delay before a reading; None when the duration is over.
+        The sample counts as taken at its deadline.
+        """
+        if self._over():
+            return None
+        now = self.clock.perf_counter_ns()
+        remaining = max(0, self._deadline - now)
+        if self._next(now + remaining) is None:
+            return None
+        return remaining / 1e9
+
+    def _over(self) -> bool:
+        return self._duration is not None and self._deadline - self._origin >= self._duration
+
+    def _next(self, now: int) -> float | None:
+        # record the sample taken at ``now`` and schedule the next one
+        if self._duration is not None and now - self._origin >= self._duration:
+            return None
+
+        self.stats.add((now - self._deadline) / 1e9)
+        if self._policy is MissedDeadline.STRETCH:
+            self._deadline = max(self._deadline, now) + self._interval
+        else:
+            self._deadline += self._interval
+            if self._policy is MissedDeadline.SKIP and self._deadline <= now:
+                missed = (now - self._deadline) // self._interval + 1
+                self.stats.skipped += missed
+                self._deadline += missed * self._interval
+        return (now - self._origin) / 1e9
+
+    def samples(self) -> Iterator[float]:
+        """The sample times of the loop, each yielded when it is due."""
+        while (t := self.wait()) is not None:
+            yield t
+
+    def hold(
+        self,
+        seconds: float,
+        *,
+        keep_alive: Callable[[], Any] | None = None,
+        cancelled: Callable[[], bool] | None = None,
+    ) -> bool:
+        """Wait ``seconds`` (e.g. a dwell); False when cancelled."""
+        self._keep_alive = keep_alive
+        self._cancelled = cancelled
+        now = self.clock.perf_counter_ns()
+        self._schedule_keep_alive(now)
+        return self._wait_until(now + round(seconds * 1e9))
+
+    def _schedule_keep_alive(self, now: int) -> None:
+        # legacy loops read before checking the time: first read right away
+        self._next_keep_alive = now
+        self._keep_alive_time = 0
+
+    def _wait_until(self, deadline: int) -> bool:
+        spin = round(self.clock.spin_threshold * 1e9)
+        poll = round(WAIT_POLL_INTERVAL * 1e9)
+        keep_alive = self._keep_alive if self.keep_alive_interval is not None else None
+        while True:
+            now = self.clock.perf_counter_ns()
+            remaining = deadline - now
+            if remaining <= 0:
+                return True
+            if self._cancelled is not None and self._cancelled():
+                return False
+            if keep_alive is not None and now >= self._next_keep_alive:
+                if remaining > self._keep_alive_time:
+                    keep_alive()
+                    end = self.clock.perf_counter_ns()
+                    self.stats.keep_alive_reads += 1
+                    self._keep_alive_time = end - now
+                    gap = round(self.keep_alive_interval * 1e9)
+                    if not gap and end == now:
+                        # back to back, time would never move on
+                        gap = poll
+                    self._next_keep_alive = end + gap
+                    continue
+                # a reading would make the sample late: none before it
+                self._next_keep_alive = deadline
+            if remaining > spin:
+                pause = min(remaining - spin, poll)
+                if keep_alive is not None:
+                    pause = min(pause, max(0, self._next_keep_alive - now))
+                self.clock.sleep(pause / 1e9)
+
+
 class MeasurementProtocol(ABC):
     """Base measurement protocol.
 
@@ -102,6 +406,44 @@ class MeasurementProtocol(ABC):
         #: Legacy Voc polarity check measured for 1 s at 0.1 s intervals.
         self.voc_check_wait = 1.0
         self.voc_poll_interval = 0.1
+        #: Missed-deadline policy of the timed loops (None: each loop's
+        #: legacy policy, see :class:`MissedDeadline`).
+        self.missed_deadline: MissedDeadline | None = None
+        #: Seconds between keep-alive readings while waiting for a sample
+        #: (0: continuous like legacy, None: none; e.g. 1.0 to cut the
+        #: instrument traffic between samples).
+        self.keep_alive_interval: float | None = KEEP_ALIVE_INTERVAL
+        #: Scheduler of the current or last run; its ``stats`` compare
+        #: the actual with the scheduled sample times.
+        self.schedule: SampleScheduler | None = None
+        #: Opens a :class:`~iv_lab.data.file_writer.StreamingWriter` for
+        #: a run's result (None: the time-dependent runs are not
+        #: written while they run).
+        self.stream_factory: Callable[[MeasurementResult], StreamingWriter] | None = None
+        #: Streaming writer of the current run, if any.
+        self.stream: StreamingWriter | None = None
+
+    @property
+    def clock(self) -> Clock:
+        """Time source of the protocol's waits and timestamps.
+
+        Protocol timing follows the SMU's clock, so the module-level scan
+        helpers (which only get the SMU) and the protocol always agree.
+        """
+        return self.smu.clock
+
+    def open_stream(self, result: MeasurementResult) -> StreamingWriter | None:
+        """Start writing the run's data file as samples arrive (when a
+        :attr:`stream_factory` is set)."""
+        if self.stream_factory is not None:
+            self.stream = self.stream_factory(result)
+        return self.stream
+
+    def close_stream(self) -> None:
+        """Finish the data file of a streamed run with its final header."""
+        stream, self.stream = self.stream, None
+        if stream is not None:
+            stream.close()
 
     # --- callback plumbing ---
 
@@ -185,6 +527,7 @@ class MeasurementProtocol(ABC):
     def _is_iv_old(self) -> bool:
         return self.system_name == "IV_Old"
 
+    @trace_span("lamp on")
     def turn_lamp_on(self, light_int: float) -> None:
         """Turn the lamp on; on IV_Old also open the shutter.
 
@@ -195,6 +538,7 @@ class MeasurementProtocol(ABC):
         if self._is_iv_old and self.arduino is not None and light_int > 0.0:
             self.arduino.open_shutter()
 
+    @trace_span("lamp off")
     def turn_lamp_off(self) -> None:
         """Turn the lamp off; on IV_Old also close the shutter."""
         self.lamp.light_off()
@@ -219,13 +563,16 @@ class MeasurementProtocol(ABC):
         self.status("Measuring Light Intensity on Reference Diode...")
 
         self.smu.setup_reference_diode()
-        readings: list[float] = []
-        deadline = time.time() + self.light_intensity_measure_time
-        while time.time() < deadline:
-            readings.append(self.smu.measure_current(SMUChannel.REFERENCE))
-            time.sleep(self.light_intensity_poll_interval)
-            if self.cancelled():
-                return -1.0
+        schedule = SampleScheduler(self.clock, policy=self.missed_deadline)
+        schedule.start(
+            self.light_intensity_poll_interval,
+            duration=self.light_intensity_measure_time,
+            policy=MissedDeadline.STRETCH,
+            cancelled=self.cancelled,
+        )
+        readings = [self.smu.measure_current(SMUChannel.REFERENCE) for _ in schedule.samples()]
+        if self.cancelled():
+            return -1.0
         if not readings:
             readings.append(self.smu.measure_current(SMUChannel.REFERENCE))
 
@@ -241,6 +588,7 @@ class MeasurementProtocol(ABC):
 
         return light_level
 
+    @trace_span("light intensity")
     def check_light_level(self, light_int: float) -> float:
         """Measure the light level and warn when it is >10% off (legacy)."""
         light_level = self.measure_light_intensity()
@@ -262,35 +610,39 @@ class MeasurementProtocol(ABC):
 
         Returns -1.0 when cancelled (legacy).
         """
-        self.smu.setup_current_output(SMUChannel.CELL, params["Vmax"])
-        self.smu.set_current(SMUChannel.CELL, 0.0)
-        self.smu.enable_output(SMUChannel.CELL)
-
-        deadline = time.time() + wait
-        while time.time() < deadline:
-            self.smu.measure_voltage(SMUChannel.CELL)
-            time.sleep(self.voc_poll_interval)
-            if self.cancelled():
-                return -1.0
+        with self.smu.batch():
+            self.smu.setup_current_output(SMUChannel.CELL, params["Vmax"])
+            self.smu.set_current(SMUChannel.CELL, 0.0)
+            self.smu.enable_output(SMUChannel.CELL)
+
+        # settle, reading every voc_poll_interval to keep the display alive
+        schedule = SampleScheduler(self.clock, keep_alive_interval=self.voc_poll_interval)
+        if not schedule.hold(
+            wait,
+            keep_alive=lambda: self.smu.measure_voltage(SMUChannel.CELL),
+            cancelled=self.cancelled,
+        ):
+            return -1.0
 
         voltage = self.smu.measure_voltage(SMUChannel.CELL)
         self.smu.disable_output(SMUChannel.CELL)
         return voltage
 
+    @trace_span("Voc check")
     def check_voc_polarity(self, params: dict) -> bool:
         """Whether the Voc has the expected polarity (legacy)."""
         return self.measure_voc(params, self.voc_check_wait) >= 0.0
 
     # --- shared time-keeping ---
 
-    @staticmethod
-    def _dwell(measure: Callable[[], Any], dwell_time: float, cancelled: Callable[[], bool]) -> None:
-        """Stabilize at the initial operating point (legacy dwell loops)."""
-        deadline = time.time() + dwell_time
-        while time.time() < deadline:
-            measure()
-            if cancelled():
-                break
+    def scheduler(self) -> SampleScheduler:
+        """New scheduler for a run, kept as :attr:`schedule`."""
+        self.schedule = SampleScheduler(
+            self.clock,
+            policy=self.missed_deadline,
+            keep_alive_interval=self.keep_alive_interval,
+        )
+        return self.schedule
 
     # --- protocol interface ---
 
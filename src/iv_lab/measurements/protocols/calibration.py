@@ -35,10 +35,12 @@ remains a separate, user-confirmed step as in legacy.
 from __future__ import annotations
 
 import datetime
-import time
 
-from iv_lab.data import CalibrationResults
+import numpy as np
+
+from iv_lab.data import CalibrationResults, LiveData
 from iv_lab.hardware.smu.base import SMUChannel
+from iv_lab.tracing import trace_span
 
 from .base import MeasurementProtocol
 from .constant_voltage import measure_current_vs_time
@@ -52,13 +54,21 @@ class CalibrationProtocol(MeasurementProtocol):
 
     def _measure_reference_calibration(
         self, p: dict
-    ) -> tuple[list[float], list[float], list[float]]:
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
         smu = self.smu
-
-        t_meas: list[float] = []
-        i_meas: list[float] = []
-        t_ref: list[float] = []
-        i_ref: list[float] = []
+        schedule = self.schedule
+
+        live = LiveData(
+            "t_meas",
+            "i_meas",
+            "t_ref",
+            "i_ref",
+            derived={
+                "i_meas_ma": lambda c: c["i_meas"] * 1000.0,
+                "i_ref_ma": lambda c: c["i_ref"] * 1000.0,
+            },
+            publish=("t_meas", "i_meas_ma", "t_ref", "i_ref_ma"),
+        )
 
         # apply compliance settings
         smu.set_voltage_limit(SMUChannel.CELL, p["Vmax"])
@@ -93,46 +103,38 @@ class CalibrationProtocol(MeasurementProtocol):
                 + str(p["Dwell"])
                 + " seconds"
             )
-            deadline = time.time() + p["Dwell"]
-            while time.time() < deadline:
-                measure()
-                if self.cancelled():
-                    break
+            with trace_span("dwell", channel=channel):
+                schedule.hold(p["Dwell"], keep_alive=measure, cancelled=self.cancelled)
 
             self.status("Running Constant Voltage Measurement...")
 
-            start_time = time.time()
-            meas_time = start_time  # first measurement at time zero
-            while (time.time() - start_time) < p["duration"]:
-                now = time.time()
-                if now >= meas_time:
+            with trace_span("measurement", channel=channel, duration=p["duration"]):
+                # first measurement at time zero
+                schedule.start(
+                    p["interval"],
+                    duration=p["duration"],
+                    keep_alive=measure,
+                    cancelled=self.cancelled,
+                )
+                for t in schedule.samples():
                     i, i_r = measure()
+                    values = {}
                     if channel in ("A", "BOTH"):
-                        i_meas.append(i)
-                        t_meas.append(now - start_time)
+                        values.update(t_meas=t, i_meas=i)
                     if channel in ("B", "BOTH"):
-                        i_ref.append(i_r)
-                        t_ref.append(now - start_time)
-
-                    self.emit_data(
-                        {
-                            "t_meas": list(t_meas),
-                            "i_meas_ma": [v * 1000.0 for v in i_meas],
-                            "t_ref": list(t_ref),
-                            "i_ref_ma": [v * 1000.0 for v in i_ref],
-                        }
-                    )
-
-                    meas_time = meas_time + p["interval"]
-                else:
-                    # dummy measurement to keep the display active (legacy)
-                    measure()
-
-                if self.cancelled():
-                    break
+                        values.update(t_ref=t, i_ref=i_r)
+
+                    live.append(**values)
+                    self.emit_data(live.delta())
+
+                    if self.cancelled():
+                        break
 
             smu.turn_off()
 
+        t_meas, i_meas = live.column("t_meas"), live.column("i_meas")
+        t_ref, i_ref = live.column("t_ref"), live.column("i_ref")
+
         # the serial case can produce different point counts; trim like legacy
         if len(t_meas) == len(t_ref):
             t = t_meas
@@ -149,33 +151,35 @@ class CalibrationProtocol(MeasurementProtocol):
 
     def _measure_with_stage(
         self, p: dict
-    ) -> tuple[list[float], list[float], list[float]]:
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
         self.status("Moving Reference Diode Into Measurement Position...")
         self.arduino.select_reference_cell()
 
-        _t_ref, i_ref, _zeros = measure_current_vs_time(
+        reference = measure_current_vs_time(
             self.smu,
             p,
             status=self.status,
             cancelled=self.cancelled,
             emit_data=self.emit_data,
+            schedule=self.schedule,
         )
 
-        t: list[float] = []
-        i_meas: list[float] = []
+        t = i_meas = np.empty(0)
         if not self.cancelled():
             self.status("Moving Control Diode Into Measurement Position...")
             self.arduino.select_test_cell()
 
-            t, i_meas, _zeros = measure_current_vs_time(
+            control = measure_current_vs_time(
                 self.smu,
                 p,
                 status=self.status,
                 cancelled=self.cancelled,
                 emit_data=self.emit_data,
+                schedule=self.schedule,
             )
+            t, i_meas = control.column("t"), control.column("i")
 
-        return (t, i_meas, i_ref)
+        return (t, i_meas, reference.column("i"))
 
     # --- protocol interface ---
 
@@ -191,6 +195,7 @@ class CalibrationProtocol(MeasurementProtocol):
             duration=p["duration"],
         )
 
+        self.scheduler()
         self.status("Turning lamp on...")
         self.turn_lamp_on(p["light_int"])
         try:
@@ -209,8 +214,8 @@ class CalibrationProtocol(MeasurementProtocol):
                 return result
 
             # process data and derive the new reference diode calibration
-            average_meas_current = sum(i_smu) / len(i_smu)
-            average_ref_current = sum(i_ref) / len(i_ref)
+            average_meas_current = float(np.mean(i_smu))
+            average_ref_current = float(np.mean(i_ref))
             cal_factor = (p["reference_current"] / average_meas_current) * (
                 100.0 / p["light_int"]
             )
@@ -11,14 +11,26 @@ calls this "Constant Current, Measure V").
 
 from __future__ import annotations
 
+import contextlib
 import datetime
-import time
 from collections.abc import Callable
 
-from iv_lab.data import ConstantCurrentResults
+import numpy as np
+
+from iv_lab.data import ConstantCurrentResults, LiveData
+from iv_lab.data.file_writer import StreamingWriter
 from iv_lab.hardware.smu.base import BaseSMU, SMUChannel
+from iv_lab.tracing import trace_span
 
-from .base import MeasurementProtocol, _nwire_value
+from .base import (
+    STREAMED_HISTORY_ROWS,
+    MeasurementProtocol,
+    SampleScheduler,
+    _buffered_time_series,
+    _nwire_value,
+    _time_series_points,
+    time_series_period_min,
+)
 
 
 def measure_voltage_vs_time(
@@ -28,68 +40,95 @@ def measure_voltage_vs_time(
     status: Callable[[str], None],
     cancelled: Callable[[], bool],
     emit_data: Callable[[dict], None],
-) -> tuple[list[float], list[float]]:
+    schedule: SampleScheduler | None = None,
+    stream: StreamingWriter | None = None,
+) -> LiveData:
     """Timed voltage measurement at a fixed current (legacy
     ``SMU.measure_V_time_dependent``).
 
-    Returns ``(t, v)``. The legacy loop records no reference diode data.
-    The SMU is turned off at the end (legacy).
+    Returns the run's live data with the columns ``t`` and ``v``. The
+    legacy loop records no reference diode data. The SMU is turned off
+    at the end (legacy). Intervals below ``meas_period_min`` run as
+    buffered readings with instrument timestamps when the SMU supports
+    them (see :func:`~.base.time_series_period_min`). The dwell and the
+    sample timing run on ``schedule`` (a default one on the SMU's clock
+    when not given). With a ``stream``, the samples are also written to
+    the data file as they arrive.
     """
     p = params
-    data_t: list[float] = []
-    data_v: list[float] = []
+    if schedule is None:
+        schedule = SampleScheduler(smu.clock)
+    live = LiveData("t", "v", max_rows=None if stream is None else STREAMED_HISTORY_ROWS)
 
     if abs(p["set_current"]) > abs(p["Imax"]):
         raise ValueError(
             "ERROR: measure_V_time_dependent set current outside of compliance range"
         )
 
-    if smu.use_reference_diode and smu.reference_diode_parallel:
-        smu.setup_reference_diode()
+    with smu.batch():
+        if smu.use_reference_diode and smu.reference_diode_parallel:
+            smu.setup_reference_diode()
 
-    # apply compliance settings
-    smu.set_voltage_limit(SMUChannel.CELL, p["Vmax"])
-    smu.set_current_limit(SMUChannel.CELL, p["Imax"])
+        # apply compliance settings
+        smu.set_voltage_limit(SMUChannel.CELL, p["Vmax"])
+        smu.set_current_limit(SMUChannel.CELL, p["Imax"])
 
-    smu.set_sense_mode(SMUChannel.CELL, _nwire_value(p["Nwire"]))
-    smu.setup_current_output(SMUChannel.CELL, p["Vmax"])
-    smu.set_current(SMUChannel.CELL, p["set_current"])
-    smu.enable_output(SMUChannel.CELL)
+        smu.set_sense_mode(SMUChannel.CELL, _nwire_value(p["Nwire"]))
+        smu.setup_current_output(SMUChannel.CELL, p["Vmax"])
+        smu.set_current(SMUChannel.CELL, p["set_current"])
+        smu.enable_output(SMUChannel.CELL)
 
     status(
         "Stabilizing at initial operating point for " + str(p["Dwell"]) + " seconds"
     )
 
-    deadline = time.time() + p["Dwell"]
-    while time.time() < deadline:
+    def keep_alive() -> None:
         smu.measure_voltage(SMUChannel.CELL)
-        if cancelled():
-            break
-
-    status("Running Constant Current Measurement...")
 
-    start_time = time.time()
-    meas_time = start_time  # first measurement at time zero
-    while (time.time() - start_time) < p["duration"]:
-        now = time.time()
-        if now >= meas_time:
-            v = smu.measure_voltage(SMUChannel.CELL)
-            data_v.append(v)
-            data_t.append(now - start_time)
+    with trace_span("dwell"):
+        schedule.hold(p["Dwell"], keep_alive=keep_alive, cancelled=cancelled)
 
-            emit_data({"t": list(data_t), "v": list(data_v)})
+    status("Running Constant Current Measurement...")
 
-            meas_time = meas_time + p["interval"]
+    with trace_span("measurement", duration=p["duration"], interval=p["interval"]):
+        if _buffered_time_series(smu, p["interval"]):
+            # instrument-timed readings, paged out while they are taken
+            acquisition = smu.acquire_time_series(
+                SMUChannel.CELL,
+                "v",
+                p["interval"],
+                _time_series_points(p["duration"], p["interval"]),
+            )
+            with contextlib.closing(acquisition):
+                for t_chunk, v_chunk, _zeros in acquisition:
+                    live.extend(t=t_chunk, v=v_chunk)
+                    emit_data(live.delta())
+                    if stream is not None:
+                        stream.write(live)
+
+                    if cancelled():
+                        break
         else:
-            # dummy measurement to keep the instrument display alive (legacy)
-            smu.measure_voltage(SMUChannel.CELL)
+            # first measurement at time zero
+            schedule.start(
+                p["interval"],
+                duration=p["duration"],
+                keep_alive=keep_alive,
+                cancelled=cancelled,
+            )
+            for t in schedule.samples():
+                v = smu.measure_voltage(SMUChannel.CELL)
+                live.append(t=t, v=v)
+                emit_data(live.delta())
+                if stream is not None:
+                    stream.write(live)
 
-        if cancelled():
-            break
+                if cancelled():
+                    break
 
     smu.turn_off()
 
-    return (data_t, data_v)
+    return live
 
 
 class ConstantCurrentProtocol(MeasurementProtocol):
@@ -106,8 +145,9 @@ class ConstantCurrentProtocol(MeasurementProtocol):
             )
 
         # check that the SMU can handle the requested measurement interval
-        if p["interval"] < self.smu.meas_period_min:
-            p["interval"] = self.smu.meas_period_min
+        period_min = time_series_period_min(self.smu)
+        if p["interval"] < period_min:
+            p["interval"] = period_min
             self.warn(
                 "WARNING: the SMU is unable to provide the requested measurement rate.\n"
                 "The measurement interval has been set to the maximum allowed by the SMU."
@@ -135,18 +175,20 @@ class ConstantCurrentProtocol(MeasurementProtocol):
                 result.light_int_meas = light_intensity
 
             self.status("Running Constant Current Measurement...")
-            t, v_smu = measure_voltage_vs_time(
+            data = measure_voltage_vs_time(
                 self.smu,
                 p,
                 status=self.status,
                 cancelled=self.cancelled,
                 emit_data=self.emit_data,
+                schedule=self.scheduler(),
+                stream=self.open_stream(result),
             )
 
-            result.time = t
-            result.voltage = v_smu
-            # legacy fills the current column with the setpoint
-            result.current = [p["set_current"]] * len(v_smu)
+            result.set_columns(data)
+            # legacy fills the current column with the setpoint as given
+            # (an int one is written as an int)
+            result.current = np.full(len(result.voltage), p["set_current"])
 
             if self.cancelled():
                 self.status("Run Aborted")
@@ -157,3 +199,4 @@ class ConstantCurrentProtocol(MeasurementProtocol):
             self.smu.turn_off()
             self.status("Turning lamp off...")
             self.turn_lamp_off()
+            self.close_stream()
@@ -11,14 +11,28 @@ calls this "Constant Voltage, Measure J").
 
 from __future__ import annotations
 
+import contextlib
 import datetime
-import time
 from collections.abc import Callable
 
-from iv_lab.data import ConstantVoltageResults
+import numpy as np
+
+from iv_lab.data import ConstantVoltageResults, LiveData
+from iv_lab.data.file_writer import StreamingWriter
 from iv_lab.hardware.smu.base import BaseSMU, SMUChannel
+from iv_lab.tracing import trace_span
 
-from .base import MeasurementProtocol, _nwire_value
+from .base import (
+    STREAMED_HISTORY_ROWS,
+    MeasurementProtocol,
+    MissedDeadline,
+    SampleScheduler,
+    _buffered_time_series,
+    _current_density,
+    _nwire_value,
+    _time_series_points,
+    time_series_period_min,
+)
 
 
 def measure_current_vs_time(
@@ -28,20 +42,35 @@ def measure_current_vs_time(
     status: Callable[[str], None],
     cancelled: Callable[[], bool],
     emit_data: Callable[[dict], None],
-) -> tuple[list[float], list[float], list[float]]:
+    schedule: SampleScheduler | None = None,
+    stream: StreamingWriter | None = None,
+) -> LiveData:
     """Timed current measurement at a fixed voltage (legacy
     ``SMU.measure_I_time_dependent``).
 
-    Returns ``(t, i, i_ref)``; ``i_ref`` is all zeros without parallel
-    reference measurement. The SMU is turned off at the end (legacy).
+    Returns the run's live data with the columns ``t``, ``i`` and
+    ``i_ref`` (all zeros without parallel reference measurement) and the
+    derived ``j``. The SMU is turned off at the end (legacy).
     This loop is also reused by the reference diode calibration on the
-    IV_Old system.
+    IV_Old system. Intervals below ``meas_period_min`` run as buffered
+    readings with instrument timestamps when the SMU supports them (see
+    :func:`~.base.time_series_period_min`). The dwell and the sample
+    timing run on ``schedule`` (a default one on the SMU's clock when not
+    given); samples missed by the polling loop are skipped by default.
+    With a ``stream``, the samples are also written to the data file as
+    they arrive.
     """
     p = params
-    data_t: list[float] = []
-    data_i: list[float] = []
-    data_i_ref: list[float] = []
-    data_j: list[float] = []
+    if schedule is None:
+        schedule = SampleScheduler(smu.clock)
+    live = LiveData(
+        "t",
+        "i",
+        "i_ref",
+        derived={"j": _current_density(p.get("active_area", 1.0))},
+        publish=("t", "j"),
+        max_rows=None if stream is None else STREAMED_HISTORY_ROWS,
+    )
 
     if abs(p["set_voltage"]) > abs(p["Vmax"]):
         raise ValueError(
@@ -49,70 +78,83 @@ def measure_current_vs_time(
         )
 
     parallel_reference = smu.use_reference_diode and smu.reference_diode_parallel
-    if parallel_reference:
-        smu.setup_reference_diode()
 
-    # apply compliance settings
-    smu.set_voltage_limit(SMUChannel.CELL, p["Vmax"])
-    smu.set_current_limit(SMUChannel.CELL, p["Imax"])
+    with smu.batch():
+        if parallel_reference:
+            smu.setup_reference_diode()
+
+        # apply compliance settings
+        smu.set_voltage_limit(SMUChannel.CELL, p["Vmax"])
+        smu.set_current_limit(SMUChannel.CELL, p["Imax"])
 
-    smu.set_sense_mode(SMUChannel.CELL, _nwire_value(p["Nwire"]))
-    smu.setup_voltage_output(SMUChannel.CELL, p["Imax"])
-    smu.set_voltage(SMUChannel.CELL, p["set_voltage"])
-    smu.enable_output(SMUChannel.CELL)
+        smu.set_sense_mode(SMUChannel.CELL, _nwire_value(p["Nwire"]))
+        smu.setup_voltage_output(SMUChannel.CELL, p["Imax"])
+        smu.set_voltage(SMUChannel.CELL, p["set_voltage"])
+        smu.enable_output(SMUChannel.CELL)
 
     status(
         "Stabilizing at initial operating point for " + str(p["Dwell"]) + " seconds"
     )
 
-    deadline = time.time() + p["Dwell"]
-    while time.time() < deadline:
+    def keep_alive() -> None:
         if parallel_reference:
             smu.measure_both_currents()
         else:
             smu.measure_current(SMUChannel.CELL)
-        if cancelled():
-            break
 
-    status("Running Constant Voltage Measurement...")
-
-    active_area = p.get("active_area", 1.0)
-    start_time = time.time()
-    meas_time = start_time  # first measurement at time zero
-    while (time.time() - start_time) < p["duration"]:
-        now = time.time()
-        if now >= meas_time:
-            if parallel_reference:
-                i, i_ref = smu.measure_both_currents()
-                data_i_ref.append(i_ref)
-            else:
-                i = smu.measure_current(SMUChannel.CELL)
-                data_i_ref.append(0.0)
+    with trace_span("dwell"):
+        schedule.hold(p["Dwell"], keep_alive=keep_alive, cancelled=cancelled)
 
-            data_i.append(i)
-            data_j.append(i * 1000.0 / active_area)
-            data_t.append(now - start_time)
-
-            emit_data({"t": list(data_t), "j": list(data_j)})
+    status("Running Constant Voltage Measurement...")
 
-            # Skip any already-elapsed intervals so burst catch-up doesn't
-            # produce duplicate timestamps when the SMU returns instantly.
-            meas_time += p["interval"]
-            while meas_time <= now:
-                meas_time += p["interval"]
+    with trace_span("measurement", duration=p["duration"], interval=p["interval"]):
+        if _buffered_time_series(smu, p["interval"]):
+            # instrument-timed readings, paged out while they are taken
+            acquisition = smu.acquire_time_series(
+                SMUChannel.CELL,
+                "i",
+                p["interval"],
+                _time_series_points(p["duration"], p["interval"]),
+                reference=parallel_reference,
+            )
+            with contextlib.closing(acquisition):
+                for t_chunk, i_chunk, i_ref_chunk in acquisition:
+                    live.extend(t=t_chunk, i=i_chunk, i_ref=i_ref_chunk)
+                    emit_data(live.delta())
+                    if stream is not None:
+                        stream.write(live)
+
+                    if cancelled():
+                        break
         else:
-            # dummy measurement to keep the instrument display alive (legacy)
-            if parallel_reference:
-                smu.measure_both_currents()
-            else:
-                smu.measure_current(SMUChannel.CELL)
+            # first measurement at time zero; skip any already-elapsed
+            # intervals so burst catch-up doesn't produce duplicate
+            # timestamps when the SMU returns instantly
+            schedule.start(
+                p["interval"],
+                duration=p["duration"],
+                policy=MissedDeadline.SKIP,
+                keep_alive=keep_alive,
+                cancelled=cancelled,
+            )
+            for t in schedule.samples():
+                if parallel_reference:
+                    i, i_ref = smu.measure_both_currents()
+                else:
+                    i = smu.measure_current(SMUChannel.CELL)
+                    i_ref = 0.0
+
+                live.append(t=t, i=i, i_ref=i_ref)
+                emit_data(live.delta())
+                if stream is not None:
+                    stream.write(live)
 
-        if cancelled():
-            break
+                if cancelled():
+                    break
 
     smu.turn_off()
 
-    return (data_t, data_i, data_i_ref)
+    return live
 
 
 class ConstantVoltageProtocol(MeasurementProtocol):
@@ -129,8 +171,9 @@ class ConstantVoltageProtocol(MeasurementProtocol):
             )
 
         # check that the SMU can handle the requested measurement interval
-        if p["interval"] < self.smu.meas_period_min:
-            p["interval"] = self.smu.meas_period_min
+        period_min = time_series_period_min(self.smu)
+        if p["interval"] < period_min:
+            p["interval"] = period_min
             self.warn(
                 "WARNING: the SMU is unable to provide the requested measurement rate.\n"
                 "The measurement interval has been set to the maximum allowed by the SMU."
@@ -158,18 +201,22 @@ class ConstantVoltageProtocol(MeasurementProtocol):
                     return result
 
             self.status("Running Constant Voltage Measurement...")
-            t, i_smu, i_ref = measure_current_vs_time(
+            data = measure_current_vs_time(
                 self.smu,
                 p,
                 status=self.status,
                 cancelled=self.cancelled,
                 emit_data=self.emit_data,
+                schedule=self.scheduler(),
+                stream=self.open_stream(result),
             )
+            result.set_columns(data)
+            i_ref = result.current_reference
 
             # average light level (legacy)
             if self.smu.use_reference_diode:
-                if self.smu.reference_diode_parallel and i_ref:
-                    avg_ref_current = sum(i_ref) / len(i_ref)
+                if self.smu.reference_diode_parallel and len(i_ref):
+                    avg_ref_current = float(np.mean(i_ref))
                     avg_light_level = abs(
                         100.0 * avg_ref_current / self.smu.full_sun_reference_current
                     )
@@ -177,10 +224,9 @@ class ConstantVoltageProtocol(MeasurementProtocol):
                     avg_light_level = light_intensity
                 result.light_int_meas = avg_light_level
 
-            result.time = t
-            result.voltage = [p["set_voltage"]] * len(i_smu)
-            result.current = i_smu
-            result.current_reference = i_ref
+            # legacy fills the voltage column with the setpoint as given
+            # (an int one is written as an int)
+            result.voltage = np.full(len(result.current), p["set_voltage"])
 
             if self.cancelled():
                 self.status("Run Aborted")
@@ -191,3 +237,4 @@ class ConstantVoltageProtocol(MeasurementProtocol):
             self.smu.turn_off()
             self.status("Turning lamp off...")
             self.turn_lamp_off()
+            self.close_stream()
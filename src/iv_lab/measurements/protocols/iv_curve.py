@@ -11,19 +11,139 @@ Migrated from the legacy ``system.measure_IVcurve`` and
 
 from __future__ import annotations
 
+import contextlib
 import datetime
-import time
 from collections.abc import Callable
 
+import numpy as np
+
 from iv_lab.analysis.jv_metrics import JVMetrics, compute_jv_metrics, pce
-from iv_lab.data import IVResults
+from iv_lab.data import IVResults, LiveData
 from iv_lab.hardware.smu.base import BaseSMU, SMUChannel
+from iv_lab.tracing import trace_span
 
-from .base import MeasurementProtocol, VocPolarityError, _nwire_value, linspace
+from .base import (
+    MeasurementProtocol,
+    SampleScheduler,
+    VocPolarityError,
+    _current_density,
+    _nwire_value,
+    linspace,
+)
 
 MetricsFunction = Callable[..., JVMetrics]
 
 
+def scan_period_min(smu: BaseSMU, *, stop_at_voc: bool = False) -> float:
+    """Shortest point interval in s a J-V scan can run at on ``smu``.
+
+    The point-by-point loop is limited by ``meas_period_min``; SMUs with
+    an on-instrument sweep (``sweep_period_min``) go faster, except for
+    scans that stop at Voc — those must look at every reading as it
+    arrives to end at the forward current limit.
+    """
+    if smu.sweep_period_min is None or stop_at_voc:
+        return smu.meas_period_min
+    return min(smu.meas_period_min, smu.sweep_period_min)
+
+
+def _sweep_point_by_point(
+    smu: BaseSMU,
+    p: dict,
+    v_points: list[float],
+    interval: float,
+    stop_at_voc: bool,
+    parallel_reference: bool,
+    live: LiveData,
+    *,
+    schedule: SampleScheduler,
+    cancelled: Callable[[], bool],
+    emit_data: Callable[[dict], None],
+) -> None:
+    """Legacy scan loop: set and measure one voltage step at a time."""
+
+    def keep_alive() -> None:
+        if parallel_reference:
+            smu.measure_both_currents()
+        else:
+            smu.measure_current(SMUChannel.CELL)
+
+    def set_and_read(v: float, settle: float) -> tuple[float, float]:
+        if parallel_reference:
+            return smu.set_voltage_measure_both_currents(v, settle)
+        return (smu.set_voltage_measure_current(SMUChannel.CELL, v, settle), 0.0)
+
+    # first measurement at time zero
+    schedule.start(interval, keep_alive=keep_alive, cancelled=cancelled)
+    for v in v_points:
+        if schedule.time_left() <= smu.settle_on_instrument:
+            # the point is due within what the SMU can wait for itself
+            # (none: no time left): set the voltage, settle until the
+            # point is due and read, in one instrument exchange
+            i, i_ref = set_and_read(v, schedule.advance() or 0.0)
+        else:
+            smu.set_voltage(SMUChannel.CELL, v)
+            schedule.wait()
+
+            if parallel_reference:
+                i, i_ref = smu.measure_both_currents()
+            else:
+                i = smu.measure_current(SMUChannel.CELL)
+                i_ref = 0.0
+
+        live.append(v=v, i=i, i_ref=i_ref)
+        emit_data(live.delta())
+
+        # positive scan to the forward current limit: end at Voc
+        if stop_at_voc and i > p["Fwd_current_limit"]:
+            break
+
+        if cancelled():
+            break
+
+    # the point reads skip the per-command error check
+    smu.check_errors()
+
+
+def _sweep_hardware(
+    smu: BaseSMU,
+    p: dict,
+    num_points: int,
+    interval: float,
+    parallel_reference: bool,
+    live: LiveData,
+    *,
+    cancelled: Callable[[], bool],
+    emit_data: Callable[[dict], None],
+) -> None:
+    """Scan as an on-instrument staircase sweep, read back in chunks.
+
+    The sweep runs on the cell channel only; with a parallel reference
+    diode, the diode is read right before and right after the sweep and
+    its column carries the average of the two readings.
+    """
+
+    if parallel_reference:
+        i_ref_before = smu.measure_current(SMUChannel.REFERENCE)
+
+    sweep = smu.sweep_voltage(
+        SMUChannel.CELL, p["start_V"], p["stop_V"], num_points, interval
+    )
+    with contextlib.closing(sweep):
+        for v_chunk, i_chunk in sweep:
+            live.extend(v=v_chunk, i=i_chunk)
+            emit_data(live.delta())
+
+            if cancelled():
+                break
+
+    i_ref = 0.0
+    if parallel_reference:
+        i_ref_after = smu.measure_current(SMUChannel.REFERENCE)
+        i_ref = (i_ref_before + i_ref_after) / 2.0
+    live.extend(i_ref=np.full(len(live.column("v")), i_ref))
+
+
 def scan_iv_points(
     smu: BaseSMU,
     params: dict,
@@ -31,15 +151,24 @@ def scan_iv_points(
     status: Callable[[str], None],
     cancelled: Callable[[], bool],
     emit_data: Callable[[dict], None],
-) -> tuple[list[float], list[float], list[float]]:
+    schedule: SampleScheduler | None = None,
+) -> LiveData:
     """Point-by-point J-V scan (legacy ``SMU.measure_IV_point_by_point``).
 
     Mutates ``params`` like the legacy code did (``'Voc'`` start/stop
-    resolution, minimum dwell) — callers pass their own copy. Returns
-    ``(v, i, i_ref)``; ``i_ref`` is all zeros without parallel reference
-    measurement. The SMU is turned off at the end (legacy).
+    resolution, minimum dwell) — callers pass their own copy. When the
+    requested interval is below what the point-by-point loop can do and
+    the SMU has a hardware sweep, the scan runs on the instrument
+    instead (see :func:`scan_period_min`). The dwell and the point
+    timing run on ``schedule`` (a default one on the SMU's clock when
+    not given). Returns the scan's live data with the columns ``v``,
+    ``i`` and ``i_ref`` (all zeros without parallel reference
+    measurement) and the derived ``j``. The SMU is turned off at the end
+    (legacy).
     """
     p = params
+    if schedule is None:
+        schedule = SampleScheduler(smu.clock)
 
     # flag to abort the scan when it reaches Voc (positive-going scans)
     stop_at_voc = False
@@ -63,42 +192,43 @@ def scan_iv_points(
     # measurement interval
     interval = abs(p["dV"]) / p["sweep_rate"]
 
-    # apply compliance settings
-    smu.set_voltage_limit(SMUChannel.CELL, p["Vmax"])
-    smu.set_current_limit(SMUChannel.CELL, p["Imax"])
-
     status("Running J-V Scan...")
 
-    data_v: list[float] = []
-    data_i: list[float] = []
-    data_i_ref: list[float] = []
-    data_j: list[float] = []
+    live = LiveData(
+        "v", "i", "i_ref", derived={"j": _current_density(p["active_area"])}, publish=("v", "j")
+    )
 
     parallel_reference = smu.use_reference_diode and smu.reference_diode_parallel
-    if parallel_reference:
-        smu.setup_reference_diode()
 
-    smu.set_sense_mode(SMUChannel.CELL, _nwire_value(p["Nwire"]))
+    # configuration up to the first point, sent in one batch
+    with smu.batch():
+        # apply compliance settings
+        smu.set_voltage_limit(SMUChannel.CELL, p["Vmax"])
+        smu.set_current_limit(SMUChannel.CELL, p["Imax"])
 
-    if p["start_V"] == "Voc":
-        smu.setup_current_output(SMUChannel.CELL, p["Vmax"])
-        smu.set_current(SMUChannel.CELL, p["Fwd_current_limit"])
-        # need a minimum dwell time to measure the starting point
-        if p["Dwell"] < 1.0:
-            p["Dwell"] = 1.0
-    else:
-        smu.setup_voltage_output(SMUChannel.CELL, p["Imax"])
-        smu.set_voltage(SMUChannel.CELL, p["start_V"])
+        if parallel_reference:
+            smu.setup_reference_diode()
+
+        smu.set_sense_mode(SMUChannel.CELL, _nwire_value(p["Nwire"]))
+
+        if p["start_V"] == "Voc":
+            smu.setup_current_output(SMUChannel.CELL, p["Vmax"])
+            smu.set_current(SMUChannel.CELL, p["Fwd_current_limit"])
+            # need a minimum dwell time to measure the starting point
+            if p["Dwell"] < 1.0:
+                p["Dwell"] = 1.0
+        else:
+            smu.setup_voltage_output(SMUChannel.CELL, p["Imax"])
+            smu.set_voltage(SMUChannel.CELL, p["start_V"])
 
-    # start the scan
-    smu.enable_output(SMUChannel.CELL)
+        # start the scan
+        smu.enable_output(SMUChannel.CELL)
 
     status(
         "Stabilizing at initial operating point for " + str(p["Dwell"]) + " seconds"
     )
 
-    deadline = time.time() + p["Dwell"]
-    while time.time() < deadline:
+    def dwell_reading() -> None:
         if p["start_V"] == "Voc":
             smu.measure_voltage(SMUChannel.CELL)
         else:
@@ -106,8 +236,9 @@ def scan_iv_points(
         if parallel_reference:
             # keeps the value visible on the instrument display (legacy)
             smu.measure_current(SMUChannel.REFERENCE)
-        if cancelled():
-            break
+
+    with trace_span("dwell"):
+        schedule.hold(p["Dwell"], keep_alive=dwell_reading, cancelled=cancelled)
 
     # if the start voltage is 'Voc', measure the voltage at the current
     # limit and then switch to voltage mode
@@ -122,43 +253,38 @@ def scan_iv_points(
 
     status("Running J-V Scan...")
 
-    meas_time = time.time()  # first measurement at time zero
-    for v in v_points:
-        smu.set_voltage(SMUChannel.CELL, v)
-
-        while time.time() < meas_time:
-            if cancelled():
-                break
-            if parallel_reference:
-                smu.measure_both_currents()
-            else:
-                smu.measure_current(SMUChannel.CELL)
-
-        if parallel_reference:
-            i, i_ref = smu.measure_both_currents()
-            data_i_ref.append(i_ref)
+    use_sweep = interval < smu.meas_period_min and (
+        scan_period_min(smu, stop_at_voc=stop_at_voc) < smu.meas_period_min
+    )
+    with trace_span("scan", points=num_points, hardware_sweep=use_sweep):
+        if use_sweep:
+            _sweep_hardware(
+                smu,
+                p,
+                num_points,
+                interval,
+                parallel_reference,
+                live,
+                cancelled=cancelled,
+                emit_data=emit_data,
+            )
         else:
-            i = smu.measure_current(SMUChannel.CELL)
-            data_i_ref.append(0.0)
-
-        data_i.append(i)
-        data_j.append(i * 1000.0 / p["active_area"])
-        data_v.append(v)
-
-        emit_data({"v": list(data_v), "j": list(data_j)})
-
-        meas_time = meas_time + interval
-
-        # positive scan to the forward current limit: end at Voc
-        if stop_at_voc and i > p["Fwd_current_limit"]:
-            break
-
-        if cancelled():
-            break
+            _sweep_point_by_point(
+                smu,
+                p,
+                v_points,
+                interval,
+                stop_at_voc,
+                parallel_reference,
+                live,
+                schedule=schedule,
+                cancelled=cancelled,
+                emit_data=emit_data,
+            )
 
     smu.turn_off()
 
-    return (data_v, data_i, data_i_ref)
+    return live
 
 
 class IVCurveProtocol(MeasurementProtocol):
@@ -187,8 +313,10 @@ class IVCurveProtocol(MeasurementProtocol):
             )
 
         # check that the SMU can handle the requested measurement interval
-        if abs(p["dV"]) / p["sweep_rate"] < self.smu.meas_period_min:
-            p["dV"] = self.smu.meas_period_min * p["sweep_rate"] + 0.01
+        # (hardware sweeps go faster than the point-by-point loop)
+        period_min = scan_period_min(self.smu, stop_at_voc=p["stop_V"] == "Voc")
+        if abs(p["dV"]) / p["sweep_rate"] < period_min:
+            p["dV"] = period_min * p["sweep_rate"] + 0.01
             new_dv_mv = abs(p["dV"]) * 1000.0
             should_continue = self.confirm_warning(
                 "WARNING: the SMU is unable to provide the requested measurement rate.\n"
@@ -253,18 +381,21 @@ class IVCurveProtocol(MeasurementProtocol):
                     )
 
             self.status("Running J-V Scan...")
-            v_smu, i_smu, i_ref = scan_iv_points(
+            data = scan_iv_points(
                 self.smu,
                 p,
                 status=self.status,
                 cancelled=self.cancelled,
                 emit_data=self.emit_data,
+                schedule=self.scheduler(),
             )
+            result.set_columns(data)
+            v_smu, i_smu, i_ref = result.voltage, result.current, result.current_reference
 
             # average light level for the single-point correction (legacy)
             if self.smu.use_reference_diode:
-                if self.smu.reference_diode_parallel and i_ref:
-                    avg_ref_current = sum(i_ref) / len(i_ref)
+                if self.smu.reference_diode_parallel and len(i_ref):
+                    avg_ref_current = float(np.mean(i_ref))
                     avg_light_level = abs(
                         100.0 * avg_ref_current / self.smu.full_sun_reference_current
                     )
@@ -274,21 +405,19 @@ class IVCurveProtocol(MeasurementProtocol):
             else:
                 avg_light_level = p["light_int"]
 
-            result.voltage = v_smu
-            result.current = i_smu
-            result.current_reference = i_ref
             # actual endpoints (important for Voc scans and aborts)
-            if v_smu:
-                result.start_V = v_smu[0]
-                result.stop_V = v_smu[-1]
+            if len(v_smu):
+                result.start_V = float(v_smu[0])
+                result.stop_V = float(v_smu[-1])
             result.dV = p["dV"]
             result.Dwell = p["Dwell"]
 
             # don't analyze dark or aborted runs (legacy)
             if len(v_smu) > 1 and p["light_int"] > 0 and not self.cancelled():
-                metrics = self._metrics_function(
-                    v_smu, i_smu, p["active_area"], cell_name=p["cell_name"]
-                )
+                with trace_span("metrics", category="analysis"):
+                    metrics = self._metrics_function(
+                        v_smu, i_smu, p["active_area"], cell_name=p["cell_name"]
+                    )
                 result.Voc = metrics.Voc
                 result.Jsc = metrics.Jsc
                 result.Vmpp = metrics.Vmpp
@@ -16,17 +16,32 @@ the last 8 steps — a strong trend (|sum| >= 3) doubles the step (up to
 ``active_area``, ``cell_name``; the voltage step sizes come from the
 system settings (legacy ``MPPVoltageStep*`` preferences) unless present
 in ``params``.
+
+With ``on_instrument`` (``MPPOnInstrument`` preference) and an SMU that
+supports it (``mpp_period_min`` set, the 2602), the tracking loop runs on
+the instrument instead: it samples at the SMU's native rate and streams
+one averaged record per ``interval`` back to the host.
 """
 
 from __future__ import annotations
 
+import contextlib
 import datetime
-import time
 
-from iv_lab.data import MPPResults
-from iv_lab.hardware.smu.base import SMUChannel
+import numpy as np
 
-from .base import MeasurementProtocol, VocPolarityError, _nwire_value
+from iv_lab.data import LiveData, MPPResults
+from iv_lab.hardware.smu.base import SMUChannel
+from iv_lab.tracing import trace_span
+
+from .base import (
+    STREAMED_HISTORY_ROWS,
+    MeasurementProtocol,
+    VocPolarityError,
+    _current_density,
+    _nwire_value,
+    _power_density,
+)
 from .iv_curve import scan_iv_points
 
 #: Legacy IVsys preference defaults (system.__init__).
@@ -49,6 +64,7 @@ class MPPTrackingProtocol(MeasurementProtocol):
         voltage_step_initial: float = MPP_VOLTAGE_STEP_INITIAL,
         voltage_step_max: float = MPP_VOLTAGE_STEP_MAX,
         voltage_step_min: float = MPP_VOLTAGE_STEP_MIN,
+        on_instrument: bool = False,
         **kwargs,
     ) -> None:
         super().__init__(*args, **kwargs)
@@ -56,6 +72,9 @@ class MPPTrackingProtocol(MeasurementProtocol):
         self.voltage_step_initial = voltage_step_initial
         self.voltage_step_max = voltage_step_max
         self.voltage_step_min = voltage_step_min
+        #: Run the tracking loop on the SMU when it supports it (legacy
+        #: code always tracked on the host).
+        self.on_instrument = on_instrument
         #: Parameters of the automatic start-voltage J-V scan (legacy
         #: hardcoded 5 mV at 0.02 V/s).
         self.auto_scan_dv = AUTO_SCAN_DV
@@ -63,10 +82,11 @@ class MPPTrackingProtocol(MeasurementProtocol):
 
     # --- automatic start voltage (legacy auto branch) ---
 
+    @trace_span("start voltage scan")
     def _find_start_voltage(self, p: dict) -> float:
         """Run a reverse J-V scan (Voc -> 0) and return the MPP voltage."""
         self.status("Running reverse JV to find MPP starting voltage...")
-        time.sleep(1)  # legacy settle
+        self.clock.sleep(1)  # legacy settle
 
         iv_params = {
             "light_int": p["light_int"],
@@ -83,31 +103,78 @@ class MPPTrackingProtocol(MeasurementProtocol):
             "cell_name": p["cell_name"],
         }
 
-        v_smu, i_smu, _i_ref = scan_iv_points(
+        data = scan_iv_points(
             self.smu,
             iv_params,
             status=self.status,
             cancelled=self.cancelled,
             emit_data=self.emit_data,
+            schedule=self.schedule,
         )
 
         # cell voltage is positive, current negative: maximize -v*i (legacy)
-        p_smu = [v * i * -1 for v, i in zip(v_smu, i_smu, strict=False)]
-        max_power = max(p_smu)
-        return v_smu[p_smu.index(max_power)]
+        v_smu = data.column("v")
+        p_smu = v_smu * data.column("i") * -1
+        return float(v_smu[np.argmax(p_smu)])
 
     # --- tracking loop (legacy SMU.measure_MPP_time_dependent) ---
 
-    def _track(self, p: dict, v_mpp: float) -> tuple[list, list, list, list]:
+    def _tracks_on_instrument(self) -> bool:
+        return self.on_instrument and self.smu.mpp_period_min is not None
+
+    def _live_data(self, p: dict) -> LiveData:
+        """Columns of a tracking run: ``t``, ``v``, ``i``, ``i_ref`` and
+        the derived ``j`` and ``w`` (bounded when the run is streamed)."""
+        return LiveData(
+            "t",
+            "v",
+            "i",
+            "i_ref",
+            derived={
+                "j": _current_density(p["active_area"]),
+                "w": _power_density(p["active_area"]),
+            },
+            publish=("t", "w", "v", "j"),
+            max_rows=None if self.stream is None else STREAMED_HISTORY_ROWS,
+        )
+
+    def _track(self, p: dict, v_mpp: float) -> LiveData:
         smu = self.smu
-        parallel_reference = smu.use_reference_diode and smu.reference_diode_parallel
 
-        data_t: list[float] = []
-        data_w: list[float] = []
-        data_i: list[float] = []
-        data_i_ref: list[float] = []
-        data_j: list[float] = []
-        data_v: list[float] = []
+        with smu.batch():
+            # apply compliance settings (redundant if a JV scan just ran)
+            smu.set_voltage_limit(SMUChannel.CELL, p["Vmax"])
+            smu.set_current_limit(SMUChannel.CELL, p["Imax"])
+
+            smu.set_sense_mode(SMUChannel.CELL, _nwire_value(p["Nwire"]))
+            smu.setup_voltage_output(SMUChannel.CELL, p["Imax"])
+            smu.set_voltage(SMUChannel.CELL, v_mpp)
+            smu.enable_output(SMUChannel.CELL)
+
+        self.status(
+            "Stabilizing at initial operating point for " + str(p["Dwell"]) + " seconds"
+        )
+
+        def dwell_reading() -> None:
+            smu.measure_current(SMUChannel.CELL)
+
+        with trace_span("dwell"):
+            self.schedule.hold(p["Dwell"], keep_alive=dwell_reading, cancelled=self.cancelled)
+
+        with trace_span("tracking", duration=p["duration"], interval=p["interval"]):
+            if self._tracks_on_instrument():
+                data = self._track_on_instrument(p, v_mpp)
+            else:
+                data = self._track_on_host(p, v_mpp)
+
+        smu.turn_off()
+
+        return data
+
+    def _track_on_host(self, p: dict, v_mpp: float) -> LiveData:
+        smu = self.smu
+        parallel_reference = smu.use_reference_diode and smu.reference_diode_parallel
+        live = self._live_data(p)
 
         v_step = p.get("voltage_step", self.voltage_step_initial)
         v_step_max = p.get("voltage_step_max", self.voltage_step_max)
@@ -116,104 +183,107 @@ class MPPTrackingProtocol(MeasurementProtocol):
         steps: list[int] = []
         last_power = 0.0
 
-        # apply compliance settings (redundant if a JV scan just ran)
-        smu.set_voltage_limit(SMUChannel.CELL, p["Vmax"])
-        smu.set_current_limit(SMUChannel.CELL, p["Imax"])
-
-        smu.set_sense_mode(SMUChannel.CELL, _nwire_value(p["Nwire"]))
-        smu.setup_voltage_output(SMUChannel.CELL, p["Imax"])
-        smu.set_voltage(SMUChannel.CELL, v_mpp)
-        smu.enable_output(SMUChannel.CELL)
+        def keep_alive() -> None:
+            # keeps the instrument display alive (legacy)
+            if parallel_reference:
+                smu.measure_both_iv_points()
+            else:
+                smu.measure_current(SMUChannel.CELL)
 
-        self.status(
-            "Stabilizing at initial operating point for " + str(p["Dwell"]) + " seconds"
+        # first measurement at time zero
+        self.schedule.start(
+            p["interval"],
+            duration=p["duration"],
+            keep_alive=keep_alive,
+            cancelled=self.cancelled,
         )
+        for t in self.schedule.samples():
+            # measure power (legacy makes this redundant first read)
+            i, v = smu.measure_iv_point(SMUChannel.CELL)
+            if parallel_reference:
+                i, v, i_ref, _v_ref = smu.measure_both_iv_points()
+            else:
+                i, v = smu.measure_iv_point(SMUChannel.CELL)
+                i_ref = 0.0
+
+            # cell voltage is positive, current is negative
+            w = i * v * -1000.0 / p["active_area"]
+
+            live.append(t=t, v=v, i=i, i_ref=i_ref)
+            self.emit_data(live.delta())
+            if self.stream is not None:
+                self.stream.write(live)
+
+            # perturb-and-observe with adaptive step size (legacy)
+            if w < last_power:
+                # the power went down: we're going the wrong way
+                step_direction *= -1
+
+            steps.append(step_direction)
+            if len(steps) >= 8:
+                trend = sum(steps[len(steps) - 8 :])
+                if abs(trend) >= 3:
+                    # noticeable trend: increase the step to get there faster
+                    v_step *= 2
+                    steps = []  # reset history when changing scale
+                    if v_step > v_step_max:
+                        v_step = v_step_max
+                elif abs(trend) == 0 and v_step > v_step_min:
+                    v_step /= 2
+                    steps = []
+                    if v_step < v_step_min:
+                        v_step = v_step_min
+
+            v_mpp = v_mpp + v_step * step_direction
+
+            # force the voltage to stay within the compliance range
+            if v_mpp > abs(p["Vmax"]):
+                v_mpp = abs(p["Vmax"])
+            if v_mpp < -1 * abs(p["Vmax"]):
+                v_mpp = -1 * abs(p["Vmax"])
+
+            smu.set_voltage(SMUChannel.CELL, v_mpp)
+            last_power = w
+
+            self.status("Running MPP Measurement. v_step: " + str(v_step))
 
-        deadline = time.time() + p["Dwell"]
-        while time.time() < deadline:
-            smu.measure_current(SMUChannel.CELL)
             if self.cancelled():
                 break
 
-        start_time = time.time()
-        meas_time = start_time  # first measurement at time zero
-        while (time.time() - start_time) < p["duration"]:
-            now = time.time()
-            if now >= meas_time:
-                # measure power (legacy makes this redundant first read)
-                i, v = smu.measure_iv_point(SMUChannel.CELL)
-                if parallel_reference:
-                    i, v, i_ref, _v_ref = smu.measure_both_iv_points()
-                    data_i_ref.append(i_ref)
-                else:
-                    i, v = smu.measure_iv_point(SMUChannel.CELL)
-                    data_i_ref.append(0)
-
-                # cell voltage is positive, current is negative
-                w = i * v * -1000.0 / p["active_area"]
-
-                data_w.append(w)
-                data_t.append(now - start_time)
-                data_i.append(i)
-                data_j.append(i * 1000.0 / p["active_area"])
-                data_v.append(v)
-
-                self.emit_data(
-                    {
-                        "t": list(data_t),
-                        "w": list(data_w),
-                        "v": list(data_v),
-                        "j": list(data_j),
-                    }
-                )
-
-                meas_time = meas_time + p["interval"]
-
-                # perturb-and-observe with adaptive step size (legacy)
-                if w < last_power:
-                    # the power went down: we're going the wrong way
-                    step_direction *= -1
-
-                steps.append(step_direction)
-                if len(steps) >= 8:
-                    trend = sum(steps[len(steps) - 8 :])
-                    if abs(trend) >= 3:
-                        # noticeable trend: increase the step to get there faster
-                        v_step *= 2
-                        steps = []  # reset history when changing scale
-                        if v_step > v_step_max:
-                            v_step = v_step_max
-                    elif abs(trend) == 0 and v_step > v_step_min:
-                        v_step /= 2
-                        steps = []
-                        if v_step < v_step_min:
-                            v_step = v_step_min
-
-                v_mpp = v_mpp + v_step * step_direction
-
-                # force the voltage to stay within the compliance range
-                if v_mpp > abs(p["Vmax"]):
-                    v_mpp = abs(p["Vmax"])
-                if v_mpp < -1 * abs(p["Vmax"]):
-                    v_mpp = -1 * abs(p["Vmax"])
-
-                smu.set_voltage(SMUChannel.CELL, v_mpp)
-                last_power = w
-
-                self.status("Running MPP Measurement. v_step: " + str(v_step))
-            else:
-                # dummy measurement to keep the instrument display alive
-                if parallel_reference:
-                    smu.measure_both_iv_points()
-                else:
-                    smu.measure_current(SMUChannel.CELL)
+        return live
 
-            if self.cancelled():
-                break
+    def _track_on_instrument(self, p: dict, v_mpp: float) -> LiveData:
+        """Let the SMU run the tracking loop and collect its records."""
+        smu = self.smu
+        parallel_reference = smu.use_reference_diode and smu.reference_diode_parallel
+        live = self._live_data(p)
 
-        smu.turn_off()
+        voltage_steps = (
+            p.get("voltage_step", self.voltage_step_initial),
+            p.get("voltage_step_max", self.voltage_step_max),
+            p.get("voltage_step_min", self.voltage_step_min),
+        )
+
+        self.status("Running MPP Measurement on the SMU...")
+        tracker = smu.track_mpp(
+            v_mpp,
+            p["Vmax"],
+            voltage_steps,
+            p["interval"],
+            p["duration"],
+            reference=parallel_reference,
+        )
+        with contextlib.closing(tracker):
+            for t_chunk, v_chunk, i_chunk, i_ref_chunk in tracker:
+                live.extend(t=t_chunk, v=v_chunk, i=i_chunk, i_ref=i_ref_chunk)
+                self.emit_data(live.delta())
+                if self.stream is not None:
+                    self.stream.write(live)
+
+                if self.cancelled():
+                    break
 
-        return (data_t, data_v, data_i, data_i_ref)
+        return live
 
     # --- protocol interface ---
 
@@ -229,8 +299,12 @@ class MPPTrackingProtocol(MeasurementProtocol):
             )
 
         # check that the SMU can handle the requested measurement interval
-        if p["interval"] < self.smu.meas_period_min:
-            p["interval"] = self.smu.meas_period_min
+        if self._tracks_on_instrument():
+            period_min = self.smu.mpp_period_min
+        else:
+            period_min = self.smu.meas_period_min
+        if p["interval"] < period_min:
+            p["interval"] = period_min
             self.warn(
                 "WARNING: the SMU is unable to provide the requested measurement rate.\n"
                 "The measurement interval has been set to the maximum allowed by the SMU."
@@ -247,6 +321,7 @@ class MPPTrackingProtocol(MeasurementProtocol):
             duration=p["duration"],
         )
 
+        self.scheduler()
         self.status("Turning lamp on...")
         self.turn_lamp_on(p["light_int"])
         light_intensity: float | None = None
@@ -278,12 +353,14 @@ class MPPTrackingProtocol(MeasurementProtocol):
                 v_mpp = p["start_voltage"]
 
             self.status("Running MPP Measurement...")
-            t, v_smu, i_smu, i_ref = self._track(p, v_mpp)
+            self.open_stream(result)
+            result.set_columns(self._track(p, v_mpp))
+            i_ref = result.current_reference
 
             # average light level (legacy)
             if self.smu.use_reference_diode:
-                if self.smu.reference_diode_parallel and i_ref:
-                    avg_ref_current = sum(i_ref) / len(i_ref)
+                if self.smu.reference_diode_parallel and len(i_ref):
+                    avg_ref_current = float(np.mean(i_ref))
                     avg_light_level = abs(
                         100.0 * avg_ref_current / self.smu.full_sun_reference_current
                     )
@@ -291,13 +368,9 @@ class MPPTrackingProtocol(MeasurementProtocol):
                     avg_light_level = light_intensity
                 result.light_int_meas = avg_light_level
 
-            result.time = t
-            result.voltage = v_smu
-            result.current = i_smu
-            result.current_reference = i_ref
             # actual starting voltage for auto runs (legacy)
-            if p["start_voltage"] == "auto" and v_smu:
-                result.start_voltage = v_smu[0]
+            if p["start_voltage"] == "auto" and len(result.voltage):
+                result.start_voltage = float(result.voltage[0])
 
             if self.cancelled():
                 self.status("Run Aborted")
@@ -308,3 +381,4 @@ class MPPTrackingProtocol(MeasurementProtocol):
             self.smu.turn_off()
             self.status("Turning lamp off...")
             self.turn_lamp_off()
+            self.close_stream()
@@ -7,7 +7,8 @@ executes the protocol and translates its callbacks into Qt signals:
 
 - ``status_update(str)`` — protocol status messages,
 - ``warning_update(str)`` — non-fatal warnings,
-- ``data_ready(dict)`` — live data arrays for plotting,
+- ``data_ready(dict)`` — live data deltas for plotting (see
+  :mod:`iv_lab.data.live`),
 - ``progress_update(int)`` — percent complete, derived from the live
   data where possible (-1 when indeterminate),
 - ``finished(object)`` — the result dataclass, emitted after successful
@@ -32,6 +33,7 @@ import threading
 from PySide6.QtCore import QObject, Signal, Slot
 
 from iv_lab.measurements.protocols.base import MeasurementProtocol
+from iv_lab.tracing import active_tracer, trace_span
 
 
 class MeasurementWorker(QObject):
@@ -155,8 +157,13 @@ class MeasurementWorker(QObject):
         raises (the protocol's ``try/finally`` has already turned the
         hardware off).
         """
+        tracer = active_tracer()
+        if tracer is not None and threading.current_thread() is not threading.main_thread():
+            tracer.name_thread("measurement worker")
+        name = type(self.protocol).__name__.removesuffix("Protocol")
         try:
-            result = self.protocol.run(self.params)
+            with trace_span(name, category="worker"):
+                result = self.protocol.run(self.params)
         except Exception as exc:  # noqa: BLE001 - everything goes to the GUI
             self.error.emit(str(exc))
             return
@@ -10,6 +10,9 @@ first byte followed by a cumulative additive byte chain mod 256,
 hex-encoded. The output is therefore non-deterministic, but
 ``unscramble_string`` recovers the input regardless of the seed byte.
 It is obfuscation, not cryptography — exactly as in the legacy code.
+``scramble_string`` also scrambles whole data files for the ``sdPath``
+copy, so the byte chain is a running sum over bytes rather than a
+per-byte Python loop.
 
 Login rules preserved from ``system.user_login``:
 
@@ -29,6 +32,7 @@ Standard library only; no GUI dependencies.
 
 from __future__ import annotations
 
+import itertools
 import json
 import random
 from dataclasses import dataclass
@@ -73,15 +77,16 @@ class AuthenticatedUser:
 
 def scramble_string(text: str) -> str:
     """Obfuscate a string (legacy ``system.scramble_string``)."""
-    bytename = bytearray(text.encode())
+    bytename = text.encode()
     # use a single random byte to scramble the numeric string
     random.seed()
     randbyte = random.getrandbits(8)
-    hashed_bytes = [randbyte]
-    for i, b in enumerate(bytename):
-        hashed_bytes.append((hashed_bytes[i] + b) % 256)
+    # running sum from the random byte, mod 256
+    hashed_bytes = bytes(
+        total & 0xFF for total in itertools.accumulate(bytename, initial=randbyte)
+    )
 
-    return "".join(f"{b:02x}" for b in hashed_bytes)
+    return hashed_bytes.hex()
 
 
 def unscramble_string(text: str) -> str:
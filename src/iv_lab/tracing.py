@@ -0,0 +1,206 @@
+"""Phase tracing of measurement runs, exported as Chrome trace events.
+
+A :class:`Tracer` collects timed spans from every thread while it is
+active (:func:`tracing`); :func:`trace_span` marks a phase in the code —
+lamp on, light intensity, Voc check, dwell, scan, metrics, save, PDF —
+and does nothing but name the phase for the instrument profiler (see
+:func:`iv_lab.hardware.profiler.profile_phase`) when no tracer is
+active. :class:`~iv_lab.core.IVLabSystem` traces each run when its
+``trace_dir`` is set and writes one trace file per run.
+
+The files use the Chrome trace-event JSON format (complete ``"X"``
+events with microsecond timestamps, instant ``"i"`` events, and thread
+names as ``"M"`` metadata), which ``chrome://tracing`` and
+https://ui.perfetto.dev open directly; each thread is one track, so
+overlapping phases (e.g. the worker measuring while the GUI thread
+saves) show side by side.
+
+This module is standard library only.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+from iv_lab.hardware.profiler import profile_phase
+
+_active: Tracer | None = None
+
+
+class Tracer:
+    """Spans and instants of one traced run.
+
+    ``timer`` returns the current time in seconds (``time.perf_counter``
+    by default; runs on a virtual clock trace simulated time). Event
+    times are relative to the creation of the tracer.
+    """
+
+    def __init__(
+        self,
+        name: str = "",
+        *,
+        timer: Callable[[], float] = time.perf_counter,
+        metadata: dict | None = None,
+    ) -> None:
+        self.name = name
+        self.timer = timer
+        #: Free-form run information stored with the trace.
+        self.metadata = dict(metadata or {})
+        self.origin = timer()
+        #: Trace events in the order they ended.
+        self.events: list[dict] = []
+        self._threads: dict[int, str] = {}
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def _microseconds(self, t: float) -> float:
+        return round((t - self.origin) * 1e6, 3)
+
+    def _thread(self) -> int:
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        return tid
+
+    def name_thread(self, name: str) -> None:
+        """Name the calling thread's track (default: the Python thread name)."""
+        with self._lock:
+            self._threads[threading.get_ident()] = name
+
+    def add_span(
+        self, name: str, category: str, start: float, end: float, args: dict | None = None
+    ) -> None:
+        """Record a span from ``start`` to ``end`` (``timer`` times)."""
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": self._microseconds(start),
+            "dur": round((end - start) * 1e6, 3),
+            "pid": self._pid,
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            event["tid"] = self._thread()
+            self.events.append(event)
+
+    def instant(self, name: str, category: str = "run", **args) -> None:
+        """Record a point in time (e.g. a thread start) on this thread."""
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "i",
+            "s": "t",
+            "ts": self._microseconds(self.timer()),
+            "pid": self._pid,
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            event["tid"] = self._thread()
+            self.events.append(event)
+
+    def spans(self, name: str | None = None) -> list[dict]:
+        """The complete events, optionally only those called ``name``."""
+        with self._lock:
+            return [
+                e for e in self.events if e["ph"] == "X" and (name is None or e["name"] == name)
+            ]
+
+    def chrome_trace(self) -> dict:
+        """The trace as a Chrome trace-event JSON object."""
+        with self._lock:
+            threads = [
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": self._pid,
+                    "tid": tid,
+                    "args": {"name": name},
+                }
+                for tid, name in self._threads.items()
+            ]
+            process = {
+                "name": "process_name",
+                "ph": "M",
+                "pid": self._pid,
+                "tid": 0,
+                "args": {"name": self.name or "iv_lab"},
+            }
+            events = [process, *threads, *sorted(self.events, key=lambda e: e["ts"])]
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": self.metadata,
+        }
+
+    def write(self, path: str | Path) -> Path:
+        """Write :meth:`chrome_trace` to ``path``; returns the path."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.chrome_trace()), encoding="utf-8")
+        return path
+
+
+def active_tracer() -> Tracer | None:
+    """The tracer recording spans, if any."""
+    return _active
+
+
+@contextlib.contextmanager
+def tracing(tracer: Tracer) -> Iterator[Tracer]:
+    """Record the spans of all threads in ``tracer`` inside the block."""
+    global _active
+    previous, _active = _active, tracer
+    try:
+        yield tracer
+    finally:
+        _active = previous
+
+
+def start_tracing(tracer: Tracer) -> None:
+    """Make ``tracer`` record the spans of all threads (see :func:`tracing`)."""
+    global _active
+    _active = tracer
+
+
+def stop_tracing() -> Tracer | None:
+    """Stop recording; returns the tracer that was active."""
+    global _active
+    tracer, _active = _active, None
+    return tracer
+
+
+@contextlib.contextmanager
+def record_span(name: str, category: str = "run", **args) -> Iterator[None]:
+    """Trace the block as a span if a tracer is active.
+
+    Unlike :func:`trace_span` it leaves the profiler phase alone, for
+    spans around whole runs. Also usable as a decorator.
+    """
+    tracer = _active
+    if tracer is None:
+        yield
+        return
+    start = tracer.timer()
+    try:
+        yield
+    finally:
+        tracer.add_span(name, category, start, tracer.timer(), args)
+
+
+@contextlib.contextmanager
+def trace_span(name: str, category: str = "protocol", **args) -> Iterator[None]:
+    """Trace the block as a span and name it as the profiler phase.
+
+    Also usable as a decorator. ``args`` are shown with the span.
+    """
+    with profile_phase(name), record_span(name, category, **args):
+        yield
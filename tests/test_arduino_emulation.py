@@ -114,3 +114,16 @@ def test_emulated_arduino_has_no_settling_wait() -> None:
     arduino = create_arduino(make_settings())
 
     assert arduino.cell_stage_settling_time == 0.0
+
+
+def test_timing_profile_adds_command_latency_and_stage_settling() -> None:
+    from iv_lab.hardware import VirtualClock
+
+    arduino = EmulatedArduino(make_settings(emulationTiming="arduino-shutter-stage"))
+    arduino.clock = VirtualClock(tick=0.0)
+
+    arduino.open_shutter()
+    arduino.select_reference_cell()
+
+    assert arduino.selected_cell == "reference"
+    assert arduino.clock.now == pytest.approx(0.01 + 0.01 + 5.0)
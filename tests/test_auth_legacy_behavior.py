@@ -5,6 +5,10 @@ content; the only repository file touched is the committed generic
 template ``config/users_generic.txt`` (read-only).
 """
 
+import os
+import random
+import subprocess
+import sys
 from pathlib import Path
 
 import pytest
@@ -61,6 +65,24 @@ def test_scramble_output_is_hex_with_random_seed_byte() -> None:
     int(scrambled, 16)  # all hex
 
 
+def test_scramble_matches_the_legacy_byte_chain(monkeypatch) -> None:
+    monkeypatch.setattr(random, "getrandbits", lambda bits: 0xF0)
+
+    # seed byte, then the running sum mod 256: 0xf0 + 0x61 wraps to 0x51
+    assert scramble_string("abc") == "f0" + "51" + "b3" + "16"
+
+
+def test_auth_is_standard_library_only() -> None:
+    code = "import sys, iv_lab.services.auth; print('numpy' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": str(REPO_ROOT / "src")},
+    )
+    assert result.stdout.strip() == "False", result.stderr
+
+
 def test_committed_generic_users_file_decodes() -> None:
     # the committed legacy template must load with the migrated code
     users = load_users(REPO_ROOT / "config" / "users_generic.txt")
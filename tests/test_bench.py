@@ -0,0 +1,65 @@
+"""Benchmark suite: every case runs, results round-trip, regressions show."""
+
+import json
+
+import pytest
+
+from iv_lab.bench import (
+    BENCHMARKS,
+    Benchmark,
+    Timing,
+    compare,
+    read_results,
+    run_benchmarks,
+    write_results,
+)
+from iv_lab.bench.__main__ import main
+
+
+def test_every_case_runs_at_its_smallest_size() -> None:
+    timings = run_benchmarks(BENCHMARKS, quick=True)
+
+    assert [t.name for t in timings] == [b.name for b in BENCHMARKS]
+    assert [t.size for t in timings] == [b.sizes[0] for b in BENCHMARKS]
+    assert all(len(t.times) == 1 and t.best > 0 for t in timings)
+
+
+def test_results_round_trip_through_json(tmp_path) -> None:
+    path = tmp_path / "bench.json"
+    timings = [Timing("data.save_jv", 100, [0.002, 0.001, 0.003])]
+
+    write_results(path, timings)
+
+    document = json.loads(path.read_text())
+    assert document["format"] == "iv_lab.bench"
+    assert document["results"][0]["best"] == 0.001
+    assert document["results"][0]["median"] == 0.002
+    assert read_results(path) == timings
+
+
+def test_comparison_flags_slower_cases_only() -> None:
+    baseline = [Timing("a", 10, [1.0]), Timing("a", 100, [2.0]), Timing("gone", 10, [1.0])]
+    current = [Timing("a", 10, [1.1]), Timing("a", 100, [3.0]), Timing("new", 10, [1.0])]
+
+    comparisons = compare(current, baseline)
+
+    assert [(c.name, c.size) for c in comparisons] == [("a", 10), ("a", 100)]
+    assert comparisons[1].ratio == pytest.approx(1.5)
+    assert [c.is_regression(0.25) for c in comparisons] == [False, True]
+
+
+def test_command_line_exits_nonzero_on_regression(tmp_path, monkeypatch, capsys) -> None:
+    calls = []
+    fast = Benchmark("toy.case", lambda size, workdir: lambda: calls.append(size), (10,), repeat=2)
+    monkeypatch.setattr("iv_lab.bench.__main__.BENCHMARKS", (fast,))
+    baseline = tmp_path / "baseline.json"
+    write_results(baseline, [Timing("toy.case", 10, [1e-12])])
+    output = tmp_path / "bench.json"
+
+    code = main(["--output", str(output), "--compare", str(baseline)])
+
+    assert code == 1
+    assert len(calls) == 3  # warm-up and two timed calls
+    assert read_results(output)[0].key == ("toy.case", 10)
+    assert "REGRESSION" in capsys.readouterr().out
+    assert main(["--compare", str(output), "--threshold", "1e9"]) == 0
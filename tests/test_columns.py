@@ -0,0 +1,54 @@
+"""Growable column store with derived columns."""
+
+import numpy as np
+
+from iv_lab.data.columns import ColumnStore
+
+
+def test_derived_columns_are_computed_from_the_stored_ones() -> None:
+    store = ColumnStore("v", "i", derived={"j": lambda c: c["i"] * 1000.0 / 0.16})
+
+    store.append(v=0.0, i=-0.004)
+    store.extend(v=[0.5, 0.6], i=[-0.0035, 0.001])
+
+    assert list(store.column("j")) == [i * 1000.0 / 0.16 for i in (-0.004, -0.0035, 0.001)]
+    assert list(store.column("j", 2)) == [0.001 * 1000.0 / 0.16]
+    assert set(store.snapshot()) == {"v", "i", "j"}
+    assert len(store) == 3
+
+
+def test_stored_columns_are_views_of_the_buffer() -> None:
+    store = ColumnStore("t", capacity=4)
+    store.extend(t=[0.0, 1.0, 2.0])
+
+    assert np.shares_memory(store.column("t"), store.column("t", 1))
+    assert list(store.column("t", 1)) == [1.0, 2.0]
+
+
+def test_capacity_doubles_as_the_columns_grow() -> None:
+    store = ColumnStore("t", "v", capacity=256)
+
+    for k in range(1000):
+        store.append(t=float(k), v=0.5)
+
+    # two columns of 1024 rows: 8 bytes per value plus the unused tail
+    assert store.nbytes == 2 * 1024 * 8
+    assert store.column("t")[-1] == 999.0
+
+
+def test_bounded_store_keeps_an_even_history_of_the_run() -> None:
+    store = ColumnStore("t", "v", derived={"w": lambda c: 2 * c["v"]}, max_rows=8)
+    store.append(t=0.0, v=0.0)
+    view = store.column("t")
+
+    for k in range(1, 20):
+        store.append(t=float(k), v=float(k))
+
+    # every 8th sample of the decimated part, then the latest in full
+    assert list(store.column("t")) == [0, 8, 16, 17, 18, 19]
+    assert list(store.column("w")) == [0, 16, 32, 34, 36, 38]
+    assert (store.stride, store.dropped) == (8, 14)
+    assert store.nbytes == 2 * 8 * 8
+    assert list(view) == [0.0]
+    # rows by sample number: sample 5 was dropped, 8 is kept
+    assert [store.position(k) for k in (0, 5, 8, 17, 20)] == [0, 1, 1, 3, 6]
@@ -10,7 +10,9 @@ from PySide6.QtCore import QCoreApplication, QEventLoop, QTimer
 
 from iv_lab.config import SystemSettings, load_settings
 from iv_lab.core import IVLabSystem
+from iv_lab.data import file_writer
 from iv_lab.data.results import ConstantVoltageResults
+from iv_lab.hardware import SYSTEM_CLOCK, VirtualClock
 from iv_lab.hardware.arduino.drivers.emulated import EmulatedArduino
 from iv_lab.hardware.lamp.drivers.emulated import EmulatedLamp
 from iv_lab.hardware.smu.base import SMUChannel
@@ -119,6 +121,16 @@ def test_system_creates_emulated_hardware_via_factories(tmp_path: Path) -> None:
     assert system.smu.reference_diode_parallel
 
 
+def test_system_injects_the_clock_into_all_devices(tmp_path: Path) -> None:
+    assert make_system(tmp_path).smu.clock is SYSTEM_CLOCK
+
+    clock = VirtualClock()
+    system = make_system(tmp_path, clock=clock)
+
+    assert system.smu.clock is clock
+    assert system.lamp.clock is clock
+
+
 def test_parallel_reference_rules(tmp_path: Path) -> None:
     system_2401 = make_system(tmp_path, overrides={"SMU": {"model": "2401"}})
     assert not system_2401.smu.reference_diode_parallel
@@ -414,6 +426,43 @@ def test_auto_save_writes_file_after_run(tmp_path: Path) -> None:
     assert len(saved) == 1
 
 
+def test_stream_data_writes_the_file_without_auto_save(tmp_path: Path) -> None:
+    system = make_system(tmp_path, overrides={"IVsys": {"streamData": True}})
+    system.hardware_init()
+    system.login("felix", "111111")
+
+    system.run_measurement("Constant Voltage, Measure J", cv_params())
+
+    data_dir = tmp_path / "data_root" / "felix" / "data"
+    (saved,) = data_dir.iterdir()
+    assert saved.name.startswith("test cell_CV_") and saved.suffix == ".csv"
+    lines = saved.read_text().splitlines()
+    n_header = int(lines[0].split(",")[1])
+    assert len(lines) - n_header == len(system.results["CV"].time)
+
+
+def test_auto_save_keeps_the_streamed_file(tmp_path: Path, monkeypatch) -> None:
+    system = make_system(tmp_path, overrides={"IVsys": {"streamData": True}})
+    system.hardware_init()
+    system.login("felix", "111111")
+    system.toggle_auto_save(True)
+    written = []
+    monkeypatch.setattr(
+        "iv_lab.data.file_writer._write_with_header",
+        lambda source, target, header, write=file_writer._write_with_header: (
+            written.append(target),
+            write(source, target, header),
+        ),
+    )
+
+    system.run_measurement("Constant Voltage, Measure J", cv_params())
+
+    # written once, when the stream closed; the save only adds the sdPath copy
+    (saved,) = (tmp_path / "data_root" / "felix" / "data").iterdir()
+    assert written == [saved]
+    assert system.results["CV"].data_file == saved
+
+
 def test_turn_off_order_is_shutter_lamp_smu(tmp_path: Path) -> None:
     # safe order per docs/HARDWARE.md: shutter first, then lamp, then SMU
     settings = settings_dict(tmp_path)
@@ -2,6 +2,7 @@
 
 from pathlib import Path
 
+import numpy as np
 import pytest
 
 from iv_lab.data import (
@@ -12,6 +13,8 @@ from iv_lab.data import (
     MPPResults,
     SystemContext,
 )
+from iv_lab.data.columns import ColumnStore
+from iv_lab.data.file_writer import StreamingWriter
 from iv_lab.data.results import CalibrationResults
 from iv_lab.services import unscramble_string
 
@@ -206,6 +209,37 @@ def test_cc_file_matches_legacy_format(tmp_path: Path) -> None:
     assert lines[-1] == "0.25,0.551,0.0"
 
 
+def test_int_setpoint_is_written_as_an_int(tmp_path: Path) -> None:
+    def cc_result() -> ConstantCurrentResults:
+        return ConstantCurrentResults(
+            start_time="20260612_140000",
+            cell_name="cellA",
+            active_area=0.16,
+            light_int=100.0,
+            Nwire="4 wire",
+            set_current=0,
+            interval=0.25,
+            duration=30.0,
+        )
+
+    # the CC protocol fills the current column with the setpoint as given
+    result = cc_result()
+    result.time = np.array([0.0, 0.25])
+    result.voltage = np.array([0.55, 0.551])
+    result.current = np.full(2, result.set_current)
+    _, lines = read_file(make_writer(tmp_path), result)
+    assert lines[-2:] == ["0.0,0.55,0", "0.25,0.551,0"]
+
+    # a streamed run writes the same rows
+    writer = make_writer(tmp_path / "streamed")
+    streamed = cc_result()
+    store = ColumnStore("t", "v")
+    stream = StreamingWriter(writer, streamed, writer.data_file_path(streamed, "felix"))
+    store.extend(t=result.time, v=result.voltage)
+    stream.write(store)
+    assert stream.close().read_text().splitlines()[-2:] == lines[-2:]
+
+
 def test_mpp_file_matches_legacy_format(tmp_path: Path) -> None:
     writer = make_writer(tmp_path)
     result = MPPResults(
@@ -291,6 +325,172 @@ def test_data_rows_parse_as_numbers(tmp_path: Path) -> None:
         assert len(values) == 3
 
 
+def test_numpy_columns_write_the_same_rows_as_lists(tmp_path: Path) -> None:
+    # numpy scalars round differently: round(np.float64(6.54067805e-05), 12)
+    # prints as 6.540678e-05 instead of 6.5406781e-05
+    values = dict(voltage=[0.0, 0.05], current=[-6.54067805e-05, -6.979805e-07])
+    _, from_lists = read_file(make_writer(tmp_path / "lists"), iv_result(**values))
+
+    arrays = {name: np.array(v) for name, v in values.items()}
+    _, from_arrays = read_file(make_writer(tmp_path / "arrays"), iv_result(**arrays))
+
+    assert from_arrays == from_lists
+    assert from_lists[-2] == "0.0,-6.5406781e-05,100.0"
+
+
+def legacy_mpp_rows(time, voltage, current, current_reference, area) -> list[str]:
+    """The legacy per-value formatting loop of ``writeDataFile``."""
+    rows = []
+    for t, v, i_ref, i in zip(time, voltage, current_reference, current, strict=False):
+        w = abs(i * v * 1000.0 / area)
+        light = -100.0 * i_ref / FULL_SUN_CURRENT
+        rows.append(
+            str(round(t, 6))
+            + ","
+            + str(round(v, 12))
+            + ","
+            + str(round(i, 12))
+            + ","
+            + str(round(w, 12))
+            + ","
+            + str(round(light, 12))
+        )
+    return rows
+
+
+def test_data_rows_match_the_legacy_formatting_byte_for_byte(tmp_path: Path) -> None:
+    rng = np.random.default_rng(20260612)
+    magnitudes = 10.0 ** np.arange(-16, 20)
+    n = 20_000
+    columns = {
+        name: (rng.standard_normal(n) * rng.choice(magnitudes, n)).tolist()
+        for name in ("time", "voltage", "current", "current_reference")
+    }
+    # scientific/positional boundary, signed zeros, exact and near .5 ties,
+    # values beyond 15 significant digits, inf and nan
+    edges = [
+        *(0.0, -0.0, 1e-4, 9.9999999999e-05, 1e-05, -1e-13, 5e-13, 2.5e-12),
+        *(0.0078125, 1.0000005, 2.5e-06, 123456.7890125, 1e15, 9.99e14, 1e16),
+        *(1.5e300, float("inf"), float("-inf"), float("nan")),
+        *((k + 0.5) / 10**12 for k in range(100)),
+        *((k + 0.5) / 10**6 for k in range(100)),
+    ]
+    for name, values in columns.items():
+        values[: len(edges)] = edges
+        # pair the edge values with others in the power column
+        columns[name] = values[::-1] if name == "voltage" else values
+    expected = legacy_mpp_rows(*columns.values(), 0.16)
+
+    for kind, convert in (("lists", list), ("arrays", np.array)):
+        result = MPPResults(
+            start_time="20260612_140000",
+            cell_name="cellA",
+            active_area=0.16,
+            light_int=100.0,
+            light_int_meas=100.0,
+            Nwire="2 wire",
+            start_voltage=0.45,
+            interval=0.25,
+            duration=30.0,
+            **{name: convert(values) for name, values in columns.items()},
+        )
+        _, lines = read_file(make_writer(tmp_path / kind), result)
+
+        n_header = int(lines[0].split(",")[1])
+        assert lines[n_header:] == expected
+
+
+def test_int_and_uneven_columns_keep_the_legacy_rows(tmp_path: Path) -> None:
+    # round() keeps ints, and the legacy loop zips to the shortest column
+    result = iv_result(voltage=[0, 1, 2], current=[-0.004, -0.0039, 0.5, 0.7])
+
+    _, lines = read_file(make_writer(tmp_path), result)
+
+    assert lines[-2:] == ["0,-0.004,100.0", "1,-0.0039,99.5"]
+
+
+def test_streamed_file_survives_a_crash_and_matches_a_save(tmp_path: Path) -> None:
+    writer = make_writer(tmp_path)
+    result = MPPResults(
+        start_time="20260612_140000",
+        cell_name="cellA",
+        active_area=0.16,
+        light_int=100.0,
+        Nwire="2 wire",
+        start_voltage="auto",
+        interval=1.0,
+        duration=3600.0,
+    )
+    store = ColumnStore("t", "v", "i", "i_ref")
+    path = writer.data_file_path(result, "felix")
+    stream = StreamingWriter(writer, result, path, buffer_rows=2)
+    for k in range(3):
+        store.append(t=float(k), v=0.45 + 0.001 * k, i=-0.0035, i_ref=-0.004)
+        stream.write(store)
+
+    # a crash now leaves a valid legacy file with the rows written so far
+    lines = stream.partial_path.read_text().splitlines()
+    n_header = int(lines[0].split(",")[1])
+    assert lines[n_header - 1].startswith("Time(s),Voltage(V)")
+    assert lines[n_header:] == ["0.0,0.45,-0.0035,9.84375,100.0", "1.0,0.451,-0.0035,9.865625,100.0"]
+
+    # the final header has the measured light intensity and start voltage
+    result.light_int_meas = 100.0
+    result.start_voltage = 0.45
+    result.set_columns(store)
+    assert stream.close() == path
+    assert not stream.partial_path.exists()
+
+    saved, _ = make_writer(tmp_path / "saved").save(result, "felix")
+    assert path.read_text() == saved.read_text()
+    assert "Measured Light Intensity,100.0,% sun" in path.read_text().splitlines()
+
+
+def test_streamed_run_keeps_every_row_of_a_bounded_store(tmp_path: Path, monkeypatch) -> None:
+    writer = make_writer(tmp_path)
+    result = ConstantCurrentResults(
+        start_time="20260612_140000",
+        cell_name="cellA",
+        active_area=0.16,
+        light_int=100.0,
+        Nwire="2 wire",
+        set_current=0,
+        interval=1.0,
+        duration=3600.0,
+    )
+    store = ColumnStore("t", "v", max_rows=4)
+    stream = StreamingWriter(writer, result, writer.data_file_path(result, "felix"), buffer_rows=3)
+    for k in range(10):
+        store.append(t=float(k), v=0.5)
+        stream.write(store)
+    result.set_columns(store)
+    result.current = [0] * len(result.voltage)
+    path = stream.close()
+
+    assert result.data_file == path
+    lines = path.read_text().splitlines()
+    n_header = int(lines[0].split(",")[1])
+    assert [line.split(",")[0] for line in lines[n_header:]] == [f"{k}.0" for k in range(10)]
+
+    # saving the finished run leaves its file as it is, and copies it to sdPath
+    rewrites = []
+    monkeypatch.setattr(
+        "iv_lab.data.file_writer._write_with_header", lambda *args: rewrites.append(args)
+    )
+    assert writer.save(result, "felix")[0] == path
+    assert rewrites == []
+    (sd_file,) = Path(writer.context.sd_path).iterdir()
+    assert unscramble_string(sd_file.read_text()) == path.read_text()
+
+    # under another cell name, the rows come from the streamed file
+    monkeypatch.undo()
+    result.cell_name = "cellB"
+    renamed, _ = writer.save(result, "felix")
+    renamed_lines = renamed.read_text().splitlines()
+    assert "cellB" in renamed.name
+    assert renamed_lines[n_header:] == lines[n_header:]
+
+
 def test_data_file_is_written_as_utf8(tmp_path: Path) -> None:
     # A non-ASCII header value (here in the light-source name) must be encoded
     # as UTF-8, not the platform default (cp1252 on Windows). The micro sign
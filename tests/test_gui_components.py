@@ -1,6 +1,7 @@
 """Headless tests for the GUI building blocks (offscreen platform)."""
 
 
+from iv_lab.data import LiveData
 from iv_lab.data.results import IVResults
 from iv_lab.gui.dialogs.logoff_dialog import LogOffDialog
 from iv_lab.gui.panels.light_panel import LightLevelPanel
@@ -72,6 +73,30 @@ def test_plot_panel_routes_data_by_keys() -> None:
     assert panel.stack.currentIndex() == PANEL_CALIBRATION
 
 
+def test_plot_panel_draws_live_deltas_from_the_shared_buffer() -> None:
+    panel = PlotPanel()
+    live = LiveData("t", "j")
+    deltas = []
+    for k in range(3):
+        live.append(t=float(k), j=-25.0 + k)
+        deltas.append(live.delta())
+
+    # queued behind a slow redraw: the first delta draws all three samples
+    panel.update_live_data(deltas[0])
+    x, y = panel._curve_constant_v.getData()
+    assert list(x) == [0.0, 1.0, 2.0]
+    assert list(y) == [-25.0, -24.0, -23.0]
+    assert panel.stack.currentIndex() == PANEL_CONSTANT_V
+
+    panel.select_panel(PANEL_IV)
+    panel.update_live_data(deltas[2])  # already drawn: skipped
+    assert panel.stack.currentIndex() == PANEL_IV
+
+    live.append(t=3.0, j=-22.0)
+    panel.update_live_data(live.delta())
+    assert len(panel._curve_constant_v.getData()[0]) == 4
+
+
 def test_plot_panel_iv_results_grid_formats() -> None:
     panel = PlotPanel()
     result = IVResults(
@@ -199,6 +199,24 @@ def test_cv_run_via_buttons_updates_plots_and_state(tmp_path: Path) -> None:
     assert window.button_save_data.isEnabled()
 
 
+def test_instrument_profile_dialog_shows_the_commands_of_a_run(tmp_path: Path) -> None:
+    window = make_window(tmp_path)
+    login(window)
+    window._show_instrument_profile()
+    dialog = window.instrument_profile_dialog
+    dialog.check_enabled.setChecked(True)
+    window.button_initialize.click()
+
+    run_cv(window)
+    dialog.refresh()
+
+    methods = {dialog.table.item(row, 3).text() for row in range(dialog.table.rowCount())}
+    assert {"connect", "measure_current", "light_on"} <= methods
+    dialog.check_enabled.setChecked(False)
+    assert not window.system.is_profiling()
+    dialog.close()
+
+
 def test_dark_jv_run_updates_results_grid(tmp_path: Path) -> None:
     window = make_window(tmp_path)
     login(window)
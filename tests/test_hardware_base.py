@@ -1,12 +1,16 @@
+import threading
+
 import pytest
 
 from iv_lab.hardware import (
+    SYSTEM_CLOCK,
     HardwareCommandError,
     HardwareConnectionError,
     HardwareDevice,
     HardwareError,
     HardwareSafetyError,
     HardwareTimeoutError,
+    VirtualClock,
 )
 
 
@@ -94,3 +98,57 @@ def test_exceptions_inherit_from_hardware_error(exc_type: type) -> None:
 
     with pytest.raises(HardwareError):
         raise exc_type("boom")
+
+
+def test_devices_default_to_the_system_clock() -> None:
+    assert DummyDevice().clock is SYSTEM_CLOCK
+
+
+def test_virtual_clock_sleep_advances_instantly() -> None:
+    clock = VirtualClock(start=100.0, tick=0.0)
+
+    clock.sleep(3600.0)
+    clock.sleep(-1.0)  # negative sleeps are ignored, like zero
+
+    assert clock.time() == 3700.0
+
+
+def test_virtual_clock_only_moves_when_advanced() -> None:
+    clock = VirtualClock(start=1.7e9)
+
+    assert clock.time() == clock.time() == 1.7e9
+    before = clock.perf_counter_ns()
+    clock.advance(1e-7)  # kept even at an epoch-sized start
+    clock.sleep(1e-9)
+
+    assert clock.perf_counter_ns() - before == 101
+
+
+def test_virtual_clock_is_advanced_safely_from_threads() -> None:
+    clock = VirtualClock()
+
+    def sleeper() -> None:
+        for _ in range(1000):
+            clock.sleep(0.001)
+
+    threads = [threading.Thread(target=sleeper) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert clock.perf_counter_ns() == 4 * 1000 * 1_000_000
+
+
+def test_virtual_clock_reads_advance_by_tick() -> None:
+    clock = VirtualClock(tick=0.5)
+
+    # a busy-polling loop without sleeps still reaches its deadline
+    deadline = clock.time() + 10.0
+    reads = 0
+    while clock.time() < deadline:
+        reads += 1
+
+    assert reads == 19
+    with pytest.raises(ValueError):
+        VirtualClock(tick=-1.0)
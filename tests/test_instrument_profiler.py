@@ -0,0 +1,186 @@
+"""Per-command instrument profiler (emulated system and the real 26xx
+driver on the simulated instrument)."""
+
+from pathlib import Path
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+from iv_lab.config import SMUSettings, SystemSettings
+from iv_lab.core import IVLabSystem
+from iv_lab.hardware import VirtualClock
+from iv_lab.hardware.mock import Keithley26xxMock, MockResourceManager, use_mock_visa
+from iv_lab.hardware.profiler import (
+    InstrumentProfiler,
+    LatencyHistogram,
+    main,
+    profile_phase,
+)
+from iv_lab.hardware.smu import SMUChannel
+from iv_lab.hardware.smu.drivers.emulated import EmulatedSMU
+from iv_lab.hardware.smu.drivers.keithley_26xx import Keithley26xxSMU
+from iv_lab.services import write_users
+
+_app = QCoreApplication.instance() or QCoreApplication([])
+
+
+def make_system(tmp_path: Path, clock: VirtualClock) -> IVLabSystem:
+    settings = SystemSettings.model_validate(
+        {
+            "computer": {
+                "hardware": "Test PC",
+                "os": "Windows 11",
+                "basePath": str(tmp_path / "data_root"),
+                "sdPath": "",
+            },
+            "IVsys": {
+                "sysName": "IVLab",
+                "fullSunReferenceCurrent": 0.004,
+                "calibrationDateTime": "Wed Jun  8 16:07:18 2022",
+                "referenceDiodeImax": 0.005,
+            },
+            "lamp": {"brand": "manual", "model": "manual", "emulate": True},
+            "SMU": {
+                "brand": "Keithley",
+                "model": "2602",
+                "visa_address": "GPIB0::24::INSTR",
+                "visa_library": "visa64.dll",
+                "emulate": True,
+                "useReferenceDiode": False,
+            },
+        }
+    )
+    users_file = tmp_path / "users.txt"
+    write_users(users_file, {"felix": "111111"})
+    system = IVLabSystem(
+        settings,
+        users_file=users_file,
+        settings_file=tmp_path / "system_settings.json",
+        threaded=False,
+        clock=clock,
+    )
+    system.smu.meas_period_min = 0.0
+    return system
+
+
+def cv_params() -> dict:
+    return {
+        "light_int": 100.0,
+        "set_voltage": 0.2,
+        "interval": 0.1,
+        "duration": 1.0,
+        "Imax": 0.01,
+        "Vmax": 2.0,
+        "Dwell": 0.0,
+        "Nwire": "2 wire",
+        "active_area": 0.16,
+        "cell_name": "test cell",
+    }
+
+
+def test_system_profiles_commands_per_phase_and_restores_drivers(tmp_path) -> None:
+    clock = VirtualClock()
+    system = make_system(tmp_path, clock)
+    system.start_profiling()
+    assert system.is_profiling()
+
+    system.hardware_init()
+    system.login("felix", "111111")
+    assert system.run_measurement("Constant Voltage, Measure J", cv_params())
+
+    rows = {(r["device"], r["phase"], r["method"]): r for r in system.profiler.rows()}
+    assert rows["Emulated Keithley 2602", "hardware init", "connect"]["count"] == 1
+    assert rows["Emulated manual manual", "ConstantVoltage / lamp on", "light_on"]["count"] == 1
+    measurements = rows["Emulated Keithley 2602", "ConstantVoltage / measurement", "measure_current"]
+    assert measurements["count"] >= 10
+    # emulated integration time on the virtual clock, read without advancing it
+    assert measurements["p50"] == pytest.approx(system.smu.integration_delay, rel=0.15)
+    assert system.profile_report()["format"] == "iv_lab.profile"
+
+    system.stop_profiling()
+    assert type(system.smu) is EmulatedSMU
+    assert not system.is_profiling()
+    count = system.profiler.rows()
+    system.smu.measure_current(SMUChannel.CELL)
+    assert system.profiler.rows() == count
+
+
+def connect_26xx(profiler: InstrumentProfiler, clock: VirtualClock):
+    instrument = Keithley26xxMock(clock=clock)
+    rm = MockResourceManager({"GPIB0::24::INSTR": instrument}, latency=0.001, clock=clock)
+    smu = Keithley26xxSMU(
+        SMUSettings(
+            brand="Keithley",
+            model="2602",
+            visa_address="GPIB0::24::INSTR",
+            visa_library="visa64.dll",
+            emulate=False,
+        )
+    )
+    smu.clock = clock
+    profiler.attach(smu)
+    with use_mock_visa(rm):
+        smu.connect()
+    (resource,) = rm.resources
+    return smu, resource
+
+
+def test_raw_tsp_and_visa_calls_are_counted_with_their_bytes() -> None:
+    clock = VirtualClock(tick=0.0)
+    profiler = InstrumentProfiler(lambda: clock.now)
+    smu, resource = connect_26xx(profiler, clock)
+    resource.reset_counters()
+
+    with profile_phase("scan"):
+        smu.setup_voltage_output(SMUChannel.CELL, 0.01)
+        with smu.batch():
+            smu.set_voltage(SMUChannel.CELL, 0.1)
+        smu.set_voltage(SMUChannel.CELL, 0.2)
+
+    rows = {r["method"]: r for r in profiler.rows() if r["phase"] == "scan"}
+    visa = [r for method, r in rows.items() if method.startswith("MockVisaResource.")]
+    # every call writes one message; a query's own write and read are not
+    # counted again
+    assert sum(r["count"] for r in visa) == resource.write_count
+    # (the mock also counts the write termination)
+    assert sum(r["bytes_out"] for r in visa) == resource.bytes_written - resource.write_count
+    # the library checks the error queue after each write_lua: one more query
+    assert rows["SMU26xx.write_lua"]["count"] >= 1
+    assert rows["MockVisaResource.query"]["count"] >= rows["SMU26xx.write_lua"]["count"]
+    # the API rows count the wire calls made inside them
+    api = [r for r in rows.values() if r["layer"] == "api"]
+    assert sum(r["io_calls"] for r in api if r["method"] == "setup_voltage_output") >= 1
+    # 1 ms bus latency per message on the virtual clock
+    assert rows["MockVisaResource.write"]["p50"] == pytest.approx(0.001, rel=0.15)
+
+    profiler.detach()
+    assert type(smu) is Keithley26xxSMU
+    assert type(resource).__name__ == "MockVisaResource"
+    assert type(resource) is not type(smu.smu)
+    assert "write_lua" not in vars(smu.smu)
+
+
+def test_histogram_percentiles() -> None:
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.add(ms * 1e-3)
+
+    assert histogram.count == 100
+    assert histogram.percentile(50) == pytest.approx(0.050, rel=0.12)
+    assert histogram.percentile(99) == pytest.approx(0.099, rel=0.12)
+    assert histogram.percentile(100) <= histogram.max == pytest.approx(0.1)
+
+
+def test_command_line_prints_a_saved_report(tmp_path, capsys) -> None:
+    clock = VirtualClock(tick=0.0)
+    profiler = InstrumentProfiler(lambda: clock.now)
+    smu, _ = connect_26xx(profiler, clock)
+    smu.measure_current(SMUChannel.CELL)
+    path = tmp_path / "profile.json"
+    profiler.write_report(path)
+
+    assert main([str(path), "--layer", "api", "--sort", "count"]) == 0
+    out = capsys.readouterr().out
+    assert "measure_current" in out
+    assert "SMU26xx.query_lua" not in out
+    assert main([str(tmp_path / "missing.json")]) == 1
@@ -157,6 +157,45 @@ def test_too_fast_scan_adjusts_dv_and_warns() -> None:
     assert any("unable to provide the requested measurement rate" in w for w in warnings)
 
 
+def test_fast_scan_uses_hardware_sweep() -> None:
+    warnings: list[str] = []
+    smu = make_smu()
+    smu.meas_period_min = 0.5  # too slow for point-by-point
+    smu.sweep_period_min = 0.0
+    set_voltage_calls = []
+    smu.set_voltage = lambda channel, v: set_voltage_calls.append(v)
+    protocol = make_protocol(smu, warning_callback=warnings.append)
+
+    result = protocol.run(iv_params())
+
+    # no dV adjustment, the sweep keeps up
+    assert not warnings
+    assert result.dV == pytest.approx(0.05)
+    assert len(result.voltage) == 12
+    assert result.voltage[-1] == pytest.approx(0.6)
+    assert result.current[0] == pytest.approx(-EMULATED_FULL_SUN_CURRENT, rel=0.02)
+    assert all(i == 0.0 for i in result.current_reference)
+    # only the dwell point is set; the steps are sourced by the sweep
+    assert set_voltage_calls == [0.0]
+    assert not smu.output_enabled(SMUChannel.CELL)
+
+
+def test_scan_stopping_at_voc_stays_point_by_point() -> None:
+    smu = make_smu()
+    smu.meas_period_min = 0.0
+    smu.sweep_period_min = 0.0
+
+    def no_sweep(*args):
+        raise AssertionError("stop at Voc must not use the hardware sweep")
+
+    smu.sweep_voltage = no_sweep
+    protocol = make_protocol(smu)
+
+    result = protocol.run(iv_params(stop_V="Voc", Vmax=0.7))
+
+    assert result.current[-1] > 0.001  # ended at the forward current limit
+
+
 def test_cancellation_returns_partial_data() -> None:
     smu = make_smu()
     measured = []
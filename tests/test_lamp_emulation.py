@@ -171,3 +171,33 @@ def test_manual_lamp_is_a_no_op_with_state() -> None:
     lamp.turn_off()  # no-op, must not raise
     lamp.disconnect()
     assert not lamp.is_connected()
+
+
+def test_timing_profile_models_filter_wheel_moves() -> None:
+    from iv_lab.hardware import VirtualClock
+
+    lamp = EmulatedLamp(make_settings(emulationTiming="keithley-filter-wheel"))
+    lamp.clock = VirtualClock(tick=0.0)
+
+    lamp.connect()
+    assert lamp.clock.now == pytest.approx(7.0)
+    lamp.light_on(100)
+    assert lamp.clock.now == pytest.approx(18.0)
+    lamp.light_off()
+    lamp.light_off()  # already dark: no move
+    assert lamp.clock.now == pytest.approx(25.0)
+
+
+def test_timing_profile_light_on_waits_for_the_warm_up() -> None:
+    from iv_lab.hardware import VirtualClock
+
+    lamp = EmulatedLamp(
+        make_settings(emulationTiming={"profile": "verasol-lss7120", "warmupTime": 60})
+    )
+    lamp.clock = VirtualClock(tick=0.0)
+    lamp.connect()
+    lamp.clock.advance(20.0)
+
+    lamp.light_on(100)
+
+    assert lamp.clock.now == pytest.approx(1.0 + 60.0 + 0.3)
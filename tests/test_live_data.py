@@ -0,0 +1,77 @@
+"""Append-only live data buffers and their deltas."""
+
+import numpy as np
+
+from iv_lab.data import LiveData
+
+
+def test_deltas_carry_only_new_values_with_a_sequence_number() -> None:
+    live = LiveData("t", "j", capacity=2)
+
+    live.append(t=0.0, j=-25.0)
+    first = live.delta()
+    live.extend(t=[1.0, 2.0, 3.0], j=np.array([-24.0, -23.0, -22.0]))
+    second = live.delta()
+
+    assert first == {"seq": 1, "live": live, "t": [0.0], "j": [-25.0]}
+    assert (second["seq"], second["t"], second["j"]) == (2, [1.0, 2.0, 3.0], [-24.0, -23.0, -22.0])
+    assert live.delta()["t"] == []
+    assert len(live) == 4
+    assert list(live.column("j")) == [-25.0, -24.0, -23.0, -22.0]
+
+
+def test_views_stay_valid_when_the_buffer_grows() -> None:
+    live = LiveData("t", capacity=1)
+    live.append(t=1.0)
+    view = live.column("t")
+
+    for k in range(100):
+        live.append(t=float(k))
+
+    assert list(view) == [1.0]
+    assert len(live.column("t")) == 101
+    assert np.shares_memory(live.column("t"), live.snapshot()["t"])
+
+
+def test_columns_have_their_own_lengths() -> None:
+    live = LiveData("t_meas", "i_meas_ma", "t_ref", "i_ref_ma")
+
+    live.append(t_meas=0.0, i_meas_ma=-4.0)
+    delta = live.delta()
+
+    assert delta["t_ref"] == [] and delta["t_meas"] == [0.0]
+    assert {name: len(v) for name, v in live.snapshot().items()} == {
+        "t_meas": 1,
+        "i_meas_ma": 1,
+        "t_ref": 0,
+        "i_ref_ma": 0,
+    }
+
+
+
+def test_deltas_publish_derived_columns() -> None:
+    live = LiveData(
+        "t", "i", "i_ref", derived={"j": lambda c: c["i"] * 1000.0}, publish=("t", "j")
+    )
+
+    live.extend(t=[0.0, 1.0], i=[-0.02, -0.021], i_ref=[0.0, 0.0])
+    first = live.delta()
+    live.append(t=2.0, i=-0.022, i_ref=0.0)
+    second = live.delta()
+
+    assert set(first) == {"seq", "live", "t", "j"}
+    assert first["j"] == [-20.0, -21.0]
+    assert second["j"] == [-22.0]
+    assert set(live.snapshot()) == {"t", "j"}
+
+
+def test_deltas_carry_every_value_of_a_bounded_buffer() -> None:
+    live = LiveData("t", derived={"j": lambda c: -c["t"]}, max_rows=4)
+    emitted = []
+
+    for k in range(10):
+        live.append(t=float(k))
+        emitted += live.delta()["j"]
+
+    assert emitted == [-float(k) for k in range(10)]
+    assert len(live) < 4
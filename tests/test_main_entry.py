@@ -1,6 +1,7 @@
 """Tests for the thin command-line entry point."""
 
 import json
+import sys
 from pathlib import Path
 
 from iv_lab.hardware.lamp.drivers.emulated import EmulatedLamp
@@ -44,6 +45,7 @@ def test_parse_args_defaults() -> None:
     assert args.users is None
     assert args.logo == "EPFL_Logo.png"
     assert not args.emulate
+    assert args.record_visa is None
 
 
 def test_main_launches_in_emulation(tmp_path: Path) -> None:
@@ -103,3 +105,61 @@ def test_missing_settings_file_returns_error(tmp_path: Path, capsys) -> None:
 
     assert exit_code == 1
     assert "settings file not found" in capsys.readouterr().err
+
+
+def test_record_visa_flag_writes_a_trace_file(tmp_path: Path, monkeypatch) -> None:
+    from iv_lab.hardware.visa_trace import read_trace
+
+    # emulated hardware needs no pyvisa; keep record_visa from importing
+    # it for the rest of the session (import-hygiene tests)
+    monkeypatch.setitem(sys.modules, "pyvisa", None)
+
+    settings_path = write_settings(tmp_path, emulate=True)
+    users_path = tmp_path / "users.txt"
+    write_users(users_path, {"felix": "111111"})
+    trace_path = tmp_path / "session.jsonl"
+
+    exit_code = main(
+        [
+            "--settings",
+            str(settings_path),
+            "--users",
+            str(users_path),
+            "--record-visa",
+            str(trace_path),
+        ],
+        exec_app=False,
+    )
+
+    assert exit_code == 0
+    # emulated hardware: a valid trace without traffic
+    assert read_trace(trace_path).entries == []
+
+
+def test_profile_instruments_flag_writes_a_report(tmp_path: Path) -> None:
+    from iv_lab.hardware.profiler import read_report
+
+    settings_path = write_settings(tmp_path, emulate=True)
+    users_path = tmp_path / "users.txt"
+    write_users(users_path, {"felix": "111111"})
+    report_path = tmp_path / "profile.json"
+
+    exit_code = main(
+        [
+            "--settings",
+            str(settings_path),
+            "--users",
+            str(users_path),
+            "--profile-instruments",
+            str(report_path),
+        ],
+        exec_app=False,
+    )
+
+    assert exit_code == 0
+    # closing the window turns the hardware off through the profiled drivers
+    rows = read_report(report_path)
+    assert {(r["device"], r["method"]) for r in rows} >= {
+        ("Emulated Keithley 2602", "turn_off"),
+        ("Emulated manual manual", "turn_off"),
+    }
@@ -263,7 +263,7 @@ def test_request_stop_cancels_long_run() -> None:
 
     # signals are delivered synchronously: stop after the second sample
     worker.data_ready.connect(
-        lambda data: worker.request_stop() if len(data["t"]) >= 2 else None
+        lambda data: worker.request_stop() if data["seq"] >= 2 else None
     )
 
     worker.run()
@@ -0,0 +1,240 @@
+"""Simulated Keithley 2400 / 2450 SCPI instrument.
+
+The SCPI below is what the 2400-family driver and pymeasure's
+``Keithley2400`` / ``Keithley2450`` properties send. With pymeasure
+installed, the driver itself also runs on the simulation.
+"""
+
+import importlib.util
+import sys
+
+import pytest
+
+from iv_lab.config import SMUSettings
+from iv_lab.hardware import VirtualClock
+from iv_lab.hardware.mock import (
+    GPIB_PROFILE,
+    SERIAL_PROFILE,
+    Keithley2400Mock,
+    MockResourceManager,
+    MockVisaIOError,
+    MockVisaResource,
+    use_mock_visa,
+)
+from iv_lab.hardware.smu import SMUChannel
+
+PHOTOCURRENT = 0.004
+
+
+def open_mock(model="2400", *, latency=0.0, **kwargs):
+    clock = VirtualClock(tick=0.0)
+    instrument = Keithley2400Mock(model, clock=clock, photocurrent=PHOTOCURRENT, **kwargs)
+    return instrument, MockVisaResource(instrument, latency=latency, clock=clock), clock
+
+
+def values(answer: str) -> list[float]:
+    return [float(value) for value in answer.split(",")]
+
+
+def setup_voltage_source(resource) -> None:
+    # pymeasure reset(), then the driver's voltage-source setup
+    resource.write("status:queue:clear;*RST;:stat:pres;:*CLS;")
+    resource.write(":SENS:CURR:PROT 0.01")
+    resource.write(":SOUR:FUNC VOLT")
+    resource.write(":SENS:FUNC 'CURR'")
+    resource.write(":FORM:ELEM CURR")
+    resource.write("OUTPUT ON")
+
+
+def test_long_form_and_relative_headers() -> None:
+    instrument, resource, _ = open_mock()
+
+    resource.write(":SOURce:VOLTage:LEVel:IMMediate:AMPLitude 0.25;RANGe 2")
+    resource.write(":sens:curr:rang:auto 0;:SENS:CURR:RANG 0.01")
+
+    assert instrument.source_level["VOLT"] == 0.25
+    assert instrument.source_range["VOLT"] == 2
+    assert instrument.sense_range["CURR"] == 0.01
+    assert not instrument.sense_autorange["CURR"]
+    assert float(resource.query(":SOUR:VOLT?")) == 0.25
+
+
+def test_unknown_header_is_queued_as_scpi_error() -> None:
+    _, resource, _ = open_mock()
+
+    resource.write(":SOUR:BOGUS 1")
+
+    assert resource.query(":SYST:ERR?") == '-113,"Undefined header"'
+    assert resource.query(":SYST:ERR?") == '+0,"No error"'
+
+
+def test_query_without_answer_times_out() -> None:
+    _, resource, _ = open_mock()
+    with pytest.raises(MockVisaIOError, match="TMO"):
+        resource.query(":SOUR:BOGUS?")
+
+
+def test_read_returns_the_diode_current_and_selected_elements() -> None:
+    _, resource, _ = open_mock()
+    setup_voltage_source(resource)
+
+    (current,) = values(resource.query(":READ?"))
+    resource.write(":FORM:ELEM VOLT,CURR")
+    voltage, current_again = values(resource.query(":READ?"))
+
+    assert current == pytest.approx(-PHOTOCURRENT, rel=0.01)
+    assert voltage == 0.0
+    assert current_again == pytest.approx(current)
+
+
+def test_compliance_and_source_function_rules() -> None:
+    instrument, resource, _ = open_mock()
+    setup_voltage_source(resource)
+    resource.write(":SENS:CURR:PROT 0.001;:SOUR:VOLT:LEV 1")
+
+    assert float(resource.query(":READ?")) == pytest.approx(0.001)
+
+    # the source function cannot change with the output on
+    resource.write(":SOUR:FUNC CURR")
+    assert instrument.source_function == "VOLT"
+    assert resource.query(":SYST:ERR?").startswith("-221")
+
+
+def test_rear_terminals_read_the_reference_diode_with_output_off() -> None:
+    instrument, resource, _ = open_mock(reference_photocurrent=0.002)
+    setup_voltage_source(resource)
+
+    resource.write(":ROUT:TERM REAR")
+    assert not instrument.output  # switching terminals turns the output off
+    assert float(resource.query(":READ?")) == 0.0
+
+    resource.write("OUTPUT ON")
+    assert float(resource.query(":READ?")) == pytest.approx(-0.002, rel=0.01)
+
+
+def test_reading_takes_nplc_line_cycles() -> None:
+    _, resource, clock = open_mock()
+    setup_voltage_source(resource)
+
+    for nplc, duration in ((1, 0.02), (0.01, 0.0002)):
+        resource.write(f":SENS:CURR:NPLC {nplc}")
+        start = clock.now
+        resource.query(":READ?")
+        assert clock.now - start == pytest.approx(duration)
+
+
+def test_ttl_and_display_keys_only_on_the_2400() -> None:
+    instrument, resource, _ = open_mock()
+    resource.write(":SOUR2:TTL:LEV 5;:SYST:KEY 22")
+    assert (instrument.ttl_level, instrument.keys) == (5, [22])
+
+    instrument, resource, _ = open_mock("2450")
+    resource.write(":SOUR2:TTL:LEV 5")
+    assert resource.query(":SYST:ERR?").startswith("-113")
+
+
+def test_2400_sweep_fills_the_trace_buffer_over_time() -> None:
+    instrument, resource, clock = open_mock()
+    setup_voltage_source(resource)
+    resource.write(":SENS:CURR:NPLC 1")
+
+    # the driver's _sweep_2400
+    resource.write(
+        ":SOUR:VOLT:STAR 0.0;:SOUR:VOLT:STOP 0.6;"
+        ":SOUR:SWE:POIN 7;:SOUR:SWE:SPAC LIN;:SOUR:VOLT:MODE SWE"
+    )
+    resource.write(":SOUR:DEL 0.08;:TRIG:COUN 7;:FORM:ELEM VOLT,CURR")
+    resource.write(":TRAC:CLE;:TRAC:POIN 7;:TRAC:FEED SENS;:TRAC:FEED:CONT NEXT")
+    resource.write(":INIT")
+
+    clock.advance(0.35)
+    assert resource.query(":TRAC:POIN:ACT?") == "3"
+    clock.advance(0.4)
+    assert resource.query(":TRAC:POIN:ACT?") == "7"
+
+    data = values(resource.query(":TRAC:DATA?"))
+    assert data[0::2] == pytest.approx([0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6])
+    assert data[1] == pytest.approx(-PHOTOCURRENT, rel=0.01)
+    assert data[-1] > 0
+    resource.write(":ABOR;:SOUR:VOLT:MODE FIX;:TRIG:COUN 1;:SOUR:DEL 0;:TRAC:FEED:CONT NEV")
+    assert not instrument.errors
+
+
+def test_2450_sweep_reads_source_and_reading_columns() -> None:
+    instrument, resource, clock = open_mock("2450")
+    setup_voltage_source(resource)
+    resource.write(":SOUR:VOLT:ILIM 0.01")
+
+    # the driver's _sweep_2450
+    resource.write(':TRAC:CLE "defbuffer1"')
+    resource.write(":SOUR:SWE:VOLT:LIN 0.0, 0.6, 4, 0.0")
+    resource.write(":INIT")
+    clock.advance(1.0)
+
+    assert resource.query(':TRAC:ACT? "defbuffer1"') == "4"
+    data = values(resource.query(':TRAC:DATA? 1, 4, "defbuffer1", SOUR, READ'))
+    assert data[0::2] == pytest.approx([0.0, 0.2, 0.4, 0.6])
+    assert data[1] == pytest.approx(-PHOTOCURRENT, rel=0.01)
+
+
+def test_transcript_records_commands_and_bus_time() -> None:
+    instrument, resource, clock = open_mock(latency=0.005)
+
+    resource.write(":SOUR:VOLT:LEV 0.1;:OUTP ON")
+    resource.query("*IDN?")
+
+    assert [c for _, c in instrument.commands] == [":SOUR:VOLT:LEV 0.1", ":OUTP ON", "*IDN?"]
+    kinds = [(entry.kind, entry.duration) for entry in resource.log]
+    assert kinds == [
+        ("write", pytest.approx(0.005)),
+        ("write", pytest.approx(0.005)),
+        ("read", pytest.approx(0.005)),
+    ]
+    assert clock.now == pytest.approx(0.015)
+
+
+@pytest.mark.parametrize(
+    ("profile", "period"), [(GPIB_PROFILE, 1 / 8.5), (SERIAL_PROFILE, 1 / 6)]
+)
+def test_latency_profiles_reproduce_legacy_point_periods(profile, period) -> None:
+    _, resource, clock = open_mock(latency=profile)
+    setup_voltage_source(resource)
+    resource.write(":SENS:CURR:NPLC 1")
+
+    start = clock.now
+    resource.write(":SOUR:VOLT:LEV 0.5")
+    resource.query(":READ?")
+
+    assert clock.now - start == pytest.approx(period, rel=0.01)
+
+
+def test_driver_runs_on_the_simulation() -> None:
+    # not imported here: the driver imports it on connect, inside the
+    # block, which unloads it again for the import-hygiene tests
+    if importlib.util.find_spec("pymeasure") is None:
+        pytest.skip("pymeasure is not installed")
+    from iv_lab.hardware.smu.drivers.keithley_2400 import Keithley2400FamilySMU
+
+    clock = VirtualClock(tick=0.0)
+    instrument = Keithley2400Mock(clock=clock, photocurrent=PHOTOCURRENT)
+    rm = MockResourceManager({"GPIB0::24::INSTR": instrument}, latency=GPIB_PROFILE, clock=clock)
+    smu = Keithley2400FamilySMU(
+        SMUSettings(
+            brand="Keithley",
+            model="2400",
+            visa_address="GPIB0::24::INSTR",
+            visa_library="visa64.dll",
+            emulate=False,
+        )
+    )
+    smu.clock = clock
+    with use_mock_visa(rm):
+        smu.connect()
+
+    smu.setup_voltage_output(SMUChannel.CELL, 0.01)
+    smu.enable_output(SMUChannel.CELL)
+    current = smu.set_voltage_measure_current(SMUChannel.CELL, 0.0)
+
+    assert current == pytest.approx(-PHOTOCURRENT, rel=0.01)
+    assert not instrument.errors
+    assert "pymeasure" not in sys.modules
@@ -0,0 +1,456 @@
+"""The real Keithley 2600 driver end to end on the simulated TSP instrument.
+
+The bundled library and the TSP helpers run unchanged; only
+``pyvisa.ResourceManager`` is replaced (``use_mock_visa``), so these
+tests cover the Lua the driver actually sends.
+"""
+
+import itertools
+import sys
+
+import pytest
+
+from iv_lab.config import SMUSettings
+from iv_lab.hardware import HardwareCommandError, VirtualClock
+from iv_lab.hardware.mock import (
+    Keithley26xxMock,
+    MockResourceManager,
+    MockVisaIOError,
+    MockVisaResource,
+    use_mock_visa,
+)
+from iv_lab.hardware.smu import SMUChannel
+from iv_lab.hardware.smu.drivers.keithley_26xx import Keithley26xxSMU
+
+PHOTOCURRENT = 0.004
+
+
+def make_settings(**overrides) -> SMUSettings:
+    data = {
+        "brand": "Keithley",
+        "model": "2602",
+        "visa_address": "GPIB0::24::INSTR",
+        "visa_library": "visa64.dll",
+        "emulate": False,
+    }
+    data.update(overrides)
+    return SMUSettings(**data)
+
+
+def connect(clock=None, *, latency=0.0, **overrides):
+    """Connected driver, its simulated instrument and VISA resource."""
+    clock = clock or VirtualClock()
+    instrument = Keithley26xxMock(clock=clock, photocurrent=PHOTOCURRENT)
+    rm = MockResourceManager({"GPIB0::24::INSTR": instrument}, latency=latency, clock=clock)
+    smu = Keithley26xxSMU(make_settings(**overrides))
+    smu.clock = clock
+    with use_mock_visa(rm):
+        smu.connect()
+    (resource,) = rm.resources
+    return smu, instrument, resource
+
+
+def iv_protocol(smu):
+    """J-V protocol on ``smu`` with an emulated lamp and fixed metrics."""
+    from iv_lab.analysis.jv_metrics import JVMetrics
+    from iv_lab.config import LampSettings
+    from iv_lab.hardware.lamp.drivers.emulated import EmulatedLamp
+    from iv_lab.measurements.protocols import IVCurveProtocol
+
+    smu.full_sun_reference_current = PHOTOCURRENT
+    lamp = EmulatedLamp(
+        LampSettings(
+            brand="Wavelabs",
+            model="Sinus70",
+            emulate=True,
+            lightLevelDict={"100": "1 sun", "0": "dummy"},
+        )
+    )
+    lamp.connect()
+    protocol = IVCurveProtocol(
+        smu, lamp, metrics_function=lambda *a, **k: JVMetrics(
+            Voc=0.55, Jsc=-25.0, Vmpp=0.45, Jmpp=-22.0, Pmpp=9.9, FF=0.72
+        )
+    )
+    protocol.light_intensity_measure_time = 0.0
+    protocol.voc_check_wait = 0.0
+    return protocol
+
+
+def voc_scan_params(**overrides) -> dict:
+    """Point-by-point scan (stopping at Voc keeps it point by point)."""
+    params = {
+        "light_int": 100.0, "start_V": 0.0, "stop_V": "Voc", "dV": 0.05,
+        "sweep_rate": 0.5, "Imax": 0.01, "Vmax": 0.6, "Dwell": 0.0,
+        "Nwire": "2 wire", "active_area": 0.16, "cell_name": "cell",
+        "Fwd_current_limit": 1.0,
+    }
+    params.update(overrides)
+    return params
+
+
+# --- the simulated resource ---
+
+
+class EchoInstrument:
+    def __init__(self) -> None:
+        self.pending: list[bytes] = []
+
+    def write(self, message: str) -> None:
+        if message.startswith("ask "):
+            self.pending.append(message[4:].encode() + b"\n")
+
+    def read(self) -> bytes | None:
+        return self.pending.pop(0) if self.pending else None
+
+
+def test_resource_counts_traffic_and_charges_latency() -> None:
+    clock = VirtualClock(tick=0.0)
+    resource = MockVisaResource(EchoInstrument(), latency=0.01, clock=clock)
+
+    resource.write("noop")
+    assert resource.query("ask hello") == "hello"
+
+    assert (resource.write_count, resource.read_count) == (2, 1)
+    assert clock.now == pytest.approx(0.03)
+    assert resource.log[-1][:2] == ("read", "hello")
+    assert resource.log[-1].start == pytest.approx(0.02)
+
+
+def test_resource_read_without_answer_times_out() -> None:
+    clock = VirtualClock(tick=0.0)
+    resource = MockVisaResource(EchoInstrument(), clock=clock)
+    resource.timeout = 500
+
+    with pytest.raises(MockVisaIOError, match="VI_ERROR_TMO"):
+        resource.read()
+    assert clock.now == pytest.approx(0.5)
+
+
+def test_resource_read_of_a_busy_instrument_times_out() -> None:
+    clock = VirtualClock(tick=0.0)
+    instrument = EchoInstrument()
+    # the instrument works for 1.5 s on each message
+    write = instrument.write
+    instrument.write = lambda message: (clock.sleep(1.5), write(message))
+    resource = MockVisaResource(instrument, clock=clock)
+    resource.timeout = 1000
+
+    with pytest.raises(MockVisaIOError, match="VI_ERROR_TMO"):
+        resource.query("ask late")
+    assert clock.now == pytest.approx(1.5)
+    # the late answer is what the next read gets
+    assert resource.read() == "late"
+    resource.timeout = 2000
+    assert resource.query("ask ok") == "ok"
+
+
+def test_unknown_address_is_not_found() -> None:
+    rm = MockResourceManager({})
+    with pytest.raises(MockVisaIOError, match="RSRC_NFOUND"):
+        rm.open_resource("GPIB0::1::INSTR")
+
+
+def test_modules_imported_in_the_block_are_unloaded(monkeypatch) -> None:
+    for name in ("pyvisa", "iv_lab.hardware.smu.drivers._keithley26xx_lib"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+    connect()
+
+    # with or without pyvisa installed
+    assert "pyvisa" not in sys.modules
+    assert "iv_lab.hardware.smu.drivers._keithley26xx_lib" not in sys.modules
+
+
+def test_imported_pyvisa_is_restored_after_the_block() -> None:
+    loaded = set(sys.modules)
+    pyvisa = pytest.importorskip("pyvisa")
+    original = pyvisa.ResourceManager
+    try:
+        with use_mock_visa(MockResourceManager({})) as rm:
+            assert pyvisa.ResourceManager() is rm
+        # imported before the block: kept, with its ResourceManager back
+        assert sys.modules["pyvisa"] is pyvisa
+        assert pyvisa.ResourceManager is original
+    finally:
+        for name in set(sys.modules) - loaded:
+            if name.split(".")[0] == "pyvisa":
+                del sys.modules[name]
+
+
+# --- the driver on the simulated instrument ---
+
+
+def test_connect_identifies_model_and_configures_channels() -> None:
+    smu, instrument, resource = connect(measSpeed="fast")
+
+    assert smu.is_connected
+    assert not instrument.errors
+    assert instrument.smua.measure.nplc == pytest.approx(0.01)
+    # the library picks the model's range covering 2 V
+    assert instrument.smub.source.rangev == 6
+    assert "IVLabFunctions" in instrument.scripts
+    assert "print(localnode.model)" in [entry.text for entry in resource.log]
+
+
+def test_short_circuit_and_open_circuit_readings() -> None:
+    smu, instrument, _ = connect()
+
+    smu.setup_voltage_output(SMUChannel.CELL, 0.01)
+    smu.enable_output(SMUChannel.CELL)
+    isc = smu.set_voltage_measure_current(SMUChannel.CELL, 0.0)
+
+    smu.setup_current_output(SMUChannel.CELL, 2.0)
+    smu.set_current(SMUChannel.CELL, 0.0)
+    voc = smu.measure_voltage(SMUChannel.CELL)
+
+    assert isc == pytest.approx(-PHOTOCURRENT, rel=0.01)
+    assert voc == pytest.approx(0.55, abs=1e-3)
+    assert not instrument.errors
+
+
+def test_output_off_reads_zero_and_compliance_clips() -> None:
+    smu, _, _ = connect()
+
+    smu.setup_voltage_output(SMUChannel.CELL, 0.001)
+    assert smu.measure_current(SMUChannel.CELL) == 0.0
+
+    smu.enable_output(SMUChannel.CELL)
+    smu.set_voltage(SMUChannel.CELL, 1.0)
+    assert smu.measure_current(SMUChannel.CELL) == pytest.approx(0.001)
+
+
+def test_reading_takes_the_integration_time() -> None:
+    clock = VirtualClock(tick=0.0)
+    smu, _, _ = connect(clock, measSpeed="normal")
+
+    start = clock.now
+    smu.measure_current(SMUChannel.CELL)
+
+    # 1 PLC at 50 Hz
+    assert clock.now - start == pytest.approx(0.02)
+
+
+def test_hardware_sweep_reads_the_diode_curve() -> None:
+    smu, instrument, _ = connect(measSpeed="fast")
+    smu.setup_voltage_output(SMUChannel.CELL, 0.01)
+
+    voltages, currents = [], []
+    for v, i in smu.sweep_voltage(SMUChannel.CELL, 0.0, 0.6, 61, 0.01):
+        voltages += v
+        currents += i
+
+    assert len(voltages) == 61
+    assert voltages[-1] == pytest.approx(0.6)
+    assert currents[0] == pytest.approx(-PHOTOCURRENT, rel=0.01)
+    assert currents[-1] > 0
+    assert currents == sorted(currents)
+    assert instrument.smua.source.delay == 0.0  # restored by the abort
+    assert not instrument.errors
+
+
+def test_library_kisweep_blocks_until_done() -> None:
+    smu, _, _ = connect()
+    channel = smu._chan(SMUChannel.CELL)
+    channel.set_mode_voltage_source()
+    channel.enable_output()
+
+    currents, voltages = channel.measure_voltage_sweep(0.0, 0.6, 0.0, 7)
+
+    assert voltages == pytest.approx([0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6])
+    assert currents[0] == pytest.approx(-PHOTOCURRENT, rel=0.01)
+
+
+def test_timed_acquisition_timestamps_follow_the_interval() -> None:
+    smu, _, _ = connect(measSpeed="fast")
+    smu.setup_voltage_output(SMUChannel.CELL, 0.01)
+    smu.enable_output(SMUChannel.CELL)
+    smu.set_voltage(SMUChannel.CELL, 0.0)
+
+    t, values = [], []
+    for times, readings, _ in smu.acquire_time_series(SMUChannel.CELL, "i", 0.01, 50):
+        t += times
+        values += readings
+
+    assert len(t) == 50
+    assert t[0] == pytest.approx(0.0)
+    assert t[-1] == pytest.approx(0.49)
+    assert values[0] == pytest.approx(-PHOTOCURRENT, rel=0.01)
+
+
+def test_on_instrument_mpp_tracker_finds_the_maximum_power_point() -> None:
+    smu, _, _ = connect(VirtualClock(tick=0.0), measSpeed="fast")
+    smu.setup_voltage_output(SMUChannel.CELL, 0.01)
+    smu.enable_output(SMUChannel.CELL)
+
+    records = []
+    for t, v, i, _ in smu.track_mpp(0.3, 1.0, (0.002, 0.02, 0.001), 0.5, 20.0):
+        records += list(zip(t, v, i, strict=True))
+
+    # one record per 0.5 s; rounding in the summed sample times (also on
+    # the instrument) can leave a last partial record
+    assert len(records) in (40, 41)
+    t, v, i = records[39]
+    assert t == pytest.approx(19.75, abs=0.01)
+    # the emulated cell's maximum power point is near 0.45 V
+    assert 0.4 < v < 0.5
+    assert i < 0
+
+
+def test_mpp_tracker_keeps_sampling_while_the_host_is_busy() -> None:
+    clock = VirtualClock(tick=0.0)
+    smu, instrument, _ = connect(clock, measSpeed="fast")
+    smu.setup_voltage_output(SMUChannel.CELL, 0.01)
+    smu.enable_output(SMUChannel.CELL)
+
+    times = []
+    tracker = smu.track_mpp(0.3, 1.0, (0.002, 0.02, 0.001), 0.5, 5.0)
+    for t, _, _, _ in tracker:
+        times += t
+        if len(times) == 2:
+            # the host stalls for three records; the script does not
+            clock.sleep(1.5)
+    # evenly spaced records: no gap while the host was away, no burst after
+    assert len(times) in (10, 11)
+    assert all(b - a == pytest.approx(0.5, abs=0.01) for a, b in itertools.pairwise(times[:10]))
+    assert clock.time() == pytest.approx(5.0, abs=0.05)
+
+
+def test_closing_the_mpp_tracker_stops_the_script() -> None:
+    clock = VirtualClock(tick=0.0)
+    smu, _, _ = connect(clock, measSpeed="fast")
+    smu.setup_voltage_output(SMUChannel.CELL, 0.01)
+    smu.enable_output(SMUChannel.CELL)
+
+    tracker = smu.track_mpp(0.3, 1.0, (0.002, 0.02, 0.001), 0.5, 20.0)
+    next(tracker)
+    tracker.close()
+
+    # the instrument takes commands again straight away
+    assert smu.measure_current(SMUChannel.CELL) < 0
+    assert clock.time() < 1.0
+
+
+def test_batch_error_names_the_failing_command() -> None:
+    smu, instrument, _ = connect()
+
+    with pytest.raises(HardwareCommandError, match="nplc"), smu.batch():
+        smu._chan(SMUChannel.CELL).set_voltage_limit(2)
+        smu.smu.write_lua("smua.measure.nplc = 100")
+
+    assert not instrument.errors  # follow-up errors cleared
+
+
+def test_batch_that_does_not_compile_is_reported_as_aborted() -> None:
+    smu, instrument, _ = connect()
+
+    with pytest.raises(HardwareCommandError, match="commands aborted"), smu.batch():
+        smu._chan(SMUChannel.CELL).set_voltage_limit(2)
+        smu.smu.write_lua("smua.measure.nplc = (")
+
+    assert not instrument.errors
+
+
+def test_runtime_error_aborts_the_chunk() -> None:
+    smu, instrument, _ = connect()
+
+    smu.smu.write_lua("x = 1\nsmua.nosuchthing.level = 2\nx = 2", check_for_errors=False)
+
+    assert instrument.globals["x"] == 1
+    assert instrument.errors[0][0] == -286
+
+
+def test_message_count_and_wall_time_per_point() -> None:
+    clock = VirtualClock(tick=0.0)
+    smu, _, resource = connect(clock, latency=0.001, measSpeed="fast")
+    smu.setup_voltage_output(SMUChannel.CELL, 0.01)
+    smu.enable_output(SMUChannel.CELL)
+    resource.reset_counters()
+    start = clock.now
+
+    for k in range(10):
+        smu.set_voltage_measure_current(SMUChannel.CELL, 0.05 * k)
+
+    # one preloaded-function query per point, no error check
+    assert resource.write_count == 10
+    assert resource.read_count == 10
+    assert clock.now - start == pytest.approx(10 * (2 * 0.001 + 0.0002))
+
+    # the errors of the whole sweep are checked once
+    smu.check_errors()
+    assert resource.write_count == 11
+
+
+def test_iv_protocol_runs_end_to_end_on_the_driver() -> None:
+    clock = VirtualClock(tick=0.0)
+    smu, instrument, resource = connect(clock, latency=0.001, measSpeed="fast")
+    protocol = iv_protocol(smu)
+    resource.reset_counters()
+
+    result = protocol.run(
+        {
+            "light_int": 100.0, "start_V": 0.0, "stop_V": 0.6, "dV": 0.01,
+            "sweep_rate": 10.0, "Imax": 0.01, "Vmax": 2.0, "Dwell": 0.0,
+            "Nwire": "2 wire", "active_area": 0.16, "cell_name": "cell",
+            "Fwd_current_limit": 0.01,
+        }
+    )
+
+    assert len(result.voltage) == 61
+    assert result.current[0] == pytest.approx(-PHOTOCURRENT, rel=0.01)
+    assert not instrument.errors
+    # 1 ms per point runs as a hardware sweep: a few messages per scan
+    assert resource.write_count < 61
+
+
+def test_point_by_point_scan_is_one_exchange_per_point() -> None:
+    clock = VirtualClock(tick=0.0)
+    smu, instrument, resource = connect(clock, latency=0.001, measSpeed="fast")
+    protocol = iv_protocol(smu)
+    resource.reset_counters()
+
+    result = protocol.run(voc_scan_params())
+
+    log = resource.log
+    points = [k for k, e in enumerate(log) if e.kind == "write" and "ivl_setv_meas_i" in e.text]
+    assert len(points) == len(result.voltage) == 12
+    # one answer per point, after the settling on the instrument: the
+    # readings stay one step (dV / sweep rate) apart
+    assert all(log[k + 1].kind == "read" for k in points)
+    ends = [log[k + 1].start + log[k + 1].duration for k in points]
+    assert all(b - a == pytest.approx(0.1, rel=1e-3) for a, b in itertools.pairwise(ends))
+    assert not instrument.errors
+
+
+def test_long_point_steps_wait_on_the_host() -> None:
+    clock = VirtualClock(tick=0.0)
+    smu, instrument, resource = connect(clock, latency=0.001, measSpeed="fast")
+    protocol = iv_protocol(smu)
+    assert resource.timeout == 1000
+    resource.reset_counters()
+
+    # 1 s per point: one fused query would run into the VISA timeout
+    result = protocol.run(voc_scan_params(sweep_rate=0.05))
+
+    assert len(result.voltage) == 12
+    assert not instrument.errors
+    settles = [
+        float(e.text.rsplit(",", 1)[1].rstrip(")"))
+        for e in resource.log
+        if e.kind == "write" and e.text.startswith("ivl_setv_meas_i(")
+    ]
+    # only the first point, due at once, is set and read in one query
+    assert settles == [0.0]
+    assert protocol.schedule.stats.max_lateness < 0.01
+
+
+def test_fused_read_waits_long_settles_on_the_host() -> None:
+    clock = VirtualClock(tick=0.0)
+    smu, instrument, resource = connect(clock, latency=0.001, measSpeed="fast")
+    smu.setup_voltage_output(SMUChannel.CELL, 0.01)
+    smu.enable_output(SMUChannel.CELL)
+    start = clock.now
+
+    assert smu.set_voltage_measure_current(SMUChannel.CELL, 0.1, 1.5) < 0
+    assert clock.now - start == pytest.approx(1.5, abs=0.01)
+    assert not instrument.errors
@@ -174,3 +174,63 @@ def test_mpp_legacy_voltage_step_defaults() -> None:
     assert protocol.voltage_step_initial == 0.002
     assert protocol.voltage_step_max == 0.002
     assert protocol.voltage_step_min == 0.001
+
+
+def test_on_instrument_tracking_collects_smu_records() -> None:
+    smu = make_smu()
+    smu.mpp_period_min = 0.001
+    calls = []
+
+    def track_mpp(v_start, v_limit, voltage_steps, interval, duration, *, reference):
+        calls.append((v_start, v_limit, voltage_steps, interval, duration, reference))
+        yield ([0.0, 0.5], [0.45, 0.452], [-0.0036, -0.0035], [0.0, 0.0])
+        yield ([1.0], [0.454], [-0.0034], [0.0])
+
+    smu.track_mpp = track_mpp
+    emitted: list[dict] = []
+    protocol = make_protocol(smu, on_instrument=True, data_callback=emitted.append)
+
+    result = protocol.run(mpp_params(interval=0.5, duration=1.0))
+
+    assert calls == [(0.45, 2.0, (0.002, 0.002, 0.001), 0.5, 1.0, False)]
+    assert list(result.time) == [0.0, 0.5, 1.0]
+    assert list(result.voltage) == [0.45, 0.452, 0.454]
+    assert list(result.current) == [-0.0036, -0.0035, -0.0034]
+    assert list(result.current_reference) == [0.0, 0.0, 0.0]
+    # live data per chunk, power in mW/cm2 like the host loop
+    assert [len(data["w"]) for data in emitted] == [2, 1]
+    w = emitted[-1]["live"].column("w")
+    assert len(w) == 3
+    assert w[0] == pytest.approx(0.45 * 0.0036 * 1000.0 / 0.16)
+    assert not smu.output_enabled(SMUChannel.CELL)
+
+
+def test_on_instrument_tracking_interval_limited_by_tracker_rate() -> None:
+    warnings: list[str] = []
+    smu = make_smu()
+    smu.meas_period_min = 0.5
+    smu.mpp_period_min = 0.01
+
+    def track_mpp(*args, **kwargs):
+        yield from ()
+
+    smu.track_mpp = track_mpp
+    protocol = make_protocol(smu, on_instrument=True, warning_callback=warnings.append)
+
+    result = protocol.run(mpp_params(interval=0.05))
+    assert result.interval == pytest.approx(0.05)
+    assert not warnings
+
+    result = protocol.run(mpp_params(interval=0.001))
+    assert result.interval == pytest.approx(0.01)
+    assert warnings
+
+
+def test_on_instrument_falls_back_to_host_loop_without_support() -> None:
+    smu = make_smu()
+    assert smu.mpp_period_min is None
+    protocol = make_protocol(smu, on_instrument=True)
+
+    result = protocol.run(mpp_params())
+
+    assert len(result.time) >= 5
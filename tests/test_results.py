@@ -1,5 +1,6 @@
 from dataclasses import is_dataclass
 
+import numpy as np
 import pytest
 
 from iv_lab.data import (
@@ -9,6 +10,7 @@ from iv_lab.data import (
     IVResults,
     MPPResults,
 )
+from iv_lab.data.columns import ColumnStore
 
 ALL_RESULT_TYPES = [
     IVResults,
@@ -110,6 +112,21 @@ def test_time_series_results_preserve_passed_arrays() -> None:
     assert mpp.start_voltage == "auto"
 
 
+def test_results_take_views_of_a_column_store() -> None:
+    store = ColumnStore("t", "v", "i", "i_ref", derived={"j": lambda c: c["i"] * 1000.0})
+    store.extend(t=[0.0, 1.0], v=[0.45, 0.46], i=[-0.0035, -0.0034], i_ref=[0.0, 0.0])
+
+    mpp = MPPResults()
+    mpp.set_columns(store)
+    iv = IVResults()
+    iv.set_columns(store)
+
+    assert list(mpp.time) == [0.0, 1.0]
+    assert np.shares_memory(mpp.voltage, store.column("v"))
+    assert list(iv.current) == [-0.0035, -0.0034]
+    assert not hasattr(iv, "time")
+
+
 def test_calibration_results_fields() -> None:
     result = CalibrationResults(
         time=[0.0, 0.1],
@@ -0,0 +1,104 @@
+"""Deadline scheduler of the timed measurement loops."""
+
+import pytest
+
+from iv_lab.hardware import VirtualClock
+from iv_lab.measurements.protocols.base import (
+    MissedDeadline,
+    SampleScheduler,
+    ScheduleStats,
+)
+
+
+def sample_times(policy: MissedDeadline, late_at: int = 2) -> tuple[list[float], ScheduleStats]:
+    """Samples every 1 s for 10 s; sample ``late_at`` takes 2.5 s."""
+    clock = VirtualClock(tick=0.0)
+    schedule = SampleScheduler(clock, keep_alive_interval=None)
+    schedule.start(1.0, duration=10.0, policy=policy)
+    times = []
+    for t in schedule.samples():
+        times.append(t)
+        clock.advance(2.5 if len(times) == late_at + 1 else 0.1)
+    return times, schedule.stats
+
+
+def test_missed_deadline_policies() -> None:
+    catch_up, stats = sample_times(MissedDeadline.CATCH_UP)
+    assert catch_up == pytest.approx([0, 1, 2, 4.5, 4.6, 5, 6, 7, 8, 9])
+    assert (stats.samples, stats.late, stats.skipped) == (10, 2, 0)
+    assert stats.max_lateness == pytest.approx(1.5)
+
+    skip, stats = sample_times(MissedDeadline.SKIP)
+    assert skip == pytest.approx([0, 1, 2, 4.5, 5, 6, 7, 8, 9])
+    assert (stats.late, stats.skipped) == (1, 1)
+
+    stretch, stats = sample_times(MissedDeadline.STRETCH)
+    assert stretch == pytest.approx([0, 1, 2, 4.5, 5.5, 6.5, 7.5, 8.5, 9.5])
+    assert stats.late == 1
+
+
+def test_scheduler_policy_overrides_the_loop_policy() -> None:
+    clock = VirtualClock(tick=0.0)
+    schedule = SampleScheduler(clock, policy=MissedDeadline.STRETCH)
+    schedule.start(1.0, policy=MissedDeadline.SKIP)
+    schedule.wait()
+    clock.advance(1.5)
+    assert schedule.wait() == pytest.approx(1.5)
+    assert schedule.wait() == pytest.approx(2.5)
+
+
+@pytest.mark.parametrize(
+    ("interval", "reads"),
+    [
+        (None, 0),
+        (1.0, 4),  # at 0, 1.1, 2.2 and 3.3 s
+        (0.0, 34),  # continuous until a read would overrun the deadline
+    ],
+)
+def test_keep_alive_reads_are_rate_limited(interval, reads) -> None:
+    clock = VirtualClock(tick=0.0)
+    schedule = SampleScheduler(clock, keep_alive_interval=interval)
+
+    assert schedule.hold(3.5, keep_alive=lambda: clock.advance(0.1))
+
+    assert schedule.stats.keep_alive_reads == reads
+    assert clock.now == pytest.approx(3.5)
+
+
+def test_default_keep_alive_is_continuous_but_lets_time_move() -> None:
+    clock = VirtualClock(start=1.7e9)
+    schedule = SampleScheduler(clock)
+    reads = []
+
+    # readings that take no time fall back to one per wait poll (50 ms)
+    assert schedule.hold(1.0, keep_alive=lambda: reads.append(clock.now))
+
+    assert len(reads) == 20
+    assert clock.now == pytest.approx(1.7e9 + 1.0)
+
+
+def test_hold_is_cancellable() -> None:
+    clock = VirtualClock(tick=0.0)
+    schedule = SampleScheduler(clock)
+
+    assert not schedule.hold(10.0, cancelled=lambda: clock.now >= 0.2)
+    assert clock.now < 1.0
+
+
+
+def test_advance_hands_the_wait_to_the_caller() -> None:
+    clock = VirtualClock(tick=0.0)
+    schedule = SampleScheduler(clock)
+    schedule.start(1.0, duration=3.0)
+
+    assert schedule.advance() == 0.0
+    clock.advance(0.25)
+    assert schedule.time_left() == pytest.approx(0.75)
+    assert schedule.advance() == pytest.approx(0.75)
+    # the caller waited on the instrument, plus a late read
+    clock.advance(0.75 + 1.5)
+    assert schedule.advance() == 0.0
+    assert schedule.advance() is None  # duration over
+
+    assert schedule.stats.samples == 3
+    assert schedule.stats.max_lateness == pytest.approx(0.5)
@@ -300,6 +300,22 @@ def test_toml_wavelabs_recipe_strings(tmp_path: Path) -> None:
     assert settings.lamp.lightLevelDict[100.0] == "1 sun, 1 h"
 
 
+def test_toml_emulation_timing_name_or_table(tmp_path: Path) -> None:
+    # [SMU] is the last section
+    content = MINIMAL_TOML + 'emulationTiming = "keithley-2400-serial"\n'
+    content = content.replace(
+        '[lamp]\nbrand = "manual"\nmodel = "manual"\nemulate = false',
+        '[lamp]\nbrand = "manual"\nmodel = "manual"\nemulate = false\n\n'
+        '[lamp.emulationTiming]\nprofile = "trinamic-filter-wheel"\nlightOnTime = 3.0',
+    )
+    settings = load_settings(write_toml_settings(tmp_path, content))
+
+    assert settings.SMU.emulationTiming.profile == "keithley-2400-serial"
+    assert settings.lamp.emulationTiming.profile == "trinamic-filter-wheel"
+    assert settings.lamp.emulationTiming.lightOnTime == 3.0
+    assert settings.lamp.emulationTiming.lightOffTime is None
+
+
 def test_toml_unsupported_extension_raises(tmp_path: Path) -> None:
     path = tmp_path / "settings.yaml"
     path.write_text("", encoding="utf-8")
@@ -2,6 +2,7 @@ import pytest
 
 from iv_lab.hardware import HardwareCommandError, HardwareDevice
 from iv_lab.hardware.smu import BaseSMU, SMUChannel
+from iv_lab.hardware.smu.base import cached_setting, clears_state_cache
 
 
 class DummySMU(BaseSMU):
@@ -130,3 +131,88 @@ def test_set_ttl_level_unsupported_by_default() -> None:
     # legacy set_TTL_level raises for anything but the 2400 series
     with pytest.raises(HardwareCommandError):
         DummySMU().set_ttl_level(3)
+
+
+# --- state cache ---
+
+
+class CachingSMU(DummySMU):
+    """DummySMU opting in to the state cache."""
+
+    fail = False
+
+    @cached_setting
+    def set_current_limit(self, channel: SMUChannel, current: float) -> None:
+        if self.fail:
+            raise HardwareCommandError("compliance rejected")
+        super().set_current_limit(channel, current)
+
+    @cached_setting
+    def setup_voltage_output(self, channel: SMUChannel, current_limit: float) -> None:
+        self.set_current_limit(channel, current_limit)
+        super().setup_voltage_output(channel, current_limit)
+
+    @clears_state_cache
+    def turn_off(self) -> None:
+        super().turn_off()
+
+
+def test_cached_setting_skips_repeated_values_per_channel() -> None:
+    smu = CachingSMU()
+
+    smu.set_current_limit(SMUChannel.CELL, 0.01)
+    smu.set_current_limit(SMUChannel.CELL, 0.01)
+    smu.set_current_limit(SMUChannel.REFERENCE, 0.01)
+    smu.set_current_limit(SMUChannel.CELL, 0.02)
+
+    assert smu.calls == [
+        ("set_current_limit", SMUChannel.CELL, 0.01),
+        ("set_current_limit", SMUChannel.REFERENCE, 0.01),
+        ("set_current_limit", SMUChannel.CELL, 0.02),
+    ]
+    assert (smu.state_cache_hits, smu.state_cache_misses) == (1, 3)
+    assert smu.state_cache_hit_rate() == pytest.approx(0.25)
+
+
+def test_changed_setting_invalidates_setup_of_its_channel() -> None:
+    smu = CachingSMU()
+    smu.setup_voltage_output(SMUChannel.CELL, 0.01)
+    smu.setup_voltage_output(SMUChannel.CELL, 0.01)  # skipped
+    smu.set_current_limit(SMUChannel.CELL, 0.02)
+    smu.calls.clear()
+
+    smu.setup_voltage_output(SMUChannel.CELL, 0.01)
+
+    assert smu.calls == [
+        ("set_current_limit", SMUChannel.CELL, 0.01),
+        ("setup_voltage_output", SMUChannel.CELL, 0.01),
+    ]
+
+
+def test_state_cache_cleared_by_turn_off_connect_and_errors() -> None:
+    smu = CachingSMU()
+    for reset in (smu.turn_off, smu.connect, smu.invalidate_state_cache):
+        smu.set_current_limit(SMUChannel.CELL, 0.01)
+        reset()
+        smu.calls.clear()
+        smu.set_current_limit(SMUChannel.CELL, 0.01)
+        assert smu.calls == [("set_current_limit", SMUChannel.CELL, 0.01)]
+
+    smu.fail = True
+    with pytest.raises(HardwareCommandError):
+        smu.set_current_limit(SMUChannel.REFERENCE, 0.01)
+    smu.fail = False
+    smu.calls.clear()
+    smu.set_current_limit(SMUChannel.CELL, 0.01)
+    assert smu.calls == [("set_current_limit", SMUChannel.CELL, 0.01)]
+
+
+def test_state_cache_can_be_disabled() -> None:
+    smu = CachingSMU()
+    smu.state_cache_enabled = False
+
+    smu.set_current_limit(SMUChannel.CELL, 0.01)
+    smu.set_current_limit(SMUChannel.CELL, 0.01)
+
+    assert len(smu.calls) == 2
+    assert smu.state_cache_hit_rate() == 0.0
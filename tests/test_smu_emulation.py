@@ -1,8 +1,12 @@
 import sys
 
+import numpy as np
 import pytest
+from scipy.special import lambertw
 
-from iv_lab.config import SMUSettings
+from iv_lab.config import LampSettings, SMUSettings
+from iv_lab.hardware import VirtualClock
+from iv_lab.hardware.lamp.drivers.emulated import EmulatedLamp
 from iv_lab.hardware.smu import (
     BaseSMU,
     SMUChannel,
@@ -11,6 +15,11 @@ from iv_lab.hardware.smu import (
     get_smu_driver,
     register_smu_driver,
 )
+from iv_lab.hardware.smu.drivers._diode_model import (
+    LegacyDiodeModel,
+    SingleDiodeModel,
+    lambertw_exp,
+)
 from iv_lab.hardware.smu.drivers.emulated import (
     EMULATED_VOC,
     LEGACY_INTEGRATION_DELAY,
@@ -30,8 +39,8 @@ def make_settings(**overrides) -> SMUSettings:
     return SMUSettings(**data)
 
 
-def make_emulated_smu() -> EmulatedSMU:
-    smu = EmulatedSMU(make_settings())
+def make_emulated_smu(**overrides) -> EmulatedSMU:
+    smu = EmulatedSMU(make_settings(**overrides))
     smu.integration_delay = 0.0  # speed up tests
     smu.full_sun_reference_current = 0.004
     return smu
@@ -247,3 +256,195 @@ def test_emulated_turn_off_disables_all_outputs() -> None:
 
     assert not smu.output_enabled(SMUChannel.CELL)
     assert not smu.output_enabled(SMUChannel.REFERENCE)
+
+
+# --- single-diode model (SMU.emulation settings) ---
+
+
+def make_diode_smu(**emulation) -> EmulatedSMU:
+    smu = make_emulated_smu(emulation=emulation)
+    smu.connect()
+    smu.setup_voltage_output(SMUChannel.CELL, 1.0)
+    smu.enable_output(SMUChannel.CELL)
+    return smu
+
+
+def test_emulation_settings_select_the_cell_model() -> None:
+    assert isinstance(make_emulated_smu().diode_model, LegacyDiodeModel)
+    assert isinstance(
+        make_emulated_smu(emulation={"model": "legacy"}).diode_model, LegacyDiodeModel
+    )
+
+    model = make_emulated_smu(
+        emulation={"seriesResistance": 2.0, "openCircuitVoltage": 1.1}
+    ).diode_model
+
+    assert model == SingleDiodeModel(series_resistance=2.0, open_circuit_voltage=1.1)
+
+
+def test_lambertw_exp_matches_scipy() -> None:
+    x = np.array([-800.0, -41.0, -5.0, 0.0, 1.0, 5.0, 300.0])
+
+    expected = lambertw(np.exp(x)).real
+    assert lambertw_exp(x) == pytest.approx(expected, rel=1e-12, abs=0.0)
+    # far beyond the float range of exp: w + log(w) = x
+    w = lambertw_exp(1e5)
+    assert w + np.log(w) == pytest.approx(1e5, rel=1e-15)
+
+
+def test_single_diode_cell_short_and_open_circuit() -> None:
+    smu = make_diode_smu(openCircuitVoltage=0.9, shuntResistance=1e4, seriesResistance=5.0)
+
+    smu.set_voltage(SMUChannel.CELL, 0.0)
+    # Isc is the photocurrent minus the shunt share through Rs
+    assert smu.measure_current(SMUChannel.CELL) == pytest.approx(
+        -0.004 * 1e4 / (1e4 + 5.0), rel=1e-6
+    )
+    smu.set_voltage(SMUChannel.CELL, 0.9)
+    assert smu.measure_current(SMUChannel.CELL) == pytest.approx(0.0, abs=1e-12)
+
+    smu.setup_current_output(SMUChannel.CELL, 2.0)
+    smu.set_current(SMUChannel.CELL, 0.0)
+    assert smu.measure_voltage(SMUChannel.CELL) == pytest.approx(0.9, abs=1e-9)
+
+
+def test_single_diode_voltage_and_current_are_inverse() -> None:
+    model = SingleDiodeModel(series_resistance=20.0, shunt_resistance=500.0)
+    v = np.linspace(-0.5, 0.8, 27)
+
+    i = model.current(v, 0.004, irradiance=0.7)
+
+    assert model.voltage(i, 0.004, irradiance=0.7) == pytest.approx(v, abs=1e-9)
+
+
+def test_series_resistance_lowers_the_fill_factor() -> None:
+    v = np.linspace(0.0, 0.55, 111)
+
+    def max_power(rs: float) -> float:
+        i = SingleDiodeModel(series_resistance=rs).current(v, 0.004)
+        return float(np.max(-v * i))
+
+    assert max_power(50.0) < max_power(5.0) < max_power(0.0)
+
+
+def test_single_diode_photocurrent_follows_the_emulated_lamp() -> None:
+    smu = make_diode_smu()
+    lamp = EmulatedLamp(LampSettings(brand="manual", model="manual", emulate=True), smu=smu)
+    assert smu.light_source is lamp
+    smu.set_voltage(SMUChannel.CELL, 0.0)
+
+    lamp.light_on(50.0)
+    half_sun = smu.measure_current(SMUChannel.CELL)
+    lamp.light_on(100.0)
+    full_sun = smu.measure_current(SMUChannel.CELL)
+    lamp.light_off()
+    dark = smu.measure_current(SMUChannel.CELL)
+
+    assert half_sun == pytest.approx(full_sun / 2, rel=1e-3)
+    assert dark == pytest.approx(0.0, abs=1e-12)
+
+
+def test_legacy_model_ignores_the_lamp() -> None:
+    smu = make_emulated_smu()
+    smu.connect()
+    smu.setup_voltage_output(SMUChannel.CELL, 0.01)
+    lamp = EmulatedLamp(LampSettings(brand="manual", model="manual", emulate=True), smu=smu)
+
+    lamp.light_off()
+
+    assert smu.measure_current(SMUChannel.CELL) == pytest.approx(-0.004, rel=0.02)
+
+
+def test_bulk_sweep_matches_point_readings() -> None:
+    smu = make_diode_smu(photocurrent=0.02)
+    voltages = np.linspace(-0.2, 0.6, 100_001)
+
+    v, i = smu.sweep(voltages)
+
+    assert v.shape == i.shape == (100_001,)
+    for k in (0, 50_000, 100_000):
+        smu.set_voltage(SMUChannel.CELL, float(voltages[k]))
+        assert i[k] == pytest.approx(smu.measure_current(SMUChannel.CELL), rel=1e-12)
+    # the channel is left at the last step
+    assert smu.measure_voltage(SMUChannel.CELL) == pytest.approx(0.6)
+
+
+def test_bulk_sweep_takes_one_interval_per_step_on_the_clock() -> None:
+    smu = make_diode_smu()
+    smu.clock = VirtualClock(tick=0.0)
+
+    smu.sweep(np.zeros(1000), interval=0.01)
+
+    assert smu.clock.now == pytest.approx(10.0)
+
+
+def test_capacitive_lag_gives_scan_direction_hysteresis() -> None:
+    smu = make_diode_smu(capacitance=1e-3, seriesResistance=5.0)
+    smu.clock = VirtualClock()
+    up = np.linspace(0.0, 0.5, 51)
+
+    smu.set_voltage(SMUChannel.CELL, 0.0)
+    _, forward = smu.sweep(up, interval=0.005)
+    _, reverse = smu.sweep(up[::-1], interval=0.005)
+
+    # charging current adds on the way up and subtracts on the way down
+    assert np.all(forward[1:] > reverse[::-1][1:])
+    # the lag decays away: slow scans show no hysteresis
+    _, slow_forward = smu.sweep(up, interval=1.0)
+    _, slow_reverse = smu.sweep(up[::-1], interval=1.0)
+    assert slow_forward == pytest.approx(slow_reverse[::-1], abs=1e-12)
+
+
+# --- timing profiles ---
+
+
+@pytest.mark.parametrize(
+    ("profile", "period"),
+    [
+        ("keithley-2602-gpib", 1 / 16),
+        ("keithley-2400-gpib", 1 / 8.5),
+        ("keithley-2400-serial", 1 / 6),
+    ],
+)
+def test_timing_profile_point_takes_the_measured_period(profile, period) -> None:
+    smu = EmulatedSMU(make_settings(emulationTiming=profile))
+    smu.clock = VirtualClock(tick=0.0)
+    smu.connect()
+
+    for k in range(10):
+        smu.set_voltage_measure_current(SMUChannel.CELL, 0.05 * k)
+
+    assert smu.clock.now == pytest.approx(10 * period)
+    assert smu.meas_period_min == pytest.approx(period)
+
+
+def test_timing_profile_enables_and_charges_hardware_sweeps() -> None:
+    smu = EmulatedSMU(make_settings(emulationTiming="keithley-2400-serial"))
+    assert smu.sweep_period_min is None
+    smu.clock = VirtualClock(tick=0.0)
+    smu.connect()
+    timing = smu.timing
+
+    for _ in smu.sweep_voltage(SMUChannel.CELL, 0.0, 0.6, 61, 0.05):
+        pass
+
+    assert smu.sweep_period_min == pytest.approx(1 / 25)
+    assert smu.clock.now == pytest.approx(
+        timing.sweep_overhead + 61 * (0.05 + timing.sweep_point_time)
+    )
+
+
+def test_timing_profile_values_can_be_overridden() -> None:
+    smu = EmulatedSMU(
+        make_settings(
+            emulationTiming={"profile": "keithley-2400-gpib", "integrationTime": 0.002}
+        )
+    )
+
+    assert smu.integration_delay == 0.002
+    assert smu.timing.command_latency == pytest.approx((1 / 8.5 - 0.02) / 3)
+
+
+def test_unknown_timing_profile_lists_the_known_ones() -> None:
+    with pytest.raises(ValueError, match="keithley-2602-gpib"):
+        EmulatedSMU(make_settings(emulationTiming="keithley-9999"))
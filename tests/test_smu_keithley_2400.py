@@ -51,6 +51,8 @@ class FakeKeithley:
         object.__setattr__(self, "adapter", FakeAdapter())
         object.__setattr__(self, "voltage_reading", 0.42)
         object.__setattr__(self, "current_reading", -0.0033)
+        # answers to ask() / values() queries, in order
+        object.__setattr__(self, "answers", [])
         if type(self).fail_on_init:
             raise OSError("VISA resource not found")
         type(self).instances.append(self)
@@ -96,6 +98,22 @@ class FakeKeithley:
     def write(self, command: str) -> None:
         self._call("write", command)
 
+    def ask(self, command: str) -> str:
+        self._call("ask", command)
+        if command == ":READ?" and not self.answers:
+            # the element selected by the last :FORM:ELEM (current by default)
+            elements = [w for w in self.writes() if w.startswith(":FORM:ELEM")]
+            if elements and elements[-1] == ":FORM:ELEM VOLT":
+                self.log.append(("read", "voltage"))
+                return f"{self.voltage_reading:e}\n"
+            self.log.append(("read", "current"))
+            return f"{self.current_reading:e}\n"
+        return self.answers.pop(0)
+
+    def values(self, command: str) -> list[float]:
+        self._call("values", command)
+        return self.answers.pop(0)
+
     # log helpers
     def calls(self, name: str) -> list:
         return [entry for entry in self.log if entry[0] == "call" and entry[1] == name]
@@ -290,7 +308,8 @@ def test_disconnect_disables_source_and_closes_adapter(fake_pymeasure) -> None:
 
 
 def test_setup_voltage_output_replicates_legacy_sequence(fake_pymeasure) -> None:
-    smu, fake = connected_smu(fake_pymeasure)
+    # fast speed, so that the mode setup's nplc=1 differs from the cached 0.01
+    smu, fake = connected_smu(fake_pymeasure, measSpeed="fast")
 
     smu.setup_voltage_output(SMUChannel.CELL, 0.02)
 
@@ -305,8 +324,10 @@ def test_setup_voltage_output_replicates_legacy_sequence(fake_pymeasure) -> None
     # the current sense function must be selected, or the measurement range
     # stays on its 100 uA default and clamps the source compliance to ~105 uA
     assert ":SENS:FUNC 'CURR'" in fake.writes()
-    assert 1 in fake.sets("current_nplc")
-    assert fake.sets("current_range_auto_enabled") == [True]
+    assert fake.sets("current_nplc") == [1]
+    # autorange is already on; the mode setup does not send it again
+    assert fake.writes().count(":CURR:RANG:AUTO ON") == 1
+    assert fake.sets("current_range_auto_enabled") == []
     # current display (legacy SYST:KEY 22, non-2450 only)
     assert "SYST:KEY 22" in fake.writes()
 
@@ -338,14 +359,14 @@ def test_setup_current_output_selects_voltage_sense_function(fake_pymeasure) ->
     # current source mode (e.g. the Voc / reference-diode setup) measures
     # voltage; the voltage sense function must be selected so the measurement
     # range and the source compliance are correct
-    smu, fake = connected_smu(fake_pymeasure)
+    smu, fake = connected_smu(fake_pymeasure, measSpeed="fast")
 
     smu.setup_current_output(SMUChannel.CELL, 1.0)
 
     assert fake.sets("source_mode") == ["current"]
     assert ":SENS:FUNC 'VOLT'" in fake.writes()
-    assert 1 in fake.sets("voltage_nplc")
-    assert fake.sets("voltage_range_auto_enabled") == [True]
+    assert fake.sets("voltage_nplc") == [1]
+    assert fake.writes().count(":VOLT:RANG:AUTO ON") == 1
 
 
 def test_set_voltage_and_measure_current(fake_pymeasure) -> None:
@@ -378,6 +399,52 @@ def test_measure_voltage_reads_instrument(fake_pymeasure) -> None:
     assert ("read", "voltage") in fake.log
 
 
+def test_reads_select_one_element_once(fake_pymeasure) -> None:
+    smu, fake = connected_smu(fake_pymeasure)
+
+    for _ in range(3):
+        smu.measure_current(SMUChannel.CELL)
+    smu.measure_voltage(SMUChannel.CELL)
+
+    # one :FORM:ELEM per element change, then bare :READ? queries
+    assert fake.writes() == [":FORM:ELEM CURR", ":FORM:ELEM VOLT"]
+    assert [c[2] for c in fake.calls("ask")] == [":READ?"] * 4
+
+
+def test_2450_reads_without_form_elements(fake_pymeasure) -> None:
+    smu, fake = connected_smu(fake_pymeasure, model="2450")
+
+    assert smu.measure_current(SMUChannel.CELL) == pytest.approx(-0.0033)
+    assert fake.writes() == []
+
+
+def test_repeated_mode_setup_sends_no_sense_commands(fake_pymeasure) -> None:
+    smu, fake = connected_smu(fake_pymeasure)
+    smu.set_mode_voltage_source(SMUChannel.CELL)
+    fake.log.clear()
+
+    smu.set_mode_voltage_source(SMUChannel.CELL)
+
+    assert ":SENS:FUNC 'CURR'" not in fake.writes()
+    assert fake.sets("current_nplc") == []
+    assert fake.sets("current_range_auto_enabled") == []
+    # switching the sense function sends it, the cached NPLC stays
+    smu.set_mode_current_source(SMUChannel.CELL)
+    assert ":SENS:FUNC 'VOLT'" in fake.writes()
+    assert fake.sets("voltage_nplc") == []
+
+
+def test_reconnect_forgets_cached_sense_settings(fake_pymeasure) -> None:
+    smu, fake = connected_smu(fake_pymeasure)
+    smu.set_mode_voltage_source(SMUChannel.CELL)
+    smu.disconnect()
+
+    smu.connect()
+    smu.set_mode_voltage_source(SMUChannel.CELL)
+
+    assert ":SENS:FUNC 'CURR'" in smu.smu.writes()
+
+
 def test_enable_and_disable_output(fake_pymeasure) -> None:
     smu, fake = connected_smu(fake_pymeasure)
 
@@ -428,8 +495,18 @@ def test_reference_channel_switches_to_rear_terminals(fake_pymeasure) -> None:
     # output disabled first, then rear terminals selected
     assert fake.log[0] == ("call", "disable_source")
     assert False in fake.sets("front_terminals_enabled")
-    # reference diode sense mode (settings default "2wire" -> 2)
-    assert 2 in fake.sets("wires")
+    # reference diode sense mode (settings default "2wire" -> 2), the same
+    # as the cell's, so not sent again
+    assert fake.sets("wires") == []
+
+
+def test_reference_channel_4_wire_sense_mode_is_applied(fake_pymeasure) -> None:
+    smu, fake = connected_smu(fake_pymeasure, referenceDiodeSenseMode="4 wire")
+
+    smu.set_voltage(SMUChannel.REFERENCE, 0.0)
+    smu.set_voltage(SMUChannel.CELL, 0.0)
+
+    assert fake.sets("wires") == [4, 2]
 
 
 def test_same_channel_operations_do_not_toggle(fake_pymeasure) -> None:
@@ -456,6 +533,125 @@ def test_switching_back_restores_cell_channel_state(fake_pymeasure) -> None:
     assert 0.6 in fake.sets("source_voltage")
 
 
+def test_terminal_switch_sends_only_differing_settings(fake_pymeasure) -> None:
+    smu, fake = connected_smu(fake_pymeasure)
+    # both channels configured alike, the reference held at 0 V
+    for channel in (SMUChannel.CELL, SMUChannel.REFERENCE):
+        smu.setup_voltage_output(channel, 0.01)
+        smu.set_voltage(channel, 0.0)
+    smu.set_voltage(SMUChannel.CELL, 0.5)
+    fake.log.clear()
+    smu.elided_writes = 0
+
+    smu.set_voltage(SMUChannel.REFERENCE, 0.0)
+
+    # only the voltage level differs (replayed, then set by the call)
+    assert fake.sets("source_voltage") == [0.0, 0.0]
+    assert fake.sets("compliance_current") == []
+    assert fake.sets("compliance_voltage") == []
+    assert fake.sets("source_mode") == []
+    assert "SYST:KEY 22" not in fake.writes()
+    # wires 1, limits 2 + 2, ranges 1 + 1, current level 1, mode 1, display 1
+    assert smu.elided_writes == 10
+
+
+def test_terminal_switch_replays_everything_after_reconnect(fake_pymeasure) -> None:
+    smu, fake = connected_smu(fake_pymeasure)
+
+    smu.set_voltage(SMUChannel.REFERENCE, 0.0)
+
+    # the channel defaults differ from what connect programmed (or it is
+    # unknown), so the limits, mode and display are all sent
+    assert fake.sets("compliance_voltage") == [1.0]
+    assert fake.sets("compliance_current") == [0.005]
+    assert fake.sets("source_mode") == ["voltage"]
+    assert "SYST:KEY 22" in fake.writes()
+
+
+def test_cached_limit_still_selects_terminals(fake_pymeasure) -> None:
+    smu, fake = connected_smu(fake_pymeasure)
+    smu.set_current_limit(SMUChannel.REFERENCE, 0.005)
+    smu.set_voltage(SMUChannel.CELL, 0.1)
+    fake.log.clear()
+
+    smu.set_current_limit(SMUChannel.REFERENCE, 0.005)
+
+    # the write is skipped, the switch to the rear terminals is not
+    assert smu.state_cache_hits == 1
+    assert fake.sets("front_terminals_enabled") == [False]
+    assert 0.005 not in fake.sets("compliance_current")
+
+
+# --- hardware sweep ---
+
+
+def test_sweep_voltage_runs_trace_buffer_sweep_on_2401(fake_pymeasure) -> None:
+    smu, fake = connected_smu(fake_pymeasure)
+    smu.sweep_poll_interval = 0.0
+    assert smu.sweep_period_min == pytest.approx(1 / 25)
+    fake.answers = [
+        "2\n",  # buffer polls
+        "3\n",
+        [0.0, -0.004, 0.1, -0.0039, 0.2, -0.0037],
+    ]
+
+    chunks = list(smu.sweep_voltage(SMUChannel.CELL, 0.0, 0.2, 3, 0.05))
+
+    assert chunks == [([0.0, 0.1, 0.2], [-0.004, -0.0039, -0.0037])]
+    writes = fake.writes()
+    assert ":SOUR:VOLT:STAR 0.0;:SOUR:VOLT:STOP 0.2;" in writes[0]
+    assert ":SOUR:VOLT:MODE SWE" in writes[0]
+    # settling fills the step minus the integration time
+    assert writes[1] == f":SOUR:DEL {0.05 - 0.02};:TRIG:COUN 3;:FORM:ELEM VOLT,CURR"
+    assert ":TRAC:FEED:CONT NEXT" in writes[2]
+    assert writes[3] == ":INIT"
+    assert [c[2] for c in fake.calls("values")] == [":TRAC:DATA?"]
+    # one-shot mode is restored and the level held
+    assert writes[-1].startswith(":SOUR:VOLT:MODE FIX;:TRIG:COUN 1")
+    assert fake.sets("source_voltage") == [0.2]
+    # the next single reading selects its element again
+    smu.measure_current(SMUChannel.CELL)
+    assert fake.writes()[-1] == ":FORM:ELEM CURR"
+
+
+def test_long_sweep_runs_in_buffer_sized_segments(fake_pymeasure, monkeypatch) -> None:
+    monkeypatch.setattr(
+        "iv_lab.hardware.smu.drivers.keithley_2400.SWEEP_POINTS_MAX", 2
+    )
+    smu, fake = connected_smu(fake_pymeasure, model="2450")
+    smu.sweep_poll_interval = 0.0
+    fake.answers = ["2", [0.0, -0.004, 0.1, -0.0039], "1", [0.2, -0.0037]]
+
+    chunks = list(smu.sweep_voltage(SMUChannel.CELL, 0.0, 0.2, 3, 0.05))
+
+    assert chunks == [([0.0, 0.1], [-0.004, -0.0039]), ([0.2], [-0.0037])]
+    sweeps = [w for w in fake.writes() if w.startswith(":SOUR:SWE:VOLT:LIN")]
+    assert sweeps == [
+        f":SOUR:SWE:VOLT:LIN 0.0, 0.1, 2, {0.05 - 0.02}",
+        f":SOUR:SWE:VOLT:LIN 0.2, 0.2, 1, {0.05 - 0.02}",
+    ]
+    assert fake.calls("values")[-1][2] == ':TRAC:DATA? 1, 1, "defbuffer1", SOUR, READ'
+    assert fake.writes()[-1] == ":ABOR"
+
+
+def test_closing_sweep_early_aborts_and_holds_level(fake_pymeasure, monkeypatch) -> None:
+    monkeypatch.setattr(
+        "iv_lab.hardware.smu.drivers.keithley_2400.SWEEP_POINTS_MAX", 2
+    )
+    smu, fake = connected_smu(fake_pymeasure, model="2450")
+    smu.sweep_poll_interval = 0.0
+    fake.answers = ["2", [0.0, -0.004, 0.1, -0.0039]]
+
+    sweep = smu.sweep_voltage(SMUChannel.CELL, 0.0, 0.3, 4, 0.05)
+    next(sweep)
+    sweep.close()
+
+    # the second segment never starts
+    assert len([w for w in fake.writes() if w.startswith(":SOUR:SWE")]) == 1
+    assert fake.writes()[-1] == ":ABOR"
+    assert fake.sets("source_voltage") == [pytest.approx(0.1)]
+
+
 # --- TTL / filter wheel ---
 
 
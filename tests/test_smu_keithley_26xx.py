@@ -8,6 +8,7 @@ imports it inside ``_open()``.
 import sys
 import types
 
+import numpy as np
 import pytest
 
 from iv_lab.config import SMUSettings
@@ -15,6 +16,7 @@ from iv_lab.hardware import HardwareCommandError
 from iv_lab.hardware.smu import SMUChannel, create_smu, get_smu_driver
 
 # importing the driver module must not pull in Keithley26XX (checked below)
+from iv_lab.hardware.smu.drivers import _keithley26xx_tsp as tsp
 from iv_lab.hardware.smu.drivers.keithley_26xx import Keithley26xxSMU
 
 
@@ -60,6 +62,34 @@ class FakeChannel:
         return [entry for entry in self.log if entry[1] == name]
 
 
+class FakeBinaryResource:
+    """Stands in for the library's pyvisa resource in binary reads."""
+
+    def __init__(self) -> None:
+        self.writes: list[str] = []
+        self.binary_answers: list[list[float]] = []
+        self.binary_kwargs: list[dict] = []
+        # lines printed by a running script, and the timeouts they were read with
+        self.lines: list[str] = []
+        self.read_timeouts: list[float] = []
+        self.timeout = 1000
+        self.cleared = 0
+
+    def write(self, cmd: str) -> None:
+        self.writes.append(cmd)
+
+    def read(self) -> str:
+        self.read_timeouts.append(self.timeout)
+        return self.lines.pop(0)
+
+    def clear(self) -> None:
+        self.cleared += 1
+
+    def read_binary_values(self, **kwargs):
+        self.binary_kwargs.append(kwargs)
+        return np.array(self.binary_answers.pop(0))
+
+
 class FakeSMU26xx:
     CHANNEL_A = "a"
     CHANNEL_B = "b"
@@ -75,8 +105,42 @@ class FakeSMU26xx:
         self.disconnected = False
         self.both_current_readings = [-0.004, 0.0063]
         self.both_voltage_readings = [0.5, 0.0]
+        # raw TSP sent by the driver's TSP helpers, and queued answers
+        self.lua_log: list[str] = []
+        # TSP queries sent with the error queue check
+        self.checked_queries: list[str] = []
+        self.lua_answers: list[str] = []
+        # the library's private pyvisa resource
+        self._SMU26xx__instrument = FakeBinaryResource()
         type(self).instances.append(self)
 
+    def write_lua(self, cmd, check_for_errors=True):
+        self.lua_log.append(cmd)
+
+    def query_lua(self, cmd, check_for_errors=True):
+        self.lua_log.append(cmd)
+        if check_for_errors:
+            self.checked_queries.append(cmd)
+        if self.lua_answers:
+            return self.lua_answers.pop(0)
+        # calls into the preloaded function library
+        if cmd in ("ivl_both_i()",) or cmd.startswith("ivl_setv_both_i("):
+            values = self.both_current_readings
+        elif cmd == "ivl_both_iv()":
+            values = self.measure_current_and_voltage()
+        elif cmd.startswith(("ivl_setv_meas_i(smu", "ivl_meas_i(smu")):
+            channel = self.channels[cmd[cmd.index("(smu") + 4]]
+            values = [channel.current_reading]
+        elif cmd.startswith("ivl_meas_iv(smu"):
+            channel = self.channels[cmd[len("ivl_meas_iv(smu")]]
+            values = [channel.current_reading, channel.voltage_reading]
+        else:
+            raise AssertionError(f"unexpected query {cmd!r}")
+        return "\t".join(f"{value:e}" for value in values)
+
+    def lua_sent(self, fragment: str) -> list[str]:
+        return [cmd for cmd in self.lua_log if fragment in cmd]
+
     def get_channel(self, channel: str) -> FakeChannel:
         return self.channels[channel]
 
@@ -120,6 +184,7 @@ def connected_smu(fake_cls, **overrides):
     fake = fake_cls.instances[-1]
     fake.channels["a"].log.clear()  # only record what the test triggers
     fake.channels["b"].log.clear()
+    fake.lua_log.clear()
     return smu, fake
 
 
@@ -171,6 +236,7 @@ def test_connect_imports_and_configures_both_channels(fake_keithley26xx) -> None
         assert chan.calls("set_measurement_speed_normal")
 
     assert smu.meas_period_min == pytest.approx(1 / 16)
+    assert smu.sweep_period_min == pytest.approx(1 / 40)
 
 
 def test_connect_fast_speed_and_4wire_reference(fake_keithley26xx) -> None:
@@ -183,6 +249,7 @@ def test_connect_fast_speed_and_4wire_reference(fake_keithley26xx) -> None:
     assert fake.channels["a"].calls("set_measurement_speed_fast")
     assert fake.channels["b"].calls("set_measurement_speed_fast")
     assert smu.meas_period_min == pytest.approx(1 / 65)
+    assert smu.sweep_period_min == pytest.approx(1 / 1000)
     # channel B sense mode from referenceDiodeSenseMode
     assert fake.channels["b"].calls("set_sense_4wire")
     assert fake.channels["a"].calls("set_sense_2wire")
@@ -284,6 +351,9 @@ def test_measure_voltage_and_current_per_channel(fake_keithley26xx) -> None:
     assert smu.measure_voltage(SMUChannel.CELL) == pytest.approx(0.5)
     assert smu.measure_current(SMUChannel.CELL) == pytest.approx(-0.004)
     assert smu.measure_current(SMUChannel.REFERENCE) == pytest.approx(0.0063)
+    # currents through the preloaded function, without error checks
+    assert fake.lua_log == ["ivl_meas_i(smua)", "ivl_meas_i(smub)"]
+    assert fake.checked_queries == []
 
 
 def test_measure_both_currents_reads_both_channels_in_parallel(
@@ -294,9 +364,10 @@ def test_measure_both_currents_reads_both_channels_in_parallel(
 
     i_cell, i_ref = smu.measure_both_currents()
 
-    # legacy CHAN_BOTH: one read through the parent SMU26xx object
+    # legacy CHAN_BOTH: one read of both channels (preloaded function)
     assert i_cell == pytest.approx(-0.0041)
     assert i_ref == pytest.approx(0.00635)
+    assert fake.lua_log == ["ivl_both_i()"]
     # the per-channel objects were not used
     assert not fake.channels["a"].calls("measure_current")
     assert not fake.channels["b"].calls("measure_current")
@@ -311,6 +382,54 @@ def test_measure_both_iv_points_reads_parent_object(fake_keithley26xx) -> None:
 
     assert (i_cell, v_cell) == pytest.approx((-0.0041, 0.51))
     assert (i_ref, v_ref) == pytest.approx((0.00635, 0.0))
+    assert fake.lua_log == ["ivl_both_iv()"]
+
+
+def test_connect_loads_function_library(fake_keithley26xx) -> None:
+    smu = Keithley26xxSMU(make_settings())
+    smu.connect()
+    fake = fake_keithley26xx.instances[0]
+
+    load, run = fake.lua_log[:2]
+    assert load.startswith("loadscript IVLabFunctions\n")
+    assert "function ivl_setv_meas_i(ch, v, settle)" in load
+    assert load.endswith("\nendscript")
+    assert run == "IVLabFunctions()"
+
+
+def test_set_voltage_measure_current_is_one_query(fake_keithley26xx) -> None:
+    smu, fake = connected_smu(fake_keithley26xx)
+    fake.channels["b"].current_reading = 0.0063
+
+    assert smu.set_voltage_measure_current(SMUChannel.CELL, 0.25) == pytest.approx(-0.004)
+    i = smu.set_voltage_measure_current(SMUChannel.REFERENCE, 0.0)
+    assert i == pytest.approx(0.0063)
+    assert smu.set_voltage_measure_both_currents(0.3) == pytest.approx((-0.004, 0.0063))
+
+    assert smu.set_voltage_measure_current(SMUChannel.CELL, 0.2, settle=0.05) == pytest.approx(
+        -0.004
+    )
+
+    assert fake.lua_log == [
+        "ivl_setv_meas_i(smua, 0.25, 0.0)",
+        "ivl_setv_meas_i(smub, 0.0, 0.0)",
+        "ivl_setv_both_i(0.3, 0.0)",
+        "ivl_setv_meas_i(smua, 0.2, 0.05)",
+    ]
+    # no separate set_voltage write, and no error check per point
+    assert not fake.channels["a"].calls("set_voltage")
+    assert fake.checked_queries == []
+
+
+def test_check_errors_raises_the_queued_error(fake_keithley26xx) -> None:
+    smu, fake = connected_smu(fake_keithley26xx)
+    fake.lua_answers = ["0.00000e+00\tQueue Is Empty", "-2.86000e+02\tbad argument"]
+
+    smu.check_errors()
+    with pytest.raises(HardwareCommandError, match="bad argument"):
+        smu.check_errors()
+
+    assert fake.lua_log[-1] == "errorqueue.clear()"
 
 
 def test_measure_iv_point_reads_current_and_voltage(fake_keithley26xx) -> None:
@@ -320,7 +439,7 @@ def test_measure_iv_point_reads_current_and_voltage(fake_keithley26xx) -> None:
 
     assert i == pytest.approx(-0.004)
     assert v == pytest.approx(0.5)
-    assert fake.channels["a"].calls("measure_current_and_voltage")
+    assert fake.lua_log == ["ivl_meas_iv(smua)"]
 
 
 def test_set_sense_mode(fake_keithley26xx) -> None:
@@ -344,6 +463,365 @@ def test_set_ttl_level_not_supported(fake_keithley26xx) -> None:
         smu.set_ttl_level(3)
 
 
+def test_sweep_voltage_runs_buffered_sweep_on_channel_a(fake_keithley26xx) -> None:
+    smu, fake = connected_smu(fake_keithley26xx, measSpeed="fast")
+    smu.sweep_poll_interval = 0.0
+    fake.lua_answers = ["3.00000e+00"]  # buffer count
+    # readings and source values of nvbuffer1, interleaved per point
+    fake._SMU26xx__instrument.binary_answers = [[-4e-03, 0, -3e-03, 0.1, 1e-03, 0.2]]
+
+    chunks = list(smu.sweep_voltage(SMUChannel.CELL, 0.0, 0.2, 3, 0.01))
+
+    assert chunks == [([0.0, 0.1, 0.2], [-0.004, -0.003, 0.001])]
+    # settling fills the step minus the fast integration time
+    (program,) = fake.lua_sent("trigger.source.linearv")
+    assert "smua.trigger.source.linearv(0.0, 0.2, 3)" in program
+    assert f"smua.source.delay = {0.01 - 0.0002}" in program
+    assert fake.lua_sent("smua.trigger.initiate()")
+    assert fake._SMU26xx__instrument.writes == [
+        "printbuffer(1, 3, smua.nvbuffer1.readings, smua.nvbuffer1.sourcevalues)"
+    ]
+    assert fake.lua_sent("format.data = format.ASCII")
+    assert fake.lua_sent("smua.abort()")
+    assert not fake.lua_sent("smub")
+
+
+def test_closing_sweep_early_aborts_it(fake_keithley26xx) -> None:
+    smu, fake = connected_smu(fake_keithley26xx)
+    smu.sweep_poll_interval = 0.0
+    fake.lua_answers = ["1"]
+    fake._SMU26xx__instrument.binary_answers = [[-4e-03, 0]]
+
+    sweep = smu.sweep_voltage(SMUChannel.CELL, 0.0, 1.0, 11, 0.1)
+    assert next(sweep) == ([0.0], [-0.004])
+    sweep.close()
+
+    assert fake.lua_sent("smua.abort()")
+
+
+def test_acquire_time_series_buffers_both_channels(fake_keithley26xx) -> None:
+    smu, fake = connected_smu(fake_keithley26xx, measSpeed="fast")
+    smu.sweep_poll_interval = 0.0
+    # buffer counts of both channels, then the base timestamp
+    fake.lua_answers = ["3", "3", "1.7e+09"]
+    fake._SMU26xx__instrument.binary_answers = [
+        [-4e-03, 0.0, -3e-03, 0.0005, -2e-03, 0.001],  # channel A, with times
+        [-1e-03, -1e-03, -1e-03],  # reference diode
+    ]
+
+    chunks = list(
+        smu.acquire_time_series(SMUChannel.CELL, "i", 0.0005, 3, reference=True)
+    )
+
+    assert chunks == [
+        ([0.0, 0.0005, 0.001], [-4e-03, -3e-03, -2e-03], [-1e-03, -1e-03, -1e-03])
+    ]
+    assert smu.acquisition_period_min == pytest.approx(1 / 2000)
+    (setup,) = fake.lua_sent("measure.interval")
+    assert "smua.measure.count = 3" in setup
+    assert "smub.nvbuffer1.collecttimestamps = 1" in setup
+    (start,) = fake.lua_sent("overlapped")
+    assert start.splitlines() == [
+        "smua.measure.overlappedi(smua.nvbuffer1)",
+        "smub.measure.overlappedi(smub.nvbuffer1)",
+    ]
+    # single readings restored for the regular measurements
+    assert fake.lua_log[-1] == (
+        "smua.abort()\nsmua.measure.count = 1\nsmub.abort()\nsmub.measure.count = 1"
+    )
+
+
+def test_long_acquisition_runs_back_to_back(fake_keithley26xx, monkeypatch) -> None:
+    monkeypatch.setattr(
+        "iv_lab.hardware.smu.drivers.keithley_26xx.ACQUISITION_POINTS_MAX", 2
+    )
+    smu, fake = connected_smu(fake_keithley26xx)
+    smu.sweep_poll_interval = 0.0
+    fake.lua_answers = ["2", "100.0", "1", "100.5"]
+    fake._SMU26xx__instrument.binary_answers = [[0.5, 0.0, 0.51, 0.25], [0.52, 0.0]]
+
+    chunks = list(smu.acquire_time_series(SMUChannel.CELL, "v", 0.25, 3))
+
+    # the second run's timestamps continue from the first reading
+    assert [t for t, _v, _ref in chunks] == [[0.0, 0.25], [0.5]]
+    assert chunks[1][1:] == ([0.52], [0.0])
+    assert len(fake.lua_sent("smua.measure.overlappedv(smua.nvbuffer1)")) == 2
+    assert "smua.measure.count = 1" in fake.lua_sent("smua.measure.count")[-1]
+
+
+def test_read_buffer_decodes_real64_block(fake_keithley26xx) -> None:
+    smu, fake = connected_smu(fake_keithley26xx)
+    resource = fake._SMU26xx__instrument
+    resource.binary_answers = [[-4e-03, 0.0, 0.0, -3e-03, 0.1, 0.02]]
+
+    i, v, t = tsp.read_buffer(fake, "b", 5, 6)
+
+    assert resource.writes == [
+        "printbuffer(5, 6, smub.nvbuffer1.readings, smub.nvbuffer1.sourcevalues,"
+        " smub.nvbuffer1.timestamps)"
+    ]
+    (kwargs,) = resource.binary_kwargs
+    assert kwargs["datatype"] == "d"
+    assert kwargs["is_big_endian"] is False
+    assert kwargs["data_points"] == 6
+    assert i.tolist() == [-4e-03, -3e-03]
+    assert v.tolist() == [0.0, 0.1]
+    assert t.tolist() == [0.0, 0.02]
+    # switched to binary for the read only
+    assert "format.REAL64" in fake.lua_log[0]
+    assert fake.lua_log[-1] == "format.data = format.ASCII"
+
+
+def test_read_buffer_restores_ascii_after_failed_read(fake_keithley26xx) -> None:
+    smu, fake = connected_smu(fake_keithley26xx)
+
+    with pytest.raises(IndexError):  # no binary answer queued
+        tsp.read_buffer(fake, "a", 1, 2)
+
+    assert fake.lua_log[-1] == "format.data = format.ASCII"
+
+
+def test_track_mpp_streams_records_of_the_running_tracker(fake_keithley26xx) -> None:
+    smu, fake = connected_smu(fake_keithley26xx, measSpeed="fast")
+    resource = fake._SMU26xx__instrument
+    resource.lines = [
+        "0.00000e+00\t4.50000e-01\t-3.60000e-03\t0.00000e+00",
+        "5.00000e-01\t4.52000e-01\t-3.50000e-03\t0.00000e+00",
+        "end",
+    ]
+
+    chunks = list(smu.track_mpp(0.45, 2.0, (0.002, 0.004, 0.001), 0.5, 1.0))
+
+    assert chunks == [
+        ([0.0], [0.45], [-0.0036], [0.0]),
+        ([0.5], [0.452], [-0.0035], [0.0]),
+    ]
+    assert smu.mpp_period_min == pytest.approx(1 / 500)
+    assert len(fake.lua_sent("loadscript IVLabMPP")) == 1
+    # fast speed: 250 samples of 2 ms averaged into each 0.5 s record
+    assert fake.lua_log[2] == "ivl_mpp_start(0.45, 0.002, 0.004, 0.001, 2.0, 0.002, 250, 1.0, 0)"
+    # started once; the host only reads, waiting up to a record interval
+    assert fake.lua_log[3:] == ["ivl_mpp_track()"]
+    assert resource.read_timeouts == [1500, 1500, 1500]
+    assert resource.timeout == 1000
+    assert resource.cleared == 0
+
+    # the script is loaded once per connection
+    resource.lines = ["end"]
+    list(smu.track_mpp(0.45, 2.0, (0.002, 0.004, 0.001), 0.5, 1.0, reference=True))
+    assert len(fake.lua_sent("loadscript IVLabMPP")) == 1
+    assert fake.lua_log[-2].startswith("ivl_mpp_start(")
+    assert fake.lua_log[-2].endswith(", 1)")
+
+
+def test_closing_the_mpp_tracker_early_aborts_the_script(fake_keithley26xx) -> None:
+    smu, fake = connected_smu(fake_keithley26xx, measSpeed="fast")
+    resource = fake._SMU26xx__instrument
+    resource.lines = ["0\t0.45\t-0.0036\t0"]
+
+    tracker = smu.track_mpp(0.45, 2.0, (0.002, 0.004, 0.001), 0.5, 10.0)
+    next(tracker)
+    tracker.close()
+
+    assert resource.cleared == 1
+
+
+# --- command batching ---
+
+
+def test_command_batch_sends_one_chunk_and_checks_errors_once(fake_keithley26xx) -> None:
+    smu, fake = connected_smu(fake_keithley26xx)
+    no_error = "0\t0.00000e+00\tQueue Is Empty"
+    fake.lua_answers = [no_error, "0.25", no_error]
+
+    with tsp.CommandBatch(fake):
+        fake.write_lua("smua.source.limiti = 0.01")
+        fake.write_lua("smua.source.func = smua.OUTPUT_DCVOLTS")
+        assert fake.lua_log == []  # nothing sent yet
+        # a query sends the pending commands first
+        assert fake.query_lua("print(smua.measure.v())") == "0.25"
+        fake.write_lua("smua.source.output = smua.OUTPUT_ON")
+
+    chunk, error_check, query, last_chunk, last_check = fake.lua_log
+    assert chunk.splitlines()[:3] == [
+        "ivl_batch_error = 0",
+        "errorqueue.clear()",
+        "smua.source.limiti = 0.01",
+    ]
+    assert "ivl_batch_error = 2" in chunk
+    assert "errorqueue.next()" in error_check
+    assert query == "print(smua.measure.v())"
+    assert "smua.source.output = smua.OUTPUT_ON" in last_chunk
+    assert "errorqueue.next()" in last_check
+    # the library methods are restored
+    assert "write_lua" not in vars(fake)
+
+
+def test_command_batch_error_names_the_failing_command(fake_keithley26xx) -> None:
+    smu, fake = connected_smu(fake_keithley26xx)
+    fake.lua_answers = ["2\t-2.85000e+02\tProgram syntax error"]
+
+    expected = r"batched command 2 of 3.*bogus"
+    with pytest.raises(HardwareCommandError, match=expected), tsp.CommandBatch(fake):
+        fake.write_lua("smua.source.limiti = 0.01")
+        fake.write_lua("smua.source.bogus = 1")
+        fake.write_lua("smua.source.output = smua.OUTPUT_ON")
+
+    assert fake.lua_log[-1] == "errorqueue.clear()"
+
+
+def test_command_batch_reports_an_aborted_chunk(fake_keithley26xx) -> None:
+    smu, fake = connected_smu(fake_keithley26xx)
+    # the chunk did not compile: no command recorded an error
+    fake.lua_answers = ["0\t-2.85000e+02\tProgram syntax error"]
+
+    expected = r"batch of 2 commands aborted"
+    with pytest.raises(HardwareCommandError, match=expected), tsp.CommandBatch(fake):
+        fake.write_lua("smua.source.limiti = 0.01")
+        fake.write_lua("smua.source.levelv = (")
+
+    assert "ivl_batch_error = nil" in fake.lua_log[-2]
+
+
+def test_command_batch_error_does_not_hide_the_body_exception(fake_keithley26xx) -> None:
+    smu, fake = connected_smu(fake_keithley26xx)
+    fake.lua_answers = ["1\t-2.85000e+02\tProgram syntax error"]
+
+    with pytest.raises(ValueError, match="body") as info, tsp.CommandBatch(fake):
+        fake.write_lua("smua.source.bogus = 1")
+        raise ValueError("body")
+
+    # the queued command was still sent, and its error is noted
+    assert "Program syntax error" in info.value.__notes__[0]
+    assert info.value.__cause__ is None
+    assert "smua.source.bogus = 1" in fake.lua_log[0]
+
+
+def test_read_buffer_sends_a_pending_batch_first(fake_keithley26xx) -> None:
+    smu, fake = connected_smu(fake_keithley26xx)
+    resource = fake._SMU26xx__instrument
+    resource.binary_answers = [[-4e-03, 0.0]]
+    fake.lua_answers = ["0\t0\tQueue Is Empty"] * 2
+
+    with tsp.CommandBatch(fake):
+        fake.write_lua("smua.source.levelv = 0.5")
+        tsp.read_buffer(fake, "a", 1, 1, fields=("readings", "sourcevalues"))
+        # the binary format reached the instrument before the read
+        assert "format.REAL64" in fake.lua_log[0]
+        assert len(resource.writes) == 1
+
+    assert "format.data = format.ASCII" in fake.lua_log[-2]
+
+
+def test_nested_batches_send_once(fake_keithley26xx) -> None:
+    smu, fake = connected_smu(fake_keithley26xx)
+    fake.lua_answers = ["0\t0\tQueue Is Empty"]
+
+    with smu.batch():
+        fake.write_lua("smua.source.limiti = 0.01")
+        with smu.batch():
+            fake.write_lua("smua.source.levelv = 0.5")
+        assert fake.lua_log == []
+
+    assert len(fake.lua_log) == 2  # one chunk, one error check
+
+
+class FakeVisaResource:
+    """pyvisa resource answering the bundled library's queries."""
+
+    def __init__(self) -> None:
+        self.writes: list[str] = []
+        self.queries: list[str] = []
+        self.batch_answer = "0\t0.00000e+00\tQueue Is Empty"
+        self.binary_answer: list[float] = []
+
+    def write(self, cmd: str) -> None:
+        self.writes.append(cmd)
+
+    def query(self, cmd: str) -> str:
+        self.queries.append(cmd)
+        if "localnode.model" in cmd:
+            return "2602B\n"
+        if "ivl_batch_error" in cmd:
+            return self.batch_answer
+        return "0.00000e+00\tQueue Is Empty\n"
+
+    def read_binary_values(self, **kwargs):
+        return np.array(self.binary_answer)
+
+    def clear(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def fake_visa_resource(monkeypatch):
+    """Run the real bundled library on a fake ``pyvisa`` module."""
+    resource = FakeVisaResource()
+
+    class FakeResourceManager:
+        def open_resource(self, address):
+            return resource
+
+    module = types.ModuleType("pyvisa")
+    module.ResourceManager = FakeResourceManager
+    module.VisaIOError = OSError
+    monkeypatch.setitem(sys.modules, "pyvisa", module)
+    lib = "iv_lab.hardware.smu.drivers._keithley26xx_lib"
+    monkeypatch.delitem(sys.modules, lib, raising=False)
+    yield resource
+    sys.modules.pop(lib, None)
+
+
+def test_setup_voltage_output_is_one_round_trip_with_library(fake_visa_resource) -> None:
+    smu = Keithley26xxSMU(make_settings())
+    smu.connect()
+    # connecting configures both channels in a single chunk
+    assert len([w for w in fake_visa_resource.writes if "ivl_batch_error" in w]) == 1
+    fake_visa_resource.writes.clear()
+    fake_visa_resource.queries.clear()
+
+    smu.setup_voltage_output(SMUChannel.CELL, 0.01)
+
+    # limit, source + measure autorange, mode, display: one write, one check
+    (chunk,) = fake_visa_resource.writes
+    assert "smua.source.limiti = 0.01" in chunk
+    assert "smua.measure.autorangei = smua.AUTORANGE_ON" in chunk
+    assert "smua.source.func = smua.OUTPUT_DCVOLTS" in chunk
+    assert "display.smua.measure.func = display.MEASURE_DCAMPS" in chunk
+    assert len(fake_visa_resource.queries) == 1
+
+
+def test_read_buffer_uses_library_visa_resource(fake_visa_resource) -> None:
+    smu = Keithley26xxSMU(make_settings())
+    smu.connect()
+    fake_visa_resource.writes.clear()
+    fake_visa_resource.binary_answer = [-4e-03, 0.5]
+
+    i, v = tsp.read_buffer(smu.smu, "a", 1, 1, fields=("readings", "sourcevalues"))
+
+    assert (i.tolist(), v.tolist()) == ([-4e-03], [0.5])
+    assert "printbuffer(1, 1, smua.nvbuffer1.readings" in fake_visa_resource.writes[1]
+    assert fake_visa_resource.writes[-1] == "format.data = format.ASCII"
+
+
+def test_batched_error_from_library_names_command(fake_visa_resource) -> None:
+    smu = Keithley26xxSMU(make_settings())
+    smu.connect()
+    fake_visa_resource.batch_answer = "4\t-2.85000e+02\tProgram syntax error"
+
+    with pytest.raises(HardwareCommandError, match="source.func"):
+        smu.setup_voltage_output(SMUChannel.CELL, 0.01)
+
+    # the failed setup is not cached
+    fake_visa_resource.batch_answer = "0\t0.00000e+00\tQueue Is Empty"
+    fake_visa_resource.writes.clear()
+    smu.setup_voltage_output(SMUChannel.CELL, 0.01)
+    assert fake_visa_resource.writes
+
+
 # --- safety ---
 
 
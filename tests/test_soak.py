@@ -0,0 +1,47 @@
+"""Accelerated soak test harness (threaded IVLabSystem, virtual clock)."""
+
+import pytest
+
+from iv_lab.bench.soak import (
+    PROTOCOLS,
+    Checkpoint,
+    heap_growth,
+    run_soak,
+    schedule_deviation,
+)
+
+
+@pytest.mark.parametrize("name", ["mpp", "cv"])
+def test_short_soak_passes_with_linear_memory_and_on_time_samples(name) -> None:
+    report = run_soak(PROTOCOLS[name], days=1 / 24, interval=30.0, checkpoints=10)
+
+    assert report.passed, report.summary()
+    assert report.samples == report.expected_samples == 120
+    assert len(report.checkpoints) >= 10
+    assert report.checkpoints[0].samples == 0
+    assert report.checkpoints[-1].samples == 120
+    assert all(c.heap is not None for c in report.checkpoints)
+    assert report.heap_per_sample is not None
+    # one 1/16 s reading of the timing profile at most behind the schedule
+    assert 0.0 <= report.max_lateness < 0.1
+    assert "PASS" in report.summary()
+
+
+def checkpoints(heap) -> list[Checkpoint]:
+    return [Checkpoint(n, float(n), None, heap(n), 0) for n in range(0, 1001, 100)]
+
+
+def test_quadratic_heap_growth_is_detected() -> None:
+    linear = heap_growth(checkpoints(lambda n: 10_000 + 200 * n))
+    quadratic = heap_growth(checkpoints(lambda n: 10_000 + 200 * n + n * n))
+
+    assert linear == pytest.approx((200.0, 200.0))
+    assert quadratic[1] > 2.0 * quadratic[0]
+
+
+def test_schedule_deviation() -> None:
+    lateness, jitter, drift = schedule_deviation([0.0, 1.05, 2.0, 3.3], 1.0)
+
+    assert lateness == pytest.approx(0.3)
+    assert jitter == pytest.approx(0.3)
+    assert drift == pytest.approx(0.3)
@@ -1,9 +1,14 @@
 """Headless emulated constant-voltage and constant-current protocol tests."""
 
+import time
+from pathlib import Path
+
 import pytest
 
 from iv_lab.config import LampSettings, SMUSettings
-from iv_lab.data import ConstantCurrentResults, ConstantVoltageResults
+from iv_lab.data import ConstantCurrentResults, ConstantVoltageResults, FileWriter, SystemContext
+from iv_lab.data.file_writer import StreamingWriter
+from iv_lab.hardware import VirtualClock
 from iv_lab.hardware.lamp.drivers.emulated import EmulatedLamp
 from iv_lab.hardware.smu.base import SMUChannel
 from iv_lab.hardware.smu.drivers.emulated import EmulatedSMU
@@ -112,6 +117,35 @@ def test_constant_voltage_interval_adjusted_with_warning() -> None:
     assert any("unable to provide the requested measurement rate" in w for w in warnings)
 
 
+def test_fast_constant_voltage_uses_buffered_readings() -> None:
+    warnings: list[str] = []
+    samples: list[dict] = []
+    smu = make_smu(useReferenceDiode=True)
+    smu.reference_diode_parallel = True
+    smu.meas_period_min = 0.02  # too slow for the polling loop
+    smu.acquisition_period_min = 0.0
+    protocol = make_protocol(
+        ConstantVoltageProtocol,
+        smu,
+        warning_callback=warnings.append,
+        data_callback=samples.append,
+    )
+
+    result = protocol.run(base_params(set_voltage=0.0, interval=0.001, duration=0.25))
+
+    # no interval adjustment; one reading per interval, instrument-timed
+    assert not warnings
+    assert result.interval == pytest.approx(0.001)
+    assert len(result.time) == 250
+    assert result.time[:3] == pytest.approx([0.0, 0.001, 0.002])
+    assert result.current[0] == pytest.approx(-EMULATED_FULL_SUN_CURRENT, rel=0.02)
+    assert len(result.current_reference) == 250
+    assert result.light_int_meas == pytest.approx(100.0, rel=0.05)
+    # live data is emitted per chunk, not per reading
+    assert len(samples) == 3
+    assert not smu.output_enabled(SMUChannel.CELL)
+
+
 def test_constant_voltage_parallel_reference_records_iref() -> None:
     smu = make_smu(useReferenceDiode=True)
     smu.reference_diode_parallel = True
@@ -144,6 +178,25 @@ def test_constant_voltage_hardware_safe_after_run_and_cancel() -> None:
     assert not lamp.light_is_on
 
 
+def test_hour_long_constant_voltage_runs_on_a_virtual_clock() -> None:
+    smu = make_smu()
+    # legacy emulation timing: 20 ms readings, 1/16 s minimum period
+    smu.integration_delay = 0.02
+    smu.meas_period_min = 1 / 16
+    lamp = make_lamp()
+    clock = VirtualClock(start=1.7e9)
+    smu.clock = lamp.clock = clock
+    protocol = make_protocol(ConstantVoltageProtocol, smu, lamp)
+
+    started = time.monotonic()
+    result = protocol.run(base_params(set_voltage=0.2, interval=5.0, duration=3600.0))
+
+    assert time.monotonic() - started < 60.0
+    assert clock.now - 1.7e9 >= 3600.0
+    assert len(result.time) == 720
+    assert result.time[-1] == pytest.approx(3595.0, abs=0.1)
+
+
 # --- constant current (measure V) ---
 
 
@@ -164,6 +217,24 @@ def test_constant_current_returns_plausible_voltages() -> None:
     assert result.current_reference is None
 
 
+def test_fast_constant_current_uses_buffered_readings() -> None:
+    samples: list[dict] = []
+    smu = make_smu()
+    smu.meas_period_min = 0.02
+    smu.acquisition_period_min = 0.0
+    protocol = make_protocol(
+        ConstantCurrentProtocol, smu, data_callback=samples.append,
+        cancel_callback=lambda: len(samples) >= 1,
+    )
+
+    result = protocol.run(base_params(set_current=0.0, interval=0.001, duration=60.0))
+
+    # cancelled after the first chunk of the long run
+    assert len(result.time) == 100
+    assert result.voltage[0] == pytest.approx(0.55, abs=0.01)
+    assert not smu.output_enabled(SMUChannel.CELL)
+
+
 def test_constant_current_out_of_compliance_raises_legacy_error() -> None:
     protocol = make_protocol(ConstantCurrentProtocol)
 
@@ -203,3 +274,150 @@ def test_status_messages_follow_legacy_flow() -> None:
     assert "Running Constant Current Measurement..." in messages
     assert "Run finished" in messages
     assert "Turning lamp off..." in messages
+
+
+def test_protocol_run_keeps_its_schedule_statistics() -> None:
+    smu = make_smu()
+    smu.clock = VirtualClock(tick=0.0)
+    protocol = make_protocol(ConstantVoltageProtocol, smu=smu)
+    protocol.keep_alive_interval = None
+
+    result = protocol.run(base_params(set_voltage=0.2, interval=0.1, duration=1.0))
+
+    stats = protocol.schedule.stats
+    assert stats.samples == len(result.time) == 10
+    assert stats.late == 0
+    assert stats.keep_alive_reads == 0
+    assert result.time == pytest.approx([0.1 * k for k in range(10)], abs=2e-3)
+
+
+def test_light_and_voc_readings_follow_their_poll_interval() -> None:
+    smu = make_smu()
+    smu.clock = VirtualClock(tick=0.0)
+    protocol = make_protocol(ConstantVoltageProtocol, smu=smu)
+    protocol.light_intensity_measure_time = 5.0
+    protocol.light_intensity_poll_interval = 0.1
+    reads: list[tuple[str, float]] = []
+    measure_current, measure_voltage = smu.measure_current, smu.measure_voltage
+    smu.measure_current = lambda ch: reads.append(("I", smu.clock.now)) or measure_current(ch)
+    smu.measure_voltage = lambda ch: reads.append(("V", smu.clock.now)) or measure_voltage(ch)
+
+    assert protocol.measure_light_intensity() == pytest.approx(100.0, rel=0.05)
+    assert [t for _, t in reads] == pytest.approx([0.1 * k for k in range(50)])
+
+    reads.clear()
+    protocol.measure_voc(base_params(), 1.0)
+    # legacy: a reading every 0.1 s while settling, then the Voc at 1 s
+    start = reads[0][1]
+    assert [t - start for _, t in reads] == pytest.approx([0.1 * k for k in range(11)])
+    assert all(kind == "V" for kind, _ in reads)
+
+
+def test_light_measurement_is_cancellable() -> None:
+    smu = make_smu()
+    smu.clock = VirtualClock(tick=0.0)
+    protocol = make_protocol(
+        ConstantVoltageProtocol, smu=smu, cancel_callback=lambda: smu.clock.now >= 1.0
+    )
+    protocol.light_intensity_measure_time = 5.0
+    protocol.light_intensity_poll_interval = 0.1
+
+    assert protocol.measure_light_intensity() == -1.0
+    assert smu.clock.now < 1.1
+
+
+def test_protocol_emits_one_sample_per_delta() -> None:
+    smu = make_smu()
+    smu.clock = VirtualClock(tick=0.0)
+    emitted: list[dict] = []
+    protocol = make_protocol(ConstantVoltageProtocol, smu=smu, data_callback=emitted.append)
+
+    result = protocol.run(base_params(set_voltage=0.2, interval=0.1, duration=1.0))
+
+    assert [d["seq"] for d in emitted] == list(range(1, 11))
+    assert all(len(d["t"]) == 1 for d in emitted)
+    live = emitted[-1]["live"]
+    assert list(live.column("t")) == pytest.approx(result.time)
+    assert list(live.column("j")) == pytest.approx(
+        [i * 1000.0 / 0.16 for i in result.current]
+    )
+
+
+def test_protocols_stream_their_rows_while_running(tmp_path: Path) -> None:
+    context = SystemContext(
+        base_path=str(tmp_path),
+        sd_path="",
+        system_name="IVLab",
+        smu_brand="Keithley",
+        smu_model="2602",
+        lamp_display_name="manual",
+        use_reference_diode=False,
+        full_sun_reference_current=EMULATED_FULL_SUN_CURRENT,
+        calibration_datetime="",
+    )
+    writer = FileWriter(context, generate_pdf=False)
+    streams: list[StreamingWriter] = []
+
+    def open_stream(result) -> StreamingWriter:
+        path = writer.data_file_path(result, "felix")
+        streams.append(StreamingWriter(writer, result, path, buffer_rows=4))
+        return streams[-1]
+
+    rows_on_disk: list[int] = []
+
+    def record_rows(_data: dict) -> None:
+        if streams and not streams[0].closed:
+            rows_on_disk.append(streams[0].rows)
+
+    smu = make_smu()
+    smu.clock = VirtualClock(tick=0.0)
+    for protocol_cls, params in [
+        (ConstantVoltageProtocol, base_params(set_voltage=0.2)),
+        (ConstantCurrentProtocol, base_params(set_current=0.001)),
+    ]:
+        streams.clear()
+        rows_on_disk.clear()
+        protocol = make_protocol(protocol_cls, smu=smu, data_callback=record_rows)
+        protocol.stream_factory = open_stream
+        params.update(interval=0.1, duration=1.0)
+
+        result = protocol.run(params)
+
+        # written in chunks of four rows during the run
+        assert sorted(set(rows_on_disk)) == [0, 4, 8]
+        saved = tmp_path / "saved"
+        expected, _ = FileWriter(
+            SystemContext(**{**vars(context), "base_path": str(saved)}), generate_pdf=False
+        ).save(result, "felix")
+        assert streams[0].path.read_text() == expected.read_text()
+        assert protocol.stream is None
+
+
+def test_streamed_run_keeps_a_bounded_history(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr("iv_lab.measurements.protocols.constant_voltage.STREAMED_HISTORY_ROWS", 16)
+    context = SystemContext(
+        base_path=str(tmp_path),
+        sd_path="",
+        system_name="IVLab",
+        smu_brand="Keithley",
+        smu_model="2602",
+        lamp_display_name="manual",
+        use_reference_diode=False,
+        full_sun_reference_current=EMULATED_FULL_SUN_CURRENT,
+        calibration_datetime="",
+    )
+    writer = FileWriter(context, generate_pdf=False)
+    smu = make_smu()
+    smu.clock = VirtualClock(tick=0.0)
+    protocol = make_protocol(ConstantVoltageProtocol, smu=smu)
+    protocol.stream_factory = lambda result: writer.open_stream(result, "felix")
+
+    result = protocol.run(base_params(set_voltage=0.2, interval=0.1, duration=10.0))
+
+    # memory: an even history of the run; the file: every sample
+    assert len(result.time) < 16
+    assert result.time[-1] > 9.0
+    lines = result.data_file.read_text().splitlines()
+    n_header = int(lines[0].split(",")[1])
+    times = [float(line.split(",")[0]) for line in lines[n_header:]]
+    assert times == pytest.approx([0.1 * k for k in range(100)], abs=2e-3)
@@ -0,0 +1,130 @@
+"""Chrome trace export of measurement run phases."""
+
+import json
+from pathlib import Path
+
+from PySide6.QtCore import QCoreApplication
+
+from iv_lab.config import SystemSettings
+from iv_lab.core import IVLabSystem
+from iv_lab.hardware import VirtualClock
+from iv_lab.hardware.profiler import current_phase
+from iv_lab.services import write_users
+from iv_lab.tracing import Tracer, active_tracer, trace_span, tracing
+
+_app = QCoreApplication.instance() or QCoreApplication([])
+
+
+def make_system(tmp_path: Path, clock: VirtualClock) -> IVLabSystem:
+    settings = SystemSettings.model_validate(
+        {
+            "computer": {
+                "hardware": "Test PC",
+                "os": "Windows 11",
+                "basePath": str(tmp_path / "data_root"),
+                "sdPath": "",
+            },
+            "IVsys": {
+                "sysName": "IVLab",
+                "fullSunReferenceCurrent": 0.004,
+                "calibrationDateTime": "Wed Jun  8 16:07:18 2022",
+                "referenceDiodeImax": 0.005,
+            },
+            "lamp": {"brand": "manual", "model": "manual", "emulate": True},
+            "SMU": {
+                "brand": "Keithley",
+                "model": "2602",
+                "visa_address": "GPIB0::24::INSTR",
+                "visa_library": "visa64.dll",
+                "emulate": True,
+                "useReferenceDiode": False,
+            },
+        }
+    )
+    users_file = tmp_path / "users.txt"
+    write_users(users_file, {"felix": "111111"})
+    system = IVLabSystem(
+        settings,
+        users_file=users_file,
+        settings_file=tmp_path / "system_settings.json",
+        threaded=False,
+        clock=clock,
+        trace_dir=tmp_path / "traces",
+    )
+    system.smu.meas_period_min = 0.0
+    return system
+
+
+def iv_params() -> dict:
+    return {
+        "light_int": 100.0,
+        "start_V": 0.0,
+        "stop_V": 0.6,
+        "dV": 0.05,
+        "sweep_rate": 1000.0,
+        "Imax": 0.01,
+        "Vmax": 2.0,
+        "Dwell": 0.5,
+        "Nwire": "2 wire",
+        "active_area": 0.16,
+        "cell_name": "test cell",
+        "Fwd_current_limit": 0.001,
+    }
+
+
+def inside(inner: dict, outer: dict) -> bool:
+    return (
+        inner["tid"] == outer["tid"]
+        and outer["ts"] <= inner["ts"]
+        and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"] + 1e-3
+    )
+
+
+def test_traced_jv_run_writes_nested_phase_spans(tmp_path) -> None:
+    system = make_system(tmp_path, VirtualClock())
+    system.hardware_init()
+    system.login("felix", "111111")
+    system.toggle_auto_save(True)
+
+    assert system.run_measurement("J-V Scan", iv_params())
+
+    assert active_tracer() is None
+    path = system.last_trace_path
+    assert path.parent == tmp_path / "traces"
+    assert path.name.endswith("_J_V_Scan.trace.json")
+    trace = json.loads(path.read_text(encoding="utf-8"))
+    assert trace["otherData"]["label"] == "J-V Scan"
+    spans = {}
+    for event in trace["traceEvents"]:
+        if event["ph"] == "X":
+            spans.setdefault(event["name"], event)
+
+    for name in ("lamp on", "dwell", "scan", "metrics", "lamp off", "save", "PDF report"):
+        assert name in spans, name
+    run, worker = spans["run_measurement"], spans["IVCurve"]
+    assert inside(worker, run)
+    for name in ("lamp on", "dwell", "scan", "metrics"):
+        assert inside(spans[name], worker), name
+    assert inside(spans["save"], spans["result handling"])
+    assert inside(spans["PDF report"], spans["save"])
+    # the dwell is spent on the virtual clock: 0.5 s
+    assert spans["dwell"]["dur"] >= 0.5e6 * 0.99
+    assert spans["scan"]["args"]["points"] == len(system.results["JV"].voltage)
+    assert spans["lamp on"]["ts"] < spans["scan"]["ts"] < spans["lamp off"]["ts"]
+
+
+def test_trace_span_names_the_profiler_phase_and_records_only_when_tracing() -> None:
+    with trace_span("outside"):
+        assert current_phase() == "outside"
+
+    tracer = Tracer("test", timer=iter(range(100)).__next__)
+    with tracing(tracer), trace_span("outer", category="run"), trace_span("inner", n=3):
+        assert current_phase() == "outer / inner"
+    assert active_tracer() is None
+
+    inner, outer = tracer.spans()
+    assert (inner["name"], inner["args"], inner["dur"]) == ("inner", {"n": 3}, 1e6)
+    assert (outer["name"], outer["cat"], outer["dur"]) == ("outer", "run", 3e6)
+    assert tracer.spans("outside") == []
+    names = [e for e in tracer.chrome_trace()["traceEvents"] if e["ph"] == "M"]
+    assert names[0]["args"]["name"] == "test"
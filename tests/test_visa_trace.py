@@ -0,0 +1,170 @@
+"""Recording VISA traffic and replaying it without the instrument.
+
+Sessions are recorded from the Keithley 2600 driver on the simulated TSP
+instrument, then replayed to a fresh driver with the instrument gone.
+"""
+
+import pytest
+
+from iv_lab.config import SMUSettings
+from iv_lab.hardware import VirtualClock
+from iv_lab.hardware.mock import (
+    Keithley26xxMock,
+    MockResourceManager,
+    MockVisaIOError,
+    ReplayMismatchError,
+    ReplayResourceManager,
+    use_mock_visa,
+)
+from iv_lab.hardware.smu import SMUChannel
+from iv_lab.hardware.smu.drivers.keithley_26xx import Keithley26xxSMU
+from iv_lab.hardware.visa_trace import read_trace, record_visa
+
+ADDRESS = "GPIB0::24::INSTR"
+
+
+def make_smu(clock) -> Keithley26xxSMU:
+    smu = Keithley26xxSMU(
+        SMUSettings(
+            brand="Keithley",
+            model="2602",
+            visa_address=ADDRESS,
+            visa_library="visa64.dll",
+            emulate=False,
+            measSpeed="fast",
+        )
+    )
+    smu.clock = clock
+    return smu
+
+
+def short_session(smu) -> list[float]:
+    smu.setup_voltage_output(SMUChannel.CELL, 0.01)
+    smu.enable_output(SMUChannel.CELL)
+    return [smu.set_voltage_measure_current(SMUChannel.CELL, 0.1 * k) for k in range(5)]
+
+
+def record(path) -> tuple[list[float], float]:
+    """Record a short driver session; return its readings and duration."""
+    clock = VirtualClock(tick=0.0)
+    rm = MockResourceManager(
+        {ADDRESS: Keithley26xxMock(clock=clock, photocurrent=0.004)},
+        latency=0.002,
+        clock=clock,
+    )
+    smu = make_smu(clock)
+    with use_mock_visa(rm), record_visa(path, clock=clock):
+        smu.connect()
+        currents = short_session(smu)
+        smu.disconnect()
+    return currents, clock.now
+
+
+def replay(path, **kwargs) -> tuple[list[float], float, ReplayResourceManager]:
+    clock = VirtualClock(tick=0.0)
+    rm = ReplayResourceManager(path, clock=clock, **kwargs)
+    smu = make_smu(clock)
+    with use_mock_visa(rm):
+        smu.connect()
+    currents = short_session(smu)
+    smu.disconnect()
+    return currents, clock.now, rm
+
+
+def test_trace_records_every_call_with_timing(tmp_path) -> None:
+    path = tmp_path / "session.jsonl"
+    record(path)
+
+    trace = read_trace(path)
+
+    assert trace.addresses() == {0: ADDRESS}
+    assert trace.entries[0].op == "open"
+    assert trace.entries[-1].op == "close"
+    calls = trace.session(0)
+    k = [entry.data for entry in calls].index("print(localnode.model)")
+    write, read = calls[k : k + 2]
+    assert (write.op, read.op, read.data) == ("w", "r", "2602B")
+    # 2 ms bus latency per message and answer
+    assert write.duration == pytest.approx(0.002)
+    assert read.t == pytest.approx(write.t + 0.002)
+
+
+@pytest.mark.parametrize("name", ["session.jsonl", "session.jsonl.gz"])
+def test_replay_reproduces_answers_and_instrument_time(tmp_path, name) -> None:
+    path = tmp_path / name
+    recorded, duration = record(path)
+
+    currents, replayed, rm = replay(path)
+
+    assert currents == recorded
+    assert replayed == pytest.approx(duration)
+    assert rm.remaining == 0
+
+
+def test_accelerated_replay(tmp_path) -> None:
+    path = tmp_path / "session.jsonl"
+    recorded, duration = record(path)
+
+    currents, fast, _ = replay(path, speed=4.0)
+    _, instant, _ = replay(path, speed=float("inf"))
+
+    assert currents == recorded
+    assert fast == pytest.approx(duration / 4)
+    assert instant == 0.0
+
+
+def test_diverging_driver_is_reported(tmp_path) -> None:
+    path = tmp_path / "session.jsonl"
+    record(path)
+    clock = VirtualClock(tick=0.0)
+    smu = make_smu(clock)
+    with use_mock_visa(ReplayResourceManager(path, clock=clock)):
+        smu.connect()
+    smu.setup_voltage_output(SMUChannel.CELL, 0.01)
+    smu.enable_output(SMUChannel.CELL)
+
+    with pytest.raises(ReplayMismatchError, match="recorded"):
+        smu.measure_voltage(SMUChannel.CELL)
+
+
+def test_unrecorded_address_is_not_found(tmp_path) -> None:
+    path = tmp_path / "session.jsonl"
+    record(path)
+    rm = ReplayResourceManager(path)
+
+    with pytest.raises(MockVisaIOError, match="RSRC_NFOUND"):
+        rm.open_resource("GPIB0::5::INSTR")
+    assert rm.list_resources() == (ADDRESS,)
+
+
+class SilentInstrument:
+    def write(self, message: str) -> None:
+        pass
+
+    def read(self) -> bytes | None:
+        return None
+
+
+def test_recorded_timeout_replays_as_timeout(tmp_path) -> None:
+    path = tmp_path / "timeout.jsonl"
+    clock = VirtualClock(tick=0.0)
+    with (
+        use_mock_visa(MockResourceManager({ADDRESS: SilentInstrument()}, clock=clock)),
+        record_visa(path, clock=clock),
+    ):
+        import pyvisa
+
+        resource = pyvisa.ResourceManager().open_resource(ADDRESS, timeout=300)
+        with pytest.raises(MockVisaIOError):
+            resource.query("*IDN?")
+
+    entries = read_trace(path).session(0)
+    assert [entry.op for entry in entries] == ["w", "r!"]
+    assert entries[1].duration == pytest.approx(0.3)
+
+    clock = VirtualClock(tick=0.0)
+    replayed = ReplayResourceManager(path, clock=clock).open_resource(ADDRESS, timeout=300)
+    with pytest.raises(MockVisaIOError, match="TMO"):
+        replayed.query("*IDN?")
+    assert clock.now == pytest.approx(0.3)
+